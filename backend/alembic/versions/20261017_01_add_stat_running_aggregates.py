@@ -0,0 +1,52 @@
+"""add running aggregates to evaluation stat tables
+
+Revision ID: 20261017_01
+Revises: 81f95d8556db
+Create Date: 2026-10-17
+
+"""
+
+# 统计表增量维护：总分累加和、各维度累加，学院统计补充最高/最低分
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_01"
+down_revision: Union[str, Sequence[str], None] = "81f95d8556db"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "teacher_evaluation_stat",
+        sa.Column("total_score_sum", sa.BigInteger(), nullable=True, comment="总分累加和（增量维护，可空表示尚未构建）"),
+    )
+    op.add_column(
+        "teacher_evaluation_stat",
+        sa.Column("dimension_sum_scores", sa.JSON(), nullable=True, comment='各维度累加 {维度: {"sum": x, "count": n}}（增量维护）'),
+    )
+
+    op.add_column("college_evaluation_stat", sa.Column("max_score", mysql.TINYINT(), nullable=True, comment="最高分（可空）"))
+    op.add_column("college_evaluation_stat", sa.Column("min_score", mysql.TINYINT(), nullable=True, comment="最低分（可空）"))
+    op.add_column(
+        "college_evaluation_stat",
+        sa.Column("total_score_sum", sa.BigInteger(), nullable=True, comment="总分累加和（增量维护，可空表示尚未构建）"),
+    )
+    op.add_column(
+        "college_evaluation_stat",
+        sa.Column("dimension_sum_scores", sa.JSON(), nullable=True, comment='各维度累加 {维度: {"sum": x, "count": n}}（增量维护）'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("college_evaluation_stat", "dimension_sum_scores")
+    op.drop_column("college_evaluation_stat", "total_score_sum")
+    op.drop_column("college_evaluation_stat", "min_score")
+    op.drop_column("college_evaluation_stat", "max_score")
+    op.drop_column("teacher_evaluation_stat", "dimension_sum_scores")
+    op.drop_column("teacher_evaluation_stat", "total_score_sum")
@@ -0,0 +1,84 @@
+"""add timetable.week_mask and semester/week index
+
+Revision ID: 20261017_02
+Revises: 20261017_01
+Create Date: 2026-10-17
+
+"""
+
+# 课表周次位图：替代 week_info 上的 LIKE 边界匹配，存量数据按 week_info 回填
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_02"
+down_revision: Union[str, Sequence[str], None] = "20261017_01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 2000
+MAX_WEEK = 63
+
+
+def _week_mask(week_info) -> int:
+    # 与 app.models.week_mask_of 一致；迁移里不引用应用代码，避免模型后续变更影响历史迁移
+    mask = 0
+    for part in str(week_info or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, sep, hi = part.partition("-")
+        try:
+            start, end = int(lo), int(hi) if sep else int(lo)
+        except ValueError:
+            continue
+        for w in range(max(start, 1), min(end, MAX_WEEK) + 1):
+            mask |= 1 << (w - 1)
+    return mask
+
+
+def upgrade() -> None:
+    op.add_column(
+        "timetable",
+        sa.Column(
+            "week_mask", sa.BigInteger(), nullable=False, server_default="0",
+            comment="上课周次位图（第n周=第n-1位，随 week_info 自动维护）",
+        ),
+    )
+
+    # 按主键分批回填
+    conn = op.get_bind()
+    timetable = sa.table("timetable", sa.column("id", sa.BigInteger()), sa.column("week_info", sa.String()), sa.column("week_mask", sa.BigInteger()))
+    update = (
+        timetable.update()
+        .where(timetable.c.id == sa.bindparam("b_id"))
+        .values(week_mask=sa.bindparam("b_mask"))
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(timetable.c.id, timetable.c.week_info)
+            .where(timetable.c.id > last_id)
+            .order_by(timetable.c.id)
+            .limit(BACKFILL_BATCH)
+        ).all()
+        if not rows:
+            break
+        params = [{"b_id": r.id, "b_mask": _week_mask(r.week_info)} for r in rows]
+        params = [p for p in params if p["b_mask"]]
+        if params:
+            conn.execute(update, params)
+        last_id = rows[-1].id
+
+    op.create_index(
+        "idx_timetable_semester_week", "timetable",
+        ["semester", "weekday", "college_id", "week_mask"], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_timetable_semester_week", table_name="timetable")
+    op.drop_column("timetable", "week_mask")
@@ -0,0 +1,64 @@
+"""add teaching_evaluation dimension generated columns and hot-filter indexes
+
+Revision ID: 20261017_03
+Revises: 20261017_02
+Create Date: 2026-10-17
+
+"""
+
+# 评教表：四个维度分数的存储生成列 + 高频过滤条件的联合索引
+# 注意：给大表加 STORED 生成列会重建整表（ALGORITHM=COPY），请在低峰期执行
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_03"
+down_revision: Union[str, Sequence[str], None] = "20261017_02"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (列名, JSON 路径, 注释)；表达式与 app.models._json_number 一致，迁移里不引用应用代码
+DIMENSION_COLUMNS = (
+    ("dim_teaching_attitude", "$.teachingAttitude", "维度分：教学态度（生成列）"),
+    ("dim_content", "$.content", "维度分：教学内容（生成列）"),
+    ("dim_method", "$.method", "维度分：教学方法与手段（生成列）"),
+    ("dim_effect", "$.effect", "维度分：教学效果（生成列）"),
+)
+
+INDEXES = (
+    ("idx_evaluation_tt_listener", ["timetable_id", "listen_teacher_id", "is_delete"]),
+    ("idx_evaluation_teacher_status", ["teach_teacher_id", "status", "is_delete"]),
+    ("idx_evaluation_listener_status", ["listen_teacher_id", "is_delete", "status", "timetable_id"]),
+)
+
+
+def _json_number(column: str, path: str) -> str:
+    value = f"json_extract(`{column}`, '{path}')"
+    return (
+        f"(case when json_type({value}) in ('INTEGER','UNSIGNED INTEGER','DOUBLE','DECIMAL') "
+        f"then cast({value} as decimal(10,4)) end)"
+    )
+
+
+def upgrade() -> None:
+    for name, path, comment in DIMENSION_COLUMNS:
+        op.add_column(
+            "teaching_evaluation",
+            sa.Column(
+                name, sa.DECIMAL(10, 4),
+                sa.Computed(_json_number("dimension_scores", path), persisted=True),
+                comment=comment,
+            ),
+        )
+    for name, columns in INDEXES:
+        op.create_index(name, "teaching_evaluation", columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name="teaching_evaluation")
+    for name, _, _ in reversed(DIMENSION_COLUMNS):
+        op.drop_column("teaching_evaluation", name)
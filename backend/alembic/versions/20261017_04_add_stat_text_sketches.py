@@ -0,0 +1,37 @@
+"""add high-frequency text sketches to teacher/college stat tables
+
+Revision ID: 20261017_04
+Revises: 20261017_03
+Create Date: 2026-10-17
+
+"""
+
+# 教师/学院统计表：高频问题/建议的 Space-Saving 计数表（增量维护），学院补高频建议
+# 已有统计行的计数表为空，下次对账（reconcile_stats）或该范围的评教变更触发重建时补齐
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_04"
+down_revision: Union[str, Sequence[str], None] = "20261017_03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("teacher_evaluation_stat", sa.Column("problem_sketch", sa.JSON(), comment="高频问题计数表（Space-Saving，增量维护）"))
+    op.add_column("teacher_evaluation_stat", sa.Column("suggestion_sketch", sa.JSON(), comment="高频建议计数表（Space-Saving，增量维护）"))
+    op.add_column("college_evaluation_stat", sa.Column("high_freq_suggestions", sa.JSON(), comment="学院高频建议（可空）"))
+    op.add_column("college_evaluation_stat", sa.Column("problem_sketch", sa.JSON(), comment="学院高频问题计数表（Space-Saving，增量维护）"))
+    op.add_column("college_evaluation_stat", sa.Column("suggestion_sketch", sa.JSON(), comment="学院高频建议计数表（Space-Saving，增量维护）"))
+
+
+def downgrade() -> None:
+    op.drop_column("college_evaluation_stat", "suggestion_sketch")
+    op.drop_column("college_evaluation_stat", "problem_sketch")
+    op.drop_column("college_evaluation_stat", "high_freq_suggestions")
+    op.drop_column("teacher_evaluation_stat", "suggestion_sketch")
+    op.drop_column("teacher_evaluation_stat", "problem_sketch")
@@ -0,0 +1,36 @@
+"""replace idx_timetable_semester_week with an academic-year-leading index
+
+Revision ID: 20261017_05
+Revises: 20261017_04
+Create Date: 2026-10-17
+
+"""
+
+# 原索引以 semester（只有 1/2 两个值）开头且不含 academic_year，待评筛选只能用上很短的前缀、扫描历年课表；
+# 改为 学年 + 学期 + 学院 + 星期 + 周次位图
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_05"
+down_revision: Union[str, Sequence[str], None] = "20261017_04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_timetable_term_week", "timetable",
+        ["academic_year", "semester", "college_id", "weekday", "week_mask"], unique=False,
+    )
+    op.drop_index("idx_timetable_semester_week", table_name="timetable")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "idx_timetable_semester_week", "timetable",
+        ["semester", "weekday", "college_id", "week_mask"], unique=False,
+    )
+    op.drop_index("idx_timetable_term_week", table_name="timetable")
@@ -0,0 +1,29 @@
+"""add user.password_changed_at
+
+Revision ID: 20261017_06
+Revises: 20261017_05
+Create Date: 2026-10-17
+
+"""
+
+# 修改/重置密码的时刻持久化（毫秒精度）：token 缓存未命中时据此判断撤销，worker 重启后撤销仍然有效
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_06"
+down_revision: Union[str, Sequence[str], None] = "20261017_05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("user", sa.Column("password_changed_at", mysql.DATETIME(fsp=3), comment="最近修改/重置密码时间（可空）"))
+
+
+def downgrade() -> None:
+    op.drop_column("user", "password_changed_at")
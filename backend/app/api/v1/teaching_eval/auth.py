@@ -14,6 +14,8 @@ from app.schemas import (
     TokenData,
 )
 from app.core.deps import get_current_user, require_access
+from app.core.rbac_cache import rbac_cache
+from app.crud.count_cache import bump_models
 from app.crud.role import role_crud
 from app.crud.permission import permission_crud
 from app.crud.user import user_crud
@@ -120,6 +122,7 @@ async def update_role(
             update_data["status"] = status
         
         updated_role = await role_crud.update(db, db_obj=role, obj_in=update_data)
+        rbac_cache.invalidate_all()
         return BaseResponse(code=200, msg="success", data={
             "id": updated_role.id,
             "name": updated_role.role_name,
@@ -146,6 +149,7 @@ async def delete_role(
     
     try:
         deleted_role = await role_crud.soft_remove(db, id=role_id)
+        rbac_cache.invalidate_all()
         return BaseResponse(code=200, msg="success", data={
             "id": deleted_role.id,
             "name": deleted_role.role_name,
@@ -292,6 +296,7 @@ async def update_permission(
             update_data["permission_description"] = description
         
         updated_permission = await permission_crud.update(db, db_obj=permission, obj_in=update_data)
+        rbac_cache.invalidate_all()
         return BaseResponse(code=200, msg="success", data={
             "id": updated_permission.id,
             "code": updated_permission.permission_code,
@@ -320,6 +325,7 @@ async def delete_permission(
     
     try:
         deleted_permission = await permission_crud.soft_remove(db, id=permission_id)
+        rbac_cache.invalidate_all()
         return BaseResponse(code=200, msg="success", data={
             "id": deleted_permission.id,
             "code": deleted_permission.permission_code,
@@ -412,6 +418,8 @@ async def assign_permissions_to_role(
         
         # 分配权限
         await role_crud.set_permissions(db, role=role, permissions=permissions)
+        # 角色权限变更影响该角色下所有用户，整体失效
+        rbac_cache.invalidate_all()
         
         return BaseResponse(code=200, msg="权限分配成功")
     except Exception as e:
@@ -527,6 +535,9 @@ async def set_user_roles(db: AsyncSession, *, user: User, roles: Sequence[Role])
         
         # 一次性提交所有更改
         await db.commit()
+        # Core 删除不经过 ORM 钩子，显式让 user_role 相关的分页总数失效
+        bump_models(UserRole)
+        rbac_cache.invalidate_user(user.id)
         await db.refresh(user)
         return user
     except IntegrityError:
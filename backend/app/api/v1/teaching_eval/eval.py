@@ -1,10 +1,14 @@
 # app/api/v1/teaching_eval/eval.py
 from __future__ import annotations
 
+import os
 from datetime import datetime
 from typing import Optional, List
 
+from urllib.parse import quote
+
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -16,9 +20,21 @@ from app.schemas import (
     EvaluationReviewRequest,
     CourseTypeUpdate,
 )
-from app.core.deps import get_current_user, require_access
+from app.core.deps import get_current_user, get_loader, require_access
+from app.crud.loader import EntityLoader
+from app.crud.pagination import want_total
 from app.crud.evaluation import evaluation_crud
+from app.crud.evaluated_index import evaluated_index
 from app.crud.timetable import timetable_crud
+from app.crud.export import (
+    EXPORT_MEDIA_TYPES,
+    build_export_stmt,
+    export_artifact_path,
+    export_body,
+    export_data_version,
+    export_filename,
+    write_export_artifact,
+)
 from app.models import TeachingEvaluation, User, Timetable, College
 
 # 如果你暂时还没把 college/school 统计迁移到 evaluation_crud，
@@ -35,6 +51,14 @@ def _iso(dt: Optional[datetime]) -> Optional[str]:
     return dt.isoformat() if dt else None
 
 
+async def _load_record_refs(loader: EntityLoader, records) -> None:
+    """评教记录列表用到的关联实体：听课人 + 课表，再到课表的授课教师"""
+    loader.prime(User, [rec.listen_teacher_id for rec in records])
+    timetables = await loader.load_many(Timetable, [rec.timetable_id for rec in records])
+    loader.prime(User, [tt.teacher_id for tt in timetables.values() if tt])
+    await loader.flush(User)
+
+
 def _timetable_brief(tt) -> dict:
     if not tt:
         return {}
@@ -225,20 +249,27 @@ async def list_my_evaluations(
         None,
         description="状态：0作废/1有效/2待审核/3驳回",
     ),
+    cursor: Optional[str] = Query(None, description="游标：传上一页返回的 next_cursor，空串表示游标模式第一页；传了则忽略页码"),
+    with_total: Optional[bool] = Query(None, description="是否返回总数（默认：页码分页返回，游标分页不返回）"),
     current_user: TokenData = Depends(
         require_access(roles_any=("teacher","supervisor","college_admin"))
     ),
     db: AsyncSession = Depends(get_db),
 ):
-    items, total = await evaluation_crud.list_mine(
-        db,
-        listen_teacher_id=current_user.id,
-        page=page,
-        page_size=page_size,
-        start_date=start_date,
-        end_date=end_date,
-        status=status,
-    )
+    try:
+        items, total, next_cursor = await evaluation_crud.list_mine(
+            db,
+            listen_teacher_id=current_user.id,
+            page=page,
+            page_size=page_size,
+            start_date=start_date,
+            end_date=end_date,
+            status=status,
+            cursor=cursor,
+            with_total=want_total(with_total, cursor),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return BaseResponse(
         code=200,
@@ -265,6 +296,7 @@ async def list_my_evaluations(
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": next_cursor,
         },
     )
 
@@ -283,7 +315,7 @@ async def get_evaluation_list_compat(
     ),
     db: AsyncSession = Depends(get_db),
 ):
-    items, total = await evaluation_crud.list_mine(
+    items, total, _ = await evaluation_crud.list_mine(
         db,
         listen_teacher_id=current_user.id,
         page=page,
@@ -421,23 +453,30 @@ async def list_received_evaluations(
     status: Optional[int] = Query(None, description="状态：0作废/1有效/2待审核/3驳回"),
     academic_year: Optional[str] = Query(None, description="学年（如2024-2025）"),
     semester: Optional[int] = Query(None, ge=1, le=2, description="学期 1-春季 2-秋季"),
+    cursor: Optional[str] = Query(None, description="游标：传上一页返回的 next_cursor，空串表示游标模式第一页；传了则忽略页码"),
+    with_total: Optional[bool] = Query(None, description="是否返回总数（默认：页码分页返回，游标分页不返回）"),
     current_user: TokenData = Depends(
         require_access(roles_any=("teacher",), perms_all=("evaluation:read:received",))
     ),
     db: AsyncSession = Depends(get_db),
 ):
-    items, total = await evaluation_crud.list_by_teacher(
-        db,
-        teach_teacher_id=current_user.id,
-        page=page,
-        page_size=page_size,
-        start_date=start_date,
-        end_date=end_date,
-        score_level=score_level,
-        status=status,
-        academic_year=academic_year,
-        semester=semester,
-    )
+    try:
+        items, total, next_cursor = await evaluation_crud.list_by_teacher(
+            db,
+            teach_teacher_id=current_user.id,
+            page=page,
+            page_size=page_size,
+            start_date=start_date,
+            end_date=end_date,
+            score_level=score_level,
+            status=status,
+            academic_year=academic_year,
+            semester=semester,
+            cursor=cursor,
+            with_total=want_total(with_total, cursor),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     data_list = []
     for ev in items:
@@ -471,6 +510,7 @@ async def list_received_evaluations(
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": next_cursor,
         },
     )
 
@@ -663,6 +703,7 @@ async def get_my_received_evaluations(
     limit: int = Query(50, ge=1, le=100),
     current_user: TokenData = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loader: EntityLoader = Depends(get_loader),
 ):
     """获取当前用户作为授课教师收到的所有评教记录"""
     from sqlalchemy import and_, or_
@@ -702,13 +743,16 @@ async def get_my_received_evaluations(
     result = await db.execute(stmt)
     evaluations = result.scalars().all()
     
+    # 课表、评教人按页批量加载
+    loader.prime(Timetable, [ev.timetable_id for ev in evaluations])
+    loader.prime(User, [ev.listen_teacher_id for ev in evaluations])
+    await loader.flush()
+
     # 构建返回数据
     records = []
     for ev in evaluations:
-        # 获取课表信息
-        timetable = await db.get(Timetable, ev.timetable_id)
-        # 获取评教人信息
-        listener = await db.get(User, ev.listen_teacher_id) if ev.listen_teacher_id else None
+        timetable = loader.get(Timetable, ev.timetable_id)
+        listener = loader.get(User, ev.listen_teacher_id)
         
         # 构建各维度评分详情（从JSON字段解析，转换为中文名称）
         dimension_name_map = {
@@ -970,6 +1014,32 @@ async def fetch_school_statistics(
     return BaseResponse(code=200, msg="success", data=stat)
 
 
+@router.post(
+    "/statistics/reconcile",
+    summary="统计表对账（按明细重建并报告偏差）",
+    response_model=BaseResponse,
+)
+async def reconcile_statistics(
+    academic_year: str = Query(..., description="学年（如2024-2025）"),
+    semester: int = Query(..., ge=1, le=2, description="学期 1-春季 2-秋季"),
+    current_user: TokenData = Depends(
+        require_access(
+            roles_any=("school_admin",),
+            perms_all=("evaluation:stats:school",),
+        )
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    from app.crud.stats import reconcile_stats
+
+    try:
+        report = await reconcile_stats(db, stat_year=academic_year, stat_semester=semester)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"统计对账失败: {str(e)}")
+    return BaseResponse(code=200, msg="success", data=report)
+
+
 # -----------------------------
 # 12) 教师排名接口
 # -----------------------------
@@ -1072,6 +1142,48 @@ async def fetch_teacher_ranking(
 # -----------------------------
 # 13) 数据导出接口
 # -----------------------------
+def _export_file_response(stmt, *, file_format: str, filename: str) -> StreamingResponse:
+    """评教明细以文件流返回（服务端游标逐行写出，内存占用与行数无关）"""
+    try:
+        body = export_body(stmt, file_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"},
+    )
+
+
+async def _resolve_export_college_id(db: AsyncSession, current_user: TokenData, college_id: Optional[int]) -> Optional[int]:
+    """范围校验（督导按配置范围导出数据），返回实际导出的学院ID"""
+    from app.crud.user import get_roles_code
+    from app.crud.user import get_effective_supervisor_scope
+
+    roles = await get_roles_code(db, current_user)
+    if "supervisor" in roles and "school_admin" not in roles:
+        # 按督导配置范围校验和默认值
+        allow_college_ids, allow_room_ids = await get_effective_supervisor_scope(db, current_user=current_user)
+        if not allow_college_ids and not allow_room_ids:
+            raise HTTPException(status_code=403, detail="督导未配置负责范围，无法导出数据")
+        if college_id is not None:
+            if allow_college_ids and college_id not in allow_college_ids:
+                raise HTTPException(status_code=403, detail="督导无权导出该学院数据")
+        else:
+            # 未指定学院时，默认取第一个允许的学院（如果有配置学院范围）
+            if allow_college_ids:
+                college_id = allow_college_ids[0]
+    return college_id
+
+
+async def _ensure_college_exists(db: AsyncSession, college_id: Optional[int]) -> None:
+    college_exists = await db.execute(
+        select(College.id).where(College.id == college_id, College.is_delete == False)  # noqa: E712
+    )
+    if not college_exists.scalar_one_or_none():
+        raise HTTPException(status_code=400, detail="学院不存在")
+
+
 @router.get(
     "/export/college",
     summary="导出学院评教数据",
@@ -1081,6 +1193,7 @@ async def export_college_evaluation(
     college_id: int,
     academic_year: Optional[str] = Query(None, description="学年（如2024-2025）"),
     semester: Optional[int] = Query(None, ge=1, le=2, description="学期 1-春季 2-秋季"),
+    file_format: str = Query("csv", alias="format", pattern="^(csv|xlsx|json)$", description="csv/xlsx 为文件流，json 为统计结构"),
     current_user: TokenData = Depends(
         require_access(
             # 22300417陈俫坤开发：督导老师可导出负责范围（学院）数据
@@ -1092,28 +1205,19 @@ async def export_college_evaluation(
 ):
     from app.crud.stats import get_college_statistics
     from datetime import datetime
-    from app.crud.user import get_roles_code
-    from app.crud.user import get_effective_supervisor_scope
 
-    # 22300417陈俫坤开发：范围校验（督导按配置范围导出数据）
-    roles = await get_roles_code(db, current_user)
-    if "supervisor" in roles and "school_admin" not in roles:
-        # 22300417陈俫坤开发：按督导配置范围校验和默认值
-        allow_college_ids, allow_room_ids = await get_effective_supervisor_scope(db, current_user=current_user)
-        if not allow_college_ids and not allow_room_ids:
-            raise HTTPException(status_code=403, detail="督导未配置负责范围，无法导出数据")
-        if college_id is not None:
-            if allow_college_ids and college_id not in allow_college_ids:
-                raise HTTPException(status_code=403, detail="督导无权导出该学院数据")
-        else:
-            # 未指定学院时，默认取第一个允许的学院（如果有配置学院范围）
-            if allow_college_ids:
-                college_id = allow_college_ids[0]
-    
+    college_id = await _resolve_export_college_id(db, current_user, college_id)
+
+    if file_format != "json":
+        await _ensure_college_exists(db, college_id)
+        return _export_file_response(
+            build_export_stmt(college_id=college_id, academic_year=academic_year, semester=semester),
+            file_format=file_format,
+            filename=export_filename(f"学院{college_id}", academic_year, semester, file_format),
+        )
+
     try:
         stat = await get_college_statistics(db, college_id=college_id, academic_year=academic_year, semester=semester)
-        # 这里可以添加导出逻辑，比如生成Excel文件
-        # 暂时返回数据结构，实际项目中应返回文件下载链接或文件流
         return BaseResponse(code=200, msg="success", data={
             "export_data": stat,
             "export_type": "college",
@@ -1131,6 +1235,7 @@ async def export_college_evaluation(
 async def export_school_evaluation(
     academic_year: Optional[str] = Query(None, description="学年（如2024-2025）"),
     semester: Optional[int] = Query(None, ge=1, le=2, description="学期 1-春季 2-秋季"),
+    file_format: str = Query("csv", alias="format", pattern="^(csv|xlsx|json)$", description="csv/xlsx 为文件流，json 为统计结构"),
     current_user: TokenData = Depends(
         require_access(
             roles_any=("school_admin",),
@@ -1141,10 +1246,15 @@ async def export_school_evaluation(
 ):
     from app.crud.stats import get_school_statistics
     from datetime import datetime
-    
+
+    if file_format != "json":
+        return _export_file_response(
+            build_export_stmt(academic_year=academic_year, semester=semester),
+            file_format=file_format,
+            filename=export_filename("全校", academic_year, semester, file_format),
+        )
+
     stat = await get_school_statistics(db, academic_year=academic_year, semester=semester)
-    # 这里可以添加导出逻辑，比如生成Excel文件
-    # 暂时返回数据结构，实际项目中应返回文件下载链接或文件流
     return BaseResponse(code=200, msg="success", data={
         "export_data": stat,
         "export_type": "school",
@@ -1152,6 +1262,161 @@ async def export_school_evaluation(
     })
 
 
+# 后台导出任务：全校跨多学期导出耗时长，同步下载会撞上 nginx 的 proxy_read_timeout
+async def _submit_export_job(
+    db: AsyncSession,
+    current_user: TokenData,
+    *,
+    scope: str,
+    college_id: Optional[int],
+    academic_year: Optional[str],
+    semester: Optional[int],
+    file_format: str,
+) -> BaseResponse:
+    from app.core.config import EXPORT_JOB_DIR
+    from app.core.jobs import export_jobs
+
+    if file_format == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=400, detail="服务器未安装 openpyxl，无法导出 XLSX，请改用 CSV")
+
+    version = await export_data_version(db, college_id=college_id, academic_year=academic_year, semester=semester)
+    path = export_artifact_path(EXPORT_JOB_DIR, scope, academic_year, semester, file_format, version)
+    stmt = build_export_stmt(college_id=college_id, academic_year=academic_year, semester=semester)
+
+    async def run(job):
+        size = await write_export_artifact(stmt, path, file_format)
+        job.meta["size"] = size
+        return str(path)
+
+    label = f"学院{college_id}" if college_id is not None else "全校"
+    job, created = export_jobs.submit(
+        (scope, academic_year, semester, file_format, version),
+        run,
+        owner=current_user.id,
+        meta={
+            "scope": scope,
+            "academic_year": academic_year,
+            "semester": semester,
+            "format": file_format,
+            "data_version": version,
+            "filename": export_filename(label, academic_year, semester, file_format),
+        },
+    )
+    return BaseResponse(code=200, msg="success", data={**job.to_dict(), "reused": not created})
+
+
+@router.post(
+    "/export/college/jobs",
+    summary="提交学院评教数据后台导出任务",
+    response_model=BaseResponse,
+)
+async def submit_college_export_job(
+    college_id: int,
+    academic_year: Optional[str] = Query(None, description="学年（如2024-2025）"),
+    semester: Optional[int] = Query(None, ge=1, le=2, description="学期 1-春季 2-秋季"),
+    file_format: str = Query("csv", alias="format", pattern="^(csv|xlsx)$"),
+    current_user: TokenData = Depends(
+        require_access(
+            roles_any=("supervisor", "college_admin", "school_admin"),
+            perms_all=("evaluation:export:college",),
+        )
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    college_id = await _resolve_export_college_id(db, current_user, college_id)
+    await _ensure_college_exists(db, college_id)
+    return await _submit_export_job(
+        db,
+        current_user,
+        scope=f"college-{college_id}",
+        college_id=college_id,
+        academic_year=academic_year,
+        semester=semester,
+        file_format=file_format,
+    )
+
+
+@router.post(
+    "/export/school/jobs",
+    summary="提交全校评教数据后台导出任务",
+    response_model=BaseResponse,
+)
+async def submit_school_export_job(
+    academic_year: Optional[str] = Query(None, description="学年（如2024-2025）"),
+    semester: Optional[int] = Query(None, ge=1, le=2, description="学期 1-春季 2-秋季"),
+    file_format: str = Query("csv", alias="format", pattern="^(csv|xlsx)$"),
+    current_user: TokenData = Depends(
+        require_access(
+            roles_any=("school_admin",),
+            perms_all=("evaluation:export:all",),
+        )
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    return await _submit_export_job(
+        db,
+        current_user,
+        scope="school",
+        college_id=None,
+        academic_year=academic_year,
+        semester=semester,
+        file_format=file_format,
+    )
+
+
+def _get_owned_export_job(job_id: str, current_user: TokenData):
+    from app.core.jobs import export_jobs
+
+    job = export_jobs.get(job_id)
+    # 只有提交过该任务（含被去重合并）的用户可以查看/下载
+    if job is None or current_user.id not in job.owners:
+        raise HTTPException(status_code=404, detail="导出任务不存在或已过期")
+    return job
+
+
+@router.get(
+    "/export/jobs/{job_id}",
+    summary="查询后台导出任务状态",
+    response_model=BaseResponse,
+)
+async def get_export_job(
+    job_id: str,
+    current_user: TokenData = Depends(
+        require_access(roles_any=("supervisor", "college_admin", "school_admin"))
+    ),
+):
+    job = _get_owned_export_job(job_id, current_user)
+    return BaseResponse(code=200, msg="success", data=job.to_dict())
+
+
+@router.get(
+    "/export/jobs/{job_id}/download",
+    summary="下载后台导出任务产物",
+)
+async def download_export_job(
+    job_id: str,
+    current_user: TokenData = Depends(
+        require_access(roles_any=("supervisor", "college_admin", "school_admin"))
+    ),
+):
+    from app.core.jobs import DONE
+
+    job = _get_owned_export_job(job_id, current_user)
+    if job.status != DONE:
+        raise HTTPException(status_code=409, detail=f"导出任务尚未完成（{job.status}）")
+    if not os.path.exists(job.result):
+        # 数据已更新，旧版本产物被清理；重新提交即可
+        raise HTTPException(status_code=410, detail="导出文件已过期，请重新提交导出任务")
+    return FileResponse(
+        job.result,
+        media_type=EXPORT_MEDIA_TYPES[job.meta["format"]],
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(job.meta['filename'])}"},
+    )
+
+
 # -----------------------------  
 # 14) 获取待评课程列表  
 # -----------------------------  
@@ -1173,6 +1438,8 @@ async def get_pending_courses(
     semester: Optional[int] = Query(None, ge=1, le=2, description="学期 1-春季 2-秋季"),
     course_name: Optional[str] = Query(None, description="课程名称（模糊匹配）"),
     keyword: Optional[str] = Query(None, description="关键词（课程名/授课教师名 模糊匹配）"),
+    cursor: Optional[str] = Query(None, description="游标：传上一页返回的 next_cursor，空串表示游标模式第一页；传了则忽略页码"),
+    with_total: Optional[bool] = Query(None, description="是否返回总数（默认：页码分页返回，游标分页不返回）"),
     current_user: TokenData = Depends(
         require_access(
             # 22300417陈俫坤开发：督导老师也可以查看待评课程
@@ -1239,21 +1506,26 @@ async def get_pending_courses(
         res = await db.execute(select(User.id).where(User.user_name.like(f"%{search_kw}%")))
         teacher_ids_kw = [int(x) for x in res.scalars().all()]
 
-    items, total = await timetable_crud.list_pending_evaluation_for_user(
-        db,
-        listen_teacher_id=current_user.id,
-        course_name=search_kw,
-        teacher_ids=teacher_ids_kw or None,
-        teacher_id=int(teacher_id) if teacher_id is not None else None,
-        weekday=int(weekday) if weekday is not None else None,
-        week=int(week) if week is not None else None,
-        college_ids=allow_college_ids or None,
-        research_room_ids=allow_room_ids or None,
-        academic_year=academic_year,
-        semester=semester,
-        skip=skip,
-        limit=page_size,
-    )
+    try:
+        items, total, next_cursor = await timetable_crud.list_pending_evaluation_for_user(
+            db,
+            listen_teacher_id=current_user.id,
+            course_name=search_kw,
+            teacher_ids=teacher_ids_kw or None,
+            teacher_id=int(teacher_id) if teacher_id is not None else None,
+            weekday=int(weekday) if weekday is not None else None,
+            week=int(week) if week is not None else None,
+            college_ids=allow_college_ids or None,
+            research_room_ids=allow_room_ids or None,
+            academic_year=academic_year,
+            semester=semester,
+            skip=skip,
+            limit=page_size,
+            cursor=cursor,
+            with_total=want_total(with_total, cursor),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # 22300417陈俫坤开发：批量查询授课教师姓名，避免前端二次请求
     teacher_ids = {int(x.teacher_id) for x in items if getattr(x, "teacher_id", None) is not None}
@@ -1288,6 +1560,7 @@ async def get_pending_courses(
             "total": total,
             "page": page,
             "page_size": page_size,
+            "next_cursor": next_cursor,
         },
     )
 
@@ -1373,19 +1646,10 @@ async def get_completed_courses(
         teacher_map = {int(uid): (uname or "") for uid, uname in res.all()}
 
     # 22300417陈俫坤开发：补齐已评课程 -> 我的评教详情联动所需 evaluation_id
-    timetable_ids = [int(x.id) for x in items]
-    evaluation_map: dict[int, int] = {}
-    if timetable_ids:
-        eval_res = await db.execute(
-            select(TeachingEvaluation.timetable_id, func.max(TeachingEvaluation.id).label("evaluation_id"))
-            .where(
-                TeachingEvaluation.listen_teacher_id == current_user.id,
-                TeachingEvaluation.is_delete == False,  # noqa: E712
-                TeachingEvaluation.timetable_id.in_(timetable_ids),
-            )
-            .group_by(TeachingEvaluation.timetable_id)
-        )
-        evaluation_map = {int(tid): int(eid) for tid, eid in eval_res.all() if eid is not None}
+    # 已评索引里记着每门课的评教记录ID，取最新一条，无需再查库
+    evaluation_map = await evaluated_index.evaluations(
+        db, listen_teacher_id=current_user.id, academic_year=academic_year, semester=semester,
+    )
 
     return BaseResponse(
         code=200,
@@ -1519,6 +1783,7 @@ async def get_college_teacher_records(
         require_access(roles_any=("college_admin", "school_admin"))
     ),
     db: AsyncSession = Depends(get_db),
+    loader: EntityLoader = Depends(get_loader),
 ):
     """22300417陈俫坤开发：学院管理员查看本院非督导教师提交的听课评教记录"""
     # school_admin可以指定学院，college_admin只能查看本院
@@ -1560,20 +1825,23 @@ async def get_college_teacher_records(
     result = await db.execute(stmt)
     records = result.scalars().all()
     
+    # 听课人、课表、授课教师按页批量加载（固定两条查询）
+    await _load_record_refs(loader, records)
+
     # 构造返回数据
     data_list = []
     for rec in records:
         # 获取听课教师名
-        listen_teacher = await db.get(User, rec.listen_teacher_id)
+        listen_teacher = loader.get(User, rec.listen_teacher_id)
         listen_teacher_name = getattr(listen_teacher, "user_name", None) if listen_teacher else None
         
         # 获取被评教师名
-        tt = await db.get(Timetable, rec.timetable_id)
+        tt = loader.get(Timetable, rec.timetable_id)
         teacher_name = None
         course_name = None
         if tt:
             course_name = tt.course_name
-            teacher = await db.get(User, tt.teacher_id)
+            teacher = loader.get(User, tt.teacher_id)
             teacher_name = getattr(teacher, "user_name", None) if teacher else None
         
         data_list.append({
@@ -1606,6 +1874,7 @@ async def get_college_received_evaluations(
         require_access(roles_any=("college_admin", "school_admin"))
     ),
     db: AsyncSession = Depends(get_db),
+    loader: EntityLoader = Depends(get_loader),
 ):
     """22300417陈俫坤开发：学院管理员查看本院老师收到的督导评教"""
     if college_id is None:
@@ -1646,20 +1915,23 @@ async def get_college_received_evaluations(
     result = await db.execute(stmt)
     records = result.scalars().all()
     
+    # 听课人、课表、授课教师按页批量加载（固定两条查询）
+    await _load_record_refs(loader, records)
+
     # 构造返回数据
     data_list = []
     for rec in records:
         # 获取督导名
-        listen_teacher = await db.get(User, rec.listen_teacher_id)
+        listen_teacher = loader.get(User, rec.listen_teacher_id)
         listen_teacher_name = getattr(listen_teacher, "user_name", None) if listen_teacher else None
         
         # 获取被评教师名
-        tt = await db.get(Timetable, rec.timetable_id)
+        tt = loader.get(Timetable, rec.timetable_id)
         teacher_name = None
         course_name = None
         if tt:
             course_name = tt.course_name
-            teacher = await db.get(User, tt.teacher_id)
+            teacher = loader.get(User, tt.teacher_id)
             teacher_name = getattr(teacher, "user_name", None) if teacher else None
         
         data_list.append({
@@ -1695,6 +1967,7 @@ async def get_college_pending_courses(
         require_access(roles_any=("college_admin", "school_admin"))
     ),
     db: AsyncSession = Depends(get_db),
+    loader: EntityLoader = Depends(get_loader),
 ):
     """22300417陈俫坤开发：学院管理员查看本院待评课程（尚未被评教的课表）"""
     if college_id is None:
@@ -1732,16 +2005,7 @@ async def get_college_pending_courses(
     
     # 按周次筛选
     if week:
-        from sqlalchemy import or_
-        w = str(int(week))
-        stmt = stmt.where(
-            or_(
-                Timetable.week_info == w,
-                Timetable.week_info.like(f"{w},%"),
-                Timetable.week_info.like(f"%,{w},%"),
-                Timetable.week_info.like(f"%,{w}"),
-            )
-        )
+        stmt = stmt.where(Timetable.has_week(week))
     
     # 按星期筛选
     if weekday:
@@ -1762,8 +2026,9 @@ async def get_college_pending_courses(
     
     # 构造返回数据
     data_list = []
+    await loader.load_many(User, [course.teacher_id for course in courses])
     for course in courses:
-        teacher = await db.get(User, course.teacher_id)
+        teacher = loader.get(User, course.teacher_id)
         teacher_name = getattr(teacher, "user_name", None) if teacher else None
         
         data_list.append({
@@ -1799,6 +2064,7 @@ async def get_college_completed_courses(
         require_access(roles_any=("college_admin", "school_admin"))
     ),
     db: AsyncSession = Depends(get_db),
+    loader: EntityLoader = Depends(get_loader),
 ):
     """22300417陈俫坤开发：学院管理员查看本院已评课程（已被评教的课表及评教信息）"""
     if college_id is None:
@@ -1831,16 +2097,7 @@ async def get_college_completed_courses(
     
     # 按周次筛选
     if week:
-        from sqlalchemy import or_
-        w = str(int(week))
-        stmt = stmt.where(
-            or_(
-                Timetable.week_info == w,
-                Timetable.week_info.like(f"{w},%"),
-                Timetable.week_info.like(f"%,{w},%"),
-                Timetable.week_info.like(f"%,{w}"),
-            )
-        )
+        stmt = stmt.where(Timetable.has_week(week))
     
     # 按星期筛选
     if weekday:
@@ -1861,13 +2118,17 @@ async def get_college_completed_courses(
     
     # 构造返回数据
     data_list = []
+    await loader.load_many(
+        User,
+        [course.teacher_id for _, course in rows] + [evaluation.listen_teacher_id for evaluation, _ in rows],
+    )
     for evaluation, course in rows:
         # 获取授课教师名
-        teacher = await db.get(User, course.teacher_id)
+        teacher = loader.get(User, course.teacher_id)
         teacher_name = getattr(teacher, "user_name", None) if teacher else None
         
         # 获取听课教师名
-        listen_teacher = await db.get(User, evaluation.listen_teacher_id)
+        listen_teacher = loader.get(User, evaluation.listen_teacher_id)
         listen_teacher_name = getattr(listen_teacher, "user_name", None) if listen_teacher else None
         
         data_list.append({
@@ -1911,49 +2172,25 @@ async def get_college_listen_statistics(
         raise HTTPException(status_code=403, detail="未指定学院")
     college_id = int(college_id)
     
-    # 获取本院所有教师
-    teacher_stmt = select(User.id, User.user_name).where(
-        User.college_id == college_id,
-        User.is_delete == False,
+    from app.crud.stats import college_listen_counts, get_listen_required_count
+
+    # 本院全部教师的听课次数（一条分组查询，未听课的教师计 0）
+    teachers = await college_listen_counts(
+        db, college_id=college_id, academic_year=academic_year, semester=semester
     )
-    teacher_result = await db.execute(teacher_stmt)
-    teachers = teacher_result.all()
-    
-    # 统计每个教师的听课次数（非督导评教）
+    required_count = await get_listen_required_count(db)
+
     teacher_stats = []
     completed_count = 0
-    required_count = 1  # 默认要求至少听课1次，可配置
-    
-    for teacher_id, teacher_name in teachers:
-        # 查询该教师提交的评教数量
-        eval_stmt = select(func.count(TeachingEvaluation.id)).where(
-            TeachingEvaluation.listen_teacher_id == teacher_id,
-            TeachingEvaluation.is_delete == False,
-            (TeachingEvaluation.eval_source != "supervisor") | (TeachingEvaluation.eval_source == None),
-        )
-        if academic_year:
-            eval_stmt = eval_stmt.join(Timetable, TeachingEvaluation.timetable_id == Timetable.id).where(
-                Timetable.academic_year == academic_year
-            )
-        if semester:
-            if academic_year:
-                eval_stmt = eval_stmt.where(Timetable.semester == semester)
-            else:
-                eval_stmt = eval_stmt.join(Timetable, TeachingEvaluation.timetable_id == Timetable.id).where(
-                    Timetable.semester == semester
-                )
-        
-        listen_count = (await db.execute(eval_stmt)).scalar_one()
-        
+    for teacher_id, teacher_name, listen_count in teachers:
         teacher_stats.append({
             "teacher_id": teacher_id,
             "teacher_name": teacher_name,
             "listen_count": listen_count,
         })
-        
         if listen_count >= required_count:
             completed_count += 1
-    
+
     # 按听课次数降序排列
     teacher_stats.sort(key=lambda x: x["listen_count"], reverse=True)
     
@@ -1979,6 +2216,7 @@ async def get_college_received_statistics(
         require_access(roles_any=("college_admin", "school_admin"))
     ),
     db: AsyncSession = Depends(get_db),
+    loader: EntityLoader = Depends(get_loader),
 ):
     """22300417陈俫坤开发：学院管理员查看本院教师被听统计（督导评分分布、排名）"""
     if college_id is None:
@@ -2007,6 +2245,9 @@ async def get_college_received_statistics(
     result = await db.execute(stmt)
     evaluations = result.scalars().all()
     
+    timetables = await loader.load_many(Timetable, [ev.timetable_id for ev in evaluations])
+    await loader.load_many(User, [tt.teacher_id for tt in timetables.values() if tt])
+
     # 统计
     total_received = len(evaluations)
     total_score = 0
@@ -2030,11 +2271,11 @@ async def get_college_received_statistics(
             score_distribution["不合格"] += 1
         
         # 按教师聚合
-        tt = await db.get(Timetable, ev.timetable_id)
+        tt = timetables.get(ev.timetable_id)
         if tt:
             tid = tt.teacher_id
             if tid not in teacher_data:
-                teacher = await db.get(User, tid)
+                teacher = loader.get(User, tid)
                 teacher_data[tid] = {
                     "teacher_id": tid,
                     "teacher_name": getattr(teacher, "user_name", None) if teacher else None,
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -27,7 +27,10 @@ from app.schemas import (
     TimetableResponse,
     TokenData,
 )
-from app.core.deps import get_current_user, require_access
+from app.core.deps import get_current_user, get_loader, require_access
+from app.crud.count_cache import cached_count
+from app.crud.loader import EntityLoader
+from app.crud.pagination import apply_keyset, keyset_order_by, keyset_page, want_total
 from app.crud.user import get_roles_code
 from app.crud.user import get_effective_supervisor_scope
 from app.crud.org import (
@@ -667,6 +670,8 @@ async def list_timetables(
     semester: Optional[int] = None,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="游标：传上一页返回的 next_cursor，空串表示游标模式第一页；传了则忽略 skip"),
+    with_total: Optional[bool] = Query(None, description="是否返回总数（默认：偏移分页返回，游标分页不返回）"),
     current_user: TokenData = Depends(
         # 22300417陈俫坤开发：督导老师需要查看负责范围内教师课表
         require_access(roles_any=("school_admin", "college_admin", "supervisor", "teacher"))
@@ -744,12 +749,22 @@ async def list_timetables(
     if classroom:
         filters.append(timetable_crud.model.classroom.like(f"%{classroom}%"))
     
+    # 排序键：星期、节次、小节，id 决胜（游标分页需要唯一的最后一列）
+    keyset = [
+        (timetable_crud.model.weekday, False),
+        (timetable_crud.model.period, False),
+        (timetable_crud.model.section_time, False),
+        (timetable_crud.model.id, False),
+    ]
+    count_total = want_total(with_total, cursor)
+    next_cursor = None
+
     # 如果提供了user_on，通过关联User表过滤
     if user_on:
         # 22300417陈俫坤开发：支持按教师工号/账号（User.user_on）查询课表。
         # 这里必须 join User，否则 where(User.user_on...) 无法正确关联到课表的 teacher_id。
         # 使用 joinedload 预加载 teacher 关系，避免后续序列化时额外查询。
-        timetables = await db.execute(
+        base = (
             select(timetable_crud.model)
             .join(User, timetable_crud.model.teacher_id == User.id)
             .options(joinedload(timetable_crud.model.teacher))
@@ -757,23 +772,43 @@ async def list_timetables(
                 *filters,
                 User.user_on.like(f"%{user_on}%")
             )
-            .offset(skip)
-            .limit(limit)
-            .order_by(timetable_crud.model.weekday, timetable_crud.model.period, timetable_crud.model.section_time)
         )
-        timetables = timetables.scalars().all()
-        
+        if cursor is None:
+            timetables = await db.execute(base.order_by(*keyset_order_by(keyset)).offset(skip).limit(limit))
+            timetables = timetables.scalars().all()
+        else:
+            try:
+                timetables = await db.execute(apply_keyset(base, keyset, cursor, limit))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            timetables, next_cursor = keyset_page(timetables.scalars().all(), keyset, limit)
+
         # 计算总数
-        total = await db.execute(
-            select(func.count())
-            .select_from(timetable_crud.model)
-            .join(User, timetable_crud.model.teacher_id == User.id)
-            .where(
-                *filters,
-                User.user_on.like(f"%{user_on}%")
+        total = None
+        if count_total:
+            total = await cached_count(
+                db,
+                select(func.count())
+                .select_from(timetable_crud.model)
+                .join(User, timetable_crud.model.teacher_id == User.id)
+                .where(
+                    *filters,
+                    User.user_on.like(f"%{user_on}%")
+                )
             )
-        )
-        total = total.scalar_one()
+    elif cursor is not None:
+        try:
+            timetables, total, next_cursor = await timetable_crud.get_multi_keyset(
+                db,
+                keyset=keyset,
+                cursor=cursor,
+                limit=limit,
+                filters=filters,
+                options=[joinedload(timetable_crud.model.teacher)],
+                with_total=count_total,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     else:
         # 常规查询
         timetables, total = await timetable_crud.get_multi(
@@ -781,8 +816,9 @@ async def list_timetables(
             filters=filters,
             skip=skip,
             limit=limit,
-            order_by=[timetable_crud.model.weekday, timetable_crud.model.period, timetable_crud.model.section_time],
+            order_by=keyset_order_by(keyset),
             options=[joinedload(timetable_crud.model.teacher)],
+            with_total=count_total,
         )
     
     # 转换为响应模型
@@ -803,6 +839,7 @@ async def list_timetables(
             "total": total,
             "skip": skip,
             "limit": limit,
+            "next_cursor": next_cursor,
         },
     )
 
@@ -823,6 +860,7 @@ async def list_users(
         require_access(roles_any=("school_admin",))
     ),
     db: AsyncSession = Depends(get_db),
+    loader: EntityLoader = Depends(get_loader),
 ):
     """22300417陈俫坤开发：获取用户列表，支持按学院筛选，用于教师归属管理"""
     filters = [User.is_delete == False]
@@ -842,15 +880,13 @@ async def list_users(
     
     # 查询总数
     count_stmt = select(func.count(User.id)).where(*filters)
-    total = (await db.execute(count_stmt)).scalar_one()
+    total = await cached_count(db, count_stmt)
     
-    # 获取用户的教研室信息
+    # 获取用户的教研室信息（教师档案按 user_id 一次取回）
+    profiles = await loader.load_many(TeacherProfile, [user.id for user in users], key="user_id")
     user_list = []
     for user in users:
-        # 查询教师档案获取教研室
-        profile_stmt = select(TeacherProfile).where(TeacherProfile.user_id == user.id)
-        profile_result = await db.execute(profile_stmt)
-        profile = profile_result.scalar_one_or_none()
+        profile = profiles.get(user.id)
         
         user_list.append({
             "id": user.id,
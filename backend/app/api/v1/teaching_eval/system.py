@@ -9,6 +9,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.core.auth import get_password_hash
+from app.core.rbac_cache import rbac_cache
+from app.core.token_cache import token_cache
+from app.core.password_pool import password_pool
+from app.core.jobs import export_jobs
+from app.core.db_pool import pool_monitor
+from app.core.coherence import coherence_bus
+from app.crud.count_cache import count_cache
+from app.crud.evaluated_index import evaluated_index
+from app.crud.audit_sink import audit_sink
 from app.models import Permission, Role, RolePermission, User, UserRole
 
 router = APIRouter(prefix="", tags=["系统初始化"])
@@ -259,6 +268,7 @@ async def bootstrap_seed(db: AsyncSession) -> Dict[str, Any]:
                 created_user_roles += 1
 
     await db.commit()
+    rbac_cache.invalidate_all()
 
     return {
         "created_permissions": created_permissions,
@@ -354,3 +364,22 @@ async def db_info(request: Request, db: AsyncSession = Depends(get_db)) -> Dict[
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"db-info failed: {e}")
+
+
+@router.get("/metrics", summary="运行指标：进程内缓存命中等")
+async def metrics(request: Request) -> Dict[str, Any]:
+    """仅本机或携带 bootstrap token 可访问"""
+
+    _require_local_or_token(request)
+
+    return {
+        "rbac_cache": rbac_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "password_pool": password_pool.stats(),
+        "export_jobs": export_jobs.stats(),
+        "count_cache": count_cache.stats(),
+        "evaluated_index": evaluated_index.stats(),
+        "audit_sink": audit_sink.stats(),
+        "db_pool": pool_monitor.stats(),
+        "coherence": coherence_bus.stats(),
+    }
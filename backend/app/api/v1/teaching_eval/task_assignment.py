@@ -1,12 +1,13 @@
 # 22300417陈俫坤开发：督导评教任务分配接口
 from __future__ import annotations
 
+import time
 from typing import Optional, List
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func
 from pydantic import BaseModel, Field
 
 from app.database import get_db
@@ -14,6 +15,15 @@ from app.schemas import BaseResponse, TokenData
 from app.core.deps import require_access
 from app.models import Timetable, User, TeachingEvaluation
 from app.crud.user import get_roles_code
+from app.crud.count_cache import bump_models, cached_count
+from app.crud.evaluated_index import evaluated_index
+from app.crud.task_assignment import (
+    bulk_insert_assignments,
+    build_assignment_rows,
+    existing_assignment_pairs,
+    find_non_supervisors,
+    load_assign_timetables,
+)
 
 router = APIRouter(prefix="", tags=["督导任务分配"])
 
@@ -43,80 +53,56 @@ async def assign_evaluation_tasks(
     - 学院管理员可以指定督导老师对特定课程进行评教
     - 避免督导不知道应该评教哪些课程的问题
     - 支持批量分配和截止时间设置
+    - 按集合校验与分块批量插入，响应中带每块耗时
     """
-    
+
+    supervisor_ids = list(dict.fromkeys(request.supervisor_user_ids))
+    timetable_ids = list(dict.fromkeys(request.timetable_ids))
+    t0 = time.perf_counter()
+
+    # 验证课表存在（一次查询同时取回授课教师和学院）
+    timetables = await load_assign_timetables(db, timetable_ids)
+    invalid_ids = [tid for tid in timetable_ids if tid not in timetables]
+    if invalid_ids:
+        raise HTTPException(status_code=400, detail=f"课表ID {invalid_ids} 不存在或已删除")
+
     # 权限检查：学院管理员只能分配本学院的任务
     roles = await get_roles_code(db, current_user)
     if "college_admin" in roles and "school_admin" not in roles:
         if not getattr(current_user, "college_id", None):
             raise HTTPException(status_code=403, detail="学院管理员未设置学院")
-        
-        # 检查课表是否都属于本学院
-        stmt = select(Timetable.id).where(
-            Timetable.id.in_(request.timetable_ids),
-            Timetable.college_id != current_user.college_id,
-            Timetable.is_delete == False
-        )
-        invalid_timetables = (await db.execute(stmt)).scalars().all()
+        invalid_timetables = [tid for tid in timetable_ids if timetables[tid][1] != current_user.college_id]
         if invalid_timetables:
-            raise HTTPException(status_code=403, detail=f"课表ID {list(invalid_timetables)} 不属于您的学院")
-    
-    # 验证督导用户存在且有督导角色
-    from app.crud.user import get_roles_code as get_user_roles
-    for supervisor_id in request.supervisor_user_ids:
-        supervisor_roles = await get_user_roles(db, TokenData(id=supervisor_id, user_on="", college_id=None, status=1, is_delete=False))
-        if "supervisor" not in supervisor_roles:
-            raise HTTPException(status_code=400, detail=f"用户ID {supervisor_id} 不是督导角色")
-    
-    # 验证课表存在
-    stmt = select(Timetable.id).where(
-        Timetable.id.in_(request.timetable_ids),
-        Timetable.is_delete == False
-    )
-    valid_timetables = list((await db.execute(stmt)).scalars().all())
-    if len(valid_timetables) != len(request.timetable_ids):
-        invalid_ids = set(request.timetable_ids) - set(valid_timetables)
-        raise HTTPException(status_code=400, detail=f"课表ID {list(invalid_ids)} 不存在或已删除")
-    
-    # 创建任务分配记录（这里可以扩展为专门的任务表，暂时用评教表的特殊状态）
-    assignments_created = 0
-    for supervisor_id in request.supervisor_user_ids:
-        for timetable_id in request.timetable_ids:
-            # 检查是否已经分配过
-            existing = await db.execute(
-                select(TeachingEvaluation.id).where(
-                    TeachingEvaluation.timetable_id == timetable_id,
-                    TeachingEvaluation.listen_teacher_id == supervisor_id,
-                    TeachingEvaluation.is_delete == False
-                )
-            )
-            if existing.scalar_one_or_none():
-                continue  # 已存在，跳过
-            
-            # 创建任务分配记录（status=2表示待评教任务）
-            assignment = TeachingEvaluation(
-                timetable_id=timetable_id,
-                listen_teacher_id=supervisor_id,
-                total_score=0,  # 占位值
-                status=2,  # 2=待评教任务
-                submit_time=datetime.utcnow(),
-                is_delete=False,
-                # 任务相关字段
-                improve_suggestion=f"任务分配：{request.note or '请完成评教'}"
-            )
-            db.add(assignment)
-            assignments_created += 1
-    
+            raise HTTPException(status_code=403, detail=f"课表ID {invalid_timetables} 不属于您的学院")
+
+    # 验证督导用户存在且有督导角色（一次查询）
+    non_supervisors = await find_non_supervisors(db, supervisor_ids)
+    if non_supervisors:
+        raise HTTPException(status_code=400, detail=f"用户ID {non_supervisors} 不是督导角色")
+
+    # 已分配过的组合一次取回，剩余组合分块批量插入
+    existing = await existing_assignment_pairs(db, supervisor_ids, timetable_ids)
+    rows = build_assignment_rows(supervisor_ids, timetables, timetable_ids, existing, note=request.note)
+    try:
+        assignments_created, chunks = await bulk_insert_assignments(db, rows)
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
     await db.commit()
-    
+    bump_models(TeachingEvaluation)
+    evaluated_index.invalidate(*supervisor_ids)
+
     return BaseResponse(
         code=200,
         msg="success",
         data={
             "assignments_created": assignments_created,
-            "supervisor_count": len(request.supervisor_user_ids),
-            "timetable_count": len(request.timetable_ids),
-            "deadline": request.deadline.isoformat() if request.deadline else None
+            "assignments_skipped": len(supervisor_ids) * len(timetable_ids) - assignments_created,
+            "supervisor_count": len(supervisor_ids),
+            "timetable_count": len(timetable_ids),
+            "deadline": request.deadline.isoformat() if request.deadline else None,
+            "chunks": chunks,
+            "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2),
         }
     )
 
@@ -195,11 +181,11 @@ async def get_supervisor_tasks(
     
     # 统计总数
     count_stmt = (
-        select(TeachingEvaluation.id)
+        select(func.count(TeachingEvaluation.id))
         .join(Timetable, TeachingEvaluation.timetable_id == Timetable.id)
         .where(and_(*filters))
     )
-    total = len((await db.execute(count_stmt)).scalars().all())
+    total = await cached_count(db, count_stmt)
     
     return BaseResponse(
         code=200,
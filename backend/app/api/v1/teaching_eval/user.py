@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 from typing import Optional
 from sqlalchemy import select
 
@@ -10,8 +11,12 @@ from app.crud.user import (
     get_user_permissions, reset_user_password, get_user_role_level, get_users_list, get_user_by_id
 )
 from app.crud.user import get_supervisor_scope_ids, set_supervisor_scope_ids
-from app.core import hash_password, create_access_token, verify_password
+from app.core import create_access_token
+from app.core.auth import get_password_hash_async, verify_password_async
 from app.core.deps import get_current_user, require_access
+from app.core.token_cache import token_cache
+from app.crud.pagination import want_total
+from app.crud.logs import record_login_log
 from app.models import Role, UserRole, College, TeacherProfile, ResearchRoom
 
 router = APIRouter(prefix="", tags=["用户"])
@@ -136,6 +141,9 @@ async def register(form: UserCreate, request: Request, db: AsyncSession = Depend
 
             db.add(UserRole(user_id=user.id, role_id=teacher_role.id))
             await db.commit()
+            from app.core.rbac_cache import rbac_cache
+
+            rbac_cache.invalidate_user(user.id)
     except Exception:
         await db.rollback()
 
@@ -152,16 +160,34 @@ async def register(form: UserCreate, request: Request, db: AsyncSession = Depend
     })
 
 
+def _record_login(request: Request, user_id: Optional[int], user_on: str, status: int, fail_reason: Optional[str] = None) -> None:
+    """登录日志只入队，由审计批量写入器异步落库"""
+    forwarded = request.headers.get("x-forwarded-for")
+    ip = forwarded.split(",", 1)[0].strip() if forwarded else (request.client.host if request.client else None)
+    record_login_log(
+        user_id=user_id,
+        user_name=user_on,
+        login_type="PASSWORD",
+        login_status=status,
+        fail_reason=fail_reason,
+        ip_address=ip,
+        user_agent=request.headers.get("user-agent"),
+    )
+
+
 @router.post("/login", summary="用户登录")
 async def login(form: UserBase, request: Request, db: AsyncSession = Depends(get_db)):
     user = await get_user(db, form.user_on)
     print(form)
     if not user:
+        _record_login(request, None, form.user_on, 0, "账号不存在")
         raise HTTPException(status_code=400, detail="账号或密码错误")
 
-    if not verify_password(form.password, user.password):
+    if not await verify_password_async(form.password, user.password):
+        _record_login(request, user.id, form.user_on, 0, "密码错误")
         raise HTTPException(status_code=401, detail="账号或密码错误")
 
+    _record_login(request, user.id, form.user_on, 1)
     set_token_in_response(request, user)
     return BaseResponse(code=200, msg="success", data={"user": await user_payload_with_college(db, user)})
 
@@ -214,10 +240,12 @@ async def change_password(
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
 
-    if not verify_password(old_password, user.password):
+    if not await verify_password_async(old_password, user.password):
         raise HTTPException(status_code=400, detail="旧密码不正确")
 
-    user.password = hash_password(new_password)
+    user.password = await get_password_hash_async(new_password)
+    # 此刻之前签发的 token 失效（见 auth.verify_token）
+    user.password_changed_at = datetime.now()
     try:
         await db.commit()
         await db.refresh(user)
@@ -225,6 +253,8 @@ async def change_password(
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"修改密码失败: {e}")
 
+    # 旧 token 作废（与库里的时间一致），随后签发新 token
+    token_cache.revoke_user(user.id, not_before=user.password_changed_at.timestamp())
     set_token_in_response(request, user)  # 换新 token（可选）
     return BaseResponse(code=200, msg="success", data=None)
 
@@ -269,7 +299,9 @@ async def reset_password(
     updated_user = await reset_user_password(db, user_id=user_id, new_password=new_password)
     if not updated_user:
         raise HTTPException(status_code=500, detail="密码重置失败")
-    
+
+    # 被重置用户的已登录 token 全部作废
+    token_cache.revoke_user(user_id, not_before=updated_user.password_changed_at.timestamp())
     return BaseResponse(code=200, msg="密码重置成功", data=None)
 
 
@@ -278,6 +310,8 @@ async def get_users(
     skip: int = Query(0, ge=0, description="跳过条数"),
     limit: int = Query(20, ge=1, le=100, description="每页条数"),
     college_id: Optional[int] = Query(None, description="学院ID"),
+    cursor: Optional[str] = Query(None, description="游标：传上一页返回的 next_cursor，空串表示游标模式第一页；传了则忽略 skip"),
+    with_total: Optional[bool] = Query(None, description="是否返回总数（默认：偏移分页返回，游标分页不返回）"),
     current_user: TokenData = Depends(require_access(perms_any=["user:manage:college", "user:manage:all"])),
     db: AsyncSession = Depends(get_db),
 ):
@@ -312,13 +346,18 @@ async def get_users(
         raise HTTPException(status_code=403, detail="没有权限执行此操作")
     
     # 查询用户列表
-    users, total = await get_users_list(
-        db, 
-        skip=skip, 
-        limit=limit, 
-        college_id=query_college_id, 
-        max_role_level=max_role_level
-    )
+    try:
+        users, total, next_cursor = await get_users_list(
+            db, 
+            skip=skip, 
+            limit=limit, 
+            college_id=query_college_id, 
+            max_role_level=max_role_level,
+            cursor=cursor,
+            with_total=want_total(with_total, cursor),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # 构造响应数据
     user_list = []
@@ -349,7 +388,8 @@ async def get_users(
             "items": user_list,
             "total": total,
             "skip": skip,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor,
         }
     )
 
@@ -1,4 +1,5 @@
 # app/core/auth.py用于验证token，角色权限验证
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -8,7 +9,13 @@ from app.core.config import ACCESS_TOKEN_EXPIRE_MINUTES, SECRET_KEY, ALGORITHM
 import bcrypt
 from jose import jwt, JWTError
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import User
 from app.schemas import Token, TokenData
+from app.core.token_cache import token_cache
+from app.core.password_pool import password_pool
 from fastapi import HTTPException, status, Request
 
 # 创建安全方案实例
@@ -32,6 +39,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+async def get_password_hash_async(password: str) -> str:
+    """在 bcrypt 线程池中生成密码哈希，避免阻塞事件循环（池满时抛 503）"""
+    return await password_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """在 bcrypt 线程池中校验密码，避免阻塞事件循环（池满时抛 503）"""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(token_data: TokenData, expires_delta: timedelta | None = None) -> Optional[Token]:
     """
     创建访问令牌
@@ -43,7 +60,8 @@ def create_access_token(token_data: TokenData, expires_delta: timedelta | None =
         to_encode = token_data.model_dump().copy()
         expire = datetime.now(timezone.utc) + (
                     expires_delta or timedelta(minutes=int(ACCESS_TOKEN_EXPIRE_MINUTES) or 30))
-        to_encode.update({"exp": expire})
+        # iat 用于撤销判断（修改/重置密码后，之前签发的 token 失效）；带毫秒，与 password_changed_at 同精度
+        to_encode.update({"exp": expire, "iat": round(time.time(), 3)})
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     except Exception as e:
         print("创建token失败", e)
@@ -53,10 +71,19 @@ def create_access_token(token_data: TokenData, expires_delta: timedelta | None =
     )
 
 
-def verify_token(request: Request) -> Optional[TokenData]:
+def _revoked() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="登录状态已失效，请重新登录",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def verify_token(request: Request, db: AsyncSession) -> Optional[TokenData]:
     """
     验证token
     :param request: HTTP请求对象
+    :param db: 缓存未命中时查询用户的 password_changed_at（命中缓存时不访问数据库）
     :return:成功返回payload，失败抛出异常
     """
     # 从Cookie获取token
@@ -75,10 +102,15 @@ def verify_token(request: Request) -> Optional[TokenData]:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # 已验签的 token 直接命中缓存（缓存内仍会检查 exp）
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
+    started = time.perf_counter()
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         token_data = TokenData(**payload)
-        return token_data
     except JWTError:
         print("token验证失败")
         raise HTTPException(
@@ -86,3 +118,20 @@ def verify_token(request: Request) -> Optional[TokenData]:
             detail="无法验证，请重新登录",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    finally:
+        token_cache.record_decode(time.perf_counter() - started)
+
+    issued_at = payload.get("iat")
+    if token_cache.is_revoked(token_data.id, issued_at):
+        raise _revoked()
+    # 撤销时刻以库里为准：worker 重启/回收或撤销广播丢失后，旧 token 仍会在这里被拒绝
+    changed_at = (await db.execute(
+        select(User.password_changed_at).where(User.id == token_data.id)
+    )).scalar_one_or_none()
+    if changed_at is not None and token_cache.is_revoked(
+        token_data.id, issued_at, not_before=changed_at.timestamp()
+    ):
+        raise _revoked()
+
+    token_cache.put(token, token_data, payload.get("exp"))
+    return token_data
@@ -0,0 +1,159 @@
+# app/core/coherence.py
+"""多 worker 进程间的缓存一致性（无外部服务）
+
+生产环境由 gunicorn 启动多个 worker 进程，RBAC/token/COUNT/已评索引这些进程内缓存各有一份。
+某个 worker 里发生的失效（改角色、改密码、写入提交……）需要同步给同机的其它 worker：
+
+- 每个 worker 启动时在 COHERENCE_DIR 下绑定一个 Unix 数据报套接字（<pid>.sock），加入事件循环的读监听
+- publish(channel, key, payload) 把失效消息发给目录下其它所有套接字；调用方自己的本地失效已先做完，不回送给自己
+- 收到消息后按 channel 调用各缓存模块 subscribe 注册的处理函数，只做本地失效，不再转发
+- 发送不阻塞：对端已退出（残留的套接字文件）时顺手清理；对端接收缓冲满导致丢消息时只计数，由各缓存的 TTL 兜底
+
+未启动（单进程开发模式、脚本、未调用 start）时 publish 为空操作。
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import socket
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import COHERENCE_DIR, COHERENCE_ENABLED
+
+Handler = Callable[[Any, Any], None]
+
+_PEER_REFRESH_SECONDS = 1.0
+_MAX_DATAGRAM = 65536
+
+
+class CoherenceBus:
+    def __init__(self, *, directory: str, enabled: bool) -> None:
+        self.directory = directory
+        self.enabled = enabled and hasattr(socket, "AF_UNIX")
+        self._handlers: Dict[str, Handler] = {}
+        self._sock: Optional[socket.socket] = None
+        self._path: Optional[str] = None
+        self._peers: List[str] = []
+        self._peers_at = 0.0
+        self.published = 0
+        self.sent = 0
+        self.received = 0
+        self.send_errors = 0
+        self.handler_errors = 0
+        self.stale_peers = 0
+
+    @property
+    def active(self) -> bool:
+        return self._sock is not None
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        """handler(key, payload) 只做本地失效，在事件循环线程里同步调用"""
+        self._handlers[channel] = handler
+
+    def start(self) -> None:
+        """在 worker 的事件循环里调用（应用 startup）"""
+        if not self.enabled or self._sock is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{os.getpid()}.sock")
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        sock.bind(path)
+        asyncio.get_running_loop().add_reader(sock.fileno(), self._on_readable)
+        self._sock = sock
+        self._path = path
+        self._refresh_peers(force=True)
+
+    def stop(self) -> None:
+        sock, self._sock = self._sock, None
+        if sock is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(sock.fileno())
+        except RuntimeError:
+            pass
+        sock.close()
+        try:
+            os.unlink(self._path)
+        except (FileNotFoundError, TypeError):
+            pass
+        self._path = None
+        self._peers = []
+
+    def _refresh_peers(self, *, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._peers_at < _PEER_REFRESH_SECONDS:
+            return
+        self._peers_at = now
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            names = []
+        self._peers = [
+            p for p in (os.path.join(self.directory, n) for n in names if n.endswith(".sock"))
+            if p != self._path
+        ]
+
+    def publish(self, channel: str, key: Any = None, payload: Any = None) -> None:
+        if self._sock is None:
+            return
+        self.published += 1
+        self._refresh_peers()
+        if not self._peers:
+            return
+        data = json.dumps([channel, key, payload], separators=(",", ":"), default=str).encode("utf-8")
+        for peer in list(self._peers):
+            try:
+                self._sock.sendto(data, peer)
+                self.sent += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # 对端进程已退出，清理残留的套接字文件
+                self.stale_peers += 1
+                self._peers.remove(peer)
+                try:
+                    os.unlink(peer)
+                except OSError:
+                    pass
+            except OSError:
+                # 对端接收缓冲已满等：这条消息丢失，依赖缓存 TTL 兜底
+                self.send_errors += 1
+
+    def _on_readable(self) -> None:
+        while self._sock is not None:
+            try:
+                data = self._sock.recv(_MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            self.received += 1
+            try:
+                channel, key, payload = json.loads(data)
+                handler = self._handlers.get(channel)
+                if handler is not None:
+                    handler(key, payload)
+            except Exception:
+                self.handler_errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "pid": os.getpid(),
+            "peers": len(self._peers),
+            "channels": sorted(self._handlers),
+            "published": self.published,
+            "sent": self.sent,
+            "received": self.received,
+            "send_errors": self.send_errors,
+            "handler_errors": self.handler_errors,
+            "stale_peers": self.stale_peers,
+        }
+
+
+coherence_bus = CoherenceBus(directory=COHERENCE_DIR, enabled=COHERENCE_ENABLED)
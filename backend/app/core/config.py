@@ -36,3 +36,63 @@ ACCESS_TOKEN_EXPIRE_MINUTES = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
 APP_NAME = os.getenv("APP_NAME") or "Teaching Evaluation System API"
 APP_VERSION = os.getenv("APP_VERSION") or "0.1.0"
 DEBUG = os.getenv("DEBUG")
+
+
+# 数据库连接池：常驻连接数、池满后允许额外建立的连接数、取连接最长等待秒数（超时报错）、
+# 连接回收秒数（应小于 MySQL wait_timeout）、取出连接前是否先 ping 一次
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# RBAC 缓存（用户 -> 角色/权限/督导范围），TTL 或容量设为 0 即关闭
+RBAC_CACHE_TTL_SECONDS = float(os.getenv("RBAC_CACHE_TTL_SECONDS", "60"))
+RBAC_CACHE_MAXSIZE = int(os.getenv("RBAC_CACHE_MAXSIZE", "10000"))
+
+# 已验签 JWT 解码缓存容量（0 表示关闭）、单条最长缓存秒数（到期后重新验签并查库核对密码修改时间）
+TOKEN_CACHE_MAXSIZE = int(os.getenv("TOKEN_CACHE_MAXSIZE", "20000"))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "60"))
+
+# bcrypt 线程池：并发线程数、最大排队数（超出返回 503）、建议重试秒数
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_POOL_MAX_QUEUE = int(os.getenv("PASSWORD_POOL_MAX_QUEUE", "64"))
+PASSWORD_POOL_RETRY_AFTER = int(os.getenv("PASSWORD_POOL_RETRY_AFTER", "2"))
+
+# 后台导出任务：worker 数、最大排队数、已结束任务的保留秒数、产物及任务状态文件落盘目录（多 worker 需共享）
+EXPORT_JOB_WORKERS = int(os.getenv("EXPORT_JOB_WORKERS", "2"))
+EXPORT_JOB_MAX_PENDING = int(os.getenv("EXPORT_JOB_MAX_PENDING", "32"))
+EXPORT_JOB_RETENTION_SECONDS = float(os.getenv("EXPORT_JOB_RETENTION_SECONDS", "86400"))
+EXPORT_JOB_DIR = os.getenv("EXPORT_JOB_DIR") or str(project_root / "exports")
+
+# 分页总数（COUNT）缓存：条目 TTL 秒数与最大条目数，任一为 0 即关闭
+COUNT_CACHE_TTL_SECONDS = float(os.getenv("COUNT_CACHE_TTL_SECONDS", "30"))
+COUNT_CACHE_MAXSIZE = int(os.getenv("COUNT_CACHE_MAXSIZE", "5000"))
+
+# 已评课表内存索引：缓存的听课人数上限与条目 TTL 秒数，任一为 0 即每次现查
+EVALUATED_INDEX_MAXSIZE = int(os.getenv("EVALUATED_INDEX_MAXSIZE", "2000"))
+EVALUATED_INDEX_TTL_SECONDS = float(os.getenv("EVALUATED_INDEX_TTL_SECONDS", "60"))
+
+# 教务课表并发抓取：教务系统地址、最大并发请求数、每秒请求数（0 表示不限速）
+CRAWL_BASE_URL = os.getenv("CRAWL_BASE_URL", "http://qzjw.bwgl.cn/gllgdxbwglxy")
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "4"))
+CRAWL_RATE_PER_SECOND = float(os.getenv("CRAWL_RATE_PER_SECOND", "2"))
+
+# 操作/登录日志异步批量写入：攒批间隔毫秒、每批最大条数、队列上限、单批写库超时秒数、写库失败时的本地溢出文件
+AUDIT_FLUSH_INTERVAL_MS = int(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "500"))
+AUDIT_FLUSH_BATCH = int(os.getenv("AUDIT_FLUSH_BATCH", "200"))
+AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", "10000"))
+AUDIT_FLUSH_TIMEOUT_SECONDS = float(os.getenv("AUDIT_FLUSH_TIMEOUT_SECONDS", "5"))
+AUDIT_SPILL_PATH = os.getenv("AUDIT_SPILL_PATH") or str(project_root / "logs" / "audit_spill.jsonl")
+# 是否为每个请求记录一条操作日志（耗时、状态码）
+AUDIT_REQUEST_LOG = os.getenv("AUDIT_REQUEST_LOG", "true").lower() == "true"
+
+# 多 worker 缓存一致性：是否启用、本机失效广播套接字目录（同一部署的所有 worker 必须一致）
+COHERENCE_ENABLED = os.getenv("COHERENCE_ENABLED", "true").lower() == "true"
+COHERENCE_DIR = os.getenv("COHERENCE_DIR") or str(project_root / "run" / "coherence")
+
+# 教师/听课人统计：true 在 MySQL 里用聚合与 JSON_EXTRACT 计算，false 取回整行在 Python 里算
+STATS_SQL_AGGREGATE = os.getenv("STATS_SQL_AGGREGATE", "true").lower() == "true"
+
+# 高频问题/建议的 Space-Saving 计数表容量（每个教师/学院每学期最多跟踪的不同文本数）
+HEAVY_HITTERS_CAPACITY = int(os.getenv("HEAVY_HITTERS_CAPACITY", "64"))
@@ -0,0 +1,134 @@
+# app/core/db_pool.py
+"""数据库连接池配置与监控
+
+- engine_options() 把 config 里的 DB_POOL_* 转成 create_async_engine 参数（池大小、溢出、等待超时、回收、pre-ping）
+- InstrumentedQueuePool 在取连接（_do_get）前后计时，记录等待耗时与超时次数；
+  池满时请求会在这里排队，等待时间上升就是连接池开始吃紧的信号
+- PoolMonitor 汇总这些计数，并实时读取池的在用/空闲/溢出连接数，供 /system/metrics 展示
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import (
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+)
+
+_WAIT_WINDOW = 2048
+
+
+class PoolMonitor:
+    def __init__(self, window: int = _WAIT_WINDOW) -> None:
+        self._engine: Any = None
+        self._waits: Deque[float] = deque(maxlen=window)
+        self.reset()
+
+    def reset(self) -> None:
+        self._waits.clear()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.peak_in_use = 0
+        self.connects = 0
+        self.invalidated = 0
+
+    def attach(self, engine: Any) -> None:
+        """监听引擎的连接池事件；engine 为 AsyncEngine"""
+        self._engine = engine
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "connect", self._on_connect)
+        event.listen(sync_engine, "checkout", self._on_checkout)
+        event.listen(sync_engine, "invalidate", self._on_invalidate)
+
+    def observe_wait(self, seconds: float, *, timed_out: bool = False) -> None:
+        if timed_out:
+            self.timeouts += 1
+            return
+        self.checkouts += 1
+        self.wait_total += seconds
+        if seconds > self.wait_max:
+            self.wait_max = seconds
+        self._waits.append(seconds)
+
+    def _on_connect(self, *_: Any) -> None:
+        self.connects += 1
+
+    def _on_checkout(self, *_: Any) -> None:
+        pool = self._pool()
+        if pool is not None:
+            in_use = pool.checkedout()
+            if in_use > self.peak_in_use:
+                self.peak_in_use = in_use
+
+    def _on_invalidate(self, *_: Any) -> None:
+        # pre-ping 发现断开的连接、或执行中连接出错都会走到这里
+        self.invalidated += 1
+
+    def _pool(self) -> Optional[Any]:
+        return self._engine.sync_engine.pool if self._engine is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+        data: Dict[str, Any] = {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_ms_p95": round(p95 * 1000, 3),
+            "wait_ms_max": round(self.wait_max * 1000, 3),
+            "peak_in_use": self.peak_in_use,
+            "connects": self.connects,
+            "invalidated": self.invalidated,
+        }
+        pool = self._pool()
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            data.update(
+                size=pool.size(),
+                max_overflow=DB_MAX_OVERFLOW,
+                in_use=pool.checkedout(),
+                idle=pool.checkedin(),
+                # overflow() 在常驻连接尚未建满时为负数
+                overflow=max(pool.overflow(), 0),
+            )
+        return data
+
+
+pool_monitor = PoolMonitor()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """取连接时计时；dispose 后重建的池同样是本类（Pool.recreate 使用 self.__class__）"""
+
+    def _do_get(self) -> Any:
+        t0 = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            pool_monitor.observe_wait(time.perf_counter() - t0, timed_out=True)
+            raise
+        pool_monitor.observe_wait(time.perf_counter() - t0)
+        return conn
+
+
+def engine_options(**overrides: Any) -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    options.update(overrides)
+    return options
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas import TokenData
 from app.database import get_db
 from app.crud.user import get_user_permissions, get_roles_code
+from app.crud.loader import EntityLoader
 
 
 # 管理员角色：默认绕过权限+角色检查（你可以按实际改）
@@ -28,6 +29,11 @@ def get_current_user(request: Request) -> TokenData:
     return token_data
 
 
+def get_loader(db: AsyncSession = Depends(get_db)) -> EntityLoader:
+    """请求级批量加载器；依赖在同一请求内有缓存，与接口拿到的是同一个会话"""
+    return EntityLoader(db)
+
+
 async def _get_cached_permissions(request: Request, db: AsyncSession, current_user: TokenData) -> List[str]:
     cached = getattr(request.state, "user_permissions", None)
     if cached is not None:
@@ -13,7 +13,9 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             code=exc.status_code,
             msg=exc.detail if isinstance(exc.detail, str) else str(exc.detail),
             data=None
-        ).model_dump()
+        ).model_dump(),
+        # 保留异常自带的响应头（如 503 的 Retry-After、401 的 WWW-Authenticate）
+        headers=getattr(exc, "headers", None),
     )
 
 
@@ -0,0 +1,395 @@
+# app/core/jobs.py
+"""进程内后台任务队列（目前用于大批量导出）
+
+- 固定数量的 worker 协程从队列取任务执行，首次提交时在当前事件循环里启动
+- 每个任务带一个去重 key：相同 key 的任务在排队/执行中或已成功时直接复用，不重复执行
+- 排队数超过上限时拒绝，返回 503 + Retry-After
+- 已结束的任务在内存中保留一段时间后清理（产物文件由调用方自行管理）
+
+多 worker 部署时查询/下载请求不一定落在执行任务的进程上：传入 state_dir 后，每个去重 key 在该目录下
+有一个状态文件（<key 哈希>.job.json，记录 id、状态、提交人、产物路径等），每次状态变化都写入；
+本进程内存里没有的任务从状态文件读取，去重也先查状态文件（flock 保护），不同 worker 提交相同导出只执行一次。
+执行进程退出后仍未结束的任务视为失败，可重新提交。
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+
+try:  # Windows 开发环境没有 fcntl，单进程运行时不需要文件锁
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from app.core.config import (
+    EXPORT_JOB_DIR,
+    EXPORT_JOB_MAX_PENDING,
+    EXPORT_JOB_RETENTION_SECONDS,
+    EXPORT_JOB_WORKERS,
+)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_JOB_ID = re.compile(r"^([0-9a-f]{16})-[0-9a-f]{12}$")
+
+
+class JobQueueFull(HTTPException):
+    def __init__(self, retry_after: int = 30) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="后台任务过多，请稍后重试",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+@dataclass
+class Job:
+    id: str
+    key: Hashable
+    # 从状态文件读出的其它进程的任务没有 func
+    func: Optional[Callable[["Job"], Awaitable[Any]]] = field(repr=False)
+    owners: Set[int] = field(default_factory=set)
+    meta: Dict[str, Any] = field(default_factory=dict)
+    status: str = PENDING
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    pid: int = field(default_factory=os.getpid)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            **self.meta,
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "pid": self.pid,
+            "owners": sorted(self.owners),
+            "meta": self.meta,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    @classmethod
+    def from_state(cls, key: Hashable, data: Dict[str, Any]) -> "Job":
+        job = cls(
+            id=data["job_id"],
+            key=key,
+            func=None,
+            owners=set(data.get("owners") or ()),
+            meta=dict(data.get("meta") or {}),
+            status=data.get("status") or FAILED,
+            result=data.get("result"),
+            error=data.get("error"),
+            created_at=data.get("created_at") or 0.0,
+            started_at=data.get("started_at"),
+            finished_at=data.get("finished_at"),
+            pid=data.get("pid") or 0,
+        )
+        if not job.finished and not _pid_alive(job.pid):
+            job.status = FAILED
+            job.error = "执行导出的进程已退出，请重新提交"
+        return job
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    if pid <= 0:
+        return False
+    if os.name == "nt":  # pragma: no cover
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _key_hash(key: Hashable) -> str:
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+
+
+class JobQueue:
+    def __init__(
+        self,
+        *,
+        workers: int,
+        max_pending: int,
+        retention_seconds: float,
+        state_dir: Optional[str] = None,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.retention_seconds = max(0.0, retention_seconds)
+        self.state_dir = state_dir
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[Hashable, str] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _ensure_workers(self) -> asyncio.Queue:
+        # 懒启动：第一次提交任务时才在当前事件循环里创建队列和 worker
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._tasks = [
+                asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.workers)
+            ]
+        return self._queue
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            job.status = RUNNING
+            job.started_at = time.time()
+            self._save(job)
+            try:
+                job.result = await job.func(job)
+                job.status = DONE
+                self.completed += 1
+            except asyncio.CancelledError:
+                job.status = FAILED
+                job.error = "任务被取消"
+                raise
+            except Exception as e:
+                job.status = FAILED
+                job.error = str(e) or e.__class__.__name__
+                self.failed += 1
+            finally:
+                job.finished_at = time.time()
+                self._save(job)
+                queue.task_done()
+
+    # -----------------------------
+    # 状态文件（跨进程共享）
+    # -----------------------------
+    def _state_path(self, key_hash: str) -> str:
+        return os.path.join(self.state_dir, f"{key_hash}.job.json")
+
+    def _locked_state(self, key_hash: str, mutate: Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]]) -> None:
+        """加锁读出状态文件交给 mutate，mutate 返回新状态则原地写回（返回 None 不写）"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        with open(self._state_path(key_hash), "a+", encoding="utf-8") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                current = json.loads(f.read() or "null")
+            except ValueError:
+                current = None
+            new = mutate(current if isinstance(current, dict) else None)
+            if new is not None:
+                f.seek(0)
+                f.truncate()
+                json.dump(new, f, ensure_ascii=False, default=str)
+                f.flush()
+
+    def _read_state(self, key_hash: str) -> Optional[Dict[str, Any]]:
+        try:
+            f = open(self._state_path(key_hash), "r", encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        with f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_SH)
+            try:
+                data = json.loads(f.read() or "null")
+            except ValueError:
+                return None
+        return data if isinstance(data, dict) else None
+
+    def _save(self, job: Job) -> None:
+        """把本进程任务的状态写入状态文件；其它进程追加的提交人合并进来"""
+        if self.state_dir is None:
+            return
+
+        def mutate(current):
+            if current is not None and current.get("job_id") == job.id:
+                job.owners.update(current.get("owners") or ())
+            elif current is not None and current.get("status") != FAILED and _pid_alive(current.get("pid") or 0):
+                # 已被其它进程的新任务接管
+                return None
+            return job.to_state()
+
+        try:
+            self._locked_state(_key_hash(job.key), mutate)
+        except OSError:
+            # 目录不可写：退化为仅本进程可见
+            return
+
+    def _pending_count(self) -> int:
+        return sum(1 for j in self._jobs.values() if j.status == PENDING)
+
+    def _prune(self) -> None:
+        deadline = time.time() - self.retention_seconds
+        for job_id in [j.id for j in self._jobs.values() if j.finished and (j.finished_at or 0) < deadline]:
+            job = self._jobs.pop(job_id)
+            if self._by_key.get(job.key) == job_id:
+                self._by_key.pop(job.key, None)
+        if self.state_dir is None or not os.path.isdir(self.state_dir):
+            return
+        for name in os.listdir(self.state_dir):
+            if not name.endswith(".job.json"):
+                continue
+            path = os.path.join(self.state_dir, name)
+            try:
+                expired = os.path.getmtime(path) < deadline
+            except OSError:
+                continue
+            state = self._read_state(name[:-len(".job.json")]) if expired else None
+            if state is not None and state.get("status") in (DONE, FAILED):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def submit(
+        self,
+        key: Hashable,
+        func: Callable[[Job], Awaitable[Any]],
+        *,
+        owner: Optional[int] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Job, bool]:
+        """提交任务，返回 (任务, 是否新建)；相同 key 未失败的任务直接复用（含其它进程提交的）"""
+        self._prune()
+        existing_id = self._by_key.get(key)
+        existing = self._jobs.get(existing_id) if existing_id else None
+        if existing is not None and existing.status != FAILED:
+            if owner is not None:
+                existing.owners.add(owner)
+            self._save(existing)
+            self.deduplicated += 1
+            return existing, False
+
+        key_hash = _key_hash(key)
+        job = Job(id=f"{key_hash}-{uuid.uuid4().hex[:12]}", key=key, func=func, meta=dict(meta or {}))
+        if owner is not None:
+            job.owners.add(owner)
+        if self.state_dir is None:
+            self._check_capacity()
+            return self._enqueue(job), True
+
+        # 检查与创建在同一把文件锁里完成，多个 worker 同时提交相同 key 只会建一个任务
+        found: Dict[str, Job] = {}
+
+        def mutate(current):
+            if current is not None and current.get("job_id"):
+                other = Job.from_state(key, current)
+                if other.status != FAILED:
+                    if owner is not None:
+                        other.owners.add(owner)
+                    found["job"] = other
+                    return {**current, "owners": sorted(other.owners)}
+            self._check_capacity()
+            return job.to_state()
+
+        try:
+            self._locked_state(key_hash, mutate)
+        except OSError:
+            self._check_capacity()
+        if "job" in found:
+            self.deduplicated += 1
+            return found["job"], False
+        return self._enqueue(job), True
+
+    def _check_capacity(self) -> None:
+        if self._pending_count() >= self.max_pending:
+            self.rejected += 1
+            raise JobQueueFull()
+
+    def _enqueue(self, job: Job) -> Job:
+        queue = self._ensure_workers()
+        self._jobs[job.id] = job
+        self._by_key[job.key] = job.id
+        queue.put_nowait(job)
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """本进程的任务直接返回（合并其它进程追加的提交人），否则从状态文件读取"""
+        job = self._jobs.get(job_id)
+        if self.state_dir is None:
+            return job
+        match = _JOB_ID.match(job_id)
+        if match is None:
+            return job
+        try:
+            state = self._read_state(match.group(1))
+        except OSError:
+            state = None
+        if state is None or state.get("job_id") != job_id:
+            return job
+        if job is not None:
+            job.owners.update(state.get("owners") or ())
+            return job
+        return Job.from_state(None, state)
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "tracked": len(self._jobs),
+            **counts,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "completed": self.completed,
+            "failed_total": self.failed,
+            "rejected": self.rejected,
+        }
+
+    async def shutdown(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+
+export_jobs = JobQueue(
+    workers=EXPORT_JOB_WORKERS,
+    max_pending=EXPORT_JOB_MAX_PENDING,
+    retention_seconds=EXPORT_JOB_RETENTION_SECONDS,
+    state_dir=EXPORT_JOB_DIR,
+)
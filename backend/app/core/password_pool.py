@@ -0,0 +1,78 @@
+# app/core/password_pool.py
+"""bcrypt 专用的有界线程池
+
+bcrypt 单次计算要几十毫秒，直接在 async 接口里调用会卡住整个事件循环。
+这里把密码哈希/校验放到固定大小的线程池执行，并限制排队深度：
+执行中 + 排队中的任务数超过上限时直接拒绝，返回 503 + Retry-After，而不是无限堆积。
+"""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core.config import PASSWORD_POOL_MAX_QUEUE, PASSWORD_POOL_RETRY_AFTER, PASSWORD_POOL_WORKERS
+
+T = TypeVar("T")
+
+
+class PasswordPoolBusy(HTTPException):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="登录人数过多，请稍后重试",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class PasswordPool:
+    def __init__(self, *, max_workers: int, max_queue: int, retry_after: int) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = max(1, retry_after)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        self._inflight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.peak_inflight = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        # 计数只在事件循环线程内增减，无需加锁
+        if self._inflight >= self.capacity:
+            self.rejected += 1
+            raise PasswordPoolBusy(self.retry_after)
+        self._inflight += 1
+        self.peak_inflight = max(self.peak_inflight, self._inflight)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._inflight -= 1
+            self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "inflight": self._inflight,
+            "queued": max(self._inflight - self.max_workers, 0),
+            "peak_inflight": self.peak_inflight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordPool(
+    max_workers=PASSWORD_POOL_WORKERS,
+    max_queue=PASSWORD_POOL_MAX_QUEUE,
+    retry_after=PASSWORD_POOL_RETRY_AFTER,
+)
@@ -0,0 +1,116 @@
+# app/core/rbac_cache.py
+"""进程内 RBAC 缓存：user_id -> 角色 / 权限 / 角色等级 / 督导范围
+
+- TTL + LRU：条目超过 RBAC_CACHE_TTL_SECONDS 视为过期，超过 RBAC_CACHE_MAXSIZE 淘汰最久未用
+- 失效：auth.py 的角色/权限/用户角色写入、set_supervisor_scope_ids 主动调用 invalidate_*
+- 防止“读旧值 -> 失效 -> 回填旧值”：回填时带上读取前的 generation，失效后 generation 变化则丢弃
+- 多 worker：失效经 coherence_bus 广播给同机其它 worker
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.core.coherence import coherence_bus
+from app.core.config import RBAC_CACHE_MAXSIZE, RBAC_CACHE_TTL_SECONDS
+
+MISSING: Any = object()
+
+# 缓存的字段
+FIELD_ROLES = "roles"
+FIELD_PERMISSIONS = "permissions"
+FIELD_ROLE_LEVEL = "role_level"
+FIELD_SCOPE = "supervisor_scope"
+
+
+class RBACCache:
+    def __init__(self, *, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        # user_id -> (过期时间, {字段: 值})
+        self._data: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl_seconds > 0
+
+    def get(self, user_id: Hashable, field: str) -> Any:
+        item = self._data.get(user_id)
+        if item is not None:
+            expires_at, fields = item
+            if expires_at > time.monotonic():
+                if field in fields:
+                    self._data.move_to_end(user_id)
+                    self.hits += 1
+                    return fields[field]
+            else:
+                self._data.pop(user_id, None)
+        self.misses += 1
+        return MISSING
+
+    def set(self, user_id: Hashable, field: str, value: Any, *, generation: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+        if generation is not None and generation != self._generation:
+            # 读取期间发生过失效，丢弃可能过期的回填
+            return
+        now = time.monotonic()
+        item = self._data.get(user_id)
+        if item is None or item[0] <= now:
+            item = (now + self.ttl_seconds, {})
+            self._data[user_id] = item
+        item[1][field] = value
+        self._data.move_to_end(user_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_user(self, user_id: Hashable, *, broadcast: bool = True) -> None:
+        self._generation += 1
+        self.invalidations += 1
+        self._data.pop(user_id, None)
+        if broadcast:
+            coherence_bus.publish("rbac", user_id)
+
+    def invalidate_all(self, *, broadcast: bool = True) -> None:
+        self._generation += 1
+        self.invalidations += 1
+        self._data.clear()
+        if broadcast:
+            coherence_bus.publish("rbac")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+rbac_cache = RBACCache(maxsize=RBAC_CACHE_MAXSIZE, ttl_seconds=RBAC_CACHE_TTL_SECONDS)
+
+
+def _on_remote_invalidate(user_id: Any, _: Any) -> None:
+    if user_id is None:
+        rbac_cache.invalidate_all(broadcast=False)
+    else:
+        rbac_cache.invalidate_user(user_id, broadcast=False)
+
+
+coherence_bus.subscribe("rbac", _on_remote_invalidate)
@@ -0,0 +1,148 @@
+# app/core/token_cache.py
+"""已验签 JWT 的解码缓存：sha256(token) -> TokenData
+
+- 有界 LRU（TOKEN_CACHE_MAXSIZE），每条最多缓存 TOKEN_CACHE_TTL_SECONDS 且不超过 token 的 exp，到期即丢弃
+- 撤销以库里的 user.password_changed_at（毫秒精度）为准：缓存未命中时 auth.verify_token 查库，
+  iat 早于该时刻的 token 拒绝，所以 worker 重启/回收后撤销依然有效
+- 修改/重置密码时调用 revoke_user：清掉本进程该用户已缓存的 token，并在内存里记下撤销时刻
+- 多 worker：撤销经 coherence_bus 广播给同机其它 worker；广播丢失时，其它 worker 已缓存的旧 token
+  最多还能用 TOKEN_CACHE_TTL_SECONDS，到期重新验签时被库里的时间拦下
+- 所有操作不含 await，并以锁保护，事件循环内并发与线程池调用都安全
+- 命中率与解码耗时通过 stats() 暴露
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.coherence import coherence_bus
+from app.core.config import ACCESS_TOKEN_EXPIRE_MINUTES, TOKEN_CACHE_MAXSIZE, TOKEN_CACHE_TTL_SECONDS
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class TokenCache:
+    def __init__(self, *, maxsize: int, max_token_lifetime: float, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.max_token_lifetime = max_token_lifetime
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # key -> (缓存到期时间戳, 用户 id, TokenData)
+        self._data: "OrderedDict[bytes, Tuple[float, int, Any]]" = OrderedDict()
+        self._by_user: Dict[int, Set[bytes]] = {}
+        # 用户 id -> 不早于该时刻（秒，含毫秒小数）签发的 token 才有效
+        self._not_before: Dict[int, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.decodes = 0
+        self.decode_seconds = 0.0
+        self.revocations = 0
+
+    def get(self, token: str) -> Optional[Any]:
+        key = _token_key(token)
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                exp, user_id, token_data = item
+                if exp > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return token_data
+                self._drop(key, user_id)
+            self.misses += 1
+            return None
+
+    def put(self, token: str, token_data: Any, exp: Optional[float]) -> None:
+        if self.maxsize <= 0 or self.ttl_seconds <= 0 or not exp:
+            return
+        key = _token_key(token)
+        user_id = int(token_data.id)
+        with self._lock:
+            self._data[key] = (min(float(exp), time.time() + self.ttl_seconds), user_id, token_data)
+            self._data.move_to_end(key)
+            self._by_user.setdefault(user_id, set()).add(key)
+            while len(self._data) > self.maxsize:
+                old_key, (_, old_uid, _) = self._data.popitem(last=False)
+                self._discard_index(old_key, old_uid)
+
+    def record_decode(self, seconds: float) -> None:
+        with self._lock:
+            self.decodes += 1
+            self.decode_seconds += seconds
+
+    def is_revoked(self, user_id: int, issued_at: Optional[Any], *, not_before: Optional[float] = None) -> bool:
+        """iat 早于撤销时刻即视为已撤销；not_before 为库里持久化的撤销时刻，与内存里记下的取较晚者"""
+        with self._lock:
+            remembered = self._not_before.get(int(user_id))
+            if remembered is not None and time.time() - remembered > self.max_token_lifetime:
+                # 撤销时刻之前签发的 token 都已自然过期，记录可以清掉
+                self._not_before.pop(int(user_id), None)
+                remembered = None
+        cutoffs = [t for t in (remembered, not_before) if t is not None]
+        if not cutoffs:
+            return False
+        try:
+            return issued_at is None or float(issued_at) < max(cutoffs)
+        except (TypeError, ValueError):
+            return True
+
+    def revoke_user(self, user_id: int, *, not_before: Optional[float] = None, broadcast: bool = True) -> None:
+        not_before = time.time() if not_before is None else float(not_before)
+        with self._lock:
+            self.revocations += 1
+            current = self._not_before.get(int(user_id))
+            self._not_before[int(user_id)] = max(not_before, current or 0)
+            for key in self._by_user.pop(int(user_id), set()):
+                self._data.pop(key, None)
+        if broadcast:
+            coherence_bus.publish("token", int(user_id), not_before)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._by_user.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "decodes": self.decodes,
+                "avg_decode_ms": round(self.decode_seconds / self.decodes * 1000, 4) if self.decodes else 0.0,
+                "revoked_users": len(self._not_before),
+                "revocations": self.revocations,
+            }
+
+    def _drop(self, key: bytes, user_id: int) -> None:
+        self._data.pop(key, None)
+        self._discard_index(key, user_id)
+
+    def _discard_index(self, key: bytes, user_id: int) -> None:
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                self._by_user.pop(user_id, None)
+
+
+token_cache = TokenCache(
+    maxsize=TOKEN_CACHE_MAXSIZE,
+    max_token_lifetime=int(ACCESS_TOKEN_EXPIRE_MINUTES or 30) * 60,
+    ttl_seconds=TOKEN_CACHE_TTL_SECONDS,
+)
+
+
+def _on_remote_revoke(user_id: Any, not_before: Any) -> None:
+    token_cache.revoke_user(int(user_id), not_before=not_before, broadcast=False)
+
+
+coherence_bus.subscribe("token", _on_remote_revoke)
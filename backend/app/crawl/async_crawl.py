@@ -0,0 +1,347 @@
+# app/crawl/async_crawl.py
+"""教务课表的并发抓取（asyncio 版 JWXTSpider）
+
+JWXTSpider 是一条同步 requests 流程：阻塞 sleep 重试、一次一个学期、HTML/JSON 写在当前目录。
+这里保留同样的登录/查询协议，换成：
+
+- httpx.AsyncClient 连接池，登录后的 cookie 在所有请求间共享；会话失效时加锁重新登录一次
+- 信号量限制并发，令牌桶限制请求速率，重试用 asyncio.sleep 指数退避，不阻塞事件循环
+- 多个学期 / 多组查询条件（如按开课专业、年级拆分）并行抓取
+- 每完成一个任务写一次检查点（原子替换），中断后重跑同一命令会跳过已完成的任务
+
+用法（在 backend 目录下）：
+    JWXT_USERNAME=... JWXT_PASSWORD=... BAIDU_API_KEY=... BAIDU_SECRET_KEY=... \\
+    python -m app.crawl.async_crawl 2025-2026-1 2024-2025-2 --out crawl_out [--concurrency 4] [--rate 2]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from app.crawl.crawl import JWXTSpider
+
+CaptchaSolver = Callable[[bytes], Awaitable[Optional[str]]]
+
+DEFAULT_BASE_URL = "http://qzjw.bwgl.cn/gllgdxbwglxy"
+
+# 查询表单的默认字段（与 JWXTSpider.fetch_full_timetable 一致）
+QUERY_FORM = {
+    "lb": "queryzkb.jsp",
+    "xq": "",
+    "kkyx": "",
+    "skyx": "",
+    "sknj": "",
+    "skzy": "",
+    "zc1": "",
+    "zc2": "",
+    "jc1": "",
+    "jc2": "",
+    "kc": "",
+}
+
+
+class CrawlError(Exception):
+    pass
+
+
+class TokenBucket:
+    """令牌桶：平均每秒 rate 个请求，允许 burst 个突发；rate<=0 表示不限速"""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class CrawlTask:
+    """一次课表查询：学年学期代码（xnxqh）+ 额外表单条件"""
+    semester: str
+    form: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        extra = "_".join(f"{k}-{v}" for k, v in sorted(self.form.items()) if v)
+        return f"{self.semester}_{extra}" if extra else self.semester
+
+
+class Checkpoint:
+    """已完成任务 -> 产物信息，每次更新都整文件原子替换"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.done: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.done = json.load(f).get("done", {})
+
+    def is_done(self, key: str) -> bool:
+        return key in self.done
+
+    def mark_done(self, key: str, info: Dict[str, Any]) -> None:
+        self.done[key] = info
+        tmp = f"{self.path}.part"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"done": self.done}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+
+class AsyncJWXTCrawler:
+    def __init__(
+        self,
+        *,
+        username: str,
+        password: str,
+        out_dir: str,
+        base_url: str = DEFAULT_BASE_URL,
+        concurrency: int = 4,
+        rate: float = 2.0,
+        retries: int = 3,
+        timeout: float = 20.0,
+        api_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        captcha_solver: Optional[CaptchaSolver] = None,
+        login_attempts: int = 5,
+    ) -> None:
+        try:
+            import httpx
+        except ImportError as e:  # pragma: no cover
+            raise CrawlError("并发抓取需要 httpx：pip install httpx") from e
+
+        self.username = username
+        self.password = password
+        self.base_url = base_url.rstrip("/")
+        self.out_dir = out_dir
+        self.retries = retries
+        self.login_attempts = login_attempts
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.captcha_solver = captcha_solver or self._baidu_ocr
+
+        # 复用同步爬虫的请求头、加密与解析逻辑
+        self.spider = JWXTSpider()
+        self.client = httpx.AsyncClient(
+            headers=self.spider.headers,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.bucket = TokenBucket(rate, burst=max(1, concurrency))
+        self.checkpoint = Checkpoint(os.path.join(out_dir, "checkpoint.json"))
+        self._login_lock = asyncio.Lock()
+        self._login_generation = 0
+        self.requests = 0
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncJWXTCrawler":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    # -------------------- HTTP --------------------
+    async def _request(self, method: str, url: str, **kwargs: Any):
+        """限速 + 重试（指数退避）；网络错误与 5xx 重试，其余原样返回"""
+        delay = 0.5
+        for attempt in range(1, self.retries + 1):
+            await self.bucket.acquire()
+            self.requests += 1
+            try:
+                resp = await self.client.request(method, url, **kwargs)
+                if resp.status_code < 500:
+                    return resp
+                err: Exception = CrawlError(f"{method} {url} -> HTTP {resp.status_code}")
+            except Exception as e:  # httpx.TransportError 等
+                err = e
+            if attempt == self.retries:
+                raise CrawlError(f"{method} {url} 失败（已重试 {self.retries} 次）: {err}") from err
+            await asyncio.sleep(delay)
+            delay *= 2
+        raise AssertionError("unreachable")
+
+    # -------------------- 登录 --------------------
+    async def _baidu_ocr(self, image_bytes: bytes) -> Optional[str]:
+        if not (self.api_key and self.secret_key):
+            raise CrawlError("未配置验证码识别：需要 BAIDU_API_KEY/BAIDU_SECRET_KEY 或自定义 captcha_solver")
+        token = None
+        token_file = self.spider.TOKEN_FILE
+        if os.path.exists(token_file):
+            with open(token_file, "r") as f:
+                token = f.read().strip() or None
+        if not token:
+            resp = await self._request(
+                "GET",
+                "https://aip.baidubce.com/oauth/2.0/token",
+                params={"grant_type": "client_credentials", "client_id": self.api_key, "client_secret": self.secret_key},
+            )
+            token = resp.json().get("access_token")
+            if not token:
+                return None
+            with open(token_file, "w") as f:
+                f.write(token)
+        resp = await self._request(
+            "POST",
+            "https://aip.baidubce.com/rest/2.0/ocr/v1/general_basic",
+            params={"access_token": token},
+            data={"image": base64.b64encode(image_bytes).decode()},
+        )
+        words = resp.json().get("words_result", [])
+        text = re.sub(r"[^A-Za-z0-9]", "", "".join(w["words"] for w in words))
+        return text if len(text) == 4 else None
+
+    async def _login_once(self) -> bool:
+        resp = await self._request("GET", f"{self.base_url}/Logon.do", params={"method": "logon", "flag": "sess"})
+        try:
+            scode, sxh = resp.text.strip().split("#")
+        except ValueError:
+            return False
+        encoded = self.spider.encode_credentials(self.username, self.password, scode, sxh)
+
+        resp = await self._request("GET", f"{self.base_url}/verifycode.servlet")
+        if resp.status_code != 200:
+            return False
+        captcha = await self.captcha_solver(resp.content)
+        if not captcha:
+            return False
+
+        await self._request(
+            "POST",
+            f"{self.base_url}/Logon.do",
+            data={"method": "logon", "view": "0", "useDogCode": "", "encoded": encoded, "RANDOMCODE": captcha},
+        )
+        return True
+
+    async def login(self, seen_generation: Optional[int] = None) -> None:
+        """并发任务同时发现会话失效时只重新登录一次"""
+        async with self._login_lock:
+            if seen_generation is not None and seen_generation != self._login_generation:
+                return
+            for attempt in range(self.login_attempts):
+                if await self._login_once():
+                    self._login_generation += 1
+                    return
+                await asyncio.sleep(min(2 ** attempt * 0.5, 5))
+            raise CrawlError("登录失败：验证码多次识别失败或教务系统不可用")
+
+    # -------------------- 抓取 --------------------
+    @staticmethod
+    def _looks_like_timetable(html: str) -> bool:
+        # 与同步版判断一致：登录页/错误页都很短且没有课表
+        return "<table" in html and len(html) > 5000
+
+    async def fetch(self, task: CrawlTask) -> str:
+        form = dict(QUERY_FORM, xnxqh=task.semester, **task.form)
+        url = f"{self.base_url}/zcbqueryAction.do"
+        for relogin in (True, False):
+            generation = self._login_generation
+            resp = await self._request("POST", url, params={"method": "goQueryZKbByXzbj"}, data=form)
+            html = resp.text
+            if self._looks_like_timetable(html):
+                return html
+            if relogin:
+                await self.login(seen_generation=generation)
+        raise CrawlError(f"{task.key}: 未取到课表页面")
+
+    async def _run_task(self, task: CrawlTask) -> Dict[str, Any]:
+        async with self.semaphore:
+            t0 = time.perf_counter()
+            html = await self.fetch(task)
+            rows = self.spider.parse_timetable_text(html) or []
+            html_path = os.path.join(self.out_dir, f"{task.key}.html")
+            json_path = os.path.join(self.out_dir, f"{task.key}.json")
+            for path, content in ((html_path, html), (json_path, json.dumps(rows, ensure_ascii=False, indent=4))):
+                with open(f"{path}.part", "w", encoding="utf-8") as f:
+                    f.write(content)
+                os.replace(f"{path}.part", path)
+            info = {
+                "html": html_path,
+                "json": json_path,
+                "rows": len(rows),
+                "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+            }
+            self.checkpoint.mark_done(task.key, info)
+            return info
+
+    async def crawl(self, tasks: Sequence[CrawlTask]) -> Dict[str, Any]:
+        """并行执行全部未完成任务；单个任务失败不影响其它任务，失败的下次重跑时继续"""
+        os.makedirs(self.out_dir, exist_ok=True)
+        pending = [t for t in tasks if not self.checkpoint.is_done(t.key)]
+        report: Dict[str, Any] = {
+            "total": len(tasks),
+            "skipped": len(tasks) - len(pending),
+            "done": {},
+            "failed": {},
+        }
+        if not pending:
+            return report
+
+        await self.login()
+        results = await asyncio.gather(*(self._run_task(t) for t in pending), return_exceptions=True)
+        for task, res in zip(pending, results):
+            if isinstance(res, BaseException):
+                report["failed"][task.key] = str(res)
+            else:
+                report["done"][task.key] = res
+        report["requests"] = self.requests
+        return report
+
+
+def build_tasks(semesters: Sequence[str], splits: Optional[Sequence[Dict[str, str]]] = None) -> List[CrawlTask]:
+    """学期 x 拆分条件（如 [{"skzy": "..."}, ...]）的笛卡尔积；不拆分则每学期一个任务"""
+    return [CrawlTask(sem, dict(form)) for sem in semesters for form in (splits or [{}])]
+
+
+async def main() -> None:
+    from app.core.config import CRAWL_BASE_URL, CRAWL_CONCURRENCY, CRAWL_RATE_PER_SECOND
+
+    parser = argparse.ArgumentParser(description="教务课表并发抓取（可断点续抓）")
+    parser.add_argument("semesters", nargs="+", help="学年学期代码，如 2025-2026-1")
+    parser.add_argument("--out", default="crawl_out", help="输出目录（HTML/JSON/检查点）")
+    parser.add_argument("--split", action="append", default=[], help="额外查询条件 k=v[,k=v]，可多次指定")
+    parser.add_argument("--concurrency", type=int, default=CRAWL_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=CRAWL_RATE_PER_SECOND, help="每秒请求数，0 表示不限")
+    parser.add_argument("--base-url", default=CRAWL_BASE_URL)
+    args = parser.parse_args()
+
+    splits = [dict(kv.split("=", 1) for kv in s.split(",")) for s in args.split] or None
+    async with AsyncJWXTCrawler(
+        username=os.environ["JWXT_USERNAME"],
+        password=os.environ["JWXT_PASSWORD"],
+        api_key=os.getenv("BAIDU_API_KEY"),
+        secret_key=os.getenv("BAIDU_SECRET_KEY"),
+        out_dir=args.out,
+        base_url=args.base_url,
+        concurrency=args.concurrency,
+        rate=args.rate,
+    ) as crawler:
+        report = await crawler.crawl(build_tasks(args.semesters, splits))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,7 +2,6 @@ import requests
 import base64
 import time
 import os
-from bs4 import BeautifulSoup
 import json
 import re
 
@@ -337,42 +336,26 @@ class JWXTSpider:
         with open(f"{current_semester}.html", "r", encoding="utf-8") as f:
             html_content = f.read()
 
-        soup = BeautifulSoup(html_content, "html.parser")
-        table = soup.find("table", {"id": "kbtable"})
-        if not table:
+        data = self.parse_timetable_text(html_content)
+        if data is None:
             return False
 
-        header_rows = table.find_all("tr")[:2]
-        days = []
-        for td in header_rows[0].find_all("td")[1:]:
-            colspan = int(td.get("colspan", 1))
-            days.extend([td.get_text(strip=True)] * colspan)
-
-        sections = [td.get_text(strip=True) for td in header_rows[1].find_all("td")[1:]]
-
-        data = []
-        for row in table.find_all("tr")[2:]:
-            cells = row.find_all("td")
-            class_name = cells[0].get_text(strip=True)
-            for i, cell in enumerate(cells[1:]):
-                content = cell.get_text(separator="\n", strip=True)
-                if content:
-                    course_info = self.parse_course_info(content)
-                    data.append({
-                        "班级": class_name,
-                        "学院": self.identify_college(class_name),
-                        "专业": self.identify_major(class_name),
-                        "年级": self.identify_grade(class_name),
-                        "星期": days[i],
-                        "节次": self.section_map.get(sections[i], sections[i]),
-                        **course_info
-                    })
-
         with open(f"{current_semester}.json", "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
 
         return True
 
+    def parse_timetable_text(self, html_content):
+        """kbtable 页面 -> 课表记录列表；页面里没有课表时返回 None（流式解析见 app.crawl.parser）"""
+        return self.timetable_parser.parse_text(html_content)
+
+    @property
+    def timetable_parser(self):
+        if getattr(self, "_timetable_parser", None) is None:
+            from app.crawl.parser import TimetableParser
+            self._timetable_parser = TimetableParser.from_spider(self)
+        return self._timetable_parser
+
     # -------------------- 主流程 --------------------
     def crawl(self, current_semester, username, password, API_KEY, SECRET_KEY):
         scode, sxh = self.get_encryption_params()
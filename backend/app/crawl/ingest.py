@@ -0,0 +1,430 @@
+# app/crawl/ingest.py
+"""爬虫课表 JSON 的批量入库
+
+原导入脚本每行课表分别查学院、教师（有时两次）、专业、班级、已有课表，逐行 flush，
+一个学期 3 万行要跑好几分钟。这里换成按批处理：
+
+- 流式读取 JSON 数组（或每行一个对象的 JSON Lines），不把整个文件读进内存
+- 学院、教师、本学期已有课表槽位（uk_timetable_slot）开始时各一条查询装进字典；
+  缺失的专业/班级每批合并成一条多值 INSERT 后回查 ID
+- 课表按批 INSERT ... ON DUPLICATE KEY UPDATE，每批提交一次；重复执行是幂等的
+
+用法（在 backend 目录下）：
+    python -m app.crawl.ingest data/2025-2026-1.json --year 2025-2026 --semester 2 [--teacher-info data/teacher_info.json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Clazz, College, Major, Timetable, User, week_mask_of
+
+INGEST_BATCH_SIZE = 1000
+
+WEEKDAY_MAP = {
+    "星期一": 1, "周一": 1,
+    "星期二": 2, "周二": 2,
+    "星期三": 3, "周三": 3,
+    "星期四": 4, "周四": 4,
+    "星期五": 5, "周五": 5,
+    "星期六": 6, "周六": 6,
+    "星期日": 7, "星期天": 7, "周日": 7, "周天": 7,
+}
+
+# uk_timetable_slot 的列顺序
+SLOT_COLUMNS = (
+    "academic_year", "semester", "teacher_id", "class_name", "course_name",
+    "weekday", "period", "section_time", "week_info", "classroom",
+)
+
+# 命中已有槽位时刷新的字段；is_delete 不动，避免把已软删的课表“复活”
+UPDATE_COLUMNS = ("college_id", "class_id", "course_code", "weekday_text", "raw_payload", "sync_time", "sync_status")
+
+Slot = Tuple[Any, ...]
+
+
+@dataclass
+class IngestReport:
+    read: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    skip_reasons: Counter = field(default_factory=Counter)
+    majors_created: int = 0
+    classes_created: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+
+    def skip(self, reason: str) -> None:
+        self.skipped += 1
+        self.skip_reasons[reason] += 1
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "read": self.read,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "skip_reasons": dict(self.skip_reasons),
+            "majors_created": self.majors_created,
+            "classes_created": self.classes_created,
+            "batches": self.batches,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+# -----------------------------
+# 流式读取
+# -----------------------------
+def iter_json_rows(path: str, *, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """逐个产出 JSON 数组（或 JSON Lines）里的元素，内存只保留当前块"""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        buf, pos, eof = "", 0, False
+        in_array: Optional[bool] = None
+        while True:
+            # 跳过空白与分隔逗号，缓冲区耗尽就续读
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buf) or eof:
+                    break
+                buf, pos = f.read(chunk_size), 0
+                eof = not buf
+            if pos >= len(buf):
+                return
+            if in_array is None:
+                in_array = buf[pos] == "["
+                if in_array:
+                    pos += 1
+                    continue
+            if in_array and buf[pos] == "]":
+                return
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                more = "" if eof else f.read(chunk_size)
+                if not more:
+                    raise
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield obj
+            pos = end
+
+
+def _batched(rows: Iterator[Any], size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _text(row: Dict[str, Any], key: str) -> str:
+    v = row.get(key)
+    return "" if v is None else str(v).strip()
+
+
+def weekday_to_int(text: str) -> Optional[int]:
+    if text in WEEKDAY_MAP:
+        return WEEKDAY_MAP[text]
+    m = re.search(r"([1-7])", text)
+    return int(m.group(1)) if m else None
+
+
+# -----------------------------
+# 引用实体预加载
+# -----------------------------
+class _Refs:
+    def __init__(self) -> None:
+        self.colleges: Dict[str, int] = {}
+        self.user_by_on: Dict[str, int] = {}
+        self.users_by_name: Dict[str, List[int]] = {}
+        self.majors: Dict[Tuple[int, str], int] = {}
+        self.classes: Dict[Tuple[int, str], int] = {}
+        self.slots: Set[Slot] = set()
+
+    async def load(self, db: AsyncSession, *, academic_year: str, semester: int) -> None:
+        res = await db.execute(select(College.college_name, College.id).where(College.is_delete == False))  # noqa: E712
+        self.colleges = {name: cid for name, cid in res.all()}
+
+        res = await db.execute(select(User.id, User.user_on, User.user_name).where(User.is_delete == False))  # noqa: E712
+        for uid, user_on, user_name in res.all():
+            self.user_by_on[user_on] = uid
+            self.users_by_name.setdefault(user_name, []).append(uid)
+
+        res = await db.execute(select(Major.college_id, Major.major_name, Major.id).where(Major.is_delete == False))  # noqa: E712
+        for college_id, name, mid in res.all():
+            self.majors.setdefault((college_id, name), mid)
+
+        res = await db.execute(select(Clazz.major_id, Clazz.class_name, Clazz.id).where(Clazz.is_delete == False))  # noqa: E712
+        for major_id, name, cid in res.all():
+            self.classes.setdefault((major_id, name), cid)
+
+        cols = [getattr(Timetable, c) for c in SLOT_COLUMNS]
+        res = await db.execute(
+            select(*cols).where(Timetable.academic_year == academic_year, Timetable.semester == semester)
+        )
+        self.slots = {tuple(r) for r in res.all()}
+
+    def teacher_id(self, name: str, employee_no: Optional[str]) -> Tuple[Optional[int], Optional[str]]:
+        """(教师ID, 跳过原因)；先按工号精确匹配，再按唯一姓名匹配"""
+        if employee_no and employee_no in self.user_by_on:
+            return self.user_by_on[employee_no], None
+        ids = self.users_by_name.get(name) or []
+        if len(ids) == 1:
+            return ids[0], None
+        return None, ("teacher_ambiguous" if ids else "teacher_missing")
+
+
+async def _ensure_majors(db: AsyncSession, refs: _Refs, keys: Set[Tuple[int, str]]) -> int:
+    missing = sorted(k for k in keys if k not in refs.majors)
+    if not missing:
+        return 0
+    await db.execute(mysql_insert(Major).values([{"college_id": c, "major_name": n, "is_delete": False} for c, n in missing]))
+    res = await db.execute(
+        select(Major.college_id, Major.major_name, Major.id).where(
+            tuple_(Major.college_id, Major.major_name).in_(missing),
+            Major.is_delete == False,  # noqa: E712
+        )
+    )
+    for college_id, name, mid in res.all():
+        refs.majors.setdefault((college_id, name), mid)
+    return len(missing)
+
+
+async def _ensure_classes(db: AsyncSession, refs: _Refs, grades: Dict[Tuple[int, str], Optional[str]]) -> int:
+    missing = sorted(k for k in grades if k not in refs.classes)
+    if not missing:
+        return 0
+    await db.execute(mysql_insert(Clazz).values([
+        {"major_id": m, "class_name": n, "grade": grades[(m, n)], "is_delete": False} for m, n in missing
+    ]))
+    res = await db.execute(
+        select(Clazz.major_id, Clazz.class_name, Clazz.id).where(
+            tuple_(Clazz.major_id, Clazz.class_name).in_(missing),
+            Clazz.is_delete == False,  # noqa: E712
+        )
+    )
+    for major_id, name, cid in res.all():
+        refs.classes.setdefault((major_id, name), cid)
+    return len(missing)
+
+
+# -----------------------------
+# 入库
+# -----------------------------
+async def _ingest_batch(
+    db: AsyncSession,
+    refs: _Refs,
+    batch: List[Any],
+    report: IngestReport,
+    *,
+    academic_year: str,
+    semester: int,
+    name_to_employee_no: Dict[str, str],
+    seen: Set[Slot],
+    now: datetime,
+) -> None:
+    # 1) 解析 + 解析引用（不访问数据库）
+    parsed: List[Tuple[Dict[str, Any], Tuple[int, str], Optional[str]]] = []
+    for row in batch:
+        report.read += 1
+        if not isinstance(row, dict):
+            report.skip("invalid")
+            continue
+        class_name, course_name = _text(row, "班级"), _text(row, "course")
+        teacher_name, weekday_text = _text(row, "teacher"), _text(row, "星期")
+        period, section_time, week_info = _text(row, "节次"), _text(row, "section_time"), _text(row, "week_info")
+        if not (class_name and course_name and teacher_name and weekday_text and period and section_time and week_info):
+            report.skip("missing_field")
+            continue
+        weekday = weekday_to_int(weekday_text)
+        if weekday is None:
+            report.skip("invalid_weekday")
+            continue
+        college_id = refs.colleges.get(_text(row, "学院"))
+        if college_id is None:
+            report.skip("college_missing")
+            continue
+        teacher_id, reason = refs.teacher_id(teacher_name, name_to_employee_no.get(teacher_name))
+        if teacher_id is None:
+            report.skip(reason)
+            continue
+
+        values = {
+            "academic_year": academic_year,
+            "semester": semester,
+            "teacher_id": teacher_id,
+            "class_name": class_name,
+            "course_name": course_name,
+            "weekday": weekday,
+            "period": period,
+            "section_time": section_time,
+            "week_info": week_info,
+            "classroom": _text(row, "classroom"),
+        }
+        slot = tuple(values[c] for c in SLOT_COLUMNS)
+        if slot in seen:
+            report.skip("duplicate_in_file")
+            continue
+        seen.add(slot)
+
+        values.update({
+            "college_id": college_id,
+            "course_code": _text(row, "class_code") or None,
+            "weekday_text": weekday_text,
+            "week_mask": week_mask_of(week_info),
+            "raw_payload": row,
+            "sync_source": 0,
+            "sync_time": now,
+            "sync_status": 1,
+            "is_delete": False,
+        })
+        parsed.append((values, (college_id, _text(row, "专业") or "未分配专业"), _text(row, "年级") or None))
+
+    if not parsed:
+        return
+
+    # 2) 本批缺失的专业/班级各一条多值插入
+    report.majors_created += await _ensure_majors(db, refs, {mk for _, mk, _ in parsed})
+    grades: Dict[Tuple[int, str], Optional[str]] = {}
+    for values, mk, grade in parsed:
+        grades.setdefault((refs.majors[mk], values["class_name"]), grade)
+    report.classes_created += await _ensure_classes(db, refs, grades)
+
+    # 3) 课表分块 upsert；插入/更新按预加载的槽位集合区分
+    rows: List[Dict[str, Any]] = []
+    for values, mk, _ in parsed:
+        values["class_id"] = refs.classes.get((refs.majors[mk], values["class_name"]))
+        slot = tuple(values[c] for c in SLOT_COLUMNS)
+        if slot in refs.slots:
+            report.updated += 1
+        else:
+            report.inserted += 1
+            refs.slots.add(slot)
+        rows.append(values)
+
+    stmt = mysql_insert(Timetable).values(rows)
+    stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in UPDATE_COLUMNS})
+    await db.execute(stmt)
+    await db.commit()
+    report.batches += 1
+
+
+async def ingest_timetable_rows(
+    db: AsyncSession,
+    rows: Iterator[Any],
+    *,
+    academic_year: str,
+    semester: int,
+    name_to_employee_no: Optional[Dict[str, str]] = None,
+    batch_size: int = INGEST_BATCH_SIZE,
+) -> IngestReport:
+    from app.crud.count_cache import bump_models
+
+    report = IngestReport()
+    t0 = time.perf_counter()
+    refs = _Refs()
+    await refs.load(db, academic_year=academic_year, semester=semester)
+    seen: Set[Slot] = set()
+    now = datetime.utcnow()
+    try:
+        for batch in _batched(rows, batch_size):
+            await _ingest_batch(
+                db, refs, batch, report,
+                academic_year=academic_year,
+                semester=semester,
+                name_to_employee_no=name_to_employee_no or {},
+                seen=seen,
+                now=now,
+            )
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        bump_models(Timetable, Major, Clazz)
+        report.elapsed_seconds = time.perf_counter() - t0
+    return report
+
+
+def load_name_to_employee_no(path: Optional[str]) -> Dict[str, str]:
+    """teacher_info.json：[{"姓名": ..., "教工号": ...}, ...]"""
+    if not path:
+        return {}
+    return {
+        str(info["姓名"]).strip(): str(info["教工号"]).strip()
+        for info in iter_json_rows(path)
+        if isinstance(info, dict) and info.get("姓名") and info.get("教工号")
+    }
+
+
+async def ingest_timetable_file(
+    db: AsyncSession,
+    path: str,
+    *,
+    academic_year: str,
+    semester: int,
+    teacher_info_path: Optional[str] = None,
+    batch_size: int = INGEST_BATCH_SIZE,
+) -> IngestReport:
+    if path.endswith((".html", ".htm")):
+        # 直接吃抓取下来的 kbtable 页面：边解析边入库
+        from app.crawl.crawl import JWXTSpider
+
+        rows = JWXTSpider().timetable_parser.iter_file(path)
+    else:
+        rows = iter_json_rows(path)
+    return await ingest_timetable_rows(
+        db,
+        rows,
+        academic_year=academic_year,
+        semester=semester,
+        name_to_employee_no=load_name_to_employee_no(teacher_info_path),
+        batch_size=batch_size,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="爬虫课表 JSON 批量入库")
+    parser.add_argument("path", help="课表 JSON（数组或 JSON Lines），或抓取下来的 kbtable 页面 .html")
+    parser.add_argument("--year", required=True, help="学年，如 2025-2026")
+    parser.add_argument("--semester", type=int, required=True, choices=(1, 2), help="学期 1-春季 2-秋季")
+    parser.add_argument("--teacher-info", default=None, help="姓名 -> 教工号映射 JSON（可选）")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    args = parser.parse_args()
+
+    from app.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        report = await ingest_timetable_file(
+            db, args.path,
+            academic_year=args.year,
+            semester=args.semester,
+            teacher_info_path=args.teacher_info,
+            batch_size=args.batch_size,
+        )
+    print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,362 @@
+# app/crawl/parser.py
+"""kbtable 课表页面的流式解析
+
+JWXTSpider 原先把整页 HTML 读进内存交给 BeautifulSoup(html.parser) 建完整棵树，
+再对每个单元格用 identify_college/identify_major 逐条遍历映射表做子串查找。这里：
+
+- 解析后端优先用 lxml 的增量 C 解析器（HTMLPullParser），没装 lxml 时退回标准库 html.parser 的增量模式；
+  两者都是边喂数据边按 <tr> 产出，处理完的行立即释放
+- 学院/专业映射预编译成一个 Aho-Corasick 自动机，一遍扫描班级名即可；结果按班级名缓存（一行 42 格共用）
+- 记录以生成器产出，JSON 落盘或入库（app.crawl.ingest）可以在解析完成前就开始
+
+识别规则与原实现一致：映射表中按定义顺序第一个出现在班级名里的简称胜出。
+"""
+from __future__ import annotations
+
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:  # lxml 为可选依赖
+    from lxml import etree as _etree
+except ImportError:  # pragma: no cover
+    _etree = None
+
+# 一个单元格：(去空白后的文本片段, colspan)
+Cell = Tuple[List[str], int]
+
+_RE_GRADE_4 = re.compile(r"(20\d{2})")
+_RE_GRADE_2 = re.compile(r"(\d{2})")
+_RE_CLASS = re.compile(r"([^\s\(]+)")
+_RE_WEEK = re.compile(r"\(([\d\-,]+)周\)")
+_RE_SECTION = re.compile(r"\(([\d\-]+)节\)")
+
+_CLASS_CACHE_MAX = 20000
+
+
+class PatternMatcher:
+    """多模式子串匹配（Aho-Corasick）：返回命中模式中定义顺序最靠前的那个值"""
+
+    def __init__(self, patterns: Sequence[Tuple[str, Any]]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[int] = [-1]  # 该状态（含 fail 链）命中的最小模式序号
+        self._values = [v for _, v in patterns]
+
+        for prio, (pat, _) in enumerate(patterns):
+            if not pat:
+                continue
+            node = 0
+            for ch in pat:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(-1)
+                    self._goto[node][ch] = nxt
+                node = nxt
+            if self._best[node] == -1:
+                self._best[node] = prio
+
+        queue = list(self._goto[0].values())
+        while queue:
+            u = queue.pop(0)
+            for ch, v in self._goto[u].items():
+                f = self._fail[u]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[v] = self._goto[f].get(ch, 0)
+                inherited = self._best[self._fail[v]]
+                if inherited != -1 and (self._best[v] == -1 or inherited < self._best[v]):
+                    self._best[v] = inherited
+                queue.append(v)
+
+    def first(self, text: str, default: Any = None) -> Any:
+        goto, fail, best_at = self._goto, self._fail, self._best
+        best = -1
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            b = best_at[node]
+            if b != -1 and (best == -1 or b < best):
+                best = b
+        return self._values[best] if best != -1 else default
+
+
+# -----------------------------
+# 解析后端：把 kbtable 内的每个 <tr> 变成 [Cell, ...]
+# -----------------------------
+class _StdlibRows(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.found = False
+        self._depth = 0  # 位于 kbtable 内时的 <table> 嵌套层数
+        self._row: Optional[List[Cell]] = None
+        self._cell: Optional[Cell] = None
+        self._text: List[str] = []  # 两个标签之间的文本可能分多次回调，合并后作为一个片段
+        self.rows: List[List[Cell]] = []
+
+    def _flush_text(self) -> None:
+        if self._cell is not None and self._text:
+            s = "".join(self._text).strip()
+            if s:
+                self._cell[0].append(s)
+        self._text = []
+
+    def _end_cell(self) -> None:
+        self._flush_text()
+        if self._cell is not None and self._row is not None:
+            self._row.append(self._cell)
+        self._cell = None
+
+    def _end_row(self) -> None:
+        self._end_cell()
+        if self._row is not None:
+            self.rows.append(self._row)
+        self._row = None
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._flush_text()
+        if tag == "table":
+            if self._depth:
+                self._depth += 1
+            elif dict(attrs).get("id") == "kbtable":
+                self._depth = 1
+                self.found = True
+        elif not self._depth:
+            return
+        elif tag == "tr":
+            self._end_row()
+            self._row = []
+        elif tag in ("td", "th"):
+            self._end_cell()
+            try:
+                colspan = int(dict(attrs).get("colspan") or 1)
+            except ValueError:
+                colspan = 1
+            self._cell = ([], colspan)
+
+    def handle_endtag(self, tag: str) -> None:
+        if not self._depth:
+            return
+        self._flush_text()
+        if tag in ("td", "th"):
+            self._end_cell()
+        elif tag == "tr":
+            self._end_row()
+        elif tag == "table":
+            self._depth -= 1
+            if not self._depth:
+                self._end_row()
+
+    def handle_data(self, data: str) -> None:
+        if self._cell is not None:
+            self._text.append(data)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        # <br/> 之类的自闭合标签同样分隔文本片段
+        self._flush_text()
+
+
+def _iter_rows_stdlib(chunks: Iterable[str], state: Dict[str, bool]) -> Iterator[List[Cell]]:
+    p = _StdlibRows()
+    for chunk in chunks:
+        p.feed(chunk)
+        state["found"] = p.found
+        if p.rows:
+            rows, p.rows = p.rows, []
+            yield from rows
+    p.close()
+    state["found"] = p.found
+    yield from p.rows
+
+
+def _lxml_cell(td: Any) -> Cell:
+    parts = [s.strip() for s in td.itertext()]
+    try:
+        colspan = int(td.get("colspan") or 1)
+    except ValueError:
+        colspan = 1
+    return [s for s in parts if s], colspan
+
+
+def _iter_rows_lxml(chunks: Iterable[str], state: Dict[str, bool]) -> Iterator[List[Cell]]:
+    parser = _etree.HTMLPullParser(events=("start", "end"))
+    table = None
+
+    def drain() -> Iterator[List[Cell]]:
+        nonlocal table
+        for event, el in parser.read_events():
+            if event == "start":
+                if table is None and el.tag == "table" and el.get("id") == "kbtable":
+                    table = el
+                    state["found"] = True
+                continue
+            if table is None:
+                continue
+            if el.tag == "tr":
+                yield [_lxml_cell(td) for td in el if td.tag in ("td", "th")]
+                # 释放已处理的行
+                el.clear()
+                while el.getprevious() is not None:
+                    del el.getparent()[0]
+            elif el is table:
+                table = None
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from drain()
+    parser.close()
+    yield from drain()
+
+
+def available_backend(backend: str = "auto") -> str:
+    if backend == "auto":
+        return "lxml" if _etree is not None else "stdlib"
+    if backend == "lxml" and _etree is None:
+        raise ValueError("未安装 lxml，无法使用 lxml 解析后端")
+    if backend not in ("lxml", "stdlib"):
+        raise ValueError(f"未知解析后端: {backend}")
+    return backend
+
+
+# -----------------------------
+# 记录组装
+# -----------------------------
+def expand_weeks(week_str: str) -> str:
+    weeks: List[str] = []
+    for part in week_str.split(","):
+        if "-" in part:
+            start, end = part.split("-")
+            weeks.extend(str(i) for i in range(int(start), int(end) + 1))
+        else:
+            weeks.append(part)
+    return ",".join(weeks)
+
+
+def parse_course_info(text: str) -> Dict[str, str]:
+    lines = text.split("\n")
+    course_name = lines[0].strip() if len(lines) > 0 else ""
+    teacher = lines[1].strip() if len(lines) > 1 else ""
+    classes_line = lines[2].strip() if len(lines) > 2 else ""
+    classroom = lines[3].strip() if len(lines) > 3 else ""
+
+    m = _RE_CLASS.match(classes_line)
+    week = _RE_WEEK.search(classes_line)
+    section = _RE_SECTION.search(classes_line)
+    return {
+        "course": course_name,
+        "teacher": teacher,
+        "class_code": m.group(1) if m else "",
+        "week_info": expand_weeks(week.group(1)) if week else "",
+        "section_time": section.group(1) if section else "",
+        "classroom": classroom,
+    }
+
+
+class TimetableParser:
+    def __init__(
+        self,
+        *,
+        section_map: Dict[str, str],
+        college_map: Dict[str, Sequence[str]],
+        major_map: Dict[str, str],
+        backend: str = "auto",
+    ) -> None:
+        self.section_map = section_map
+        self.backend = available_backend(backend)
+        self._college = PatternMatcher([(m, college) for college, majors in college_map.items() for m in majors])
+        self._major = PatternMatcher(list(major_map.items()))
+        self._class_cache: Dict[str, Tuple[str, str, str]] = {}
+        self.found_table = False
+
+    @classmethod
+    def from_spider(cls, spider: Any, *, backend: str = "auto") -> "TimetableParser":
+        return cls(
+            section_map=spider.section_map,
+            college_map=spider.college_map,
+            major_map=spider.major_map,
+            backend=backend,
+        )
+
+    def identify_college(self, text: str) -> str:
+        return self._college.first(text, "未知学院")
+
+    def identify_major(self, text: str) -> str:
+        return self._major.first(text, "未知专业")
+
+    @staticmethod
+    def identify_grade(text: str) -> str:
+        m = _RE_GRADE_4.search(text)
+        if m:
+            return m.group(1)
+        m = _RE_GRADE_2.match(text)
+        if m:
+            return "20" + m.group(1)
+        return "未知年级"
+
+    def _class_info(self, class_name: str) -> Tuple[str, str, str]:
+        info = self._class_cache.get(class_name)
+        if info is None:
+            if len(self._class_cache) >= _CLASS_CACHE_MAX:
+                self._class_cache.clear()
+            info = (self.identify_college(class_name), self.identify_major(class_name), self.identify_grade(class_name))
+            self._class_cache[class_name] = info
+        return info
+
+    def iter_records(self, chunks: Iterable[Union[str, bytes]]) -> Iterator[Dict[str, Any]]:
+        """逐条产出课表记录；迭代结束后 found_table 表示页面里是否有 kbtable"""
+        state = {"found": False}
+        text_chunks = (c.decode("utf-8") if isinstance(c, bytes) else c for c in chunks)
+        rows = (_iter_rows_lxml if self.backend == "lxml" else _iter_rows_stdlib)(text_chunks, state)
+
+        days: List[str] = []
+        sections: List[str] = []
+        try:
+            for i, row in enumerate(rows):
+                if i == 0:
+                    for parts, colspan in row[1:]:
+                        days.extend(["".join(parts)] * colspan)
+                    continue
+                if i == 1:
+                    sections = ["".join(parts) for parts, _ in row[1:]]
+                    continue
+                if not row:
+                    continue
+                class_name = "".join(row[0][0])
+                college = major = grade = None
+                for j, (parts, _) in enumerate(row[1:]):
+                    if not parts or j >= len(days) or j >= len(sections):
+                        continue
+                    if college is None:
+                        college, major, grade = self._class_info(class_name)
+                    yield {
+                        "班级": class_name,
+                        "学院": college,
+                        "专业": major,
+                        "年级": grade,
+                        "星期": days[j],
+                        "节次": self.section_map.get(sections[j], sections[j]),
+                        **parse_course_info("\n".join(parts)),
+                    }
+        finally:
+            self.found_table = state["found"]
+
+    def parse_text(self, html: str) -> Optional[List[Dict[str, Any]]]:
+        """整页解析；页面里没有课表时返回 None（与 JWXTSpider.parse_timetable_text 约定一致）"""
+        records = list(self.iter_records([html]))
+        return records if self.found_table else None
+
+    def iter_file(self, path: str, *, chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+        def chunks() -> Iterator[str]:
+            with open(path, "r", encoding="utf-8") as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+
+        return self.iter_records(chunks())
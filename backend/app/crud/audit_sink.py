@@ -0,0 +1,351 @@
+# app/crud/audit_sink.py
+"""操作/登录日志的异步批量写入（write-behind）
+
+logs.create_operation_log/create_login_log 每条日志一次 add + commit + refresh，放在请求路径上会拖慢响应。
+这里改为：
+
+- 请求侧只把整理好的一行数据放进进程内有界队列（put 不等待、不取连接）
+- 单个 flusher 协程攒批：满 AUDIT_FLUSH_BATCH 条或距本批第一条超过 AUDIT_FLUSH_INTERVAL_MS 即落库，
+  每张表一条多行 INSERT，整批一次提交
+- 数据库写入失败或超过 AUDIT_FLUSH_TIMEOUT_SECONDS 时，整批追加写入本地 JSON Lines 溢出文件；
+  队列已满（数据库持续变慢）时新日志也直接写溢出文件，不阻塞请求
+- 启动时 replay_spill 把溢出文件回放入库；关闭时 shutdown 把队列里剩余的日志写完
+
+多 worker 部署时每个进程写自己的溢出文件（AUDIT_SPILL_PATH 插入 pid，如 audit_spill.1234.jsonl），
+回放时扫描目录下全部溢出文件；同一时刻只有一个 worker 回放（flock 回放锁），避免同一批日志被重复写入。
+
+语义是至少一次：超时被取消的批次可能其实已提交，回放时会产生重复日志。
+"""
+from __future__ import annotations
+
+import asyncio
+import glob
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+try:  # Windows 开发环境没有 fcntl，单进程运行时不需要文件锁
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from app.core.config import (
+    AUDIT_FLUSH_BATCH,
+    AUDIT_FLUSH_INTERVAL_MS,
+    AUDIT_FLUSH_TIMEOUT_SECONDS,
+    AUDIT_QUEUE_MAX,
+    AUDIT_SPILL_PATH,
+)
+from app.models import LoginLog, OperationLog
+
+TABLES = {
+    OperationLog.__tablename__: OperationLog.__table__,
+    LoginLog.__tablename__: LoginLog.__table__,
+}
+
+# 一条待写日志：(表名, 行数据)
+Entry = Tuple[str, Dict[str, Any]]
+
+_STOP = object()
+
+
+class AuditSink:
+    def __init__(
+        self,
+        *,
+        flush_interval_ms: int,
+        batch_size: int,
+        max_queue: int,
+        flush_timeout: float,
+        spill_path: str,
+        session_factory: Any = None,
+    ) -> None:
+        self.flush_interval = max(flush_interval_ms, 1) / 1000
+        self.batch_size = max(batch_size, 1)
+        self.max_queue = max_queue
+        self.flush_timeout = flush_timeout
+        self.spill_path = spill_path
+        self._session_factory = session_factory
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._full = asyncio.Event()
+
+        self.enqueued = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.last_flush_ms = 0.0
+        self.last_error: Optional[str] = None
+
+    # -----------------------------
+    # 入队
+    # -----------------------------
+    def _ensure_flusher(self) -> Optional[asyncio.Queue]:
+        # 懒启动：第一次写日志时才在当前事件循环里创建队列和 flusher
+        if self._queue is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return None
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._full = asyncio.Event()
+            self._task = loop.create_task(self._flusher(), name="audit-flusher")
+        return self._queue
+
+    def put(self, table: str, row: Dict[str, Any]) -> None:
+        """非阻塞写入一条日志；没有事件循环或队列已满时直接追加到溢出文件"""
+        if table not in TABLES:
+            raise ValueError(f"未知日志表: {table}")
+        queue = self._ensure_flusher()
+        if queue is None:
+            self._spill([(table, row)])
+            return
+        try:
+            queue.put_nowait((table, row))
+        except asyncio.QueueFull:
+            self._spill([(table, row)])
+            return
+        self.enqueued += 1
+        if queue.qsize() >= self.batch_size:
+            self._full.set()
+
+    # -----------------------------
+    # 攒批与落库
+    # -----------------------------
+    async def _flusher(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await queue.get()
+            if item is _STOP:
+                return
+            batch: List[Entry] = [item]
+            stop = False
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                while len(batch) < self.batch_size and not queue.empty():
+                    item = queue.get_nowait()
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+                remaining = deadline - loop.time()
+                if stop or len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            await self._flush(batch)
+            if stop:
+                return
+
+    async def _insert(self, entries: Iterable[Entry]) -> None:
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for table, row in entries:
+            groups.setdefault(table, []).append(row)
+
+        factory = self._session_factory
+        if factory is None:
+            from app.database import AsyncSessionLocal
+            factory = AsyncSessionLocal
+        async with factory() as db:
+            for table, rows in groups.items():
+                await db.execute(insert(TABLES[table]).values(rows))
+            await db.commit()
+
+    async def _flush(self, batch: List[Entry]) -> bool:
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._insert(batch), self.flush_timeout)
+        except Exception as e:
+            self.failed_batches += 1
+            self.last_error = f"{e.__class__.__name__}: {e}"
+            self._spill(batch)
+            return False
+        self.last_flush_ms = (time.perf_counter() - t0) * 1000
+        self.flushed += len(batch)
+        self.batches += 1
+        return True
+
+    # -----------------------------
+    # 溢出文件
+    # -----------------------------
+    def _own_spill_path(self) -> str:
+        root, ext = os.path.splitext(self.spill_path)
+        return f"{root}.{os.getpid()}{ext}"
+
+    def _spill_files(self) -> List[str]:
+        """目录下所有进程的溢出文件（含改为按 pid 分文件之前的旧文件）"""
+        root, ext = os.path.splitext(self.spill_path)
+        return sorted(set(glob.glob(f"{glob.escape(root)}.*{ext}")) | set(glob.glob(glob.escape(self.spill_path))))
+
+    def _spill(self, entries: Iterable[Entry], *, count: bool = True) -> None:
+        lines = [
+            json.dumps({"t": table, "r": row}, ensure_ascii=False, default=str) + "\n"
+            for table, row in entries
+        ]
+        if not lines:
+            return
+        path = self._own_spill_path()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        while True:
+            with open(path, "a", encoding="utf-8") as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                    # 打开之后文件被回放改名认领：写到新文件里，否则这几行会随回放文件一起被删掉
+                    try:
+                        same = os.stat(path).st_ino == os.fstat(f.fileno()).st_ino
+                    except FileNotFoundError:
+                        same = False
+                    if not same:
+                        continue
+                f.writelines(lines)
+                break
+        if count:
+            self.spilled += len(lines)
+
+    @staticmethod
+    def _read_spill(path: str) -> Iterator[Entry]:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    obj = json.loads(line)
+                    table, row = obj["t"], obj["r"]
+                except (ValueError, KeyError, TypeError):
+                    # 进程崩溃时可能留下半行，跳过
+                    continue
+                if table not in TABLES:
+                    continue
+                if isinstance(row.get("create_time"), str):
+                    try:
+                        row["create_time"] = datetime.fromisoformat(row["create_time"])
+                    except ValueError:
+                        row["create_time"] = None
+                yield table, row
+
+    async def replay_spill(self) -> int:
+        """把所有溢出文件回放入库，返回成功写入的条数；中途失败时剩余日志重新写回本进程的溢出文件
+
+        多个 worker 同时启动时只有拿到回放锁的那个回放，其余直接返回 0。
+        """
+        directory = os.path.dirname(self.spill_path) or "."
+        if not os.path.isdir(directory):
+            return 0
+        with open(self.spill_path + ".lock", "a") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return 0
+            # 上次回放中途崩溃留下的 .replay 先处理；再把各进程的溢出文件改名认领，
+            # 回放期间新产生的溢出写到新文件，不会被一起删掉
+            works = sorted(glob.glob(glob.escape(self.spill_path) + "*.replay")
+                           + glob.glob(glob.escape(os.path.splitext(self.spill_path)[0]) + ".*.replay"))
+            for path in self._spill_files():
+                work = f"{path}.{time.time_ns()}.replay"
+                try:
+                    os.replace(path, work)
+                except FileNotFoundError:
+                    continue
+                works.append(work)
+            done = 0
+            for work in dict.fromkeys(works):
+                done += await self._replay_file(work)
+            return done
+
+    async def _replay_file(self, work: str) -> int:
+        try:
+            f = open(work, "a")
+        except FileNotFoundError:
+            return 0
+        with f:
+            if fcntl is not None:
+                # 等改名前已打开该文件的写入方写完
+                fcntl.flock(f, fcntl.LOCK_EX)
+            return await self._replay_entries(work)
+
+    async def _replay_entries(self, work: str) -> int:
+        done = 0
+        entries = self._read_spill(work)
+        batch: List[Entry] = []
+        try:
+            for entry in entries:
+                batch.append(entry)
+                if len(batch) < self.batch_size:
+                    continue
+                await asyncio.wait_for(self._insert(batch), self.flush_timeout)
+                done += len(batch)
+                batch = []
+            if batch:
+                await asyncio.wait_for(self._insert(batch), self.flush_timeout)
+                done += len(batch)
+                batch = []
+        except Exception as e:
+            self.last_error = f"{e.__class__.__name__}: {e}"
+            # 写回的是旧日志，不计入新的溢出数
+            self._spill(batch, count=False)
+            self._spill(entries, count=False)
+        finally:
+            entries.close()
+            os.remove(work)
+            self.replayed += done
+        return done
+
+    # -----------------------------
+    # 关闭与指标
+    # -----------------------------
+    async def shutdown(self) -> None:
+        """停止 flusher，队列里剩余的日志写完（写不进数据库的落到溢出文件）"""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        # flusher 遇到停止标记时，标记之后入队的日志也一并写掉
+        rest: List[Entry] = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                rest.append(item)
+        for i in range(0, len(rest), self.batch_size):
+            await self._flush(rest[i:i + self.batch_size])
+        self._task = None
+        self._queue = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "last_error": self.last_error,
+        }
+
+
+audit_sink = AuditSink(
+    flush_interval_ms=AUDIT_FLUSH_INTERVAL_MS,
+    batch_size=AUDIT_FLUSH_BATCH,
+    max_queue=AUDIT_QUEUE_MAX,
+    flush_timeout=AUDIT_FLUSH_TIMEOUT_SECONDS,
+    spill_path=AUDIT_SPILL_PATH,
+)
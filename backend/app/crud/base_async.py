@@ -1,12 +1,15 @@
 # app/crud/base_async.py
 from __future__ import annotations
 
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, Type, TypeVar, Union
 
 from sqlalchemy import select, func
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.crud.count_cache import bump_models, cached_count
+from app.crud.pagination import Keyset, Page, apply_keyset, keyset_page
+
 ModelType = TypeVar("ModelType")
 
 
@@ -34,21 +37,9 @@ class CRUDBaseAsync(Generic[ModelType]):
         order_by: Optional[List[Any]] = None,
         include_deleted: bool = False,
         options: Optional[List[Any]] = None,
-    ) -> tuple[List[ModelType], int]:
-        # 构建查询语句
-        stmt = select(self.model)
-        if options:
-            for opt in options:
-                stmt = stmt.options(opt)
-
-        # 添加过滤条件
-        if filters:
-            for f in filters:
-                stmt = stmt.where(f)
-
-        # 默认排除软删除
-        if not include_deleted and hasattr(self.model, "is_delete"):
-            stmt = stmt.where(getattr(self.model, "is_delete") == False)  # noqa: E712
+        with_total: bool = True,
+    ) -> tuple[List[ModelType], Optional[int]]:
+        stmt = self._filtered_select(filters=filters, include_deleted=include_deleted, options=options)
 
         # 添加排序
         if order_by:
@@ -59,17 +50,50 @@ class CRUDBaseAsync(Generic[ModelType]):
         result = await db.execute(stmt)
         items = list(result.scalars().all())
 
-        # 计算总数
-        count_stmt = select(func.count()).select_from(self.model)
+        # 计算总数（with_total=False 时跳过）
+        total = await self.count(db, filters=filters, include_deleted=include_deleted) if with_total else None
+        return items, total
+
+    async def get_multi_keyset(
+        self,
+        db: AsyncSession,
+        *,
+        keyset: Keyset,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        filters: Optional[List[Any]] = None,
+        include_deleted: bool = False,
+        options: Optional[List[Any]] = None,
+        with_total: bool = False,
+    ) -> Page:
+        """游标分页：keyset 为 [(列, 是否降序)]，最后一列须唯一；cursor 非法时抛 ValueError"""
+        stmt = self._filtered_select(filters=filters, include_deleted=include_deleted, options=options)
+        result = await db.execute(apply_keyset(stmt, keyset, cursor, limit))
+        items, next_cursor = keyset_page(result.scalars().all(), keyset, limit)
+        total = await self.count(db, filters=filters, include_deleted=include_deleted) if with_total else None
+        return Page(items, total, next_cursor)
+
+    def _filtered_select(
+        self,
+        *,
+        filters: Optional[List[Any]] = None,
+        include_deleted: bool = False,
+        options: Optional[List[Any]] = None,
+    ):
+        stmt = select(self.model)
+        if options:
+            for opt in options:
+                stmt = stmt.options(opt)
+
+        # 添加过滤条件
         if filters:
             for f in filters:
-                count_stmt = count_stmt.where(f)
-        if not include_deleted and hasattr(self.model, "is_delete"):
-            count_stmt = count_stmt.where(getattr(self.model, "is_delete") == False)  # noqa: E712
-        count_result = await db.execute(count_stmt)
-        total = count_result.scalar_one()
+                stmt = stmt.where(f)
 
-        return items, total
+        # 默认排除软删除
+        if not include_deleted and hasattr(self.model, "is_delete"):
+            stmt = stmt.where(getattr(self.model, "is_delete") == False)  # noqa: E712
+        return stmt
 
     async def count(
         self,
@@ -87,8 +111,8 @@ class CRUDBaseAsync(Generic[ModelType]):
         if not include_deleted and hasattr(self.model, "is_delete"):
             stmt = stmt.where(getattr(self.model, "is_delete") == False)  # noqa: E712
 
-        result = await db.execute(stmt)
-        return int(result.scalar_one())
+        # 总数走 COUNT 缓存，表有写入后自动失效
+        return await cached_count(db, stmt)
 
     async def create(self, db: AsyncSession, *, obj_in: Union[Dict[str, Any], Any]) -> ModelType:
         data = obj_in if isinstance(obj_in, dict) else obj_in.__dict__
@@ -99,6 +123,7 @@ class CRUDBaseAsync(Generic[ModelType]):
         except IntegrityError as e:
             await db.rollback()
             raise ValueError(f"Create failed: integrity error: {e}") from e
+        bump_models(self.model)
         await db.refresh(db_obj)
         return db_obj
 
@@ -122,6 +147,7 @@ class CRUDBaseAsync(Generic[ModelType]):
         except IntegrityError as e:
             await db.rollback()
             raise ValueError(f"Update failed: integrity error: {e}") from e
+        bump_models(self.model)
 
         await db.refresh(db_obj)
         return db_obj
@@ -134,12 +160,14 @@ class CRUDBaseAsync(Generic[ModelType]):
         if hasattr(obj, "is_delete"):
             setattr(obj, "is_delete", True)
             await db.commit()
+            bump_models(self.model)
             await db.refresh(obj)
             return obj
 
         # 没有 is_delete 就硬删
         await db.delete(obj)
         await db.commit()
+        bump_models(self.model)
         return obj
 
     async def restore(self, db: AsyncSession, *, id: Any) -> Optional[ModelType]:
@@ -149,5 +177,6 @@ class CRUDBaseAsync(Generic[ModelType]):
         if hasattr(obj, "is_delete"):
             setattr(obj, "is_delete", False)
             await db.commit()
+            bump_models(self.model)
             await db.refresh(obj)
         return obj
@@ -0,0 +1,167 @@
+# app/crud/count_cache.py
+"""分页总数（COUNT）缓存
+
+列表接口每次都要再跑一条同条件的 COUNT(*)，在评教/课表大表上往往比取一页数据还贵。
+这里按「涉及的表 + 编译后的 SQL + 参数」做指纹缓存 COUNT 结果：
+
+- 每张表一个写版本号；条目记下计算时各表的版本，任一表版本变化即失效
+- 版本号在提交之后递增：CRUDBaseAsync 的 create/update/soft_remove/restore 与 Core 批量写入处显式调用 bump_*，
+  另外在 Session 上挂了 after_flush/after_commit 钩子，接口里直接改 ORM 对象的写入也会递增
+- 读取前先取版本快照，计算期间有写入提交时，写回的条目自然作废，不会缓存到旧值
+- 多 worker：版本号是进程内的，递增经 coherence_bus 广播给同机其它 worker；广播丢失时由 TTL 兜底
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.util import find_tables
+
+from app.core.coherence import coherence_bus
+from app.core.config import COUNT_CACHE_MAXSIZE, COUNT_CACHE_TTL_SECONDS
+
+
+class CountCache:
+    def __init__(self, *, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._versions: Dict[str, int] = {}
+        # 指纹 -> (过期时间, {表: 版本}, 总数, 计算耗时)
+        self._data: "OrderedDict[Hashable, Tuple[float, Dict[str, int], int, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.bumps = 0
+        self.saved_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl_seconds > 0
+
+    def snapshot(self, tables: Iterable[str]) -> Dict[str, int]:
+        return {t: self._versions.get(t, 0) for t in tables}
+
+    def bump(self, tables: Iterable[str], *, broadcast: bool = True) -> None:
+        tables = list(tables)
+        for t in tables:
+            self._versions[t] = self._versions.get(t, 0) + 1
+            self.bumps += 1
+        if broadcast and tables:
+            coherence_bus.publish("count", None, tables)
+
+    def get(self, key: Hashable) -> Optional[int]:
+        item = self._data.get(key)
+        if item is not None:
+            expires_at, versions, total, cost = item
+            if expires_at > time.monotonic() and all(self._versions.get(t, 0) == v for t, v in versions.items()):
+                self._data.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += cost
+                return total
+            self._data.pop(key, None)
+            self.stale += 1
+        self.misses += 1
+        return None
+
+    def set(self, key: Hashable, total: int, *, versions: Dict[str, int], cost: float) -> None:
+        if not self.enabled:
+            return
+        # 计算期间有写入提交：版本已变，直接丢弃
+        if any(self._versions.get(t, 0) != v for t, v in versions.items()):
+            return
+        self._data[key] = (time.monotonic() + self.ttl_seconds, versions, total, cost)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "bumps": self.bumps,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "saved_ms": round(self.saved_seconds * 1000, 1),
+        }
+
+
+count_cache = CountCache(maxsize=COUNT_CACHE_MAXSIZE, ttl_seconds=COUNT_CACHE_TTL_SECONDS)
+coherence_bus.subscribe("count", lambda _, tables: count_cache.bump(tables, broadcast=False))
+
+
+def statement_tables(stmt: Any) -> FrozenSet[str]:
+    """语句（含子查询、JOIN）涉及的全部表名"""
+    return frozenset(
+        t.name for t in find_tables(stmt, check_columns=True)
+        if getattr(t, "name", None)
+    )
+
+
+def fingerprint(stmt: Any) -> Tuple[str, str]:
+    compiled = stmt.compile()
+    params = sorted((k, repr(v)) for k, v in compiled.params.items())
+    return str(compiled), repr(params)
+
+
+async def cached_count(db: AsyncSession, count_stmt: Any) -> int:
+    """执行返回单个计数的语句，命中缓存则不访问数据库"""
+    if not count_cache.enabled:
+        return int((await db.execute(count_stmt)).scalar_one() or 0)
+    key = fingerprint(count_stmt)
+    total = count_cache.get(key)
+    if total is not None:
+        return total
+    versions = count_cache.snapshot(statement_tables(count_stmt))
+    t0 = time.perf_counter()
+    total = int((await db.execute(count_stmt)).scalar_one() or 0)
+    count_cache.set(key, total, versions=versions, cost=time.perf_counter() - t0)
+    return total
+
+
+def bump_tables(*tables: str) -> None:
+    count_cache.bump(tables)
+
+
+def bump_models(*models: Any) -> None:
+    count_cache.bump(m.__tablename__ for m in models)
+
+
+# -----------------------------
+# ORM 写入自动递增版本号（提交后生效，回滚则丢弃）
+# -----------------------------
+_PENDING_KEY = "count_cache_tables"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_tables(session: Session, flush_context: Any) -> None:
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            pending.add(table)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        count_cache.bump(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
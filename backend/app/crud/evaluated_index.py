@@ -0,0 +1,214 @@
+# app/crud/evaluated_index.py
+"""「已评课表」内存索引：听课人 -> 学期 -> 课表 -> 评教记录ID
+
+待评/已评课程列表原先对每一行候选课表做一次相关子查询 NOT EXISTS (teaching_evaluation ...)，
+是打开最频繁也最慢的页面。这里按听课人缓存其全部有效评教涉及的课表，按 (学年, 学期) 分组：
+
+- 首次访问某听课人时一条 JOIN 查询装载（按 listen_teacher_id 走索引），之后列表只需一条课表查询，
+  条件变成 Timetable.id [NOT] IN (...)
+- 评教提交/软删除在提交后调用 mark/unmark 同步更新；保存评教记录ID而不是计数，重复应用是幂等的，
+  装载期间发生的变更在装载完成后重放
+- 批量分配任务等 Core 写入调用 invalidate，下次访问重新装载
+- 多 worker：mark/unmark/invalidate 经 coherence_bus 广播给同机其它 worker 照样应用；广播丢失时由 TTL 兜底
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.coherence import coherence_bus
+from app.core.config import EVALUATED_INDEX_MAXSIZE, EVALUATED_INDEX_TTL_SECONDS
+from app.models import TeachingEvaluation, Timetable
+
+Term = Tuple[str, int]
+# 学期 -> 课表ID -> 评教记录ID集合
+_Terms = Dict[Term, Dict[int, Set[int]]]
+
+
+class EvaluatedIndex:
+    def __init__(self, *, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        # 听课人ID -> (过期时间, 分学期数据)
+        self._data: "OrderedDict[int, Tuple[float, _Terms]]" = OrderedDict()
+        self._inflight: Dict[int, "asyncio.Future[_Terms]"] = {}
+        # 装载期间到达的变更：("mark"|"unmark", 学期, 课表ID, 评教ID)
+        self._replay: Dict[int, List[Tuple[str, Optional[Term], int, int]]] = {}
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl_seconds > 0
+
+    async def _load(self, db: AsyncSession, listen_teacher_id: int) -> _Terms:
+        stmt = (
+            select(
+                TeachingEvaluation.id,
+                TeachingEvaluation.timetable_id,
+                Timetable.academic_year,
+                Timetable.semester,
+            )
+            .join(Timetable, Timetable.id == TeachingEvaluation.timetable_id)
+            .where(
+                TeachingEvaluation.listen_teacher_id == listen_teacher_id,
+                TeachingEvaluation.is_delete == False,  # noqa: E712
+            )
+        )
+        terms: _Terms = {}
+        for ev_id, tt_id, year, sem in (await db.execute(stmt)).all():
+            terms.setdefault((year, int(sem)), {}).setdefault(int(tt_id), set()).add(int(ev_id))
+        self.loads += 1
+        return terms
+
+    async def _terms(self, db: AsyncSession, listen_teacher_id: int) -> _Terms:
+        if not self.enabled:
+            return await self._load(db, listen_teacher_id)
+
+        item = self._data.get(listen_teacher_id)
+        if item is not None:
+            if item[0] > time.monotonic():
+                self._data.move_to_end(listen_teacher_id)
+                self.hits += 1
+                return item[1]
+            self._data.pop(listen_teacher_id, None)
+
+        # 同一听课人并发首访只装载一次
+        fut = self._inflight.get(listen_teacher_id)
+        if fut is not None:
+            return await asyncio.shield(fut)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[listen_teacher_id] = fut
+        self._replay[listen_teacher_id] = []
+        try:
+            terms = await self._load(db, listen_teacher_id)
+        except BaseException as e:
+            self._inflight.pop(listen_teacher_id, None)
+            self._replay.pop(listen_teacher_id, None)
+            fut.set_exception(e)
+            fut.exception()  # 没有并发等待者时避免 "exception was never retrieved"
+            raise
+        for op, term, tt_id, ev_id in self._replay.pop(listen_teacher_id, []):
+            self._apply(terms, op, term, tt_id, ev_id)
+        self._inflight.pop(listen_teacher_id, None)
+
+        self._data[listen_teacher_id] = (time.monotonic() + self.ttl_seconds, terms)
+        self._data.move_to_end(listen_teacher_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+        fut.set_result(terms)
+        return terms
+
+    @staticmethod
+    def _apply(terms: _Terms, op: str, term: Optional[Term], tt_id: int, ev_id: int) -> None:
+        if op == "mark" and term is not None:
+            terms.setdefault(term, {}).setdefault(tt_id, set()).add(ev_id)
+            return
+        # 软删除时不知道课表所属学期，逐学期查找（单个听课人的学期数很少）
+        for key, tts in list(terms.items()):
+            evs = tts.get(tt_id)
+            if evs is None:
+                continue
+            evs.discard(ev_id)
+            if not evs:
+                del tts[tt_id]
+            if not tts:
+                del terms[key]
+
+    def _change(
+        self, op: str, listen_teacher_id: int, term: Optional[Term], tt_id: int, ev_id: int, *, broadcast: bool = True
+    ) -> None:
+        replay = self._replay.get(listen_teacher_id)
+        if replay is not None:
+            replay.append((op, term, tt_id, ev_id))
+        item = self._data.get(listen_teacher_id)
+        if item is not None:
+            self._apply(item[1], op, term, tt_id, ev_id)
+        if broadcast:
+            coherence_bus.publish("evaluated", listen_teacher_id, [op, term, tt_id, ev_id])
+
+    def mark(self, *, listen_teacher_id: int, academic_year: str, semester: int, timetable_id: int, evaluation_id: int) -> None:
+        """评教提交成功后调用"""
+        self._change("mark", listen_teacher_id, (academic_year, int(semester)), int(timetable_id), int(evaluation_id))
+
+    def unmark(self, *, listen_teacher_id: int, timetable_id: int, evaluation_id: int) -> None:
+        """评教软删除成功后调用"""
+        self._change("unmark", listen_teacher_id, None, int(timetable_id), int(evaluation_id))
+
+    def invalidate(self, *listen_teacher_ids: int, broadcast: bool = True) -> None:
+        for lid in listen_teacher_ids:
+            self._data.pop(lid, None)
+        if broadcast and listen_teacher_ids:
+            coherence_bus.publish("evaluated", None, list(listen_teacher_ids))
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    async def evaluations(
+        self,
+        db: AsyncSession,
+        *,
+        listen_teacher_id: int,
+        academic_year: Optional[str] = None,
+        semester: Optional[int] = None,
+    ) -> Dict[int, int]:
+        """该听课人已评课表 -> 最新评教记录ID；学年/学期为空表示不限"""
+        terms = await self._terms(db, listen_teacher_id)
+        out: Dict[int, int] = {}
+        for (year, sem), tts in terms.items():
+            if academic_year and year != academic_year:
+                continue
+            if semester and sem != int(semester):
+                continue
+            for tt_id, evs in tts.items():
+                if evs:
+                    out[tt_id] = max(max(evs), out.get(tt_id, 0))
+        return out
+
+    async def timetable_ids(
+        self,
+        db: AsyncSession,
+        *,
+        listen_teacher_id: int,
+        academic_year: Optional[str] = None,
+        semester: Optional[int] = None,
+    ) -> Set[int]:
+        return set(await self.evaluations(
+            db, listen_teacher_id=listen_teacher_id, academic_year=academic_year, semester=semester,
+        ))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.loads
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+evaluated_index = EvaluatedIndex(maxsize=EVALUATED_INDEX_MAXSIZE, ttl_seconds=EVALUATED_INDEX_TTL_SECONDS)
+
+
+def _on_remote_change(listen_teacher_id: Any, payload: Any) -> None:
+    if listen_teacher_id is None:
+        evaluated_index.invalidate(*payload, broadcast=False)
+        return
+    op, term, tt_id, ev_id = payload
+    evaluated_index._change(
+        op, int(listen_teacher_id), tuple(term) if term else None, int(tt_id), int(ev_id), broadcast=False
+    )
+
+
+coherence_bus.subscribe("evaluated", _on_remote_change)
@@ -2,15 +2,58 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
-from statistics import mean
-from collections import Counter
 from typing import Optional, List, Dict, Any, Tuple
 
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import and_, case, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models import TeachingEvaluation, Timetable, User, College, EvaluationDimension
+from app.core.config import STATS_SQL_AGGREGATE
+from app.models import TeachingEvaluation, Timetable, User, College, EvaluationDimension, TeacherEvaluationStat
+from app.crud.aggregation import (
+    LEVEL4_BOUNDS,
+    LEVEL4_LABELS,
+    LEVEL5_BOUNDS,
+    LEVEL5_LABELS,
+    ColumnStats,
+    aggregate_dimensions,
+    classify,
+    summarize,
+)
+from app.crud.count_cache import cached_count
+from app.crud.evaluated_index import evaluated_index
+from app.crud.heavy_hitters import SpaceSaving
+from app.crud.pagination import Page, apply_keyset, keyset_order_by, keyset_page
+
+# 评教列表的排序键：提交时间倒序，id 决胜
+EVALUATION_KEYSET = ((TeachingEvaluation.submit_time, True), (TeachingEvaluation.id, True))
+
+# 前端提交的 dimension_scores 维度 key -> 对应的存储生成列（缺失或非数值为 NULL）
+DIMENSION_COLUMNS = {
+    "teachingAttitude": TeachingEvaluation.dim_teaching_attitude,
+    "content": TeachingEvaluation.dim_content,
+    "method": TeachingEvaluation.dim_method,
+    "effect": TeachingEvaluation.dim_effect,
+}
+DIMENSION_KEYS = tuple(DIMENSION_COLUMNS)
+
+
+def _dimension_avg_scores(dims: Dict[str, Tuple[int, float]]) -> Dict[str, float]:
+    """{维度: (取到数值的条数, 数值和)} -> 维度均分；两种聚合实现共用同一口径：
+
+    - 分母为该维度取到数值的条数（即生成列 IS NOT NULL 的行数），缺失或非数值的行不计入
+    - 至少一行取到数值的维度才返回；SQL 实现只有 DIMENSION_KEYS 对应的生成列，
+      Python 实现还会带上数据里出现的其它维度
+    """
+    return {key: round(float(total or 0) / count, 2) for key, (count, total) in dims.items() if count}
+
+
+def _trend_data(groups: Dict[str, Tuple[float, int]]) -> List[Dict[str, Any]]:
+    """{月份: (总分和, 条数)} -> 按月份排序的平均分趋势"""
+    return [
+        {"label": k, "score": round(total / cnt, 1) if cnt else 0.0}
+        for k, (total, cnt) in sorted(groups.items(), key=lambda x: x[0])
+    ]
 
 
 class TeachingEvaluationCRUD:
@@ -31,6 +74,21 @@ class TeachingEvaluationCRUD:
             return "合格"
         return "不合格"
 
+    async def _apply_stat_delta(
+        self,
+        db: AsyncSession,
+        *,
+        ev: TeachingEvaluation,
+        sign: int,
+        timetable: Optional[Timetable] = None,
+    ) -> None:
+        """评教变更后同事务内差量维护教师/学院统计（调用前需已 flush）"""
+        from app.crud.stats import apply_evaluation_delta
+
+        if timetable is None:
+            timetable = await self.get_timetable(db, timetable_id=ev.timetable_id)
+        await apply_evaluation_delta(db, evaluation=ev, timetable=timetable, sign=sign)
+
     # ------- 基础查询 -------
     async def get_timetable(self, db: AsyncSession, *, timetable_id: int) -> Optional[Timetable]:
         res = await db.execute(select(Timetable).where(Timetable.id == timetable_id))
@@ -134,7 +192,17 @@ class TeachingEvaluationCRUD:
 
         db.add(ev)
         try:
+            await db.flush()
+            if status == 1:
+                await self._apply_stat_delta(db, ev=ev, timetable=timetable, sign=1)
             await db.commit()
+            evaluated_index.mark(
+                listen_teacher_id=listen_teacher_id,
+                academic_year=timetable.academic_year,
+                semester=timetable.semester,
+                timetable_id=timetable_id,
+                evaluation_id=ev.id,
+            )
             await db.refresh(ev)
             return ev
         except Exception as e:
@@ -152,8 +220,9 @@ class TeachingEvaluationCRUD:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         status: Optional[int] = None,
-    ) -> Tuple[List[TeachingEvaluation], int]:
-        skip = (page - 1) * page_size
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+    ) -> Page:
         conditions: List[Any] = [
             TeachingEvaluation.listen_teacher_id == listen_teacher_id,
             TeachingEvaluation.is_delete == False,  # noqa: E712
@@ -174,14 +243,33 @@ class TeachingEvaluationCRUD:
             )
             .where(and_(*conditions))
         )
-        res = await db.execute(
-            base.order_by(TeachingEvaluation.submit_time.desc()).offset(skip).limit(page_size)
+        return await self._paginate(
+            db, base, page=page, page_size=page_size, cursor=cursor, with_total=with_total
         )
-        items = list(res.scalars().all())
 
-        count_subq = base.with_only_columns(TeachingEvaluation.id).subquery()
-        total = int((await db.execute(select(func.count()).select_from(count_subq))).scalar_one())
-        return items, total
+    @staticmethod
+    async def _paginate(
+        db: AsyncSession,
+        base: Any,
+        *,
+        page: int,
+        page_size: int,
+        cursor: Optional[str],
+        with_total: bool,
+    ) -> Page:
+        """cursor 为 None 时按页码偏移分页，否则按 (submit_time, id) 游标分页"""
+        if cursor is None:
+            stmt = base.order_by(*keyset_order_by(EVALUATION_KEYSET)).offset((page - 1) * page_size).limit(page_size)
+            items, next_cursor = list((await db.execute(stmt)).scalars().all()), None
+        else:
+            res = await db.execute(apply_keyset(base, EVALUATION_KEYSET, cursor, page_size))
+            items, next_cursor = keyset_page(res.scalars().all(), EVALUATION_KEYSET, page_size)
+
+        total = None
+        if with_total:
+            count_subq = base.with_only_columns(TeachingEvaluation.id).subquery()
+            total = await cached_count(db, select(func.count()).select_from(count_subq))
+        return Page(items, total, next_cursor)
 
     # ------- 列表：某教师收到的（teach_teacher_id），支持筛选学年学期 -------
     async def list_by_teacher(
@@ -197,9 +285,9 @@ class TeachingEvaluationCRUD:
         status: Optional[int] = None,
         academic_year: Optional[str] = None,
         semester: Optional[int] = None,
-    ) -> Tuple[List[TeachingEvaluation], int]:
-        skip = (page - 1) * page_size
-
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+    ) -> Page:
         conditions: List[Any] = [
             TeachingEvaluation.teach_teacher_id == teach_teacher_id,
             TeachingEvaluation.is_delete == False,  # noqa: E712
@@ -226,14 +314,9 @@ class TeachingEvaluationCRUD:
         if academic_year and semester:
             base = base.where(Timetable.academic_year == academic_year, Timetable.semester == semester)
 
-        res = await db.execute(
-            base.order_by(TeachingEvaluation.submit_time.desc()).offset(skip).limit(page_size)
+        return await self._paginate(
+            db, base, page=page, page_size=page_size, cursor=cursor, with_total=with_total
         )
-        items = list(res.scalars().all())
-
-        count_subq = base.with_only_columns(TeachingEvaluation.id).subquery()
-        total = int((await db.execute(select(func.count()).select_from(count_subq))).scalar_one())
-        return items, total
 
     async def list_by_timetable(self, db: AsyncSession, *, timetable_id: int) -> List[TeachingEvaluation]:
         res = await db.execute(
@@ -255,8 +338,19 @@ class TeachingEvaluationCRUD:
         ev = await self.get_by_id(db, evaluation_id=evaluation_id)
         if not ev:
             return False
+        was_effective = ev.status == 1
         ev.is_delete = True
-        await db.commit()
+        try:
+            await db.flush()
+            if was_effective:
+                await self._apply_stat_delta(db, ev=ev, sign=-1)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        evaluated_index.unmark(
+            listen_teacher_id=ev.listen_teacher_id, timetable_id=ev.timetable_id, evaluation_id=ev.id,
+        )
         return True
 
     # ------- 审核/状态更新 -------
@@ -271,10 +365,17 @@ class TeachingEvaluationCRUD:
         ev = await self.get_by_id(db, evaluation_id=evaluation_id)
         if not ev:
             return None
+        old_status = ev.status
         ev.status = status
         if review_comment is not None and hasattr(ev, "review_comment"):
             ev.review_comment = review_comment
         try:
+            await db.flush()
+            # 仅“有效(1)”计入统计：进入/离开有效状态时做差量
+            if old_status != 1 and status == 1:
+                await self._apply_stat_delta(db, ev=ev, sign=1)
+            elif old_status == 1 and status != 1:
+                await self._apply_stat_delta(db, ev=ev, sign=-1)
             await db.commit()
             await db.refresh(ev)
             return ev
@@ -282,6 +383,162 @@ class TeachingEvaluationCRUD:
             await db.rollback()
             raise
 
+    # ------- 统计：分数/维度/趋势聚合 -------
+    @staticmethod
+    def _scoped(stmt: Any, where: List[Any], academic_year: Optional[str], semester: Optional[int]) -> Any:
+        stmt = stmt.select_from(TeachingEvaluation).join(Timetable, TeachingEvaluation.timetable_id == Timetable.id).where(*where)
+        if academic_year and semester:
+            stmt = stmt.where(Timetable.academic_year == academic_year, Timetable.semester == semester)
+        return stmt
+
+    async def _aggregate(
+        self,
+        db: AsyncSession,
+        *,
+        where: List[Any],
+        academic_year: Optional[str],
+        semester: Optional[int],
+        sql: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """有效评教的条数、总分统计、维度均分、月度趋势
+
+        sql 为 None 时按 STATS_SQL_AGGREGATE：True 在 MySQL 里聚合，False 取回整行在 Python 里算（原实现）。
+        """
+        if STATS_SQL_AGGREGATE if sql is None else sql:
+            return await self._aggregate_sql(db, where=where, academic_year=academic_year, semester=semester)
+
+        evaluations = list((await db.execute(
+            self._scoped(select(TeachingEvaluation), where, academic_year, semester)
+        )).scalars().all())
+        trend: Dict[str, Tuple[float, int]] = {}
+        for ev in evaluations:
+            dt = ev.listen_date or ev.submit_time
+            label = dt.strftime("%Y-%m") if dt else ""
+            if label:
+                total, cnt = trend.get(label, (0, 0))
+                trend[label] = (total + int(ev.total_score or 0), cnt + 1)
+        agg = {
+            "valid": len(evaluations),
+            "score": summarize(e.total_score for e in evaluations),
+            "dimension_avg_scores": _dimension_avg_scores(
+                {k: (col.count, col.sum) for k, col in aggregate_dimensions(e.dimension_scores for e in evaluations).items()}
+            ),
+            "trend_data": _trend_data(trend),
+        }
+        return agg
+
+    async def _stream_high_freq_texts(
+        self,
+        db: AsyncSession,
+        *,
+        where: List[Any],
+        academic_year: Optional[str],
+        semester: Optional[int],
+    ) -> Tuple[SpaceSaving, SpaceSaving]:
+        """流式读取问题/建议两列，边读边计入计数表，不在内存里保留原文"""
+        stmt = self._scoped(
+            select(TeachingEvaluation.problem_content, TeachingEvaluation.improve_suggestion),
+            [*where, or_(TeachingEvaluation.problem_content.isnot(None), TeachingEvaluation.improve_suggestion.isnot(None))],
+            academic_year,
+            semester,
+        ).order_by(TeachingEvaluation.id)
+        problems, suggestions = SpaceSaving(), SpaceSaving()
+        async for problem, suggestion in await db.stream(stmt.execution_options(yield_per=500)):
+            problems.add(problem)
+            suggestions.add(suggestion)
+        return problems, suggestions
+
+    async def _teacher_texts_from_stats(
+        self,
+        db: AsyncSession,
+        *,
+        teacher_id: int,
+        academic_year: Optional[str],
+        semester: Optional[int],
+        valid: int,
+        score_sum: float,
+    ) -> Optional[Tuple[SpaceSaving, SpaceSaving]]:
+        """统计表新鲜则合并各学期的计数表返回，否则 None
+
+        新鲜的判定与学院统计一致：各行均已构建，且条数、总分和与明细一致。
+        """
+        stmt = select(TeacherEvaluationStat).where(TeacherEvaluationStat.teacher_id == teacher_id)
+        if academic_year and semester:
+            stmt = stmt.where(
+                TeacherEvaluationStat.stat_year == academic_year,
+                TeacherEvaluationStat.stat_semester == semester,
+            )
+        stats = list((await db.execute(stmt)).scalars().all())
+        if any(s.total_score_sum is None or s.problem_sketch is None or s.suggestion_sketch is None for s in stats):
+            return None
+        if sum(int(s.total_evaluation_num or 0) for s in stats) != valid:
+            return None
+        if sum(int(s.total_score_sum or 0) for s in stats) != int(round(score_sum)):
+            return None
+        problems, suggestions = SpaceSaving(), SpaceSaving()
+        for s in stats:
+            problems.merge(SpaceSaving.from_json(s.problem_sketch))
+            suggestions.merge(SpaceSaving.from_json(s.suggestion_sketch))
+        return problems, suggestions
+
+    async def _aggregate_sql(
+        self,
+        db: AsyncSession,
+        *,
+        where: List[Any],
+        academic_year: Optional[str],
+        semester: Optional[int],
+    ) -> Dict[str, Any]:
+        """一行汇总（条数/总分/分数段/各维度）+ 按月分组，口径与 Python 实现一致：
+
+        - 维度分读存储生成列，不逐行解析 JSON；均分口径见 _dimension_avg_scores
+        """
+        te = TeachingEvaluation
+        cols: List[Any] = [
+            func.count(),
+            func.count(te.total_score),
+            func.sum(te.total_score),
+            func.min(te.total_score),
+            func.max(te.total_score),
+            # 各分数段下限以上的累计条数（90/75/60）
+            *(func.sum(case((te.total_score >= b, 1), else_=0)) for b in LEVEL4_BOUNDS),
+        ]
+        for column in DIMENSION_COLUMNS.values():
+            cols.append(func.count(column))
+            cols.append(func.sum(column))
+        row = (await db.execute(self._scoped(select(*cols), where, academic_year, semester))).one()
+
+        valid, n_scores, score_sum, score_min, score_max = (row[0] or 0), (row[1] or 0), row[2], row[3], row[4]
+        at_least = [int(v or 0) for v in row[5:5 + len(LEVEL4_BOUNDS)]]
+        counts = [a - b for a, b in zip(at_least + [n_scores], [0] + at_least)]
+        score = ColumnStats(
+            count=int(n_scores),
+            total=float(score_sum or 0),
+            min_value=float(score_min) if score_min is not None else None,
+            max_value=float(score_max) if score_max is not None else None,
+            histogram=dict(zip(LEVEL4_LABELS, counts)),
+        )
+
+        i = 5 + len(LEVEL4_BOUNDS)
+        dimension_avg_scores = _dimension_avg_scores(
+            {key: (int(row[i + 2 * j] or 0), row[i + 1 + 2 * j]) for j, key in enumerate(DIMENSION_KEYS)}
+        )
+
+        label = func.date_format(te.listen_date, "%Y-%m")
+        trend_rows = (await db.execute(self._scoped(
+            select(label, func.sum(func.coalesce(te.total_score, 0)), func.count()).group_by(label),
+            where,
+            academic_year,
+            semester,
+        ))).all()
+
+        return {
+            "valid": int(valid),
+            "score": score,
+            "dimension_avg_scores": dimension_avg_scores,
+            "trend_data": _trend_data({r[0]: (int(r[1] or 0), int(r[2])) for r in trend_rows if r[0]}),
+        }
+
     # ------- 统计：教师（修正 join 学年学期过滤 + 高频） -------
     async def teacher_statistics(
         self,
@@ -290,25 +547,18 @@ class TeachingEvaluationCRUD:
         teacher_id: int,
         academic_year: Optional[str] = None,
         semester: Optional[int] = None,
+        sql_aggregate: Optional[bool] = None,
     ) -> Dict[str, Any]:
         teacher = (await db.execute(select(User).where(User.id == teacher_id))).scalar_one_or_none()
         if not teacher:
             raise ValueError("教师不存在")
 
-        stmt = (
-            select(TeachingEvaluation)
-            .join(Timetable, TeachingEvaluation.timetable_id == Timetable.id)
-            .where(
-                TeachingEvaluation.teach_teacher_id == teacher_id,
-                TeachingEvaluation.is_delete == False,  # noqa: E712
-                TeachingEvaluation.status == 1,  # 只算有效
-            )
-        )
-        if academic_year and semester:
-            stmt = stmt.where(Timetable.academic_year == academic_year, Timetable.semester == semester)
-
-        evaluations = list((await db.execute(stmt)).scalars().all())
-        scores = [e.total_score for e in evaluations]
+        where = [
+            TeachingEvaluation.teach_teacher_id == teacher_id,
+            TeachingEvaluation.is_delete == False,  # noqa: E712
+            TeachingEvaluation.status == 1,  # 只算有效
+        ]
+        agg = await self._aggregate(db, where=where, academic_year=academic_year, semester=semester, sql=sql_aggregate)
 
         # 22300417陈俫坤开发：补齐待审核/总数统计口径（用于个人统计页展示）
         pending_stmt = (
@@ -323,7 +573,7 @@ class TeachingEvaluationCRUD:
         if academic_year and semester:
             pending_stmt = pending_stmt.where(Timetable.academic_year == academic_year, Timetable.semester == semester)
         pending_evaluation_num = int((await db.execute(pending_stmt)).scalar_one() or 0)
-        valid_evaluation_num = int(len(evaluations))
+        valid_evaluation_num = agg["valid"]
         total_evaluations = int(valid_evaluation_num + pending_evaluation_num)
 
         college_name = None
@@ -332,20 +582,7 @@ class TeachingEvaluationCRUD:
             college_name = college.college_name if college else None
 
         # 22300417陈俫坤开发：评教趋势（按月份聚合平均分，只统计有效评教）
-        trend_map: Dict[str, List[int]] = {}
-        for ev in evaluations:
-            dt = ev.listen_date or ev.submit_time
-            try:
-                label = dt.strftime("%Y-%m") if dt else ""
-            except Exception:
-                label = ""
-            if not label:
-                continue
-            trend_map.setdefault(label, []).append(int(ev.total_score or 0))
-        trend_data = [
-            {"label": k, "score": round(mean(v), 1) if v else 0.0}
-            for k, v in sorted(trend_map.items(), key=lambda x: x[0])
-        ]
+        trend_data = agg["trend_data"]
 
         # 22300417陈俫坤开发：维度名映射（前端提交的维度 key -> 数据库维度 code/name）
         dim_code_map = {
@@ -366,7 +603,7 @@ class TeachingEvaluationCRUD:
         )
         dim_name_by_code = {r[0]: r[1] for r in dim_rows.all() if r and r[0]}
 
-        if not evaluations:
+        if not valid_evaluation_num:
             empty_dimension_scores = [
                 {
                     "dimension_code": dim_code_map[k],
@@ -396,21 +633,9 @@ class TeachingEvaluationCRUD:
                 "high_freq_suggestions": None,
             }
 
-        score_distribution = {
-            "优秀": sum(1 for s in scores if s >= 90),
-            "良好": sum(1 for s in scores if 75 <= s < 90),
-            "合格": sum(1 for s in scores if 60 <= s < 75),
-            "不合格": sum(1 for s in scores if s < 60),
-        }
-
-        # 维度平均分（dimension_scores 视为 dict）
-        dimension_scores_list = [e.dimension_scores for e in evaluations if isinstance(e.dimension_scores, dict)]
-        dimension_avg_scores: Dict[str, float] = {}
-        if dimension_scores_list:
-            all_keys = set().union(*[ds.keys() for ds in dimension_scores_list])
-            for k in all_keys:
-                vals = [float(ds.get(k, 0) or 0) for ds in dimension_scores_list]
-                dimension_avg_scores[k] = round(mean(vals), 2) if vals else 0.0
+        score_stats = agg["score"]
+        score_distribution = dict(score_stats.histogram)
+        dimension_avg_scores: Dict[str, float] = agg["dimension_avg_scores"]
 
         dimension_scores = [
             {
@@ -422,10 +647,19 @@ class TeachingEvaluationCRUD:
             for k in ("teachingAttitude", "content", "method", "effect")
         ]
 
-        problems = [e.problem_content.strip() for e in evaluations if e.problem_content and e.problem_content.strip()]
-        suggestions = [e.improve_suggestion.strip() for e in evaluations if e.improve_suggestion and e.improve_suggestion.strip()]
-        high_freq_problems = [t for t, _ in Counter(problems).most_common(5)] if problems else None
-        high_freq_suggestions = [t for t, _ in Counter(suggestions).most_common(5)] if suggestions else None
+        # 高频问题/建议：优先读统计表里增量维护的计数表，不新鲜时流式扫描明细
+        texts = await self._teacher_texts_from_stats(
+            db,
+            teacher_id=teacher_id,
+            academic_year=academic_year,
+            semester=semester,
+            valid=valid_evaluation_num,
+            score_sum=score_stats.sum,
+        )
+        if texts is None:
+            texts = await self._stream_high_freq_texts(db, where=where, academic_year=academic_year, semester=semester)
+        high_freq_problems = texts[0].top()
+        high_freq_suggestions = texts[1].top()
 
         return {
             "teacher_id": teacher_id,
@@ -436,9 +670,9 @@ class TeachingEvaluationCRUD:
             "valid_evaluation_num": valid_evaluation_num,
             "pending_evaluation_num": pending_evaluation_num,
             "total_evaluation_num": valid_evaluation_num,
-            "avg_total_score": round(mean(scores), 2) if scores else 0.0,
-            "max_score": max(scores),
-            "min_score": min(scores),
+            "avg_total_score": round(score_stats.mean, 2) if score_stats.count else 0.0,
+            "max_score": int(score_stats.max),
+            "min_score": int(score_stats.min),
             "dimension_avg_scores": dimension_avg_scores or None,
             "dimension_scores": dimension_scores,
             "trend_data": trend_data,
@@ -455,25 +689,23 @@ class TeachingEvaluationCRUD:
         listen_teacher_id: int,
         academic_year: Optional[str] = None,
         semester: Optional[int] = None,
+        sql_aggregate: Optional[bool] = None,
     ) -> Dict[str, Any]:
         listener = (await db.execute(select(User).where(User.id == listen_teacher_id))).scalar_one_or_none()
         if not listener:
             raise ValueError("用户不存在")
 
-        stmt = (
-            select(TeachingEvaluation)
-            .join(Timetable, TeachingEvaluation.timetable_id == Timetable.id)
-            .where(
+        agg = await self._aggregate(
+            db,
+            where=[
                 TeachingEvaluation.listen_teacher_id == listen_teacher_id,
                 TeachingEvaluation.is_delete == False,  # noqa: E712
                 TeachingEvaluation.status == 1,
-            )
+            ],
+            academic_year=academic_year,
+            semester=semester,
+            sql=sql_aggregate,
         )
-        if academic_year and semester:
-            stmt = stmt.where(Timetable.academic_year == academic_year, Timetable.semester == semester)
-
-        evaluations = list((await db.execute(stmt)).scalars().all())
-        scores = [e.total_score for e in evaluations]
 
         pending_stmt = (
             select(func.count(TeachingEvaluation.id))
@@ -487,23 +719,9 @@ class TeachingEvaluationCRUD:
         if academic_year and semester:
             pending_stmt = pending_stmt.where(Timetable.academic_year == academic_year, Timetable.semester == semester)
         pending_evaluation_num = int((await db.execute(pending_stmt)).scalar_one() or 0)
-        valid_evaluation_num = int(len(evaluations))
+        valid_evaluation_num = agg["valid"]
         total_evaluations = int(valid_evaluation_num + pending_evaluation_num)
-
-        trend_map: Dict[str, List[int]] = {}
-        for ev in evaluations:
-            dt = ev.listen_date or ev.submit_time
-            try:
-                label = dt.strftime("%Y-%m") if dt else ""
-            except Exception:
-                label = ""
-            if not label:
-                continue
-            trend_map.setdefault(label, []).append(int(ev.total_score or 0))
-        trend_data = [
-            {"label": k, "score": round(mean(v), 1) if v else 0.0}
-            for k, v in sorted(trend_map.items(), key=lambda x: x[0])
-        ]
+        trend_data = agg["trend_data"]
 
         dim_code_map = {
             "teachingAttitude": "teaching_attitude",
@@ -522,14 +740,7 @@ class TeachingEvaluationCRUD:
             .where(EvaluationDimension.is_delete == False, EvaluationDimension.status == 1)  # noqa: E712
         )
         dim_name_by_code = {r[0]: r[1] for r in dim_rows.all() if r and r[0]}
-
-        dimension_scores_list = [e.dimension_scores for e in evaluations if isinstance(e.dimension_scores, dict)]
-        dimension_avg_scores: Dict[str, float] = {}
-        if dimension_scores_list:
-            all_keys = set().union(*[ds.keys() for ds in dimension_scores_list])
-            for k in all_keys:
-                vals = [float(ds.get(k, 0) or 0) for ds in dimension_scores_list]
-                dimension_avg_scores[k] = round(mean(vals), 2) if vals else 0.0
+        dimension_avg_scores: Dict[str, float] = agg["dimension_avg_scores"]
 
         dimension_scores = [
             {
@@ -548,7 +759,7 @@ class TeachingEvaluationCRUD:
             "valid_evaluation_num": valid_evaluation_num,
             "pending_evaluation_num": pending_evaluation_num,
             "total_evaluation_num": valid_evaluation_num,
-            "avg_total_score": round(mean(scores), 2) if scores else 0.0,
+            "avg_total_score": round(agg["score"].mean, 2) if agg["score"].count else 0.0,
             "dimension_avg_scores": dimension_avg_scores or None,
             "dimension_scores": dimension_scores,
             "trend_data": trend_data,
@@ -612,16 +823,8 @@ class TeachingEvaluationCRUD:
         valid_evaluation_num = int(len(rows))
         total_evaluations = int(valid_evaluation_num + pending_evaluation_num)
 
-        def level5(score: int) -> str:
-            if score >= 90:
-                return "优秀"
-            if score >= 80:
-                return "良好"
-            if score >= 70:
-                return "一般"
-            if score >= 60:
-                return "合格"
-            return "不合格"
+        score_stats = summarize(scores, bounds=LEVEL5_BOUNDS, labels=LEVEL5_LABELS)
+        row_levels = classify(scores, bounds=LEVEL5_BOUNDS, labels=LEVEL5_LABELS)
 
         college_map: Dict[int, Dict[str, Any]] = {}
         level_teacher_map: Dict[str, Dict[tuple[int, int], Dict[str, Any]]] = {
@@ -632,12 +835,11 @@ class TeachingEvaluationCRUD:
             "不合格": {},
         }
 
-        for total_score, teach_teacher_id, teach_teacher_name, cid, cname in rows:
+        for (total_score, teach_teacher_id, teach_teacher_name, cid, cname), lv in zip(rows, row_levels):
             cidi = int(cid) if cid is not None else 0
             cn = cname or "未知学院"
             tid = int(teach_teacher_id) if teach_teacher_id is not None else 0
             tn = teach_teacher_name or "未知教师"
-            score_int = int(total_score or 0)
 
             cobj = college_map.get(cidi)
             if cobj is None:
@@ -656,7 +858,6 @@ class TeachingEvaluationCRUD:
                 tmap[tid] = tob
             tob["evaluation_count"] += 1
 
-            lv = level5(score_int)
             key = (cidi, tid)
             lmap = level_teacher_map[lv]
             lob = lmap.get(key)
@@ -701,7 +902,7 @@ class TeachingEvaluationCRUD:
             "valid_evaluation_num": valid_evaluation_num,
             "pending_evaluation_num": pending_evaluation_num,
             "total_evaluation_num": valid_evaluation_num,
-            "avg_total_score": round(mean(scores), 2) if scores else 0.0,
+            "avg_total_score": round(score_stats.mean, 2) if score_stats.count else 0.0,
             "college_stats": college_stats,
             "level_stats": level_stats,
         }
@@ -0,0 +1,277 @@
+# app/crud/export.py
+"""评教明细导出：服务端游标逐行读取 -> 逐行写 CSV / 只写模式 XLSX
+
+不把整批数据放进内存：
+- 查询走 AsyncSession.stream + yield_per，按分片从 MySQL 取行
+- CSV 每攒一小批就 yield 一次字节块
+- XLSX 用 openpyxl write_only 模式写到临时文件，再分块读出
+- 大范围导出可走后台任务：产物按 (范围, 学年, 学期, 数据版本) 落盘，数据没变就直接复用
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models import College, TeachingEvaluation, Timetable, User
+
+EXPORT_YIELD_PER = 2000
+CSV_FLUSH_ROWS = 500
+FILE_CHUNK_SIZE = 64 * 1024
+
+EXPORT_HEADERS: Tuple[str, ...] = (
+    "评教编号",
+    "学年",
+    "学期",
+    "学院",
+    "课程名称",
+    "授课班级",
+    "授课教师",
+    "听课人",
+    "听课日期",
+    "总分",
+    "等级",
+    "各维度得分",
+    "优点",
+    "问题",
+    "改进建议",
+    "提交时间",
+)
+
+
+def build_export_stmt(
+    *,
+    college_id: Optional[int] = None,
+    academic_year: Optional[str] = None,
+    semester: Optional[int] = None,
+) -> Select:
+    """导出口径与学院/全校统计一致：只导出有效评教，学年学期同时给出才过滤"""
+    teacher = aliased(User)
+    listener = aliased(User)
+    stmt = (
+        select(
+            TeachingEvaluation.evaluation_no,
+            Timetable.academic_year,
+            Timetable.semester,
+            College.college_name,
+            Timetable.course_name,
+            Timetable.class_name,
+            teacher.user_name,
+            listener.user_name,
+            TeachingEvaluation.is_anonymous,
+            TeachingEvaluation.listen_date,
+            TeachingEvaluation.total_score,
+            TeachingEvaluation.score_level,
+            TeachingEvaluation.dimension_scores,
+            TeachingEvaluation.advantage_content,
+            TeachingEvaluation.problem_content,
+            TeachingEvaluation.improve_suggestion,
+            TeachingEvaluation.submit_time,
+        )
+        .join(Timetable, TeachingEvaluation.timetable_id == Timetable.id)
+        .join(teacher, TeachingEvaluation.teach_teacher_id == teacher.id)
+        .join(listener, TeachingEvaluation.listen_teacher_id == listener.id)
+        .outerjoin(College, Timetable.college_id == College.id)
+        .where(
+            TeachingEvaluation.is_delete == False,  # noqa: E712
+            TeachingEvaluation.status == 1,
+        )
+        .order_by(TeachingEvaluation.id)
+    )
+    if college_id is not None:
+        stmt = stmt.where(Timetable.college_id == college_id)
+    if academic_year and semester:
+        stmt = stmt.where(Timetable.academic_year == academic_year, Timetable.semester == semester)
+    return stmt
+
+
+def _fmt_dt(v: Optional[datetime]) -> str:
+    return v.strftime("%Y-%m-%d %H:%M:%S") if v else ""
+
+
+def format_export_row(row: Sequence[Any]) -> List[Any]:
+    (
+        evaluation_no, academic_year, semester, college_name, course_name, class_name,
+        teacher_name, listener_name, is_anonymous, listen_date, total_score, score_level,
+        dimension_scores, advantage, problem, suggestion, submit_time,
+    ) = row
+    return [
+        evaluation_no,
+        academic_year,
+        semester,
+        college_name or "",
+        course_name,
+        class_name,
+        teacher_name,
+        "匿名" if is_anonymous else listener_name,
+        _fmt_dt(listen_date),
+        total_score,
+        score_level or "",
+        json.dumps(dimension_scores, ensure_ascii=False) if dimension_scores is not None else "",
+        advantage or "",
+        problem or "",
+        suggestion or "",
+        _fmt_dt(submit_time),
+    ]
+
+
+async def stream_export_rows(stmt: Select, *, yield_per: int = EXPORT_YIELD_PER) -> AsyncIterator[List[Any]]:
+    """服务端游标逐行产出（自带会话：StreamingResponse 发送时请求依赖的会话已关闭）"""
+    from app.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=yield_per))
+        async for row in result:
+            yield format_export_row(row)
+
+
+async def iter_csv(rows: AsyncIterator[Sequence[Any]], *, headers: Iterable[str] = EXPORT_HEADERS) -> AsyncIterator[bytes]:
+    # 带 BOM，Excel 直接打开中文不乱码
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write("\ufeff")
+    writer.writerow(list(headers))
+    pending = 0
+    async for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= CSV_FLUSH_ROWS:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate(0)
+            pending = 0
+    tail = buf.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+async def iter_xlsx(rows: AsyncIterator[Sequence[Any]], *, headers: Iterable[str] = EXPORT_HEADERS) -> AsyncIterator[bytes]:
+    import asyncio
+
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("评教明细")
+    ws.append(list(headers))
+    async for row in rows:
+        ws.append(row)
+
+    with tempfile.TemporaryFile(suffix=".xlsx") as fp:
+        # 压缩打包耗时，放到线程里做，避免卡住事件循环
+        await asyncio.to_thread(wb.save, fp)
+        fp.seek(0)
+        while True:
+            chunk = fp.read(FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def export_body(stmt: Select, file_format: str) -> AsyncIterator[bytes]:
+    """返回响应体迭代器；依赖缺失在这里就报错，而不是发送到一半才失败"""
+    if file_format == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError as e:  # pragma: no cover
+            raise ValueError("服务器未安装 openpyxl，无法导出 XLSX，请改用 CSV") from e
+        return iter_xlsx(stream_export_rows(stmt))
+    return iter_csv(stream_export_rows(stmt))
+
+
+def export_filename(scope: str, academic_year: Optional[str], semester: Optional[int], file_format: str) -> str:
+    parts = ["评教数据", scope]
+    if academic_year and semester:
+        parts.append(f"{academic_year}-{semester}")
+    parts.append(datetime.now().strftime("%Y%m%d%H%M%S"))
+    return "_".join(parts) + f".{file_format}"
+
+
+# -----------------------------
+# 后台导出任务的产物管理
+# -----------------------------
+async def export_data_version(
+    db: AsyncSession,
+    *,
+    college_id: Optional[int] = None,
+    academic_year: Optional[str] = None,
+    semester: Optional[int] = None,
+) -> str:
+    """范围内评教数据的版本指纹
+
+    不过滤状态/删除标记：新增、作废、删除、修改都会改变 行数 / 最大ID / 最大更新时间 / 有效数 之一。
+    """
+    stmt = select(
+        func.count(TeachingEvaluation.id),
+        func.max(TeachingEvaluation.id),
+        func.max(TeachingEvaluation.update_time),
+        func.sum(
+            case(
+                (and_(TeachingEvaluation.status == 1, TeachingEvaluation.is_delete == False), 1),  # noqa: E712
+                else_=0,
+            )
+        ),
+    ).join(Timetable, TeachingEvaluation.timetable_id == Timetable.id)
+    if college_id is not None:
+        stmt = stmt.where(Timetable.college_id == college_id)
+    if academic_year and semester:
+        stmt = stmt.where(Timetable.academic_year == academic_year, Timetable.semester == semester)
+    count, max_id, max_update, valid = (await db.execute(stmt)).one()
+    raw = f"{count}|{max_id}|{max_update.isoformat() if max_update else ''}|{int(valid or 0)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def export_artifact_path(
+    base_dir: str,
+    scope: str,
+    academic_year: Optional[str],
+    semester: Optional[int],
+    file_format: str,
+    version: str,
+) -> Path:
+    term = f"{academic_year}-{semester}" if academic_year and semester else "all"
+    return Path(base_dir) / f"{scope}_{term}_{version}.{file_format}"
+
+
+async def write_export_artifact(stmt: Select, path: Path, file_format: str) -> int:
+    """把导出结果写到 path（先写临时文件再原子替换），并清理同范围的旧版本；返回文件字节数"""
+    if path.exists():
+        return path.stat().st_size
+    path.parent.mkdir(parents=True, exist_ok=True)
+    body = export_body(stmt, file_format)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.part")
+    size = 0
+    try:
+        with open(tmp, "wb") as fp:
+            async for chunk in body:
+                fp.write(chunk)
+                size += len(chunk)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+    # 同一 (范围, 学期, 格式) 只保留最新版本
+    prefix = path.name.rsplit("_", 1)[0]
+    for old in path.parent.glob(f"{prefix}_*.{file_format}"):
+        if old != path:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+    return size
@@ -0,0 +1,151 @@
+# app/crud/heavy_hitters.py
+"""高频问题/建议：文本归一化 + Space-Saving 流式 Top-N
+
+- normalize_text：全角转半角（NFKC）、大小写折叠、去掉标点，空白合并（中文之间的空白直接去掉），
+  "节奏偏快。" / "节奏偏快！" / "节奏 偏快" 视为同一条
+- SpaceSaving：最多跟踪 capacity 个不同文本，内存与明细条数无关；满了以后新文本顶替当前计数最小的一项，
+  继承其计数作为误差上界。真实频次超过 总条数/capacity 的文本一定在表里
+- 支持撤销（评教删除/离开有效状态）：被跟踪的文本计数减一，未被跟踪的忽略；误差由对账重建兜底
+- 可合并（跨学期/跨教师），可序列化为 JSON 存入统计表
+
+展示用的文本取该归一化 key 第一次出现时的原文（去首尾空白）。
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.config import HEAVY_HITTERS_CAPACITY
+
+# 统计接口返回的高频条数
+TOP_N = 5
+
+_SEPARATORS = re.compile(r"[\W_]+")
+_CJK_GAP = re.compile(r"(?<=[^\x00-\x7f]) | (?=[^\x00-\x7f])")
+
+
+def normalize_text(value: Any) -> str:
+    if not value:
+        return ""
+    text = unicodedata.normalize("NFKC", str(value)).casefold()
+    text = _SEPARATORS.sub(" ", text).strip()
+    return _CJK_GAP.sub("", text)
+
+
+class SpaceSaving:
+    """Space-Saving 计数表：key -> [计数, 误差上界, 展示文本]，按插入顺序决胜"""
+
+    __slots__ = ("capacity", "total", "_items")
+
+    def __init__(self, capacity: int = HEAVY_HITTERS_CAPACITY) -> None:
+        self.capacity = max(int(capacity), 1)
+        self.total = 0
+        self._items: Dict[str, List[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _floor(self) -> int:
+        """表已满时未被跟踪文本的计数上界"""
+        if len(self._items) < self.capacity:
+            return 0
+        return min(item[0] for item in self._items.values())
+
+    def _insert(self, key: str, count: int, error: int, display: str) -> None:
+        item = self._items.get(key)
+        if item is not None:
+            item[0] += count
+            item[1] += error
+            return
+        if len(self._items) >= self.capacity:
+            victim = min(self._items, key=lambda k: self._items[k][0])
+            floor = self._items.pop(victim)[0]
+            count += floor
+            error += floor
+        self._items[key] = [count, error, display]
+
+    def add(self, text: Any, weight: int = 1) -> None:
+        """计入一条文本；weight 为负表示撤销"""
+        if weight < 0:
+            self.remove(text, -weight)
+            return
+        key = normalize_text(text)
+        if not key or weight == 0:
+            return
+        self.total += weight
+        self._insert(key, weight, 0, str(text).strip())
+
+    def remove(self, text: Any, weight: int = 1) -> None:
+        key = normalize_text(text)
+        if not key:
+            return
+        self.total = max(self.total - weight, 0)
+        item = self._items.get(key)
+        if item is None:
+            return
+        item[0] -= weight
+        item[1] = min(item[1], max(item[0], 0))
+        if item[0] <= 0:
+            del self._items[key]
+
+    def update(self, values: Iterable[Any]) -> "SpaceSaving":
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """合并另一张表：两边都有的计数相加，只在一边的补上另一边的下限，再保留计数最大的 capacity 项"""
+        mine, theirs = self._floor(), other._floor()
+        merged: Dict[str, List[Any]] = {}
+        for key, (count, error, display) in self._items.items():
+            extra = other._items.get(key)
+            if extra is not None:
+                merged[key] = [count + extra[0], error + extra[1], display]
+            else:
+                merged[key] = [count + theirs, error + theirs, display]
+        for key, (count, error, display) in other._items.items():
+            if key not in merged:
+                merged[key] = [count + mine, error + mine, display]
+        if len(merged) > self.capacity:
+            keep = set(sorted(merged, key=lambda k: -merged[k][0])[:self.capacity])
+            merged = {k: v for k, v in merged.items() if k in keep}
+        self._items = merged
+        self.total += other.total
+        return self
+
+    def top(self, n: int = TOP_N) -> Optional[List[str]]:
+        """计数最高的 n 条展示文本；没有任何文本时为 None"""
+        if not self._items:
+            return None
+        ranked = sorted(self._items.values(), key=lambda item: -item[0])
+        return [item[2] for item in ranked[:n]]
+
+    def to_json(self) -> Dict[str, Any]:
+        """空表也序列化为对象：统计表里 NULL 表示尚未构建"""
+        return {
+            "total": self.total,
+            "items": [[display, count, error] for count, error, display in self._items.values()],
+        }
+
+    @classmethod
+    def from_json(cls, data: Any, capacity: int = HEAVY_HITTERS_CAPACITY) -> "SpaceSaving":
+        """从统计表 JSON 还原；key 按当前归一化规则重算，规则变化后重复的 key 自动合并"""
+        sketch = cls(capacity)
+        if not isinstance(data, dict):
+            return sketch
+        for entry in data.get("items") or ():
+            try:
+                display, count, error = entry
+            except (TypeError, ValueError):
+                continue
+            key = normalize_text(display)
+            if key and int(count) > 0:
+                sketch._insert(key, int(count), int(error), str(display))
+        sketch.total = int(data.get("total") or 0)
+        return sketch
+
+
+def top_texts(values: Iterable[Any], n: int = TOP_N) -> Optional[List[str]]:
+    """一次遍历得出高频文本（内存受 capacity 限制）"""
+    return SpaceSaving().update(values).top(n)
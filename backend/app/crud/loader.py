@@ -0,0 +1,79 @@
+# app/crud/loader.py
+"""请求级批量实体加载器（DataLoader 思路）
+
+列表接口里逐行 db.get(...) 会让一页 100 行变成几百次往返。
+用法：先把一页里要用到的 ID 收集起来，每种实体一条 IN 查询取回并缓存，之后按 ID 直接取：
+
+    loader = EntityLoader(db)
+    loader.prime(User, [r.listen_teacher_id for r in rows])
+    timetables = await loader.load_many(Timetable, [r.timetable_id for r in rows])
+    await loader.load_many(User, [tt.teacher_id for tt in timetables.values() if tt])
+    name = getattr(loader.get(User, uid), "user_name", None)
+
+每页的查询条数只与实体层级有关，与页大小无关。加载器挂在单个请求上（见 app.core.deps.get_loader），
+不跨请求共享，因此不会读到别的请求里的旧数据。
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# MySQL IN 列表过长时分批，避免单条 SQL 过大
+LOADER_BATCH_SIZE = 1000
+
+_Key = Tuple[type, str]
+
+
+class EntityLoader:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self._cache: Dict[_Key, Dict[Any, Any]] = {}
+        self._pending: Dict[_Key, Set[Any]] = {}
+        self.queries = 0
+
+    def prime(self, model: type, ids: Iterable[Any], *, key: str = "id") -> None:
+        """登记待加载的 ID（不发查询），下次 flush/load 时合并成一条 IN 查询"""
+        k = (model, key)
+        cache = self._cache.setdefault(k, {})
+        pending = self._pending.setdefault(k, set())
+        for i in ids:
+            if i is not None and i not in cache:
+                pending.add(i)
+
+    async def flush(self, model: Optional[type] = None, *, key: str = "id") -> None:
+        keys = [(model, key)] if model is not None else list(self._pending)
+        for k in keys:
+            pending = self._pending.pop(k, None)
+            if not pending:
+                continue
+            m, col_name = k
+            col = getattr(m, col_name)
+            cache = self._cache.setdefault(k, {})
+            ids = list(pending)
+            for start in range(0, len(ids), LOADER_BATCH_SIZE):
+                batch = ids[start:start + LOADER_BATCH_SIZE]
+                rows = (await self.db.execute(select(m).where(col.in_(batch)))).scalars().all()
+                self.queries += 1
+                for obj in rows:
+                    cache.setdefault(getattr(obj, col_name), obj)
+            # 不存在的 ID 也记下，避免重复查询
+            for i in ids:
+                cache.setdefault(i, None)
+
+    async def load_many(self, model: type, ids: Iterable[Any], *, key: str = "id") -> Dict[Any, Any]:
+        ids = [i for i in ids if i is not None]
+        self.prime(model, ids, key=key)
+        await self.flush(model, key=key)
+        cache = self._cache[(model, key)]
+        return {i: cache.get(i) for i in ids}
+
+    async def load(self, model: type, id_: Any, *, key: str = "id") -> Any:
+        if id_ is None:
+            return None
+        return (await self.load_many(model, [id_], key=key)).get(id_)
+
+    def get(self, model: type, id_: Any, *, key: str = "id") -> Any:
+        """只读缓存（须先 load/load_many），未加载或不存在都返回 None"""
+        return self._cache.get((model, key), {}).get(id_)
@@ -1,4 +1,8 @@
 # app/crud/logs.py
+"""操作/登录日志
+
+create_* 用同步会话逐条写入；请求路径上请用 record_*：只入队，由 app.crud.audit_sink 攒批异步落库。
+"""
 from __future__ import annotations
 
 from datetime import datetime
@@ -9,8 +13,11 @@ from sqlalchemy.orm import Session
 from app.models import OperationLog, LoginLog  # 按你的实际路径改
 
 
-def create_operation_log(
-    db: Session,
+def _clip(value: Optional[str], length: int) -> Optional[str]:
+    return value[:length] if value and len(value) > length else value
+
+
+def operation_log_row(
     *,
     user_id: Optional[int],
     user_name: Optional[str],
@@ -27,35 +34,32 @@ def create_operation_log(
     request_method: Optional[str] = None,
     response_code: Optional[int] = None,
     execute_time: Optional[int] = None,
-) -> OperationLog:
+) -> Dict[str, Any]:
+    """整理一行 operation_log：补创建时间，按列宽截断；各行键一致，可直接用于多行 INSERT"""
     now = datetime.utcnow()
-    obj = OperationLog(
-        user_id=user_id,
-        user_name=user_name,
-        operation_type=operation_type,
-        module=module,
-        target_id=target_id,
-        target_type=target_type,
-        content=content,
-        before_data=before_data,
-        after_data=after_data,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        request_url=request_url,
-        request_method=request_method,
-        response_code=response_code,
-        execute_time=execute_time,
-        create_time=now,
-        create_date=now.strftime("%Y-%m-%d"),
-    )
-    db.add(obj)
-    db.commit()
-    db.refresh(obj)
-    return obj
+    return {
+        "user_id": user_id,
+        "user_name": _clip(user_name, 64),
+        "operation_type": _clip(operation_type, 32),
+        "module": _clip(module, 32),
+        "target_id": target_id,
+        "target_type": _clip(target_type, 32),
+        "content": content,
+        "before_data": before_data,
+        "after_data": after_data,
+        "ip_address": _clip(ip_address, 45),
+        "user_agent": _clip(user_agent, 512),
+        "request_url": _clip(request_url, 256),
+        "request_method": _clip(request_method, 10),
+        "response_code": response_code,
+        # execute_time 为 SMALLINT
+        "execute_time": min(execute_time, 32767) if execute_time is not None else None,
+        "create_time": now,
+        "create_date": now.strftime("%Y-%m-%d"),
+    }
 
 
-def create_login_log(
-    db: Session,
+def login_log_row(
     *,
     user_id: Optional[int],
     user_name: Optional[str],
@@ -68,24 +72,51 @@ def create_login_log(
     browser: Optional[str] = None,
     os: Optional[str] = None,
     user_agent: Optional[str] = None,
-) -> LoginLog:
+) -> Dict[str, Any]:
+    """整理一行 login_log，规则同 operation_log_row"""
     now = datetime.utcnow()
-    obj = LoginLog(
-        user_id=user_id,
-        user_name=user_name,
-        login_type=login_type,
-        login_status=login_status,
-        fail_reason=fail_reason,
-        ip_address=ip_address,
-        location=location,
-        device_type=device_type,
-        browser=browser,
-        os=os,
-        user_agent=user_agent,
-        create_time=now,
-        create_date=now.strftime("%Y-%m-%d"),
-    )
+    return {
+        "user_id": user_id,
+        "user_name": _clip(user_name, 64),
+        "login_type": _clip(login_type, 16),
+        "login_status": login_status,
+        "fail_reason": _clip(fail_reason, 128),
+        "ip_address": _clip(ip_address, 45),
+        "location": _clip(location, 64),
+        "device_type": _clip(device_type, 32),
+        "browser": _clip(browser, 64),
+        "os": _clip(os, 64),
+        "user_agent": _clip(user_agent, 512),
+        "create_time": now,
+        "create_date": now.strftime("%Y-%m-%d"),
+    }
+
+
+def create_operation_log(db: Session, **fields: Any) -> OperationLog:
+    """同步写入一条操作日志，参数见 operation_log_row"""
+    obj = OperationLog(**operation_log_row(**fields))
     db.add(obj)
     db.commit()
     db.refresh(obj)
     return obj
+
+
+def create_login_log(db: Session, **fields: Any) -> LoginLog:
+    """同步写入一条登录日志，参数见 login_log_row"""
+    obj = LoginLog(**login_log_row(**fields))
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+    return obj
+
+
+def record_operation_log(**fields: Any) -> None:
+    """异步写入一条操作日志：只入队不等待，参数见 operation_log_row"""
+    from app.crud.audit_sink import audit_sink
+    audit_sink.put(OperationLog.__tablename__, operation_log_row(**fields))
+
+
+def record_login_log(**fields: Any) -> None:
+    """异步写入一条登录日志：只入队不等待，参数见 login_log_row"""
+    from app.crud.audit_sink import audit_sink
+    audit_sink.put(LoginLog.__tablename__, login_log_row(**fields))
@@ -0,0 +1,98 @@
+# app/crud/pagination.py
+"""游标（keyset）分页
+
+offset 分页翻到深页时 MySQL 仍要先扫过前面所有行，越往后越慢；游标分页记住上一页最后一行的排序键，
+下一页直接 WHERE (排序键) 在其之后 + LIMIT，每页代价只与页大小有关。
+
+- keyset：[(列, 是否降序), ...]，最后一列必须是唯一列（一般是 id）作为决胜键
+- 游标：上一页最后一行的排序键值，JSON 后做 base64url，对前端不透明
+- 总数：游标模式默认不算 COUNT（滚动列表不需要），需要时显式 with_total=true
+"""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, and_, or_
+
+Keyset = Sequence[Tuple[Any, bool]]
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    total: Optional[int]
+    next_cursor: Optional[str]
+
+
+def _encode_value(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return {"dt": v.isoformat()}
+    if isinstance(v, date):
+        return {"d": v.isoformat()}
+    return v
+
+
+def _decode_value(v: Any) -> Any:
+    if isinstance(v, dict):
+        if "dt" in v:
+            return datetime.fromisoformat(v["dt"])
+        if "d" in v:
+            return date.fromisoformat(v["d"])
+        raise ValueError("无效的分页游标")
+    return v
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw.decode("utf-8"))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError
+        return [_decode_value(v) for v in values]
+    except ValueError:
+        raise ValueError("无效的分页游标") from None
+
+
+def want_total(with_total: Optional[bool], cursor: Optional[str]) -> bool:
+    """未显式指定时：偏移分页返回总数，游标分页不返回"""
+    return with_total if with_total is not None else cursor is None
+
+
+def keyset_order_by(keyset: Keyset) -> List[Any]:
+    return [col.desc() if desc else col.asc() for col, desc in keyset]
+
+
+def keyset_after(keyset: Keyset, values: Sequence[Any]) -> Any:
+    """(k1, k2, ..., kn) 严格排在 values 之后的条件，逐列展开以支持升降序混合：
+    k1 > v1 OR (k1 = v1 AND k2 > v2) OR ...（降序列用 <）
+    """
+    clauses = []
+    for i, (col, desc) in enumerate(keyset):
+        prefix = [c == v for (c, _), v in zip(keyset[:i], values[:i])]
+        step = col < values[i] if desc else col > values[i]
+        clauses.append(and_(*prefix, step) if prefix else step)
+    return or_(*clauses)
+
+
+def apply_keyset(stmt: Select, keyset: Keyset, cursor: Optional[str], limit: int) -> Select:
+    """加上排序、游标条件，并多取一行用来判断是否还有下一页；cursor 为空串表示游标模式第一页"""
+    if cursor:
+        stmt = stmt.where(keyset_after(keyset, decode_cursor(cursor, len(keyset))))
+    return stmt.order_by(*keyset_order_by(keyset)).limit(limit + 1)
+
+
+def keyset_page(items: Sequence[Any], keyset: Keyset, limit: int) -> Tuple[List[Any], Optional[str]]:
+    """截掉多取的一行，返回 (本页数据, 下一页游标)；没有下一页时游标为 None"""
+    items = list(items)
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    last = items[-1]
+    return items, encode_cursor([getattr(last, col.key) for col, _ in keyset])
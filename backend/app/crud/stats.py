@@ -3,10 +3,12 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import func, select, and_
+from sqlalchemy import func, select, and_, case, or_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.crud.heavy_hitters import SpaceSaving
 from app.models import (
     Timetable,
     TeachingEvaluation,
@@ -15,195 +17,595 @@ from app.models import (
     User,
     College,
     EvaluationDimension,
+    SystemConfig,
 )
 
 
-async def recompute_teacher_stat(db: AsyncSession, *, teacher_id: int, stat_year: str, stat_semester: int) -> TeacherEvaluationStat:
-    # 先找本学期该教师涉及的课表
-    tt_ids_stmt = select(Timetable.id, Timetable.college_id).where(
-        Timetable.teacher_id == teacher_id,
+SCORE_LEVELS: Tuple[str, ...] = ("优秀", "良好", "合格", "不合格")
+
+
+def _score_level(total_score: int) -> str:
+    # 与 TeachingEvaluationCRUD.score_level 口径一致（延迟导入，避免循环依赖）
+    from app.crud.evaluation import TeachingEvaluationCRUD
+    return TeachingEvaluationCRUD.score_level(int(total_score or 0))
+
+
+class StatAccumulator:
+    """统计表的运行聚合量：count/sum/min/max + 各维度 sum/count + 分数分布 + 高频问题/建议计数表
+
+    既用于评教写入时的差量维护（add(sign=-1) 表示撤销一条），也用于对账重建。
+    撤销的分数恰好是当前最高/最低分时无法就地推出新的极值，置 minmax_dirty 交由调用方查库刷新。
+    """
+
+    __slots__ = (
+        "count", "score_sum", "max_score", "min_score", "dimensions", "distribution", "minmax_dirty",
+        "problems", "suggestions",
+    )
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.score_sum = 0
+        self.max_score: Optional[int] = None
+        self.min_score: Optional[int] = None
+        self.dimensions: Dict[str, Dict[str, float]] = {}
+        self.distribution: Dict[str, int] = {lv: 0 for lv in SCORE_LEVELS}
+        self.minmax_dirty = False
+        self.problems = SpaceSaving()
+        self.suggestions = SpaceSaving()
+
+    @classmethod
+    def from_stat(cls, stat: Any) -> "StatAccumulator":
+        acc = cls()
+        acc.count = int(stat.total_evaluation_num or 0)
+        acc.score_sum = int(stat.total_score_sum or 0)
+        acc.max_score = int(stat.max_score) if stat.max_score is not None else None
+        acc.min_score = int(stat.min_score) if stat.min_score is not None else None
+        for dim, item in (stat.dimension_sum_scores or {}).items():
+            acc.dimensions[dim] = {"sum": float(item.get("sum") or 0), "count": int(item.get("count") or 0)}
+        for lv, n in (stat.score_distribution or {}).items():
+            acc.distribution[lv] = int(n or 0)
+        acc.problems = SpaceSaving.from_json(stat.problem_sketch)
+        acc.suggestions = SpaceSaving.from_json(stat.suggestion_sketch)
+        return acc
+
+    def add(self, total_score: Any, dimension_scores: Any, sign: int = 1) -> None:
+        score = int(total_score or 0)
+        self.count += sign
+        self.score_sum += sign * score
+        level = _score_level(score)
+        self.distribution[level] = self.distribution.get(level, 0) + sign
+
+        if sign > 0:
+            self.max_score = score if self.max_score is None else max(self.max_score, score)
+            self.min_score = score if self.min_score is None else min(self.min_score, score)
+        elif self.count <= 0:
+            self.max_score = None
+            self.min_score = None
+        elif score == self.max_score or score == self.min_score:
+            self.minmax_dirty = True
+
+        if isinstance(dimension_scores, dict):
+            for dim, value in dimension_scores.items():
+                if not isinstance(value, (int, float)):
+                    continue
+                item = self.dimensions.setdefault(dim, {"sum": 0.0, "count": 0})
+                item["sum"] += sign * float(value)
+                item["count"] += sign
+                if item["count"] <= 0:
+                    self.dimensions.pop(dim, None)
+
+    def add_texts(self, problem: Any, suggestion: Any, sign: int = 1) -> None:
+        self.problems.add(problem, sign)
+        self.suggestions.add(suggestion, sign)
+
+    @classmethod
+    def from_rows(cls, total_scores: List[Any], dimension_scores: List[Any]) -> "StatAccumulator":
+        """批量构建：交给列式聚合内核一次算完，避免逐条 add"""
+        from app.crud.aggregation import aggregate_dimensions, summarize
+
+        acc = cls()
+        scores = summarize(total_scores)
+        acc.count = scores.count
+        acc.score_sum = int(round(scores.sum))
+        acc.max_score = int(scores.max) if scores.max is not None else None
+        acc.min_score = int(scores.min) if scores.min is not None else None
+        for lv, n in scores.histogram.items():
+            acc.distribution[lv] = n
+        for dim, col in aggregate_dimensions(dimension_scores).items():
+            if col.count > 0:
+                acc.dimensions[dim] = {"sum": col.sum, "count": col.count}
+        return acc
+
+    def write_to(self, stat: Any) -> None:
+        stat.total_evaluation_num = int(self.count)
+        stat.total_score_sum = int(self.score_sum)
+        stat.avg_total_score = round(self.score_sum / self.count, 2) if self.count > 0 else None
+        stat.max_score = self.max_score
+        stat.min_score = self.min_score
+        # JSON 列整体替换，保证 SQLAlchemy 能感知变更
+        stat.dimension_sum_scores = {k: dict(v) for k, v in self.dimensions.items()} or None
+        stat.dimension_avg_scores = {
+            k: float(v["sum"] / v["count"]) for k, v in self.dimensions.items() if v["count"] > 0
+        } or None
+        stat.score_distribution = dict(self.distribution)
+        stat.problem_sketch = self.problems.to_json()
+        stat.suggestion_sketch = self.suggestions.to_json()
+        stat.high_freq_problems = self.problems.top()
+        stat.high_freq_suggestions = self.suggestions.top()
+
+
+def sketches_built(stat: Any) -> bool:
+    """统计行的高频计数表是否已构建（迁移前的旧行为 NULL，需重建一次）"""
+    return stat.problem_sketch is not None and stat.suggestion_sketch is not None
+
+
+def _scope_conditions(
+    *,
+    stat_year: str,
+    stat_semester: int,
+    teacher_id: Optional[int] = None,
+    college_id: Optional[int] = None,
+) -> List[Any]:
+    conditions: List[Any] = [
         Timetable.academic_year == stat_year,
         Timetable.semester == stat_semester,
         Timetable.is_delete == False,  # noqa: E712
-    )
-    rows = (await db.execute(tt_ids_stmt)).all()
-    timetable_ids = [r[0] for r in rows]
-    # college_id：这里用“最多出现的college_id”或第一条；你也可强制 teacher_profile/college_id
-    college_id = next((r[1] for r in rows if r[1] is not None), None)
-
-    # 没有课表就清空/创建空统计
-    if not timetable_ids:
-        stat = (await db.execute(select(TeacherEvaluationStat).where(
-            TeacherEvaluationStat.teacher_id == teacher_id,
-            TeacherEvaluationStat.stat_year == stat_year,
-            TeacherEvaluationStat.stat_semester == stat_semester,
-        ))).scalars().first()
-        if not stat:
-            stat = TeacherEvaluationStat(
-                teacher_id=teacher_id,
-                college_id=college_id or 0,
-                stat_year=stat_year,
-                stat_semester=stat_semester,
-                total_evaluation_num=0,
-            )
-            db.add(stat)
-        else:
-            stat.total_evaluation_num = 0
-            stat.avg_total_score = None
-            stat.max_score = None
-            stat.min_score = None
-            stat.dimension_avg_scores = None
-        await db.commit()
-        await db.refresh(stat)
-        return stat
-
-    agg_stmt = select(
-        func.count(TeachingEvaluation.id),
-        func.avg(TeachingEvaluation.total_score),
-        func.max(TeachingEvaluation.total_score),
-        func.min(TeachingEvaluation.total_score),
-    ).where(
-        TeachingEvaluation.timetable_id.in_(timetable_ids),
         TeachingEvaluation.status == 1,
         TeachingEvaluation.is_delete == False,  # noqa: E712
+    ]
+    if teacher_id is not None:
+        conditions.append(Timetable.teacher_id == teacher_id)
+    if college_id is not None:
+        conditions.append(Timetable.college_id == college_id)
+    return conditions
+
+
+async def _accumulate_scope(db: AsyncSession, *, conditions: List[Any]) -> Tuple[StatAccumulator, set]:
+    """按范围重新累加，只取分数与问题/建议列，不加载 ORM 对象；同时返回涉及的授课教师集合"""
+    stmt = (
+        select(
+            Timetable.teacher_id,
+            TeachingEvaluation.total_score,
+            TeachingEvaluation.dimension_scores,
+            TeachingEvaluation.problem_content,
+            TeachingEvaluation.improve_suggestion,
+        )
+        .join(Timetable, TeachingEvaluation.timetable_id == Timetable.id)
+        .where(and_(*conditions))
+    )
+    rows = (await db.execute(stmt)).all()
+    acc = StatAccumulator.from_rows([r[1] for r in rows], [r[2] for r in rows])
+    for r in rows:
+        acc.add_texts(r[3], r[4])
+    return acc, {r[0] for r in rows}
+
+
+async def _refresh_min_max(db: AsyncSession, acc: StatAccumulator, *, conditions: List[Any]) -> None:
+    stmt = (
+        select(func.max(TeachingEvaluation.total_score), func.min(TeachingEvaluation.total_score))
+        .join(Timetable, TeachingEvaluation.timetable_id == Timetable.id)
+        .where(and_(*conditions))
     )
-    total_num, avg_score, max_score, min_score = (await db.execute(agg_stmt)).one()
+    max_score, min_score = (await db.execute(stmt)).one()
+    acc.max_score = int(max_score) if max_score is not None else None
+    acc.min_score = int(min_score) if min_score is not None else None
+    acc.minmax_dirty = False
+
 
-    stat = (await db.execute(select(TeacherEvaluationStat).where(
+async def _get_teacher_stat(db: AsyncSession, *, teacher_id: int, stat_year: str, stat_semester: int, for_update: bool = False) -> Optional[TeacherEvaluationStat]:
+    stmt = select(TeacherEvaluationStat).where(
         TeacherEvaluationStat.teacher_id == teacher_id,
         TeacherEvaluationStat.stat_year == stat_year,
         TeacherEvaluationStat.stat_semester == stat_semester,
-    ))).scalars().first()
-
-    if not stat:
-        stat = TeacherEvaluationStat(
-            teacher_id=teacher_id,
-            college_id=college_id or 0,
-            stat_year=stat_year,
-            stat_semester=stat_semester,
-        )
-        db.add(stat)
+    )
+    if for_update:
+        # 加锁读取时以库里最新值覆盖会话中已加载的对象
+        stmt = stmt.with_for_update().execution_options(populate_existing=True)
+    return (await db.execute(stmt)).scalars().first()
+
+
+async def _get_college_stat(db: AsyncSession, *, college_id: int, stat_year: str, stat_semester: int, for_update: bool = False) -> Optional[CollegeEvaluationStat]:
+    stmt = select(CollegeEvaluationStat).where(
+        CollegeEvaluationStat.college_id == college_id,
+        CollegeEvaluationStat.stat_year == stat_year,
+        CollegeEvaluationStat.stat_semester == stat_semester,
+    )
+    if for_update:
+        # 加锁读取时以库里最新值覆盖会话中已加载的对象
+        stmt = stmt.with_for_update().execution_options(populate_existing=True)
+    return (await db.execute(stmt)).scalars().first()
+
+
+async def _lock_teacher_stat(
+    db: AsyncSession, *, teacher_id: int, stat_year: str, stat_semester: int, college_id: Optional[int]
+) -> TeacherEvaluationStat:
+    """取教师统计行并加行锁；行不存在时先 INSERT ... ON DUPLICATE KEY UPDATE 建空行（total_score_sum 为空，待重建）
+
+    不能直接对不存在的行 SELECT ... FOR UPDATE：同一教师学期的两次首次提交会各自拿到间隙锁再插入，
+    一个死锁、一个撞 uk_teacher_stat_period，评教提交随之失败。
+    """
+    stmt = mysql_insert(TeacherEvaluationStat).values(
+        teacher_id=teacher_id,
+        college_id=college_id or 0,
+        stat_year=stat_year,
+        stat_semester=stat_semester,
+    )
+    await db.execute(stmt.on_duplicate_key_update(id=TeacherEvaluationStat.id))
+    return await _get_teacher_stat(db, teacher_id=teacher_id, stat_year=stat_year, stat_semester=stat_semester, for_update=True)
+
+
+async def _lock_college_stat(db: AsyncSession, *, college_id: int, stat_year: str, stat_semester: int) -> CollegeEvaluationStat:
+    """取学院统计行并加行锁；行不存在时先建空行，原因同 _lock_teacher_stat"""
+    stmt = mysql_insert(CollegeEvaluationStat).values(
+        college_id=college_id,
+        stat_year=stat_year,
+        stat_semester=stat_semester,
+    )
+    await db.execute(stmt.on_duplicate_key_update(id=CollegeEvaluationStat.id))
+    return await _get_college_stat(db, college_id=college_id, stat_year=stat_year, stat_semester=stat_semester, for_update=True)
+
+
+async def _teacher_colleges(
+    db: AsyncSession, *, stat_year: str, stat_semester: int, teacher_id: Optional[int] = None
+) -> Dict[int, Optional[int]]:
+    """教师所属学院：本学期课表中该教师的最小非空学院 id（单个重建与全量对账共用，口径一致）"""
+    stmt = select(Timetable.teacher_id, func.min(Timetable.college_id)).where(
+        Timetable.academic_year == stat_year,
+        Timetable.semester == stat_semester,
+        Timetable.is_delete == False,  # noqa: E712
+    )
+    if teacher_id is not None:
+        stmt = stmt.where(Timetable.teacher_id == teacher_id)
+    return {int(tid): cid for tid, cid in (await db.execute(stmt.group_by(Timetable.teacher_id))).all()}
+
 
+async def _rebuild_teacher_stat(db: AsyncSession, *, teacher_id: int, stat_year: str, stat_semester: int) -> TeacherEvaluationStat:
+    """全量重建教师统计（不提交事务）"""
+    teacher_college = await _teacher_colleges(db, stat_year=stat_year, stat_semester=stat_semester, teacher_id=teacher_id)
+    college_id = teacher_college.get(teacher_id)
+
+    acc, _ = await _accumulate_scope(
+        db, conditions=_scope_conditions(stat_year=stat_year, stat_semester=stat_semester, teacher_id=teacher_id)
+    )
+
+    stat = await _lock_teacher_stat(
+        db, teacher_id=teacher_id, stat_year=stat_year, stat_semester=stat_semester, college_id=college_id
+    )
     if college_id is not None:
         stat.college_id = college_id
 
-    stat.total_evaluation_num = int(total_num or 0)
-    stat.avg_total_score = float(avg_score) if avg_score is not None else None
-    stat.max_score = int(max_score) if max_score is not None else None
-    stat.min_score = int(min_score) if min_score is not None else None
+    acc.write_to(stat)
+    return stat
 
-    # dimension_avg_scores：计算各维度平均分
-    dim_scores_stmt = select(TeachingEvaluation.dimension_scores).where(
-        TeachingEvaluation.timetable_id.in_(timetable_ids),
-        TeachingEvaluation.status == 1,
-        TeachingEvaluation.is_delete == False,  # noqa: E712
+
+async def _rebuild_college_stat(db: AsyncSession, *, college_id: int, stat_year: str, stat_semester: int) -> CollegeEvaluationStat:
+    """全量重建学院统计（不提交事务）"""
+    acc, teacher_ids = await _accumulate_scope(
+        db, conditions=_scope_conditions(stat_year=stat_year, stat_semester=stat_semester, college_id=college_id)
     )
-    dim_scores_results = await db.execute(dim_scores_stmt)
-    dim_scores_list = [r[0] for r in dim_scores_results if r[0] is not None]
-    
-    if dim_scores_list:
-        # 合并所有维度
-        all_dims = set()
-        for dim_scores in dim_scores_list:
-            if isinstance(dim_scores, dict):
-                all_dims.update(dim_scores.keys())
-        
-        # 计算各维度平均分
-        dim_avg_scores = {}
-        for dim in all_dims:
-            scores = []
-            for dim_scores in dim_scores_list:
-                if isinstance(dim_scores, dict) and dim in dim_scores:
-                    score = dim_scores[dim]
-                    if isinstance(score, (int, float)):
-                        scores.append(score)
-            if scores:
-                dim_avg_scores[dim] = float(sum(scores) / len(scores))
-        
-        stat.dimension_avg_scores = dim_avg_scores
-    else:
-        stat.dimension_avg_scores = None
 
+    stat = await _lock_college_stat(db, college_id=college_id, stat_year=stat_year, stat_semester=stat_semester)
+    acc.write_to(stat)
+    stat.total_teacher_num = len(teacher_ids)
+    return stat
+
+
+async def recompute_teacher_stat(db: AsyncSession, *, teacher_id: int, stat_year: str, stat_semester: int) -> TeacherEvaluationStat:
+    stat = await _rebuild_teacher_stat(db, teacher_id=teacher_id, stat_year=stat_year, stat_semester=stat_semester)
     await db.commit()
     await db.refresh(stat)
     return stat
 
 
 async def recompute_college_stat(db: AsyncSession, *, college_id: int, stat_year: str, stat_semester: int) -> CollegeEvaluationStat:
-    # 找学院本学期课表
-    tt_ids_stmt = select(Timetable.id).where(
-        Timetable.college_id == college_id,
-        Timetable.academic_year == stat_year,
-        Timetable.semester == stat_semester,
-        Timetable.is_delete == False,  # noqa: E712
-    )
-    timetable_ids = [r[0] for r in (await db.execute(tt_ids_stmt)).all()]
+    stat = await _rebuild_college_stat(db, college_id=college_id, stat_year=stat_year, stat_semester=stat_semester)
+    await db.commit()
+    await db.refresh(stat)
+    return stat
 
-    agg_stmt = select(
-        func.count(TeachingEvaluation.id),
-        func.avg(TeachingEvaluation.total_score),
-    ).where(
-        TeachingEvaluation.timetable_id.in_(timetable_ids) if timetable_ids else False,
-        TeachingEvaluation.status == 1,
-        TeachingEvaluation.is_delete == False,  # noqa: E712
+
+async def apply_evaluation_delta(
+    db: AsyncSession,
+    *,
+    evaluation: TeachingEvaluation,
+    timetable: Optional[Timetable],
+    sign: int,
+) -> None:
+    """把一条有效评教的增/减（sign=+1/-1）以差量方式计入教师/学院统计
+
+    调用方需在变更 flush 之后、commit 之前调用，与评教写入处于同一事务。
+    统计行不存在或尚未构建（total_score_sum 为空）时改为全量重建一次，此后即可持续差量维护。
+    学院参评教师数按该教师在本学院范围内的有效评教数是否在 0 与正数之间变化来增减。
+    """
+    if timetable is None or getattr(timetable, "is_delete", False):
+        return
+    stat_year = timetable.academic_year
+    stat_semester = timetable.semester
+    if not stat_year or not stat_semester:
+        return
+
+    teacher_conditions = _scope_conditions(stat_year=stat_year, stat_semester=stat_semester, teacher_id=timetable.teacher_id)
+    t_stat = await _lock_teacher_stat(
+        db,
+        teacher_id=timetable.teacher_id,
+        stat_year=stat_year,
+        stat_semester=stat_semester,
+        college_id=timetable.college_id,
     )
+    if t_stat.total_score_sum is None or not sketches_built(t_stat):
+        await _rebuild_teacher_stat(db, teacher_id=timetable.teacher_id, stat_year=stat_year, stat_semester=stat_semester)
+    else:
+        acc = StatAccumulator.from_stat(t_stat)
+        acc.add(evaluation.total_score, evaluation.dimension_scores, sign=sign)
+        acc.add_texts(evaluation.problem_content, evaluation.improve_suggestion, sign=sign)
+        if acc.minmax_dirty:
+            await _refresh_min_max(db, acc, conditions=teacher_conditions)
+        acc.write_to(t_stat)
+
+    if timetable.college_id is None:
+        return
+    college_conditions = _scope_conditions(stat_year=stat_year, stat_semester=stat_semester, college_id=timetable.college_id)
+    c_stat = await _lock_college_stat(db, college_id=timetable.college_id, stat_year=stat_year, stat_semester=stat_semester)
+    if c_stat.total_score_sum is None or not sketches_built(c_stat):
+        await _rebuild_college_stat(db, college_id=timetable.college_id, stat_year=stat_year, stat_semester=stat_semester)
+        return
+
+    acc = StatAccumulator.from_stat(c_stat)
+    acc.add(evaluation.total_score, evaluation.dimension_scores, sign=sign)
+    acc.add_texts(evaluation.problem_content, evaluation.improve_suggestion, sign=sign)
+    if acc.minmax_dirty:
+        await _refresh_min_max(db, acc, conditions=college_conditions)
+    acc.write_to(c_stat)
+
+    # 该教师在本学院本学期的有效评教数（已含本次变更，调用前已 flush）
+    after, _ = await _scope_count_sum(db, conditions=[
+        *college_conditions, Timetable.teacher_id == timetable.teacher_id,
+    ])
+    before = after - sign
+    if before <= 0 < after:
+        c_stat.total_teacher_num = int(c_stat.total_teacher_num or 0) + 1
+    elif after <= 0 < before:
+        c_stat.total_teacher_num = max(int(c_stat.total_teacher_num or 0) - 1, 0)
+
+
+_DRIFT_FIELDS: Tuple[str, ...] = ("total_evaluation_num", "total_score_sum", "max_score", "min_score", "total_teacher_num")
+
+
+def _stat_snapshot(stat: Any) -> Dict[str, Any]:
+    snap = {f: getattr(stat, f, None) for f in _DRIFT_FIELDS}
+    snap["dimension_sum_scores"] = {
+        k: (round(float(v.get("sum") or 0), 4), int(v.get("count") or 0))
+        for k, v in (stat.dimension_sum_scores or {}).items()
+    }
+    return snap
 
-    total_eval, avg_score = (0, None)
-    if timetable_ids:
-        total_eval, avg_score = (await db.execute(agg_stmt)).one()
 
-    stat = (await db.execute(select(CollegeEvaluationStat).where(
-        CollegeEvaluationStat.college_id == college_id,
-        CollegeEvaluationStat.stat_year == stat_year,
-        CollegeEvaluationStat.stat_semester == stat_semester,
-    ))).scalars().first()
+def _diff_snapshot(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+    if old is None:
+        return {"missing": True}
+    return {k: [old.get(k), v] for k, v in new.items() if old.get(k) != v}
 
-    if not stat:
-        stat = CollegeEvaluationStat(
-            college_id=college_id,
-            stat_year=stat_year,
-            stat_semester=stat_semester,
+
+async def reconcile_stats(db: AsyncSession, *, stat_year: str, stat_semester: int) -> Dict[str, Any]:
+    """对账：按学年学期从评教明细整体重建教师/学院统计，并报告与增量结果的偏差
+
+    明细只扫描一遍（只取分数列），按教师、学院分别累加后回写。
+    """
+    teacher_rows = {
+        s.teacher_id: s
+        for s in (await db.execute(select(TeacherEvaluationStat).where(
+            TeacherEvaluationStat.stat_year == stat_year,
+            TeacherEvaluationStat.stat_semester == stat_semester,
+        ).with_for_update())).scalars().all()
+    }
+    college_rows = {
+        s.college_id: s
+        for s in (await db.execute(select(CollegeEvaluationStat).where(
+            CollegeEvaluationStat.stat_year == stat_year,
+            CollegeEvaluationStat.stat_semester == stat_semester,
+        ).with_for_update())).scalars().all()
+    }
+    old_teacher = {tid: _stat_snapshot(s) for tid, s in teacher_rows.items() if s.total_score_sum is not None}
+    old_college = {cid: _stat_snapshot(s) for cid, s in college_rows.items() if s.total_score_sum is not None}
+
+    teacher_college = await _teacher_colleges(db, stat_year=stat_year, stat_semester=stat_semester)
+
+    # 按教师/学院分桶（只存引用），再逐桶交给列式内核聚合；问题/建议边读边计入计数表，不留原文
+    teacher_detail: Dict[int, Tuple[List[Any], List[Any]]] = {}
+    college_detail: Dict[int, Tuple[List[Any], List[Any]]] = {}
+    teacher_texts: Dict[int, Tuple[SpaceSaving, SpaceSaving]] = {}
+    college_texts: Dict[int, Tuple[SpaceSaving, SpaceSaving]] = {}
+    college_teachers: Dict[int, set] = {}
+    stmt = (
+        select(
+            Timetable.teacher_id,
+            Timetable.college_id,
+            TeachingEvaluation.total_score,
+            TeachingEvaluation.dimension_scores,
+            TeachingEvaluation.problem_content,
+            TeachingEvaluation.improve_suggestion,
         )
-        db.add(stat)
-
-    stat.total_evaluation_num = int(total_eval or 0)
-    stat.avg_total_score = float(avg_score) if avg_score is not None else None
-    
-    # 计算学院各维度平均分
-    dim_scores_stmt = select(TeachingEvaluation.dimension_scores).where(
-        TeachingEvaluation.timetable_id.in_(timetable_ids),
-        TeachingEvaluation.status == 1,
-        TeachingEvaluation.is_delete == False,  # noqa: E712
+        .join(Timetable, TeachingEvaluation.timetable_id == Timetable.id)
+        .where(and_(*_scope_conditions(stat_year=stat_year, stat_semester=stat_semester)))
     )
-    dim_scores_results = await db.execute(dim_scores_stmt)
-    dim_scores_list = [r[0] for r in dim_scores_results if r[0] is not None]
-    
-    if dim_scores_list:
-        # 合并所有维度
-        all_dims = set()
-        for dim_scores in dim_scores_list:
-            if isinstance(dim_scores, dict):
-                all_dims.update(dim_scores.keys())
-        
-        # 计算各维度平均分
-        dim_avg_scores = {}
-        for dim in all_dims:
-            scores = []
-            for dim_scores in dim_scores_list:
-                if isinstance(dim_scores, dict) and dim in dim_scores:
-                    score = dim_scores[dim]
-                    if isinstance(score, (int, float)):
-                        scores.append(score)
-            if scores:
-                dim_avg_scores[dim] = float(sum(scores) / len(scores))
-        
-        stat.dimension_avg_scores = dim_avg_scores
-    else:
-        stat.dimension_avg_scores = None
+    for teacher_id, college_id, total_score, dimension_scores, problem, suggestion in (await db.execute(stmt)).all():
+        scores, dims = teacher_detail.setdefault(int(teacher_id), ([], []))
+        scores.append(total_score)
+        dims.append(dimension_scores)
+        problems, suggestions = teacher_texts.setdefault(int(teacher_id), (SpaceSaving(), SpaceSaving()))
+        problems.add(problem)
+        suggestions.add(suggestion)
+        if college_id is not None:
+            scores, dims = college_detail.setdefault(int(college_id), ([], []))
+            scores.append(total_score)
+            dims.append(dimension_scores)
+            problems, suggestions = college_texts.setdefault(int(college_id), (SpaceSaving(), SpaceSaving()))
+            problems.add(problem)
+            suggestions.add(suggestion)
+            college_teachers.setdefault(int(college_id), set()).add(int(teacher_id))
+    teacher_acc = {k: StatAccumulator.from_rows(*v) for k, v in teacher_detail.items()}
+    college_acc = {k: StatAccumulator.from_rows(*v) for k, v in college_detail.items()}
+    for texts, accs in ((teacher_texts, teacher_acc), (college_texts, college_acc)):
+        for k, (problems, suggestions) in texts.items():
+            accs[k].problems, accs[k].suggestions = problems, suggestions
+
+    drift: List[Dict[str, Any]] = []
+
+    for teacher_id in sorted(set(teacher_rows) | set(teacher_acc)):
+        acc = teacher_acc.get(teacher_id) or StatAccumulator()
+        stat = teacher_rows.get(teacher_id)
+        college_id = teacher_college.get(teacher_id)
+        if stat is None:
+            stat = TeacherEvaluationStat(
+                teacher_id=teacher_id,
+                college_id=college_id or 0,
+                stat_year=stat_year,
+                stat_semester=stat_semester,
+            )
+            db.add(stat)
+        if college_id is not None:
+            stat.college_id = college_id
+        acc.write_to(stat)
+        diff = _diff_snapshot(old_teacher.get(teacher_id), _stat_snapshot(stat))
+        if diff:
+            drift.append({"scope": "teacher", "id": teacher_id, "diff": diff})
+
+    for college_id in sorted(set(college_rows) | set(college_acc)):
+        acc = college_acc.get(college_id) or StatAccumulator()
+        stat = college_rows.get(college_id)
+        if stat is None:
+            stat = CollegeEvaluationStat(college_id=college_id, stat_year=stat_year, stat_semester=stat_semester)
+            db.add(stat)
+        acc.write_to(stat)
+        stat.total_teacher_num = len(college_teachers.get(college_id, ()))
+        diff = _diff_snapshot(old_college.get(college_id), _stat_snapshot(stat))
+        if diff:
+            drift.append({"scope": "college", "id": college_id, "diff": diff})
 
     await db.commit()
-    await db.refresh(stat)
-    return stat
+
+    return {
+        "stat_year": stat_year,
+        "stat_semester": stat_semester,
+        "teachers_checked": len(set(teacher_rows) | set(teacher_acc)),
+        "colleges_checked": len(set(college_rows) | set(college_acc)),
+        "drift_count": len(drift),
+        "drift": drift,
+    }
+
+
+# ----------------------------------------------------------------------
+# 学院/全校统计：统计表新鲜时直接读表，否则按层级下推 GROUP BY，不再加载整行 ORM
+# 口径与旧实现保持一致：不过滤课表软删除、教师按姓名归并、学院按名称归并
+# ----------------------------------------------------------------------
+def _legacy_scope(*, academic_year: Optional[str], semester: Optional[int], college_id: Optional[int] = None) -> List[Any]:
+    conditions: List[Any] = [
+        TeachingEvaluation.is_delete == False,  # noqa: E712
+        TeachingEvaluation.status == 1,  # 只算有效
+    ]
+    if college_id is not None:
+        conditions.append(Timetable.college_id == college_id)
+    # 学年学期需同时给出才过滤
+    if academic_year and semester:
+        conditions.append(Timetable.academic_year == academic_year)
+        conditions.append(Timetable.semester == semester)
+    return conditions
+
+
+def _score_bucket():
+    return case(
+        (TeachingEvaluation.total_score >= 90, "优秀"),
+        (TeachingEvaluation.total_score >= 75, "良好"),
+        (TeachingEvaluation.total_score >= 60, "合格"),
+        else_="不合格",
+    )
+
+
+async def _scope_count_sum(db: AsyncSession, *, conditions: List[Any], join_college: bool = False) -> Tuple[int, int]:
+    stmt = (
+        select(func.count(TeachingEvaluation.id), func.sum(TeachingEvaluation.total_score))
+        .select_from(TeachingEvaluation)
+        .join(Timetable, TeachingEvaluation.timetable_id == Timetable.id)
+        .where(and_(*conditions))
+    )
+    if join_college:
+        stmt = stmt.join(College, Timetable.college_id == College.id)
+    cnt, total = (await db.execute(stmt)).one()
+    return int(cnt or 0), int(total or 0)
+
+
+async def _stream_texts(db: AsyncSession, *, conditions: List[Any]) -> Tuple[SpaceSaving, SpaceSaving]:
+    """高频问题/建议：流式读取两列并归一化计数，并列时按首次出现（最小 id）排序"""
+    problem, suggestion = TeachingEvaluation.problem_content, TeachingEvaluation.improve_suggestion
+    stmt = (
+        select(problem, suggestion)
+        .select_from(TeachingEvaluation)
+        .join(Timetable, TeachingEvaluation.timetable_id == Timetable.id)
+        .where(and_(*conditions), or_(problem.is_not(None), suggestion.is_not(None)))
+        .order_by(TeachingEvaluation.id)
+        .execution_options(yield_per=500)
+    )
+    problems, suggestions = SpaceSaving(), SpaceSaving()
+    async for p, s in await db.stream(stmt):
+        problems.add(p)
+        suggestions.add(s)
+    return problems, suggestions
+
+
+def _merge_by_name(rows: List[Tuple[Any, ...]]) -> Dict[str, Dict[str, Any]]:
+    """(name, count, sum, max, min) 行按名称归并（旧实现按姓名/名称匹配，重名会合并）"""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for name, cnt, total, max_score, min_score in rows:
+        cnt = int(cnt or 0)
+        if cnt <= 0:
+            continue
+        item = merged.setdefault(name, {"count": 0, "sum": 0, "max": None, "min": None})
+        item["count"] += cnt
+        item["sum"] += int(total or 0)
+        if max_score is not None:
+            item["max"] = int(max_score) if item["max"] is None else max(item["max"], int(max_score))
+        if min_score is not None:
+            item["min"] = int(min_score) if item["min"] is None else min(item["min"], int(min_score))
+    return merged
+
+
+async def _college_from_stat_tables(
+    db: AsyncSession, *, college_id: int, academic_year: str, semester: int, scope_count: int, scope_sum: int
+) -> Optional[Tuple[Dict[str, int], Dict[str, Dict[str, Any]], Any]]:
+    """统计表新鲜则返回（分数分布, 按姓名归并的教师聚合, 学院统计行），否则 None
+
+    新鲜的判定：学院行与该学院下教师行均已构建，且二者的条数、总分和都与明细一致。
+    """
+    c_stat = await _get_college_stat(db, college_id=college_id, stat_year=academic_year, stat_semester=semester)
+    if c_stat is None or c_stat.total_score_sum is None:
+        return None
+    if int(c_stat.total_evaluation_num or 0) != scope_count or int(c_stat.total_score_sum) != scope_sum:
+        return None
+
+    rows = (await db.execute(
+        select(
+            User.user_name,
+            TeacherEvaluationStat.total_evaluation_num,
+            TeacherEvaluationStat.total_score_sum,
+            TeacherEvaluationStat.max_score,
+            TeacherEvaluationStat.min_score,
+        )
+        .join(User, TeacherEvaluationStat.teacher_id == User.id)
+        .where(
+            TeacherEvaluationStat.college_id == college_id,
+            TeacherEvaluationStat.stat_year == academic_year,
+            TeacherEvaluationStat.stat_semester == semester,
+        )
+    )).all()
+    if any(r[2] is None for r in rows if r[1]):
+        return None
+    if sum(int(r[1] or 0) for r in rows) != scope_count or sum(int(r[2] or 0) for r in rows) != scope_sum:
+        return None
+
+    distribution = {lv: 0 for lv in SCORE_LEVELS}
+    for lv, n in (c_stat.score_distribution or {}).items():
+        distribution[lv] = int(n or 0)
+    return distribution, _merge_by_name(rows), c_stat
 
 
 async def get_college_statistics(db: AsyncSession, *, college_id: int, academic_year: Optional[str] = None, semester: Optional[int] = None) -> Dict[str, Any]:
@@ -212,97 +614,93 @@ async def get_college_statistics(db: AsyncSession, *, college_id: int, academic_
     college = await db.get(College, college_id)
     if not college:
         raise ValueError("学院不存在")
-    
+
     # 获取学院教师列表
     teacher_stmt = select(User.id, User.user_name).where(
         User.college_id == college_id,
         User.is_delete == False,  # noqa: E712
     )
-    teachers = await db.execute(teacher_stmt)
-    teacher_list = [(t[0], t[1]) for t in teachers]
-    
-    # 获取学院评教数据
-    evaluation_stmt = select(
-        TeachingEvaluation,
-        Timetable,
-        User.user_name.label('teach_teacher_name')
-    ).join(
-        Timetable, TeachingEvaluation.timetable_id == Timetable.id
-    ).join(
-        User, Timetable.teacher_id == User.id
-    ).where(
-        Timetable.college_id == college_id,
-        TeachingEvaluation.is_delete == False,  # noqa: E712
-        TeachingEvaluation.status == 1,  # 只算有效
-    )
-    
-    # 添加学年学期过滤
+    teacher_list = [(t[0], t[1]) for t in await db.execute(teacher_stmt)]
+
+    conditions = _legacy_scope(academic_year=academic_year, semester=semester, college_id=college_id)
+    total_count, total_sum = await _scope_count_sum(db, conditions=conditions)
+
+    from_stats = None
     if academic_year and semester:
-        evaluation_stmt = evaluation_stmt.where(
-            Timetable.academic_year == academic_year,
-            Timetable.semester == semester
+        from_stats = await _college_from_stat_tables(
+            db,
+            college_id=college_id,
+            academic_year=academic_year,
+            semester=int(semester),
+            scope_count=total_count,
+            scope_sum=total_sum,
+        )
+
+    c_stat = None
+    if from_stats is not None:
+        score_levels, by_name, c_stat = from_stats
+    else:
+        # 分数段
+        score_levels = {lv: 0 for lv in SCORE_LEVELS}
+        bucket = _score_bucket()
+        bucket_rows = await db.execute(
+            select(bucket, func.count(TeachingEvaluation.id))
+            .select_from(TeachingEvaluation)
+            .join(Timetable, TeachingEvaluation.timetable_id == Timetable.id)
+            .where(and_(*conditions))
+            .group_by(bucket)
+        )
+        for level, n in bucket_rows.all():
+            score_levels[level] = int(n or 0)
+
+        # 教师（按授课教师姓名分组，与旧实现的姓名匹配一致）
+        teacher_rows = await db.execute(
+            select(
+                User.user_name,
+                func.count(TeachingEvaluation.id),
+                func.sum(TeachingEvaluation.total_score),
+                func.max(TeachingEvaluation.total_score),
+                func.min(TeachingEvaluation.total_score),
+            )
+            .select_from(TeachingEvaluation)
+            .join(Timetable, TeachingEvaluation.timetable_id == Timetable.id)
+            .join(User, Timetable.teacher_id == User.id)
+            .where(and_(*conditions))
+            .group_by(User.user_name)
         )
-    
-    evaluations = await db.execute(evaluation_stmt)
-    evaluation_list = evaluations.all()
-    
+        by_name = _merge_by_name(teacher_rows.all())
+
     # 计算学院总平均分
-    total_scores = [e[0].total_score for e in evaluation_list]
-    college_avg_score = sum(total_scores) / len(total_scores) if total_scores else 0
-    
+    college_avg_score = total_sum / total_count if total_count else 0
+
     # 计算各教师平均分
     teacher_avg_scores = {}
     for teacher_id, teacher_name in teacher_list:
-        teacher_evaluations = [e for e in evaluation_list if e[2] == teacher_name]
-        if teacher_evaluations:
-            teacher_scores = [e[0].total_score for e in teacher_evaluations]
+        agg = by_name.get(teacher_name)
+        if agg:
             teacher_avg_scores[teacher_id] = {
                 'name': teacher_name,
-                'avg_score': sum(teacher_scores) / len(teacher_scores),
-                'total_evaluations': len(teacher_evaluations),
-                'max_score': max(teacher_scores),
-                'min_score': min(teacher_scores)
+                'avg_score': agg["sum"] / agg["count"],
+                'total_evaluations': agg["count"],
+                'max_score': agg["max"],
+                'min_score': agg["min"],
             }
-    
-    # 计算得分分布
-    score_levels = {"优秀": 0, "良好": 0, "合格": 0, "不合格": 0}
-    for score in total_scores:
-        if score >= 90:
-            score_levels["优秀"] += 1
-        elif score >= 75:
-            score_levels["良好"] += 1
-        elif score >= 60:
-            score_levels["合格"] += 1
-        else:
-            score_levels["不合格"] += 1
-    
-    # 提取高频问题
-    problems = []
-    suggestions = []
-    for e in evaluation_list:
-        eval_item = e[0]
-        if eval_item.problem_content:
-            problems.append(eval_item.problem_content.strip())
-        if eval_item.improve_suggestion:
-            suggestions.append(eval_item.improve_suggestion.strip())
-    
-    # 统计高频问题
-    def get_top_issues(items: List[str], top_n: int = 5) -> List[str]:
-        from collections import Counter
-        if not items:
-            return []
-        counter = Counter(items)
-        return [issue for issue, _ in counter.most_common(top_n)]
-    
-    top_problems = get_top_issues(problems)
-    top_suggestions = get_top_issues(suggestions)
-    
+
+    # 统计高频问题：统计表新鲜时直接读增量维护的结果，否则流式扫描明细
+    if c_stat is not None and sketches_built(c_stat):
+        top_problems = list(c_stat.high_freq_problems or [])
+        top_suggestions = list(c_stat.high_freq_suggestions or [])
+    else:
+        problems, suggestions = await _stream_texts(db, conditions=conditions)
+        top_problems = problems.top() or []
+        top_suggestions = suggestions.top() or []
+
     return {
         "college_id": college_id,
         "college_name": college.college_name,
         "academic_year": academic_year,
         "semester": semester,
-        "total_evaluations": len(evaluation_list),
+        "total_evaluations": total_count,
         "college_avg_score": college_avg_score,
         "teacher_avg_scores": teacher_avg_scores,
         "score_distribution": score_levels,
@@ -314,64 +712,78 @@ async def get_college_statistics(db: AsyncSession, *, college_id: int, academic_
 async def get_school_statistics(db: AsyncSession, *, academic_year: Optional[str] = None, semester: Optional[int] = None) -> Dict[str, Any]:
     """获取全校评教统计"""
     # 获取所有学院列表
-    college_stmt = select(College.id, College.college_name)
-    colleges = await db.execute(college_stmt)
-    college_list = [(c[0], c[1]) for c in colleges]
-    
-    # 获取全校评教数据
-    evaluation_stmt = select(
-        TeachingEvaluation,
-        Timetable,
-        User.user_name.label('teach_teacher_name'),
-        College.college_name
-    ).join(
-        Timetable, TeachingEvaluation.timetable_id == Timetable.id
-    ).join(
-        User, Timetable.teacher_id == User.id
-    ).join(
-        College, Timetable.college_id == College.id
-    ).where(
-        TeachingEvaluation.is_delete == False,  # noqa: E712
-        TeachingEvaluation.status == 1,  # 只算有效
-    )
-    
-    # 添加学年学期过滤
+    college_list = [(c[0], c[1]) for c in await db.execute(select(College.id, College.college_name))]
+
+    conditions = _legacy_scope(academic_year=academic_year, semester=semester)
+    total_count, total_sum = await _scope_count_sum(db, conditions=conditions, join_college=True)
+
+    by_name: Optional[Dict[str, Dict[str, Any]]] = None
     if academic_year and semester:
-        evaluation_stmt = evaluation_stmt.where(
-            Timetable.academic_year == academic_year,
-            Timetable.semester == semester
+        rows = (await db.execute(
+            select(
+                College.college_name,
+                CollegeEvaluationStat.total_evaluation_num,
+                CollegeEvaluationStat.total_score_sum,
+                CollegeEvaluationStat.max_score,
+                CollegeEvaluationStat.min_score,
+            )
+            .join(College, CollegeEvaluationStat.college_id == College.id)
+            .where(
+                CollegeEvaluationStat.stat_year == academic_year,
+                CollegeEvaluationStat.stat_semester == int(semester),
+            )
+        )).all()
+        # 新鲜的判定：各学院行均已构建，且条数、总分和与明细一致
+        fresh = (
+            all(r[2] is not None for r in rows if r[1])
+            and sum(int(r[1] or 0) for r in rows) == total_count
+            and sum(int(r[2] or 0) for r in rows) == total_sum
         )
-    
-    evaluations = await db.execute(evaluation_stmt)
-    evaluation_list = evaluations.all()
-    
+        if fresh:
+            by_name = _merge_by_name(rows)
+
+    if by_name is None:
+        college_rows = await db.execute(
+            select(
+                College.college_name,
+                func.count(TeachingEvaluation.id),
+                func.sum(TeachingEvaluation.total_score),
+                func.max(TeachingEvaluation.total_score),
+                func.min(TeachingEvaluation.total_score),
+            )
+            .select_from(TeachingEvaluation)
+            .join(Timetable, TeachingEvaluation.timetable_id == Timetable.id)
+            .join(College, Timetable.college_id == College.id)
+            .where(and_(*conditions))
+            .group_by(College.college_name)
+        )
+        by_name = _merge_by_name(college_rows.all())
+
     # 计算全校总平均分
-    total_scores = [e[0].total_score for e in evaluation_list]
-    school_avg_score = sum(total_scores) / len(total_scores) if total_scores else 0
-    
+    school_avg_score = total_sum / total_count if total_count else 0
+
     # 计算各学院平均分
     college_avg_scores = {}
     for college_id, college_name in college_list:
-        college_evaluations = [e for e in evaluation_list if e[3] == college_name]
-        if college_evaluations:
-            college_scores = [e[0].total_score for e in college_evaluations]
+        agg = by_name.get(college_name)
+        if agg:
             college_avg_scores[college_id] = {
                 'name': college_name,
-                'avg_score': sum(college_scores) / len(college_scores),
-                'total_evaluations': len(college_evaluations)
+                'avg_score': agg["sum"] / agg["count"],
+                'total_evaluations': agg["count"],
             }
-    
+
     # 学院排名（按平均分）
     college_ranking = sorted(
         college_avg_scores.values(),
         key=lambda x: x['avg_score'],
         reverse=True
     )
-    
+
     return {
         "academic_year": academic_year,
         "semester": semester,
-        "total_evaluations": len(evaluation_list),
+        "total_evaluations": total_count,
         "school_avg_score": school_avg_score,
         "college_avg_scores": college_avg_scores,
         "college_ranking": college_ranking,
@@ -449,3 +861,57 @@ async def get_teacher_ranking(
         # 22300417陈俫坤开发：不要吞掉异常，让上层接口返回明确错误，便于定位
         print(f"教师排名查询失败: {e}")
         raise
+
+
+# -----------------------------
+# 学院教师听课完成情况
+# -----------------------------
+LISTEN_REQUIRED_COUNT_KEY = "listen_required_count"
+DEFAULT_LISTEN_REQUIRED_COUNT = 1
+
+
+async def get_listen_required_count(db: AsyncSession) -> int:
+    """每位教师每学期应完成的听课次数，取 system_config.listen_required_count，缺省/非法时为 1"""
+    value = (await db.execute(
+        select(SystemConfig.config_value).where(SystemConfig.config_key == LISTEN_REQUIRED_COUNT_KEY)
+    )).scalar_one_or_none()
+    try:
+        required = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_LISTEN_REQUIRED_COUNT
+    return required if required >= 0 else DEFAULT_LISTEN_REQUIRED_COUNT
+
+
+async def college_listen_counts(
+    db: AsyncSession,
+    *,
+    college_id: int,
+    academic_year: Optional[str] = None,
+    semester: Optional[int] = None,
+) -> List[Tuple[int, str, int]]:
+    """学院每位教师提交的非督导评教数 [(教师ID, 姓名, 次数)]，一条分组查询，没听过课的教师计 0"""
+    teachers_in_college = select(User.id).where(User.college_id == college_id, User.is_delete == False)  # noqa: E712
+    counts = (
+        select(TeachingEvaluation.listen_teacher_id.label("teacher_id"), func.count(TeachingEvaluation.id).label("n"))
+        .where(
+            TeachingEvaluation.listen_teacher_id.in_(teachers_in_college),
+            TeachingEvaluation.is_delete == False,  # noqa: E712
+            (TeachingEvaluation.eval_source != "supervisor") | (TeachingEvaluation.eval_source == None),  # noqa: E711
+        )
+        .group_by(TeachingEvaluation.listen_teacher_id)
+    )
+    if academic_year or semester:
+        counts = counts.join(Timetable, TeachingEvaluation.timetable_id == Timetable.id)
+        if academic_year:
+            counts = counts.where(Timetable.academic_year == academic_year)
+        if semester:
+            counts = counts.where(Timetable.semester == semester)
+    counts = counts.subquery()
+
+    stmt = (
+        select(User.id, User.user_name, func.coalesce(counts.c.n, 0))
+        .outerjoin(counts, counts.c.teacher_id == User.id)
+        .where(User.college_id == college_id, User.is_delete == False)  # noqa: E712
+        .order_by(User.id)
+    )
+    return [(tid, name, int(n)) for tid, name, n in (await db.execute(stmt)).all()]
@@ -0,0 +1,154 @@
+# app/crud/task_assignment.py
+"""督导评教任务的批量分配
+
+按集合处理，而不是按 (督导, 课表) 逐对查询：
+- 一次查询校验全部督导角色
+- 一次查询取出已存在的 (课表, 督导) 组合，在内存里做差集
+- 剩余组合分块 INSERT IGNORE，并发分配或撞上已软删除的行（唯一键冲突）时跳过并计入跳过数
+"""
+from __future__ import annotations
+
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Role, TeachingEvaluation, Timetable, User, UserRole
+
+ASSIGN_CHUNK_SIZE = 1000
+
+# MySQL 的 ER_DUP_ENTRY：INSERT IGNORE 跳过唯一键冲突时产生的警告码
+_DUP_ENTRY_WARNING = 1062
+
+# status=2 表示待评教任务
+TASK_STATUS = 2
+
+
+async def find_non_supervisors(db: AsyncSession, user_ids: Sequence[int]) -> List[int]:
+    """返回不具备督导角色（或已删除）的用户ID，保持入参顺序"""
+    if not user_ids:
+        return []
+    stmt = (
+        select(UserRole.user_id)
+        .join(Role, Role.id == UserRole.role_id)
+        .join(User, User.id == UserRole.user_id)
+        .where(
+            UserRole.user_id.in_(set(user_ids)),
+            Role.role_code == "supervisor",
+            User.is_delete == False,  # noqa: E712
+        )
+    )
+    ok = set((await db.execute(stmt)).scalars().all())
+    return [uid for uid in user_ids if uid not in ok]
+
+
+async def load_assign_timetables(db: AsyncSession, timetable_ids: Sequence[int]) -> Dict[int, Tuple[int, Optional[int]]]:
+    """有效课表 -> (授课教师ID, 学院ID)"""
+    if not timetable_ids:
+        return {}
+    stmt = select(Timetable.id, Timetable.teacher_id, Timetable.college_id).where(
+        Timetable.id.in_(set(timetable_ids)),
+        Timetable.is_delete == False,  # noqa: E712
+    )
+    return {tid: (teacher_id, college_id) for tid, teacher_id, college_id in (await db.execute(stmt)).all()}
+
+
+async def existing_assignment_pairs(
+    db: AsyncSession, supervisor_ids: Iterable[int], timetable_ids: Iterable[int]
+) -> Set[Tuple[int, int]]:
+    """已存在（未删除）的 (课表ID, 督导ID) 组合，一次查询取回"""
+    supervisor_ids, timetable_ids = set(supervisor_ids), set(timetable_ids)
+    if not supervisor_ids or not timetable_ids:
+        return set()
+    stmt = (
+        select(TeachingEvaluation.timetable_id, TeachingEvaluation.listen_teacher_id)
+        .where(
+            TeachingEvaluation.listen_teacher_id.in_(supervisor_ids),
+            TeachingEvaluation.timetable_id.in_(timetable_ids),
+            TeachingEvaluation.is_delete == False,  # noqa: E712
+        )
+        .distinct()
+    )
+    return {(tid, sid) for tid, sid in (await db.execute(stmt)).all()}
+
+
+def _task_no(ts: str) -> str:
+    # 批量时同一秒内会生成上万条，随机段取 16 位避免撞号
+    return f"EVAL-{ts}-{uuid.uuid4().hex[:16].upper()}"
+
+
+def build_assignment_rows(
+    supervisor_ids: Sequence[int],
+    timetables: Dict[int, Tuple[int, Optional[int]]],
+    timetable_ids: Sequence[int],
+    existing: Set[Tuple[int, int]],
+    *,
+    note: Optional[str],
+    now: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    now = now or datetime.utcnow()
+    ts = now.strftime("%Y%m%d%H%M%S")
+    # 听课日期取分配当天零点：同一天重复分配会落到唯一键 (课表, 听课人, 听课日期) 上
+    listen_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    suggestion = f"任务分配：{note or '请完成评教'}"
+    rows: List[Dict[str, Any]] = []
+    seen: Set[Tuple[int, int]] = set()
+    for supervisor_id in supervisor_ids:
+        for timetable_id in timetable_ids:
+            pair = (timetable_id, supervisor_id)
+            if pair in existing or pair in seen:
+                continue
+            seen.add(pair)
+            rows.append({
+                "evaluation_no": _task_no(ts),
+                "timetable_id": timetable_id,
+                "teach_teacher_id": timetables[timetable_id][0],
+                "listen_teacher_id": supervisor_id,
+                "eval_source": "supervisor",
+                "total_score": 0,  # 占位值
+                "dimension_scores": {},
+                "improve_suggestion": suggestion,
+                "listen_date": listen_date,
+                "is_anonymous": False,
+                "status": TASK_STATUS,
+                "submit_time": now,
+                "is_delete": False,
+            })
+    return rows
+
+
+async def bulk_insert_assignments(
+    db: AsyncSession, rows: Sequence[Dict[str, Any]], *, chunk_size: int = ASSIGN_CHUNK_SIZE
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """分块多值插入（不提交），返回 (实际插入条数, 每块耗时)
+
+    不用 ON DUPLICATE KEY UPDATE id=id：驱动连接带 CLIENT_FOUND_ROWS，重复行也计 1，插入条数会偏高。
+    INSERT IGNORE 的受影响行数只含真正插入的行；被跳过的行逐条核对警告，除唯一键冲突外的
+    （外键、截断等）不应被静默吞掉，抛 ValueError 由调用方回滚。
+    """
+    inserted = 0
+    chunks: List[Dict[str, Any]] = []
+    table = TeachingEvaluation.__table__
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        t0 = time.perf_counter()
+        stmt = mysql_insert(table).prefix_with("IGNORE").values(list(chunk))
+        res = await db.execute(stmt)
+        n = max(res.rowcount or 0, 0)
+        if n < len(chunk):
+            warnings = (await db.execute(text("SHOW WARNINGS"))).all()
+            unexpected = [w for w in warnings if int(w[1]) != _DUP_ENTRY_WARNING]
+            if unexpected:
+                raise ValueError(f"批量分配写入失败：{unexpected[0][2]}")
+        inserted += n
+        chunks.append({
+            "chunk": len(chunks) + 1,
+            "rows": len(chunk),
+            "inserted": n,
+            "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2),
+        })
+    return inserted, chunks
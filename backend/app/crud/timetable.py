@@ -7,7 +7,14 @@ from sqlalchemy import and_, select, func, true, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.base_async import CRUDBaseAsync
-from app.models import Timetable, TeachingEvaluation, TeacherProfile
+from app.crud.count_cache import cached_count
+from app.crud.evaluated_index import evaluated_index
+from app.crud.pagination import Page, apply_keyset, keyset_order_by, keyset_page
+from app.models import Timetable, TeacherProfile
+
+
+# 待评课表的排序键：学年、学期倒序，id 决胜
+PENDING_TIMETABLE_KEYSET = ((Timetable.academic_year, True), (Timetable.semester, True), (Timetable.id, True))
 
 
 class CRUDTimetable(CRUDBaseAsync[Timetable]):
@@ -189,18 +196,15 @@ class CRUDTimetable(CRUDBaseAsync[Timetable]):
         if not include_deleted:
             filters.append(Timetable.is_delete == False)  # noqa: E712
 
-        evaluated_exists = (
-            select(TeachingEvaluation.id)
-            .where(
-                TeachingEvaluation.timetable_id == Timetable.id,
-                TeachingEvaluation.listen_teacher_id == listen_teacher_id,
-                TeachingEvaluation.is_delete == False,  # noqa: E712
-            )
-            .limit(1)
+        # 已评课表取自内存索引，一条课表查询即可，不再逐行 EXISTS
+        evaluated_ids = await evaluated_index.timetable_ids(
+            db, listen_teacher_id=listen_teacher_id, academic_year=academic_year, semester=semester,
         )
+        if not evaluated_ids:
+            return [], 0
 
         cond = and_(*filters) if filters else true()
-        base = select(Timetable).where(cond, evaluated_exists.exists())
+        base = select(Timetable).where(cond, Timetable.id.in_(sorted(evaluated_ids)))
 
         # 22300417陈俫坤开发：督导只配置教研室范围时，按 teacher_profile.research_room_id 限制
         if research_room_ids:
@@ -209,14 +213,14 @@ class CRUDTimetable(CRUDBaseAsync[Timetable]):
             )
 
         res = await db.execute(
-            base.order_by(Timetable.academic_year.desc(), Timetable.semester.desc())
+            base.order_by(*keyset_order_by(PENDING_TIMETABLE_KEYSET))
             .offset(skip)
             .limit(limit)
         )
         items = list(res.scalars().all())
 
         count_subq = base.with_only_columns(Timetable.id).subquery()
-        total = int((await db.execute(select(func.count()).select_from(count_subq))).scalar_one() or 0)
+        total = await cached_count(db, select(func.count()).select_from(count_subq))
         return items, total
 
     async def list_pending_teachers_for_user(
@@ -248,40 +252,29 @@ class CRUDTimetable(CRUDBaseAsync[Timetable]):
             # 22300417陈俫坤开发：semester 1=春季(2-7月) 2=秋季(8-1月)
             current_semester = 1 if 2 <= current_month <= 7 else 2
             filters.append(Timetable.semester == current_semester)
+            semester = current_semester
 
         if weekday:
             filters.append(Timetable.weekday == weekday)
         if week:
-            # 22300417陈俫坤开发：week_info 形如 "1,2,3"，用边界匹配避免 1 匹配到 10/11
-            w = str(int(week))
-            filters.append(
-                or_(
-                    Timetable.week_info == w,
-                    Timetable.week_info.like(f"{w},%"),
-                    Timetable.week_info.like(f"%,{w},%"),
-                    Timetable.week_info.like(f"%,{w}"),
-                )
-            )
+            # 周次位图按位判断，可与学年/学期/学院/星期共用 idx_timetable_term_week
+            filters.append(Timetable.has_week(week))
 
         if college_ids:
             filters.append(Timetable.college_id.in_(college_ids))
         if not include_deleted:
             filters.append(Timetable.is_delete == False)  # noqa: E712
 
-        evaluated_exists = (
-            select(TeachingEvaluation.id)
-            .where(
-                TeachingEvaluation.timetable_id == Timetable.id,
-                TeachingEvaluation.listen_teacher_id == listen_teacher_id,
-                TeachingEvaluation.is_delete == False,  # noqa: E712
-            )
-            .limit(1)
+        # 已评课表取自内存索引，一条课表查询即可，不再逐行 NOT EXISTS
+        evaluated_ids = await evaluated_index.timetable_ids(
+            db, listen_teacher_id=listen_teacher_id, academic_year=academic_year, semester=semester,
         )
+        not_evaluated = [Timetable.id.notin_(sorted(evaluated_ids))] if evaluated_ids else []
 
         cond = and_(*filters) if filters else true()
         base = (
             select(Timetable.teacher_id, func.count(Timetable.id))
-            .where(cond, ~evaluated_exists.exists())
+            .where(cond, *not_evaluated)
             .group_by(Timetable.teacher_id)
         )
 
@@ -311,7 +304,9 @@ class CRUDTimetable(CRUDBaseAsync[Timetable]):
         skip: int = 0,
         limit: int = 10,
         include_deleted: bool = False,
-    ) -> tuple[List[Timetable], int]:
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+    ) -> Page:
         """22300417陈俫坤开发：按当前用户过滤待评课表
 
         规则：
@@ -335,6 +330,7 @@ class CRUDTimetable(CRUDBaseAsync[Timetable]):
             # 22300417陈俫坤开发：semester 1=春季(2-7月) 2=秋季(8-1月)
             current_semester = 1 if 2 <= current_month <= 7 else 2
             filters.append(Timetable.semester == current_semester)
+            semester = current_semester
         if course_name:
             # 22300417陈俫坤开发：支持“课程名/教师名”统一关键词搜索
             if teacher_ids:
@@ -353,33 +349,21 @@ class CRUDTimetable(CRUDBaseAsync[Timetable]):
         if weekday:
             filters.append(Timetable.weekday == weekday)
         if week:
-            # week_info 形如 "1,2,3,4"，用边界匹配避免 1 匹配到 10/11
-            w = str(int(week))
-            filters.append(
-                or_(
-                    Timetable.week_info == w,
-                    Timetable.week_info.like(f"{w},%"),
-                    Timetable.week_info.like(f"%,{w},%"),
-                    Timetable.week_info.like(f"%,{w}"),
-                )
-            )
+            # 周次位图按位判断，可与学年/学期/学院/星期共用 idx_timetable_term_week
+            filters.append(Timetable.has_week(week))
         if college_ids:
             filters.append(Timetable.college_id.in_(college_ids))
         if not include_deleted:
             filters.append(Timetable.is_delete == False)  # noqa: E712
 
-        evaluated_exists = (
-            select(TeachingEvaluation.id)
-            .where(
-                TeachingEvaluation.timetable_id == Timetable.id,
-                TeachingEvaluation.listen_teacher_id == listen_teacher_id,
-                TeachingEvaluation.is_delete == False,  # noqa: E712
-            )
-            .limit(1)
+        # 已评课表取自内存索引，一条课表查询即可，不再逐行 NOT EXISTS
+        evaluated_ids = await evaluated_index.timetable_ids(
+            db, listen_teacher_id=listen_teacher_id, academic_year=academic_year, semester=semester,
         )
+        not_evaluated = [Timetable.id.notin_(sorted(evaluated_ids))] if evaluated_ids else []
 
         cond = and_(*filters) if filters else true()
-        base = select(Timetable).where(cond, ~evaluated_exists.exists())
+        base = select(Timetable).where(cond, *not_evaluated)
 
         # 22300417陈俫坤开发：督导只配置教研室范围时，按 teacher_profile.research_room_id 限制
         if research_room_ids:
@@ -387,16 +371,19 @@ class CRUDTimetable(CRUDBaseAsync[Timetable]):
                 TeacherProfile.research_room_id.in_(research_room_ids)
             )
 
-        res = await db.execute(
-            base.order_by(Timetable.academic_year.desc(), Timetable.semester.desc())
-            .offset(skip)
-            .limit(limit)
-        )
-        items = list(res.scalars().all())
-
-        count_subq = base.with_only_columns(Timetable.id).subquery()
-        total = int((await db.execute(select(func.count()).select_from(count_subq))).scalar_one() or 0)
-        return items, total
+        # cursor 为 None 时按偏移分页，否则按 (academic_year, semester, id) 游标分页
+        if cursor is None:
+            res = await db.execute(base.order_by(*keyset_order_by(PENDING_TIMETABLE_KEYSET)).offset(skip).limit(limit))
+            items, next_cursor = list(res.scalars().all()), None
+        else:
+            res = await db.execute(apply_keyset(base, PENDING_TIMETABLE_KEYSET, cursor, limit))
+            items, next_cursor = keyset_page(res.scalars().all(), PENDING_TIMETABLE_KEYSET, limit)
+
+        total = None
+        if with_total:
+            count_subq = base.with_only_columns(Timetable.id).subquery()
+            total = await cached_count(db, select(func.count()).select_from(count_subq))
+        return Page(items, total, next_cursor)
 
     async def list_completed_evaluation(
         self,
@@ -1,17 +1,24 @@
 # app/crud/user.py
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Optional, List
 
 from sqlalchemy import select, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.rbac_cache import FIELD_PERMISSIONS, FIELD_ROLE_LEVEL, FIELD_ROLES, FIELD_SCOPE, MISSING, rbac_cache
 from app.crud.base_async import CRUDBaseAsync
+from app.crud.count_cache import bump_models, cached_count
+from app.crud.pagination import Page, apply_keyset, keyset_page
 from app.models import User, Role, UserRole, Permission, RolePermission, SupervisorScope, TeacherProfile  # 按你的实际路径改
 from app.schemas import TokenData, UserUpdate  # 按你的实际路径改
 
 # 下面这两行按你 auth.py 真实函数名改一下即可：
-from app.core.auth import get_password_hash, verify_password  # noqa: F401
+from app.core.auth import get_password_hash_async, verify_password_async
+
+
+USER_KEYSET = ((User.id, False),)
 
 
 class CRUDUser(CRUDBaseAsync[User]):
@@ -28,7 +35,7 @@ class CRUDUser(CRUDBaseAsync[User]):
     async def create_user(self, db: AsyncSession, *, user_data: dict) -> User:
         # 如果 user_data 里是明文密码，建议在这里 hash（字段名按你 schema）
         if "password" in user_data and user_data["password"]:
-            user_data["password"] = get_password_hash(user_data["password"])
+            user_data["password"] = await get_password_hash_async(user_data["password"])
 
         user = User(**user_data)
         db.add(user)
@@ -81,7 +88,9 @@ class CRUDUser(CRUDBaseAsync[User]):
         if not user:
             return None
 
-        user.password = get_password_hash(new_password)
+        user.password = await get_password_hash_async(new_password)
+        # 此刻之前签发的 token 失效（见 auth.verify_token）
+        user.password_changed_at = datetime.now()
         try:
             await db.commit()
             await db.refresh(user)
@@ -107,7 +116,9 @@ class CRUDUser(CRUDBaseAsync[User]):
         limit: int = 20,
         college_id: Optional[int] = None,
         max_role_level: Optional[int] = None,
-    ) -> tuple[List[User], int]:
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+    ) -> Page:
         from sqlalchemy import and_
 
         # 构建查询语句
@@ -139,15 +150,16 @@ class CRUDUser(CRUDBaseAsync[User]):
         # 默认排除软删除
         stmt = stmt.where(User.is_delete == False)  # noqa: E712
 
-        # 添加排序
-        stmt = stmt.order_by(User.id)
-
-        # 添加分页
-        stmt = stmt.offset(skip).limit(limit)
+        # 排序 + 分页：cursor 为 None 时按偏移，否则按 id 游标
+        if cursor is None:
+            result = await db.execute(stmt.order_by(User.id).offset(skip).limit(limit))
+            items, next_cursor = list(result.scalars().all()), None
+        else:
+            result = await db.execute(apply_keyset(stmt, USER_KEYSET, cursor, limit))
+            items, next_cursor = keyset_page(result.scalars().all(), USER_KEYSET, limit)
 
-        # 执行查询
-        result = await db.execute(stmt)
-        items = list(result.scalars().all())
+        if not with_total:
+            return Page(items, None, next_cursor)
 
         # 计算总数
         count_stmt = select(func.count()).select_from(User)
@@ -175,10 +187,8 @@ class CRUDUser(CRUDBaseAsync[User]):
 
         count_stmt = count_stmt.where(User.is_delete == False)  # noqa: E712
 
-        count_result = await db.execute(count_stmt)
-        total = count_result.scalar_one()
-
-        return items, total
+        total = await cached_count(db, count_stmt)
+        return Page(items, total, next_cursor)
 
     async def authenticate(self, db: AsyncSession, *, user_on: str, plain_password: str) -> Optional[User]:
         user = await self.get_by_user_on(db, user_on=user_on)
@@ -186,7 +196,7 @@ class CRUDUser(CRUDBaseAsync[User]):
             return None
         if user.status != 1 or user.is_delete:
             return None
-        if not verify_password(plain_password, user.password):
+        if not await verify_password_async(plain_password, user.password):
             return None
         return user
 
@@ -224,7 +234,16 @@ class CRUDUser(CRUDBaseAsync[User]):
 # 22300417陈俫坤开发：督导负责范围（多学院/多教研组）
 # ---------------------------
 async def get_supervisor_scope_ids(db: AsyncSession, *, supervisor_user_id: int) -> tuple[list[int], list[int]]:
-    """返回 (college_ids, research_room_ids)"""
+    """返回 (college_ids, research_room_ids)，经 RBAC 缓存读取"""
+    college_ids, research_room_ids = await _read_through(
+        supervisor_user_id,
+        FIELD_SCOPE,
+        lambda: _load_supervisor_scope_ids(db, supervisor_user_id=supervisor_user_id),
+    )
+    return list(college_ids), list(research_room_ids)
+
+
+async def _load_supervisor_scope_ids(db: AsyncSession, *, supervisor_user_id: int) -> tuple[tuple[int, ...], tuple[int, ...]]:
     stmt = select(SupervisorScope.scope_type, SupervisorScope.scope_id).where(
         SupervisorScope.supervisor_user_id == supervisor_user_id,
         SupervisorScope.is_delete == False,  # noqa: E712
@@ -240,7 +259,7 @@ async def get_supervisor_scope_ids(db: AsyncSession, *, supervisor_user_id: int)
     # 去重
     college_ids = sorted(list({*college_ids}))
     research_room_ids = sorted(list({*research_room_ids}))
-    return college_ids, research_room_ids
+    return tuple(college_ids), tuple(research_room_ids)
 
 
 async def set_supervisor_scope_ids(
@@ -265,6 +284,8 @@ async def set_supervisor_scope_ids(
         db.add(SupervisorScope(supervisor_user_id=supervisor_user_id, scope_type="research_room", scope_id=rid, is_delete=False))
 
     await db.commit()
+    bump_models(SupervisorScope)
+    rbac_cache.invalidate_user(supervisor_user_id)
 
 
 async def get_effective_supervisor_scope(
@@ -310,14 +331,31 @@ async def reset_user_password(db: AsyncSession, user_id: int, new_password: str)
     return await user_crud.reset_password(db, user_id=user_id, new_password=new_password)
 
 
+async def _read_through(user_id: int, field: str, loader) -> object:
+    """RBAC 缓存读穿：命中直接返回，未命中查库后回填（失效期间读到的结果不回填）"""
+    generation = rbac_cache.generation
+    cached = rbac_cache.get(user_id, field)
+    if cached is not MISSING:
+        return cached
+    value = await loader()
+    if isinstance(value, list):
+        value = tuple(value)
+    rbac_cache.set(user_id, field, value, generation=generation)
+    return value
+
+
 async def get_user_role_level(db: AsyncSession, token_data: TokenData) -> int:
-    return await user_crud.get_user_role_level(db, user_id=token_data.id)
+    return await _read_through(
+        token_data.id, FIELD_ROLE_LEVEL, lambda: user_crud.get_user_role_level(db, user_id=token_data.id)
+    )
 
 
 async def get_users_list(db: AsyncSession, skip: int = 0, limit: int = 20, 
-                        college_id: Optional[int] = None, max_role_level: Optional[int] = None) -> tuple[List[User], int]:
+                        college_id: Optional[int] = None, max_role_level: Optional[int] = None,
+                        cursor: Optional[str] = None, with_total: bool = True) -> Page:
     return await user_crud.get_users_with_roles(db, skip=skip, limit=limit, 
-                                              college_id=college_id, max_role_level=max_role_level)
+                                              college_id=college_id, max_role_level=max_role_level,
+                                              cursor=cursor, with_total=with_total)
 
 
 async def get_roles_name(db: AsyncSession, token_data: TokenData) -> list[str]:
@@ -325,8 +363,14 @@ async def get_roles_name(db: AsyncSession, token_data: TokenData) -> list[str]:
 
 
 async def get_roles_code(db: AsyncSession, token_data: TokenData) -> list[str]:
-    return await user_crud.get_roles_code(db, user_id=token_data.id)
+    roles = await _read_through(
+        token_data.id, FIELD_ROLES, lambda: user_crud.get_roles_code(db, user_id=token_data.id)
+    )
+    return list(roles)
 
 
 async def get_user_permissions(db: AsyncSession, token_data: TokenData) -> list[str]:
-    return await user_crud.get_user_permissions(db, user_id=token_data.id)
+    perms = await _read_through(
+        token_data.id, FIELD_PERMISSIONS, lambda: user_crud.get_user_permissions(db, user_id=token_data.id)
+    )
+    return list(perms)
@@ -1,19 +1,23 @@
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import MYSQL_USER, MYSQL_PASSWORD, MYSQL_HOST, MYSQL_PORT, MYSQL_DB
+from app.core.db_pool import engine_options, pool_monitor
 
 DATABASE_URL = f"mysql+asyncmy://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
 
-engine = create_async_engine(DATABASE_URL)
+# 连接池参数见 config 中的 DB_POOL_*
+engine = create_async_engine(DATABASE_URL, **engine_options())
+pool_monitor.attach(engine)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
-
-
+async def get_db(request: Request):
+    # AuthMiddleware 已为本请求建好会话时直接复用（由中间件负责关闭），一个请求只占一个连接
+    shared = getattr(request.state, "db", None)
+    if shared is not None:
+        yield shared
+        return
 
+    async with AsyncSessionLocal() as session:
+        yield session
@@ -0,0 +1,96 @@
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import AUDIT_REQUEST_LOG
+from app.crud.logs import record_operation_log
+from app.middleware.auth_middleware import PathPrefixTrie, PUBLIC_PREFIXES
+
+# 不记录请求日志的路径：健康检查、指标与静态/文档
+AUDIT_SKIP_PATHS = frozenset(("/", "/health", "/api/v1/teaching-eval/system/metrics"))
+_skip_prefixes = PathPrefixTrie(PUBLIC_PREFIXES)
+
+API_PREFIX = "/api/v1/teaching-eval/"
+
+
+def _module_of(path: str) -> str:
+    """/api/v1/teaching-eval/eval/... -> eval；其它路径取第一段"""
+    if path.startswith(API_PREFIX):
+        path = path[len(API_PREFIX):]
+    return path.strip("/").split("/", 1)[0] or "root"
+
+
+def _client_ip(scope: Scope) -> Optional[str]:
+    for key, value in scope.get("headers") or ():
+        if key == b"x-forwarded-for":
+            return value.decode("latin-1").split(",", 1)[0].strip()
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers") or ():
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class AuditMiddleware:
+    """
+    请求日志中间件（纯 ASGI）：记录每个请求的状态码与耗时，写入 operation_log
+
+    响应发完之后才整理日志，且只入队（app.crud.audit_sink 攒批落库），不占用请求的数据库连接。
+    需放在 AuthMiddleware 外层，才能读到其写入 scope["state"] 的 current_user，并把 401 也计入。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or not AUDIT_REQUEST_LOG
+            or scope["method"] == "OPTIONS"
+            or path in AUDIT_SKIP_PATHS
+            or _skip_prefixes.match(path)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        status_code: Optional[int] = None
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self._record(scope, status_code or 500, int((time.perf_counter() - start) * 1000))
+
+    @staticmethod
+    def _record(scope: Scope, status_code: int, elapsed_ms: int) -> None:
+        user = (scope.get("state") or {}).get("current_user")
+        query = scope.get("query_string") or b""
+        url = scope["path"] + ("?" + query.decode("latin-1") if query else "")
+        try:
+            record_operation_log(
+                user_id=getattr(user, "id", None),
+                user_name=getattr(user, "user_on", None),
+                operation_type="REQUEST",
+                module=_module_of(scope["path"]),
+                ip_address=_client_ip(scope),
+                user_agent=_header(scope, b"user-agent"),
+                request_url=url,
+                request_method=scope["method"],
+                response_code=status_code,
+                execute_time=elapsed_ms,
+            )
+        except Exception:
+            # 日志写入问题不影响请求本身
+            pass
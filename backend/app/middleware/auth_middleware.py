@@ -1,104 +1,174 @@
+from typing import Dict, Iterable, Optional
+
 from fastapi import HTTPException, Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core import DEBUG, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.core.auth import verify_token
 from app.database import AsyncSessionLocal
 from app.crud.user import get_roles_code, get_user_permissions
 
-class AuthMiddleware(BaseHTTPMiddleware):
+
+# 不需要认证的路径（精确匹配）
+PUBLIC_PATHS = (
+    "/",
+    "/health",
+    "/api/v1/teaching-eval/user/login",
+    "/api/v1/teaching-eval/user/register",
+    "/api/v1/teaching-eval/system/bootstrap",
+    "/api/v1/teaching-eval/system/bootstrap/",
+    "/api/v1/teaching-eval/system/db-info",
+    "/api/v1/teaching-eval/system/db-info/",
+    "/api/v1/teaching-eval/system/metrics",
+)
+
+# 不需要认证的路径前缀
+PUBLIC_PREFIXES = ("/static", "/docs", "/redoc", "/openapi")
+
+# 需要自动设置 token cookie 的路径
+TOKEN_PATHS = frozenset((
+    "/api/v1/teaching-eval/user/login",
+    "/api/v1/teaching-eval/user/register",
+    "/api/v1/teaching-eval/user/update",
+    "/api/v1/teaching-eval/user/change-password",
+    "/api/v1/teaching-eval/eval/evaluation/submit",
+))
+TOKEN_METHODS = frozenset(("POST", "PATCH"))
+
+
+class PathPrefixTrie:
+    """按字符构建的前缀树：一次从左到右扫描即可判断路径是否命中任一前缀"""
+
+    __slots__ = ("_root",)
+    _END = ""
+
+    def __init__(self, prefixes: Iterable[str] = ()) -> None:
+        self._root: Dict[str, dict] = {}
+        for p in prefixes:
+            self.add(p)
+
+    def add(self, prefix: str) -> None:
+        node = self._root
+        for ch in prefix:
+            node = node.setdefault(ch, {})
+        node[self._END] = {}
+
+    def match(self, path: str) -> bool:
+        node = self._root
+        for ch in path:
+            if self._END in node:
+                return True
+            node = node.get(ch)
+            if node is None:
+                return False
+        return self._END in node
+
+
+class PublicPathMatcher:
+    """公共路径：精确集合 + 前缀树，预先编译好，请求时单次判断"""
+
+    __slots__ = ("_exact", "_prefixes")
+
+    def __init__(self, exact: Iterable[str], prefixes: Iterable[str]) -> None:
+        self._exact = frozenset(exact)
+        self._prefixes = PathPrefixTrie(prefixes)
+
+    def __call__(self, path: str) -> bool:
+        return path in self._exact or self._prefixes.match(path)
+
+
+is_public_path = PublicPathMatcher(PUBLIC_PATHS, PUBLIC_PREFIXES)
+
+
+def _unauthorized(e: HTTPException) -> JSONResponse:
+    return JSONResponse(
+        status_code=e.status_code,
+        content={
+            "code": e.status_code,
+            "msg": e.detail,
+            "data": None
+        }
+    )
+
+
+def _token_cookie_headers(token_value: str) -> list:
+    """复用 starlette 的 set_cookie 生成 Set-Cookie 头，保证与原实现格式一致"""
+    tmp = Response()
+    tmp.set_cookie(
+        key="token",
+        value=token_value,
+        httponly=DEBUG,
+        secure=not DEBUG,
+        max_age=int(ACCESS_TOKEN_EXPIRE_MINUTES) * 60,
+        path="/"
+    )
+    return [(k, v) for k, v in tmp.raw_headers if k == b"set-cookie"]
+
+
+class AuthMiddleware:
     """
-    认证和Token设置中间件，用于验证需要token的请求并自动设置token cookie
+    认证和Token设置中间件（纯 ASGI 实现），用于验证需要token的请求并自动设置token cookie
+
+    相比 BaseHTTPMiddleware 不再为每个请求额外创建任务和响应流包装；
+    request.state 与下游共享同一个 scope["state"]。
     """
 
-    async def dispatch(self, request: Request, call_next):
-        # 定义不需要认证的路径
-        public_paths = [
-            "/",
-            "/health",
-            "/api/v1/teaching-eval/user/login",
-            "/api/v1/teaching-eval/user/register",
-            "/api/v1/teaching-eval/system/bootstrap",
-            "/api/v1/teaching-eval/system/bootstrap/",
-            "/api/v1/teaching-eval/system/db-info",
-            "/api/v1/teaching-eval/system/db-info/",
-            
-        ]
-
-        # 检查是否为公共路径
-        if request.url.path in public_paths:
-            response = await call_next(request)
-        else:
-            # 非公共路径，需要验证token
-            if (request.url.path.startswith('/static') or
-                    request.url.path.startswith('/docs') or
-                    request.url.path.startswith('/redoc') or
-                    request.url.path.startswith('/openapi')):
-                response = await call_next(request)
-            else:
-                try:
-                    token_data = verify_token(request)
-                    request.state.current_user = token_data
-                    
-                    # 获取数据库会话并获取用户角色和权限信息
-                    async with AsyncSessionLocal() as db:
-                        user_roles = await get_roles_code(db, token_data)
-                        user_permissions = await get_user_permissions(db, token_data)
-                        
-                        # 缓存用户角色和权限信息
-                        request.state.user_roles = user_roles
-                        request.state.user_permissions = user_permissions
-                        
-                except HTTPException as e:
-                    # 检查是否是来自Authorization头部的token验证失败
-                    authorization = request.headers.get("Authorization")
-                    if authorization and authorization.startswith("Bearer "):
-                        # 如果是Authorization头部的token验证失败，返回标准的401响应
-                        return JSONResponse(
-                            status_code=e.status_code,
-                            content={
-                                "code": e.status_code,
-                                "msg": e.detail,
-                                "data": None
-                            }
-                        )
-                    else:
-                        # 其他情况返回标准的401响应
-                        return JSONResponse(
-                            status_code=e.status_code,
-                            content={
-                                "code": e.status_code,
-                                "msg": e.detail,
-                                "data": None
-                            }
-                        )
-
-                response = await call_next(request)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        db = None
+        if not is_public_path(path):
+            request = Request(scope)
+            # 本请求共享的会话：get_db 直接复用，处理函数不再另取连接；请求结束时在这里关闭
+            db = AsyncSessionLocal()
+            request.state.db = db
+            try:
+                # token 缓存未命中时会查一次用户的密码修改时间
+                token_data = await verify_token(request, db)
+                request.state.current_user = token_data
+                # 获取用户角色和权限信息（经 RBAC 缓存，命中时会话不会取连接）
+                request.state.user_roles = await get_roles_code(db, token_data)
+                request.state.user_permissions = await get_user_permissions(db, token_data)
+                # 结束只读事务、把连接还回池：处理函数用到数据库时再取，并且读到的是新快照
+                await db.commit()
+            except BaseException as e:
+                await db.close()
+                if isinstance(e, HTTPException):
+                    await _unauthorized(e)(scope, receive, send)
+                    return
+                raise
 
         # 检查是否需要自动设置token cookie
-        token_paths = [
-            "/api/v1/teaching-eval/user/login",
-            "/api/v1/teaching-eval/user/register",
-            "/api/v1/teaching-eval/user/update",
-            "/api/v1/teaching-eval/eval/evaluation/submit",
-        ]
-
-        if request.url.path in token_paths and request.method in ["POST", "PATCH"]:
-            if hasattr(request.state, 'token_to_set') and request.state.token_to_set:
-                token_data = request.state.token_to_set
-                token_value = token_data if isinstance(token_data, str) else token_data.get('token', token_data)
-
-                response.set_cookie(
-                    key="token",
-                    value=token_value,
-                    httponly=DEBUG,
-                    secure=not DEBUG,
-                    max_age=int(ACCESS_TOKEN_EXPIRE_MINUTES) * 60,
-                    path="/"
-                )
-                
-                # 同时在响应头中设置 Authorization，方便客户端使用
-                response.headers["Authorization"] = f"Bearer {token_value}"
-
-        return response
\ No newline at end of file
+        if path in TOKEN_PATHS and scope["method"] in TOKEN_METHODS:
+            send = self._wrap_send_with_token(scope, send)
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if db is not None:
+                await db.close()
+
+    @staticmethod
+    def _wrap_send_with_token(scope: Scope, send: Send) -> Send:
+        async def send_with_token(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                state = scope.get("state") or {}
+                token_to_set: Optional[object] = state.get("token_to_set")
+                if token_to_set:
+                    token_value = token_to_set if isinstance(token_to_set, str) else token_to_set.get('token', token_to_set)
+                    headers = MutableHeaders(scope=message)
+                    for key, value in _token_cookie_headers(token_value):
+                        headers.append(key.decode("latin-1"), value.decode("latin-1"))
+                    # 同时在响应头中设置 Authorization，方便客户端使用
+                    headers["Authorization"] = f"Bearer {token_value}"
+            await send(message)
+
+        return send_with_token
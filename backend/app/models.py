@@ -1,9 +1,9 @@
 from sqlalchemy import (
     Column, BigInteger, String, DateTime, Text, Boolean,
-    JSON, DECIMAL, ForeignKey, UniqueConstraint, Index, SmallInteger
+    JSON, DECIMAL, ForeignKey, UniqueConstraint, Index, SmallInteger, Computed
 )
-from sqlalchemy.dialects.mysql import TINYINT
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.mysql import DATETIME, TINYINT
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from app.base import Base
 
@@ -36,6 +36,8 @@ class User(Base):
     last_login_ip = Column(String(45), comment='最近登录IP（支持IPv6）')
     login_fail_count = Column(TINYINT, default=0, comment='连续登录失败次数')
     lock_until = Column(DateTime, comment='锁定截止时间')
+    # 毫秒精度：早于该时刻签发（iat）的 token 失效，同一秒内先签发的 token 也能被撤销
+    password_changed_at = Column(DATETIME(fsp=3), comment='最近修改/重置密码时间（可空）')
 
     # 教务系统登录Key（可选）
     nnlg_key = Column(String(128), comment='教务系统登录key（可选）')
@@ -391,6 +393,32 @@ class SupervisorScope(Base):
 #  课表（核心业务：适配你的JSON课表数据）
 # =========================================================
 
+# 周次位图：第 n 周对应第 n-1 位；BIGINT 有符号，最多记 63 周
+MAX_WEEK = 63
+
+
+def week_bit(week: int) -> int:
+    week = int(week)
+    return 1 << (week - 1) if 1 <= week <= MAX_WEEK else 0
+
+
+def week_mask_of(week_info) -> int:
+    """周次文本（"1,2,3"，也兼容 "1-16"）-> 位图；无法识别的片段忽略"""
+    mask = 0
+    for part in str(week_info or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, sep, hi = part.partition("-")
+        try:
+            start, end = int(lo), int(hi) if sep else int(lo)
+        except ValueError:
+            continue
+        for w in range(max(start, 1), min(end, MAX_WEEK) + 1):
+            mask |= week_bit(w)
+    return mask
+
+
 class Timetable(Base):
     """
     课表表（课程安排/课表槽位）——评教的“被评价对象”来源之一
@@ -434,6 +462,8 @@ class Timetable(Base):
     period = Column(String(16), nullable=False, comment='节次（大节，如第一大节）')
     section_time = Column(String(16), nullable=False, comment='小节范围（如01-02）')
     week_info = Column(String(128), nullable=False, comment='上课周次（逗号列表，如1,2,3,4,...)')
+    week_mask = Column(BigInteger, nullable=False, default=0, server_default='0',
+                       comment='上课周次位图（第n周=第n-1位，随 week_info 自动维护）')
     classroom = Column(String(128), default='', nullable=False, comment='教室（空字符串表示未知）')
 
     # 可选：课程容量信息（独立运行可不填；教务接入可填）
@@ -458,6 +488,17 @@ class Timetable(Base):
     clazz = relationship("Clazz", back_populates="timetables")
     evaluations = relationship("TeachingEvaluation", back_populates="timetable")
 
+    @validates("week_info")
+    def _sync_week_mask(self, key, value):
+        # 任何经 ORM 写入 week_info 的路径（create/update/upsert/导入脚本）都同步位图
+        self.week_mask = week_mask_of(value)
+        return value
+
+    @classmethod
+    def has_week(cls, week: int):
+        """第 week 周有课；替代 week_info 上的 LIKE 边界匹配"""
+        return cls.week_mask.op("&")(week_bit(week)) != 0
+
     __table_args__ = (
         # 教务幂等：同来源+外部ID唯一（external_id 为空时不影响）
         UniqueConstraint('sync_source', 'external_id', name='uk_timetable_source_external'),
@@ -473,6 +514,9 @@ class Timetable(Base):
         Index('idx_timetable_college_teacher', 'college_id', 'teacher_id'),
         Index('idx_timetable_year_semester', 'academic_year', 'semester'),
         Index('idx_timetable_schedule', 'weekday', 'period'),
+        # 待评/周课表筛选：学年 + 学期 + 学院 + 星期走索引，周次位运算在同一索引上下推判断
+        # （学院几乎总有范围限制、星期是可选筛选，所以学院在前；不带学年的查询跨全部学年，用不上本索引）
+        Index('idx_timetable_term_week', 'academic_year', 'semester', 'college_id', 'weekday', 'week_mask'),
         Index('idx_timetable_delete', 'is_delete'),
         {'mysql_charset': 'utf8mb4', 'mysql_collate': 'utf8mb4_unicode_ci', 'comment': '课表表'}
     )
@@ -511,6 +555,15 @@ class EvaluationDimension(Base):
     )
 
 
+def _json_number(column: str, path: str) -> str:
+    """生成列表达式：JSON 中该路径为数值时取值，缺失或非数值为 NULL（写入不会因类型转换报错）"""
+    value = f"json_extract(`{column}`, '{path}')"
+    return (
+        f"(case when json_type({value}) in ('INTEGER','UNSIGNED INTEGER','DOUBLE','DECIMAL') "
+        f"then cast({value} as decimal(10,4)) end)"
+    )
+
+
 class TeachingEvaluation(Base):
     """教学评价表：一次听课/评教记录"""
     __tablename__ = 'teaching_evaluation'
@@ -534,6 +587,15 @@ class TeachingEvaluation(Base):
     # 评分
     total_score = Column(TINYINT, nullable=False, comment='评教总分（0-100）')
     dimension_scores = Column(JSON, nullable=False, comment='各维度得分（JSON）')
+    # 四个维度分数的存储生成列（由 MySQL 随 dimension_scores 维护，统计直接聚合，不再逐行解析 JSON）
+    dim_teaching_attitude = Column(DECIMAL(10, 4), Computed(_json_number("dimension_scores", "$.teachingAttitude"), persisted=True),
+                                   comment='维度分：教学态度（生成列）')
+    dim_content = Column(DECIMAL(10, 4), Computed(_json_number("dimension_scores", "$.content"), persisted=True),
+                         comment='维度分：教学内容（生成列）')
+    dim_method = Column(DECIMAL(10, 4), Computed(_json_number("dimension_scores", "$.method"), persisted=True),
+                        comment='维度分：教学方法与手段（生成列）')
+    dim_effect = Column(DECIMAL(10, 4), Computed(_json_number("dimension_scores", "$.effect"), persisted=True),
+                        comment='维度分：教学效果（生成列）')
     score_level = Column(String(8), index=True, comment='等级（优秀/良好/合格/不合格，可空）')
 
     # 文本反馈
@@ -565,6 +627,12 @@ class TeachingEvaluation(Base):
         Index('idx_evaluation_submit', 'submit_time', 'is_delete'),
         Index('idx_evaluation_score_level', 'score_level', 'status'),
         Index('idx_evaluation_listen_date', 'listen_date', 'status'),
+        # 查重 / 督导任务已存在判断：按课表 + 听课人
+        Index('idx_evaluation_tt_listener', 'timetable_id', 'listen_teacher_id', 'is_delete'),
+        # 授课教师统计 / 收到的评教
+        Index('idx_evaluation_teacher_status', 'teach_teacher_id', 'status', 'is_delete'),
+        # 听课人统计 / 已评索引装载（带上 timetable_id，装载时只读索引）
+        Index('idx_evaluation_listener_status', 'listen_teacher_id', 'is_delete', 'status', 'timetable_id'),
         {'mysql_charset': 'utf8mb4', 'mysql_collate': 'utf8mb4_unicode_ci', 'comment': '教学评价表'}
     )
 
@@ -592,6 +660,10 @@ class TeacherEvaluationStat(Base):
     min_score = Column(TINYINT, comment='最低分（可空）')
     dimension_avg_scores = Column(JSON, comment='各维度平均分（可空）')
 
+    # 增量维护：评教写入时按差量更新，对账任务可整体重建
+    total_score_sum = Column(BigInteger, comment='总分累加和（增量维护，可空表示尚未构建）')
+    dimension_sum_scores = Column(JSON, comment='各维度累加 {维度: {"sum": x, "count": n}}（增量维护）')
+
     school_rank = Column(SmallInteger, comment='全校排名（可空）')
     school_total = Column(SmallInteger, comment='全校参评教师总数（可空）')
     college_rank = Column(SmallInteger, comment='院内排名（可空）')
@@ -599,6 +671,8 @@ class TeacherEvaluationStat(Base):
 
     high_freq_problems = Column(JSON, comment='高频问题（可空）')
     high_freq_suggestions = Column(JSON, comment='高频建议（可空）')
+    problem_sketch = Column(JSON, comment='高频问题计数表（Space-Saving，增量维护）')
+    suggestion_sketch = Column(JSON, comment='高频建议计数表（Space-Saving，增量维护）')
     score_distribution = Column(JSON, comment='分数分布（可空）')
 
     update_time = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment='更新时间')
@@ -628,12 +702,21 @@ class CollegeEvaluationStat(Base):
     total_teacher_num = Column(SmallInteger, default=0, comment='参评教师总数')
     total_evaluation_num = Column(SmallInteger, default=0, comment='评价总次数')
     avg_total_score = Column(DECIMAL(5, 2), comment='学院总平均分（可空）')
+    max_score = Column(TINYINT, comment='最高分（可空）')
+    min_score = Column(TINYINT, comment='最低分（可空）')
     dimension_avg_scores = Column(JSON, comment='学院各维度平均分（可空）')
 
+    # 增量维护：评教写入时按差量更新，对账任务可整体重建
+    total_score_sum = Column(BigInteger, comment='总分累加和（增量维护，可空表示尚未构建）')
+    dimension_sum_scores = Column(JSON, comment='各维度累加 {维度: {"sum": x, "count": n}}（增量维护）')
+
     school_rank = Column(SmallInteger, comment='学院全校排名（可空）')
     school_total = Column(SmallInteger, comment='参评学院总数（可空）')
 
     high_freq_problems = Column(JSON, comment='学院高频问题（可空）')
+    high_freq_suggestions = Column(JSON, comment='学院高频建议（可空）')
+    problem_sketch = Column(JSON, comment='学院高频问题计数表（Space-Saving，增量维护）')
+    suggestion_sketch = Column(JSON, comment='学院高频建议计数表（Space-Saving，增量维护）')
     score_distribution = Column(JSON, comment='分数分布（可空）')
     excellent_rate = Column(DECIMAL(5, 2), comment='优秀率（可空）')
 
@@ -758,6 +758,7 @@ class CollegeStatisticsResponse(BaseModel):
     excellent_rate: Optional[float] = None
     score_distribution: Optional[Dict[str, int]] = None
     high_freq_problems: Optional[List[str]] = None
+    high_freq_suggestions: Optional[List[str]] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,73 @@
+# benchmarks/bench_aggregation.py
+"""维度聚合微基准：旧的逐维度嵌套循环 vs 列式聚合内核（校验结果一致并对比耗时）
+
+用法（在 backend 目录下）：
+    python -m benchmarks.bench_aggregation            # 默认 10k/100k/1M
+    python -m benchmarks.bench_aggregation 10000 50000
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from statistics import mean
+
+from app.crud.aggregation import aggregate_dimensions, summarize
+
+DIMS = ("teachingAttitude", "content", "method", "effect")
+
+
+def make_rows(n: int, seed: int = 7):
+    rnd = random.Random(seed)
+    scores = [rnd.randint(40, 100) for _ in range(n)]
+    dims = []
+    for _ in range(n):
+        ds = {k: rnd.randint(10, 25) for k in DIMS}
+        if rnd.random() < 0.05:
+            ds.pop(rnd.choice(DIMS))
+        dims.append(ds)
+    return scores, dims
+
+
+def legacy(scores, dims):
+    # 原 teacher_statistics 写法：每个维度各扫一遍
+    dimension_avg_scores = {}
+    all_keys = set().union(*[ds.keys() for ds in dims])
+    for k in all_keys:
+        vals = [float(ds.get(k, 0) or 0) for ds in dims]
+        dimension_avg_scores[k] = round(mean(vals), 2) if vals else 0.0
+    distribution = {
+        "优秀": sum(1 for s in scores if s >= 90),
+        "良好": sum(1 for s in scores if 75 <= s < 90),
+        "合格": sum(1 for s in scores if 60 <= s < 75),
+        "不合格": sum(1 for s in scores if s < 60),
+    }
+    return dimension_avg_scores, distribution, mean(scores), max(scores), min(scores)
+
+
+def kernel(scores, dims):
+    cols = aggregate_dimensions(dims)
+    s = summarize(scores)
+    # 与旧写法同口径：缺该维度的行按 0 计，分母为全部行
+    return {k: round(c.sum / len(dims), 2) for k, c in cols.items()}, s.histogram, s.mean, s.max, s.min
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - t0, out
+
+
+def main(sizes):
+    print(f"{'rows':>10} {'legacy(s)':>10} {'kernel(s)':>10} {'speedup':>8}")
+    for n in sizes:
+        scores, dims = make_rows(n)
+        t_old, old = timed(legacy, scores, dims)
+        t_new, new = timed(kernel, scores, dims)
+        assert old[0] == new[0] and old[1] == new[1], "结果不一致"
+        print(f"{n:>10} {t_old:>10.3f} {t_new:>10.3f} {t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    main(args)
@@ -0,0 +1,78 @@
+# benchmarks/bench_async_crawl.py
+"""并发抓取：本地桩服务器回放 kbtable 页面，比较并发度与断点续抓
+
+桩服务器见 benchmarks.kbtable_fixture.KbtableStub（每次查询固定延迟后返回同一份课表页面）。
+验证码用固定识别函数，不访问百度 OCR。
+
+依次运行：并发 1、并发 N、中断后续抓（第一轮只让部分任务成功，第二轮只补剩余任务）。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.bench_async_crawl [学期数] [每学期拆分数] [查询延迟毫秒] [并发数]
+"""
+from __future__ import annotations
+
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+
+from app.crawl.async_crawl import AsyncJWXTCrawler, build_tasks
+from benchmarks.kbtable_fixture import KbtableStub, make_kbtable_html
+
+PAGE = make_kbtable_html(60)
+
+
+async def fixed_captcha(_: bytes) -> str:
+    return "AB12"
+
+
+async def run(base_url: str, out_dir: str, tasks, concurrency: int, retries: int = 3):
+    async with AsyncJWXTCrawler(
+        username="stub",
+        password="stub",
+        out_dir=out_dir,
+        base_url=base_url,
+        concurrency=concurrency,
+        rate=0,
+        retries=retries,
+        captcha_solver=fixed_captcha,
+    ) as crawler:
+        t0 = time.perf_counter()
+        report = await crawler.crawl(tasks)
+        return report, time.perf_counter() - t0
+
+
+async def main(n_sem: int, n_split: int, latency_ms: float, concurrency: int) -> None:
+    semesters = [f"20{20 + i}-20{21 + i}-{1 + i % 2}" for i in range(n_sem)]
+    tasks = build_tasks(semesters, [{"skzy": f"Z{j:02d}"} for j in range(n_split)])
+    print(f"{len(tasks)} tasks, page={len(PAGE.encode('utf-8')) // 1024}KB, latency={latency_ms}ms")
+
+    tmp = tempfile.mkdtemp(prefix="crawl_bench_")
+    try:
+        with KbtableStub(PAGE, latency=latency_ms / 1000) as stub:
+            for c in (1, concurrency):
+                out = f"{tmp}/c{c}"
+                report, elapsed = await run(stub.base_url, out, tasks, c)
+                rows = sum(v["rows"] for v in report["done"].values())
+                print(f"concurrency={c:<3} {elapsed:6.2f}s  done={len(report['done'])} failed={len(report['failed'])} rows={rows}")
+
+            # 断点续抓：第一轮有一半查询失败（不重试），第二轮只补失败的任务
+            out = f"{tmp}/resume"
+            stub.fail_queries = len(tasks) // 2
+            report, elapsed = await run(stub.base_url, out, tasks, concurrency, retries=1)
+            print(f"resume#1     {elapsed:6.2f}s  done={len(report['done'])} failed={len(report['failed'])}")
+            report, elapsed = await run(stub.base_url, out, tasks, concurrency)
+            print(f"resume#2     {elapsed:6.2f}s  done={len(report['done'])} skipped={report['skipped']} failed={len(report['failed'])}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(main(
+        int(args[0]) if len(args) > 0 else 4,
+        int(args[1]) if len(args) > 1 else 4,
+        float(args[2]) if len(args) > 2 else 200,
+        int(args[3]) if len(args) > 3 else 8,
+    ))
@@ -0,0 +1,114 @@
+# benchmarks/bench_auth_middleware.py
+"""认证中间件基准：旧 BaseHTTPMiddleware 实现 vs 纯 ASGI 实现
+
+在进程内直接驱动 ASGI 应用（不经网络），对一个空接口发带 token 的请求，
+输出 p50/p99 延迟与 requests/sec。RBAC 缓存与 token 缓存预先填好，避免数据库干扰。
+
+用法（在 backend 目录下，需能 import app，即依赖已安装、.env 配置了 SECRET_KEY/ALGORITHM）：
+    python -m benchmarks.bench_auth_middleware [请求数]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+from fastapi import FastAPI, HTTPException, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from app.core.auth import create_access_token, verify_token
+from app.core.rbac_cache import FIELD_PERMISSIONS, FIELD_ROLES, rbac_cache
+from app.core.token_cache import token_cache
+from app.database import AsyncSessionLocal
+from app.crud.user import get_roles_code, get_user_permissions
+from app.middleware.auth_middleware import AuthMiddleware
+from app.schemas import TokenData
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """旧实现的认证主路径（列表 + 多次 startswith，BaseHTTPMiddleware）"""
+
+    async def dispatch(self, request: Request, call_next):
+        public_paths = ["/", "/health"]
+        if request.url.path in public_paths or request.url.path.startswith(("/static", "/docs", "/redoc", "/openapi")):
+            return await call_next(request)
+        try:
+            async with AsyncSessionLocal() as db:
+                token_data = await verify_token(request, db)
+                request.state.current_user = token_data
+                request.state.user_roles = await get_roles_code(db, token_data)
+                request.state.user_permissions = await get_user_permissions(db, token_data)
+        except HTTPException as e:
+            return JSONResponse(status_code=e.status_code, content={"code": e.status_code, "msg": e.detail, "data": None})
+        return await call_next(request)
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping(request: Request):
+        return {"uid": request.state.current_user.id}
+
+    app.add_middleware(middleware)
+    return app
+
+
+async def drive(app, token: str, n: int):
+    scope_base = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/ping",
+        "raw_path": b"/api/v1/ping",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 12345),
+        "server": ("127.0.0.1", 8000),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    status = {}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(n):
+        t0 = time.perf_counter()
+        await app(dict(scope_base), receive, send)
+        latencies.append(time.perf_counter() - t0)
+        assert status["code"] == 200, status
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "rps": n / elapsed,
+    }
+
+
+async def main(n: int):
+    user = TokenData(id=1, user_on="bench", college_id=None, status=1, is_delete=False)
+    token = create_access_token(user).token
+    rbac_cache.set(user.id, FIELD_ROLES, ("teacher",))
+    rbac_cache.set(user.id, FIELD_PERMISSIONS, ())
+    token_cache.put(token, user, time.time() + 3600)
+
+    for name, mw in (("BaseHTTPMiddleware", LegacyAuthMiddleware), ("pure ASGI", AuthMiddleware)):
+        app = build_app(mw)
+        await drive(app, token, min(n, 500))  # 预热
+        r = await drive(app, token, n)
+        print(f"{name:>20}: p50={r['p50_ms']:.3f}ms p99={r['p99_ms']:.3f}ms rps={r['rps']:.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
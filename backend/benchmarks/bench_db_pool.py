@@ -0,0 +1,101 @@
+# benchmarks/bench_db_pool.py
+"""连接池压测：逐级提高并发，观察取连接等待、超时与在用/溢出连接数，找出连接池开始耗尽的并发度
+
+每个模拟请求在一个会话里执行一条查询后继续占住连接 hold 毫秒（模拟处理函数里的多条 SQL/业务逻辑），再提交。
+两种模式：
+- shared：中间件与处理函数共用一个会话（当前实现），每个请求取一次连接
+- legacy：中间件先单独开会话查 RBAC 并关闭，处理函数再开一个（改动前的写法），每个请求取两次连接
+
+池参数与线上一致（engine_options），可用命令行覆盖；pool_timeout 默认压到 2 秒以便在压测中观察到超时。
+
+用法（在 backend 目录下，需要可连接的数据库）：
+    python -m benchmarks.bench_db_pool [数据库URL] [pool_size] [max_overflow] [hold毫秒] [每级请求数]
+    例如 python -m benchmarks.bench_db_pool sqlite+aiosqlite:///./bench_pool.db 5 5 50 400
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db_pool import engine_options, pool_monitor
+
+
+async def one_request(Session, hold: float, legacy: bool) -> None:
+    if legacy:
+        async with Session() as db:
+            await db.execute(text("SELECT 1"))
+    async with Session() as db:
+        await db.execute(text("SELECT 1"))
+        await asyncio.sleep(hold)
+        await db.commit()
+
+
+async def run_level(Session, concurrency: int, total: int, hold: float, legacy: bool):
+    pool_monitor.reset()
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                await one_request(Session, hold, legacy)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(total)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0
+    return elapsed, p95, errors, pool_monitor.stats()
+
+
+async def main(url: str, pool_size: int, max_overflow: int, hold_ms: float, total: int) -> None:
+    engine = create_async_engine(url, **engine_options(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=2))
+    pool_monitor.attach(engine)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    capacity = pool_size + max_overflow
+    levels = sorted({1, 2, 4, pool_size, capacity, capacity * 2, capacity * 4})
+    print(f"pool_size={pool_size} max_overflow={max_overflow} hold={hold_ms}ms requests/level={total}")
+    try:
+        for legacy in (False, True):
+            print("legacy (2 sessions/request)" if legacy else "shared (1 session/request)")
+            print(f"{'conc':>5} {'req/s':>8} {'p95ms':>8} {'wait_p95':>9} {'wait_max':>9} "
+                  f"{'peak':>5} {'ovf':>4} {'timeouts':>8} {'errors':>6}")
+            exhausted = None
+            for c in levels:
+                elapsed, p95, errors, s = await run_level(Session, c, total, hold_ms / 1000, legacy)
+                print(f"{c:>5} {total / elapsed:>8.1f} {p95:>8.1f} {s['wait_ms_p95']:>9.1f} {s['wait_ms_max']:>9.1f} "
+                      f"{s['peak_in_use']:>5} {s.get('overflow', 0):>4} {s['timeouts']:>8} {errors:>6}")
+                # 取连接等待超过持有时间的一半，说明请求已经在排队等连接
+                if exhausted is None and (s["wait_ms_p95"] > hold_ms / 2 or s["timeouts"]):
+                    exhausted = c
+            print(f"pool exhaustion starts at concurrency ≈ {exhausted}" if exhausted else "pool not exhausted")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args:
+        db_url = args[0]
+    else:
+        from app.database import DATABASE_URL as db_url
+    asyncio.run(main(
+        db_url,
+        int(args[1]) if len(args) > 1 else 10,
+        int(args[2]) if len(args) > 2 else 20,
+        float(args[3]) if len(args) > 3 else 50,
+        int(args[4]) if len(args) > 4 else 500,
+    ))
@@ -0,0 +1,80 @@
+# benchmarks/bench_export_rss.py
+"""导出峰值内存基准：一次性物化 vs 逐行流式（CSV / XLSX）
+
+每个 (行数, 模式) 在独立子进程中运行，读取子进程的 ru_maxrss 作为峰值 RSS。
+数据行为合成数据（与导出列一致），因此不需要数据库；数据库侧的 yield_per
+流式读取保证了行是分片到达的，这里用异步生成器模拟。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.bench_export_rss                 # 默认 100k 与 1M 行
+    python -m benchmarks.bench_export_rss 100000
+"""
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+MODES = ("materialize", "stream_csv", "stream_xlsx")
+
+
+def fake_row(i: int) -> list:
+    return [
+        f"EVAL-20250101000000-{i:08X}", "2024-2025", 1, "信息工程学院", "数据结构", "计科2201",
+        f"教师{i % 500}", f"听课人{i % 300}", "2025-03-01 10:00:00", 60 + i % 40, "良好",
+        '{"content": 20, "effect": 22, "method": 21, "teachingAttitude": 23}',
+        "讲解清晰", "互动偏少", "增加课堂提问", "2025-03-01 12:00:00",
+    ]
+
+
+async def fake_rows(n: int):
+    for i in range(n):
+        if i % 2000 == 0:
+            await asyncio.sleep(0)  # 模拟按分片到达
+        yield fake_row(i)
+
+
+async def run(mode: str, n: int) -> int:
+    from app.crud.export import EXPORT_HEADERS, iter_csv, iter_xlsx
+
+    total = 0
+    if mode == "materialize":
+        # 旧做法的等价物：先把全部行放进内存，再整体生成
+        rows = [r async for r in fake_rows(n)]
+        buf = io.StringIO()
+        w = csv.writer(buf)
+        w.writerow(EXPORT_HEADERS)
+        w.writerows(rows)
+        total = len(buf.getvalue().encode("utf-8"))
+    else:
+        body = iter_csv(fake_rows(n)) if mode == "stream_csv" else iter_xlsx(fake_rows(n))
+        async for chunk in body:
+            total += len(chunk)
+    return total
+
+
+def child(mode: str, n: int) -> None:
+    t0 = time.perf_counter()
+    size = asyncio.run(run(mode, n))
+    elapsed = time.perf_counter() - t0
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux 下单位为 KB
+    print(f"{n:>9} {mode:>12} peak_rss={peak_mb:8.1f}MB output={size / 1e6:8.1f}MB time={elapsed:6.1f}s")
+
+
+def main(sizes) -> None:
+    print(f"started {datetime.now():%Y-%m-%d %H:%M:%S}")
+    for n in sizes:
+        for mode in MODES:
+            subprocess.run([sys.executable, "-m", "benchmarks.bench_export_rss", "--child", mode, str(n)], check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], int(sys.argv[3]))
+    else:
+        main([int(a) for a in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,88 @@
+# benchmarks/bench_http_load.py
+"""HTTP 压测：对已启动的服务并发请求若干接口，统计吞吐与延迟分位
+
+用来比较 worker 数不同时的扩展性：分别以 WEB_CONCURRENCY=1 与 WEB_CONCURRENCY=<核数> 启动
+gunicorn -c gunicorn.conf.py main:app，对统计与列表接口各压一轮，吞吐应接近随 worker 数线性增长。
+
+需要登录的接口通过 BENCH_TOKEN 环境变量传入 Bearer token。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.bench_http_load <服务地址> [并发数] [每个接口压测秒数] [接口路径 ...]
+    例如 BENCH_TOKEN=xxx python -m benchmarks.bench_http_load http://127.0.0.1:8000 64 15
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/health",
+    "/api/v1/teaching-eval/eval/statistics/school",
+    "/api/v1/teaching-eval/eval/statistics/listen/me",
+    "/api/v1/teaching-eval/eval/list?page=1&page_size=20",
+    "/api/v1/teaching-eval/eval/pending-courses",
+]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+async def hammer(client: httpx.AsyncClient, path: str, concurrency: int, duration: float) -> None:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                resp = await client.get(path)
+                ok = resp.status_code < 500
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - t0)
+            else:
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    print(f"{path}\n    {len(latencies) / elapsed:8.1f} req/s  "
+          f"p50={percentile(latencies, 0.5) * 1000:.1f}ms  p95={percentile(latencies, 0.95) * 1000:.1f}ms  "
+          f"p99={percentile(latencies, 0.99) * 1000:.1f}ms  errors={errors}")
+
+
+async def main(base_url: str, concurrency: int, duration: float, paths: List[str]) -> None:
+    headers = {}
+    token = os.getenv("BENCH_TOKEN")
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+        print(f"{base_url} concurrency={concurrency} duration={duration}s")
+        for path in paths:
+            await hammer(client, path, concurrency, duration)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+    asyncio.run(main(
+        args[0],
+        int(args[1]) if len(args) > 1 else 64,
+        float(args[2]) if len(args) > 2 else 15,
+        args[3:] or DEFAULT_PATHS,
+    ))
@@ -0,0 +1,103 @@
+# benchmarks/bench_listen_statistics.py
+"""教师/听课人统计：取回整行在 Python 里算 vs MySQL 聚合（JSON_EXTRACT + GROUP BY 月份）
+
+在一个事务里临时造一名授课教师、一名听课人、一门课表和 N 条有效评教（默认 2000，带长文本），
+对 teacher_statistics / listen_statistics 两种模式各跑若干次取中位耗时，校验两种模式结果一致，最后整体回滚，不留数据。
+
+用法（在 backend 目录下，需要可连接的 MySQL，使用 .env 中的库）：
+    python -m benchmarks.bench_listen_statistics [评教条数] [重复次数]
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.crud.evaluation import DIMENSION_KEYS, evaluation_crud
+from app.database import AsyncSessionLocal, engine
+from app.models import TeachingEvaluation, Timetable, User
+
+PROBLEMS = ["板书不够清晰", "课堂互动较少", "节奏偏快", "案例陈旧", ""]
+SUGGESTIONS = ["增加课堂提问", "多用案例教学", "控制讲授节奏", "布置课前预习", ""]
+
+
+async def seed(db, n: int):
+    rnd = random.Random(7)
+    tag = uuid.uuid4().hex[:8]
+    teacher = User(user_on=f"bench_t_{tag}", user_name="压测授课教师", password="x")
+    listener = User(user_on=f"bench_l_{tag}", user_name="压测听课人", password="x")
+    db.add_all([teacher, listener])
+    await db.flush()
+    tt = Timetable(
+        teacher_id=teacher.id, class_name="压测班", course_name="压测课程", academic_year="2025-2026",
+        semester=1, weekday=1, period="第一大节", section_time="01-02", week_info="1,2,3", classroom="",
+    )
+    db.add(tt)
+    await db.flush()
+
+    start = datetime(2024, 1, 1, 8, 0)
+    filler = "很长的优点描述。" * 200
+    rows = []
+    for i in range(n):
+        dims = {k: rnd.randint(10, 25) for k in DIMENSION_KEYS}
+        rows.append({
+            "evaluation_no": f"BENCH-{tag}-{i}",
+            "timetable_id": tt.id,
+            "teach_teacher_id": teacher.id,
+            "listen_teacher_id": listener.id,
+            "total_score": sum(dims.values()),
+            "dimension_scores": dims,
+            "advantage_content": filler,
+            "problem_content": rnd.choice(PROBLEMS) or None,
+            "improve_suggestion": rnd.choice(SUGGESTIONS) or None,
+            "listen_date": start + timedelta(hours=i),
+            "submit_time": start + timedelta(hours=i),
+            "status": 1,
+            "is_delete": False,
+        })
+    for i in range(0, n, 500):
+        await db.execute(insert(TeachingEvaluation), rows[i:i + 500])
+    return teacher.id, listener.id
+
+
+async def timed(repeat: int, fn):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = await fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000, result
+
+
+async def main(n: int, repeat: int) -> None:
+    async with AsyncSessionLocal() as db:
+        try:
+            teacher_id, listener_id = await seed(db, n)
+            print(f"{n} evaluations, repeat={repeat}")
+            for name, call in (
+                ("teacher_statistics", lambda sql: evaluation_crud.teacher_statistics(db, teacher_id=teacher_id, sql_aggregate=sql)),
+                ("listen_statistics", lambda sql: evaluation_crud.listen_statistics(db, listen_teacher_id=listener_id, sql_aggregate=sql)),
+            ):
+                rows_ms, rows_out = await timed(repeat, lambda: call(False))
+                sql_ms, sql_out = await timed(repeat, lambda: call(True))
+                same = rows_out == sql_out
+                print(f"{name:>20}: rows={rows_ms:8.1f}ms  sql={sql_ms:8.1f}ms  x{rows_ms / sql_ms:5.1f}  same={same}")
+                if not same:
+                    for k in rows_out:
+                        if rows_out[k] != sql_out.get(k):
+                            print(f"    {k}: rows={rows_out[k]!r} sql={sql_out.get(k)!r}")
+        finally:
+            await db.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(main(int(args[0]) if args else 2000, int(args[1]) if len(args) > 1 else 5))
@@ -0,0 +1,72 @@
+# benchmarks/bench_password_pool.py
+"""登录高峰场景：bcrypt 在事件循环内同步执行 vs 放到有界线程池
+
+模拟 N 个并发登录（每个做一次 bcrypt 校验），同时运行一个每 10ms 醒来一次的“心跳”协程，
+用心跳的实际唤醒延迟衡量事件循环卡顿（其它请求被拖慢的程度）。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.bench_password_pool [并发登录数]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+import bcrypt
+
+from app.core.auth import verify_password, verify_password_async
+from app.core.password_pool import PasswordPoolBusy, password_pool
+
+TICK = 0.01
+
+
+async def heartbeat(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - t0 - TICK)
+
+
+async def login_sync(hashed: str) -> str:
+    # 旧写法：async 接口里直接同步调用 bcrypt
+    return "ok" if verify_password("secret", hashed) else "bad"
+
+
+async def login_pool(hashed: str) -> str:
+    try:
+        return "ok" if await verify_password_async("secret", hashed) else "bad"
+    except PasswordPoolBusy:
+        return "503"
+
+
+async def scenario(name: str, login, n: int, hashed: str) -> None:
+    stop = asyncio.Event()
+    lags: list = []
+    hb = asyncio.create_task(heartbeat(stop, lags))
+    await asyncio.sleep(TICK * 3)
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(login(hashed) for _ in range(n)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await hb
+    lags.sort()
+    p50 = lags[len(lags) // 2] * 1000 if lags else 0.0
+    p99 = lags[max(int(len(lags) * 0.99) - 1, 0)] * 1000 if lags else 0.0
+    print(
+        f"{name:>6}: {n} logins in {elapsed:.2f}s | loop lag p50={p50:.1f}ms "
+        f"p99={p99:.1f}ms max={lags[-1] * 1000 if lags else 0:.1f}ms | "
+        f"ok={results.count('ok')} 503={results.count('503')}"
+    )
+
+
+async def main(n: int) -> None:
+    hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt()).decode()
+    print(f"pool: workers={password_pool.max_workers} max_queue={password_pool.max_queue}")
+    await scenario("sync", login_sync, n, hashed)
+    await scenario("pool", login_pool, n, hashed)
+    print(password_pool.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
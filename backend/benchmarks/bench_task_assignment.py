@@ -0,0 +1,107 @@
+# benchmarks/bench_task_assignment.py
+"""督导任务分配：逐对查询 vs 集合化批量插入
+
+用一个只模拟网络往返延迟（每条语句 sleep RTT）的假会话执行两种写法，
+统计语句条数与耗时；行构造、语句构造都是真实代码。默认 30 名督导 x 400 门课表 = 12000 对。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.bench_task_assignment [督导数] [课表数] [RTT毫秒]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+from sqlalchemy import select
+
+from app.crud.task_assignment import (
+    bulk_insert_assignments,
+    build_assignment_rows,
+    existing_assignment_pairs,
+    find_non_supervisors,
+)
+from app.models import TeachingEvaluation
+
+
+class FakeResult:
+    rowcount = 0
+
+    def __init__(self, rowcount: int = 0) -> None:
+        self.rowcount = rowcount
+
+    def all(self):
+        return []
+
+    def scalars(self):
+        return self
+
+    def scalar_one_or_none(self):
+        return None
+
+
+class FakeSession:
+    def __init__(self, rtt: float) -> None:
+        self.rtt = rtt
+        self.statements = 0
+
+    async def execute(self, stmt):
+        self.statements += 1
+        await asyncio.sleep(self.rtt)
+        params = getattr(stmt, "_multi_values", None)
+        return FakeResult(len(params[0]) if params else 0)
+
+
+async def legacy(db: FakeSession, supervisor_ids, timetables, timetable_ids) -> int:
+    # 旧写法：每个督导查一次角色，每对 (督导, 课表) 查一次是否已存在；插入按一批 executemany 计
+    for _ in supervisor_ids:
+        await db.execute(select(TeachingEvaluation.id).limit(1))
+    created = 0
+    for sid in supervisor_ids:
+        for tid in timetable_ids:
+            res = await db.execute(
+                select(TeachingEvaluation.id).where(
+                    TeachingEvaluation.timetable_id == tid,
+                    TeachingEvaluation.listen_teacher_id == sid,
+                )
+            )
+            if res.scalar_one_or_none():
+                continue
+            created += 1
+    await db.execute(select(TeachingEvaluation.id).limit(1))
+    return created
+
+
+async def batched(db: FakeSession, supervisor_ids, timetables, timetable_ids):
+    await find_non_supervisors(db, supervisor_ids)
+    existing = await existing_assignment_pairs(db, supervisor_ids, timetable_ids)
+    rows = build_assignment_rows(supervisor_ids, timetables, timetable_ids, existing, note="bench")
+    return await bulk_insert_assignments(db, rows)
+
+
+async def main(n_sup: int, n_tt: int, rtt_ms: float) -> None:
+    supervisor_ids = list(range(1, n_sup + 1))
+    timetable_ids = list(range(1000, 1000 + n_tt))
+    timetables = {tid: (tid % 97 + 1, 1) for tid in timetable_ids}
+    print(f"{n_sup} supervisors x {n_tt} timetables = {n_sup * n_tt} pairs, rtt={rtt_ms}ms")
+
+    db = FakeSession(rtt_ms / 1000)
+    t0 = time.perf_counter()
+    created = await legacy(db, supervisor_ids, timetables, timetable_ids)
+    print(f" legacy: {created} rows, {db.statements} statements, {time.perf_counter() - t0:.2f}s")
+
+    db = FakeSession(rtt_ms / 1000)
+    t0 = time.perf_counter()
+    created, chunks = await batched(db, supervisor_ids, timetables, timetable_ids)
+    print(f"batched: {created} rows, {db.statements} statements, {time.perf_counter() - t0:.2f}s")
+    for c in chunks[:3]:
+        print("   ", c)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(main(
+        int(args[0]) if len(args) > 0 else 30,
+        int(args[1]) if len(args) > 1 else 400,
+        float(args[2]) if len(args) > 2 else 0.5,
+    ))
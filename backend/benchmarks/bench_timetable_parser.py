@@ -0,0 +1,91 @@
+# benchmarks/bench_timetable_parser.py
+"""课表页面解析：BeautifulSoup 整树 + 逐格遍历映射表 vs 流式解析 + Aho-Corasick
+
+用 kbtable_fixture 生成与教务系统结构一致的大页面（默认 3000 个班级 ≈ 一整学期全校课表），落盘后按文件分块读取，
+分别统计总耗时、产出第一条记录的耗时与 tracemalloc 峰值内存，并校验各实现输出一致。
+旧实现（legacy）按改动前 JWXTSpider.parse_timetable_html 的写法原样保留在本文件中。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.bench_timetable_parser [班级数]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from app.crawl.crawl import JWXTSpider
+from app.crawl.parser import TimetableParser, available_backend
+from benchmarks.kbtable_fixture import make_kbtable_html
+
+
+def legacy_parse(spider: JWXTSpider, path: str):
+    from bs4 import BeautifulSoup
+
+    with open(path, "r", encoding="utf-8") as f:
+        html_content = f.read()
+    soup = BeautifulSoup(html_content, "html.parser")
+    table = soup.find("table", {"id": "kbtable"})
+    header_rows = table.find_all("tr")[:2]
+    days = []
+    for td in header_rows[0].find_all("td")[1:]:
+        days.extend([td.get_text(strip=True)] * int(td.get("colspan", 1)))
+    sections = [td.get_text(strip=True) for td in header_rows[1].find_all("td")[1:]]
+    for row in table.find_all("tr")[2:]:
+        cells = row.find_all("td")
+        class_name = cells[0].get_text(strip=True)
+        for i, cell in enumerate(cells[1:]):
+            content = cell.get_text(separator="\n", strip=True)
+            if content:
+                yield {
+                    "班级": class_name,
+                    "学院": spider.identify_college(class_name),
+                    "专业": spider.identify_major(class_name),
+                    "年级": spider.identify_grade(class_name),
+                    "星期": days[i],
+                    "节次": spider.section_map.get(sections[i], sections[i]),
+                    **spider.parse_course_info(content),
+                }
+
+
+def measure(name: str, records):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    first = None
+    out = []
+    for r in records:
+        if first is None:
+            first = time.perf_counter() - t0
+        out.append(r)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:>8}: {elapsed * 1000:8.1f}ms  first={first * 1000 if first is not None else 0:7.1f}ms  "
+          f"peak={peak / 1024 / 1024:6.1f}MB  records={len(out)}")
+    return out
+
+
+def main(n_classes: int) -> None:
+    html = make_kbtable_html(n_classes)
+    fd, path = tempfile.mkstemp(suffix=".html")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(html)
+    print(f"{n_classes} classes, page={len(html.encode('utf-8')) / 1024 / 1024:.1f}MB")
+
+    spider = JWXTSpider()
+    try:
+        baseline = measure("legacy", legacy_parse(spider, path))
+        backends = ["stdlib"] + (["lxml"] if available_backend() == "lxml" else [])
+        for backend in backends:
+            parser = TimetableParser.from_spider(spider, backend=backend)
+            out = measure(backend, parser.iter_file(path))
+            assert out == baseline, f"{backend} 输出与旧实现不一致"
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 3000)
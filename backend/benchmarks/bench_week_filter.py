@@ -0,0 +1,108 @@
+# benchmarks/bench_week_filter.py
+"""周次筛选：week_info LIKE 边界匹配 vs week_mask 位图
+
+在内存 SQLite 里造两个学年的课表（默认 40 个学院 x 每学院 600 门，周次为 1-16/1-8/9-16/单双周等常见排布），
+建与 MySQL 相同的 idx_timetable_term_week 索引，对每一周 x 每个星期跑「待评课程」的典型条件，
+比较两种写法的耗时与查询计划。SQLite 的计划与 MySQL 不完全一样，看相对差距即可。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.bench_week_filter [学院数] [每学院课表数] [重复轮数]
+"""
+from __future__ import annotations
+
+import random
+import sqlite3
+import sys
+import time
+
+from app.models import week_bit, week_mask_of
+
+WEEK_PATTERNS = [
+    list(range(1, 17)),
+    list(range(1, 9)),
+    list(range(9, 17)),
+    list(range(1, 17, 2)),
+    list(range(2, 17, 2)),
+    list(range(3, 15)),
+    [5],
+]
+
+YEARS = ("2024-2025", "2025-2026")
+
+LIKE_SQL = """
+SELECT count(*) FROM timetable
+WHERE academic_year = ? AND semester = ? AND weekday = ? AND college_id IN ({cids}) AND is_delete = 0
+  AND (week_info = ? OR week_info LIKE ? OR week_info LIKE ? OR week_info LIKE ?)
+"""
+
+MASK_SQL = """
+SELECT count(*) FROM timetable
+WHERE academic_year = ? AND semester = ? AND weekday = ? AND college_id IN ({cids}) AND is_delete = 0
+  AND (week_mask & ?) != 0
+"""
+
+
+def build(n_college: int, per_college: int) -> sqlite3.Connection:
+    rnd = random.Random(42)
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE timetable (id INTEGER PRIMARY KEY, academic_year TEXT, semester INT, weekday INT, college_id INT,"
+        " week_info TEXT, week_mask INT, is_delete INT)"
+    )
+    rows = []
+    for cid in range(1, n_college + 1):
+        for _ in range(per_college):
+            weeks = ",".join(str(w) for w in rnd.choice(WEEK_PATTERNS))
+            rows.append((rnd.choice(YEARS), rnd.choice((1, 2)), rnd.randint(1, 7), cid, weeks, week_mask_of(weeks), 0))
+    conn.executemany(
+        "INSERT INTO timetable (academic_year, semester, weekday, college_id, week_info, week_mask, is_delete)"
+        " VALUES (?,?,?,?,?,?,?)",
+        rows,
+    )
+    conn.execute(
+        "CREATE INDEX idx_timetable_term_week ON timetable (academic_year, semester, college_id, weekday, week_mask)"
+    )
+    conn.execute("ANALYZE")
+    return conn
+
+
+def run(conn: sqlite3.Connection, sql: str, params_for, rounds: int, cids):
+    total = 0
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for week in range(1, 17):
+            for weekday in range(1, 8):
+                total += conn.execute(sql.format(cids=",".join("?" * len(cids))), (YEARS[0], 1, weekday, *cids, *params_for(week))).fetchone()[0]
+    return total, time.perf_counter() - t0
+
+
+def main(n_college: int, per_college: int, rounds: int) -> None:
+    conn = build(n_college, per_college)
+    cids = list(range(1, min(n_college, 5) + 1))
+    print(f"{n_college * per_college} timetables, {len(cids)} colleges in scope, {rounds} rounds x 16 weeks x 7 weekdays")
+
+    def like_params(week):
+        w = str(week)
+        return (w, f"{w},%", f"%,{w},%", f"%,{w}")
+
+    def mask_params(week):
+        return (week_bit(week),)
+
+    like_total, like_s = run(conn, LIKE_SQL, like_params, rounds, cids)
+    mask_total, mask_s = run(conn, MASK_SQL, mask_params, rounds, cids)
+    assert like_total == mask_total, (like_total, mask_total)
+    print(f"  like: {like_s * 1000:8.1f}ms  rows={like_total}")
+    print(f"  mask: {mask_s * 1000:8.1f}ms  rows={mask_total}  ({like_s / mask_s:.1f}x)")
+
+    for name, sql, params in (("like", LIKE_SQL, like_params(3)), ("mask", MASK_SQL, mask_params(3))):
+        plan = conn.execute("EXPLAIN QUERY PLAN " + sql.format(cids=",".join("?" * len(cids))), (YEARS[0], 1, 1, *cids, *params)).fetchall()
+        print(f"  plan[{name}]:", "; ".join(r[-1] for r in plan))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 40,
+        int(args[1]) if len(args) > 1 else 600,
+        int(args[2]) if len(args) > 2 else 3,
+    )
@@ -0,0 +1,147 @@
+# benchmarks/kbtable_fixture.py
+"""生成与教务系统 kbtable 页面结构一致的课表 HTML，以及回放该页面的本地桩服务器，供抓取/解析基准与测试使用
+
+页面结构（与 JWXTSpider.parse_timetable_text 的约定一致）：
+- 第 1 行：表头「班级」+ 星期一..星期日，每天 colspan=6
+- 第 2 行：每天 6 个节次代码 0102..1112
+- 之后每行一个班级：首格班级名，其后 42 格课程（课程名<br>教师<br>班级代码(周次)(节次)<br>教室）
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+DAYS = ["星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日"]
+SECTIONS = ["0102", "0304", "0506", "0708", "0910", "1112"]
+CLASS_PREFIXES = ["计算机", "电信", "工商", "会计", "土木（工民建）", "视传", "英语", "人工智能", "大数据技术", "学前"]
+COURSES = ["高等数学", "大学英语", "数据结构", "操作系统", "管理学原理", "工程制图", "设计基础", "思想道德与法治"]
+WEEKS = ["1-16", "1-8", "9-16", "1-15", "2-16", "3-14"]
+
+
+def make_kbtable_html(n_classes: int = 300, *, fill: float = 0.35, seed: int = 7) -> str:
+    rnd = random.Random(seed)
+    parts: List[str] = ['<html><head><meta charset="utf-8"><title>课表</title></head><body>']
+    parts.append('<table id="kbtable" border="1">')
+    parts.append("<tr><td>班级</td>" + "".join(f'<td colspan="6">{d}</td>' for d in DAYS) + "</tr>")
+    parts.append("<tr><td></td>" + "".join(f"<td>{s}</td>" for _ in DAYS for s in SECTIONS) + "</tr>")
+    for i in range(n_classes):
+        class_name = f"{23 + i % 3}{rnd.choice(CLASS_PREFIXES)}{i % 4 + 1}班"
+        cells = [f"<td>{class_name}</td>"]
+        for d in range(len(DAYS)):
+            for s, code in enumerate(SECTIONS):
+                if d < 5 and rnd.random() < fill:
+                    cells.append(
+                        "<td>"
+                        f"{rnd.choice(COURSES)}<br/>"
+                        f"教师{rnd.randint(1, 400):03d}<br/>"
+                        f"C{i:04d}({rnd.choice(WEEKS)}周)({code[:2]}-{code[2:]}节)<br/>"
+                        f"{rnd.choice('ABCD')}{rnd.randint(101, 520)}"
+                        "</td>"
+                    )
+                else:
+                    cells.append("<td>&nbsp;</td>")
+        parts.append("<tr>" + "".join(cells) + "</tr>")
+    parts.append("</table></body></html>")
+    return "\n".join(parts)
+
+
+class KbtableStub:
+    """本地桩服务器（标准库 ThreadingHTTPServer），实现教务系统用到的四个接口：
+
+    加密参数、验证码、登录（下发会话 cookie）、课表查询（固定延迟后返回 page；未登录返回短的登录页，
+    用来触发重新登录；前 fail_queries 次返回 500，用来模拟中断）。
+
+    记录每个请求的到达时间（arrivals，monotonic）、课表查询次数（queries）与同时处理中的课表查询峰值（max_inflight）。
+
+        with KbtableStub(make_kbtable_html(60), latency=0.2) as stub:
+            ... base_url=stub.base_url ...
+    """
+
+    def __init__(self, page: str, *, latency: float = 0.0, fail_queries: int = 0) -> None:
+        self.page = page.encode("utf-8")
+        self.latency = latency
+        self.fail_queries = fail_queries
+        self.arrivals: List[float] = []
+        self.queries = 0
+        self.inflight = 0
+        self.max_inflight = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self) -> "KbtableStub":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:  # 静默
+                pass
+
+            def _send(self, body: bytes, status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+                self.send_response(status)
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                stub._arrive()
+                if self.path.startswith("/Logon.do"):
+                    self._send(b"abcdefghijklmnopqrstuvwxyz0123456789#1111111111111111111111")
+                elif self.path.startswith("/verifycode.servlet"):
+                    self._send(b"\x89PNG-fake")
+                else:
+                    self._send(b"not found", 404)
+
+            def do_POST(self) -> None:
+                stub._arrive()
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if self.path.startswith("/Logon.do"):
+                    self._send(b"<html>ok</html>", headers={"Set-Cookie": "JSESSIONID=stub; Path=/"})
+                elif self.path.startswith("/zcbqueryAction.do"):
+                    fail = stub._begin_query()
+                    try:
+                        time.sleep(stub.latency)
+                    finally:
+                        stub._end_query()
+                    if fail:
+                        self._send(b"busy", 500)
+                    elif "JSESSIONID=stub" not in (self.headers.get("Cookie") or ""):
+                        self._send(b"<html>login</html>")
+                    else:
+                        self._send(stub.page, headers={"Content-Type": "text/html; charset=utf-8"})
+                else:
+                    self._send(b"not found", 404)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _arrive(self) -> None:
+        with self._lock:
+            self.arrivals.append(time.monotonic())
+
+    def _begin_query(self) -> bool:
+        with self._lock:
+            self.queries += 1
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+            fail = self.fail_queries > 0
+            if fail:
+                self.fail_queries -= 1
+            return fail
+
+    def _end_query(self) -> None:
+        with self._lock:
+            self.inflight -= 1
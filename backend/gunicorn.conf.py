@@ -0,0 +1,48 @@
+# gunicorn.conf.py
+"""生产启动配置：gunicorn 管理多个 uvicorn worker 进程
+
+    gunicorn -c gunicorn.conf.py main:app
+
+- worker 数默认等于 CPU 核数（WEB_CONCURRENCY 覆盖）。每个 worker 有自己的事件循环和数据库连接池，
+  总连接数约为 worker 数 × (DB_POOL_SIZE + DB_MAX_OVERFLOW)，不要超过 MySQL 的 max_connections
+- preload_app：主进程先导入应用再 fork，worker 启动快并共享只读内存页；
+  主进程不建立数据库连接（startup 事件在各 worker 里执行），post_fork 里再丢弃继承来的连接池以防万一
+- 平滑重启：kill -HUP <主进程>，逐个替换 worker，正在处理的请求最多等 graceful_timeout 秒。
+  开启 preload 时 HUP 不会重新加载代码，发布新代码用 USR2 起新主进程后再 QUIT 旧主进程，或直接重启容器
+- max_requests 让 worker 处理一定请求数后自动替换，避免长期运行的内存膨胀
+- 各 worker 的进程内缓存通过 app/core/coherence.py 互相广播失效
+"""
+import glob
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+errorlog = "-"
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+
+
+def on_starting(server):
+    # 清理上次运行残留的缓存失效广播套接字
+    from app.core.config import COHERENCE_DIR
+    for path in glob.glob(os.path.join(COHERENCE_DIR, "*.sock")):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def post_fork(server, worker):
+    # preload 时引擎在主进程里创建：子进程丢弃继承的连接池，但不关闭其中的连接（属于父进程）
+    try:
+        from app.database import engine
+    except Exception:
+        return
+    engine.sync_engine.dispose(close=False)
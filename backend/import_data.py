@@ -5,8 +5,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy import select, insert, update, delete
 from app.database import DATABASE_URL
 from app.models import (
-    College, ResearchRoom, Major, Clazz, User, TeacherProfile,
-    Timetable, Role, UserRole
+    College, ResearchRoom, User, TeacherProfile, Role, UserRole
 )
 from app.core.auth import get_password_hash
 from datetime import datetime
@@ -15,17 +14,6 @@ from datetime import datetime
 engine = create_async_engine(DATABASE_URL, echo=True)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
-# 星期映射
-day_of_week_mapping = {
-    "星期一": 1,
-    "星期二": 2,
-    "星期三": 3,
-    "星期四": 4,
-    "星期五": 5,
-    "星期六": 6,
-    "星期日": 7
-}
-
 async def init_db():
     """初始化数据库连接"""
     async with engine.begin() as conn:
@@ -216,134 +204,26 @@ async def import_teachers():
             print(f"导入教师数据时出错: {e}")
 
 async def import_timetable():
-    """导入课表数据"""
+    """导入课表数据（批量入库，见 app.crawl.ingest）"""
+    from app.crawl.ingest import ingest_timetable_file
+
     async with AsyncSessionLocal() as db:
         try:
-            # 读取教师信息数据，创建姓名到教工号的映射
-            with open('data/teacher_info.json', 'r', encoding='utf-8') as f:
-                teacher_info_data = json.load(f)
-            
-            # 创建姓名到教工号的映射
-            name_to_employee_id = {}
-            for info in teacher_info_data:
-                name_to_employee_id[info['姓名']] = info['教工号']
-            
-            # 读取课表数据
-            with open('data/2025-2026-1.json', 'r', encoding='utf-8') as f:
-                timetable_data = json.load(f)
-            
             # 学期信息：2025-2026学年秋季学期
-            academic_year = "2025-2026"
-            semester = 2
-            
-            for course_item in timetable_data:
-                # 查找学院
-                stmt = select(College).where(College.college_name == course_item['学院'])
-                result = await db.execute(stmt)
-                college = result.scalar_one_or_none()
-                
-                if not college:
-                    continue
-                
-                # 查找教师
-                teacher_name = course_item['teacher']
-                teacher = None
-                
-                # 首先通过姓名获取教工号，然后使用教工号精确查找
-                employee_id = name_to_employee_id.get(teacher_name)
-                if employee_id:
-                    stmt = select(User).where(User.user_on == employee_id)
-                    result = await db.execute(stmt)
-                    teacher = result.scalar_one_or_none()
-                
-                # 如果教工号查找失败，才尝试通过姓名查找，处理可能的重名情况
-                if not teacher:
-                    stmt = select(User).where(User.user_name == teacher_name)
-                    result = await db.execute(stmt)
-                    users = result.scalars().all()
-                    if len(users) == 1:
-                        teacher = users[0]
-                    elif len(users) > 1:
-                        print(f"警告: 发现多个重名教师 {teacher_name}，请使用教工号查询，跳过导入此课表")
-                        continue
-                
-                if not teacher:
-                    print(f"警告: 未找到教师 {teacher_name}，跳过导入此课表")
-                    continue
-                
-                # 查找或创建专业
-                stmt = select(Major).where(
-                    Major.major_name == course_item['专业'],
-                    Major.college_id == college.id
-                )
-                result = await db.execute(stmt)
-                major = result.scalar_one_or_none()
-                
-                if not major:
-                    major = Major(
-                        major_name=course_item['专业'],
-                        college_id=college.id
-                    )
-                    db.add(major)
-                    await db.flush()
-                
-                # 查找或创建班级
-                stmt = select(Clazz).where(
-                    Clazz.class_name == course_item['班级'],
-                    Clazz.major_id == major.id
-                )
-                result = await db.execute(stmt)
-                clazz = result.scalar_one_or_none()
-                
-                if not clazz:
-                    clazz = Clazz(
-                        class_name=course_item['班级'],
-                        grade=course_item['年级'],
-                        major_id=major.id
-                    )
-                    db.add(clazz)
-                    await db.flush()
-                
-                # 检查课表是否已存在
-                stmt = select(Timetable).where(
-                    Timetable.academic_year == academic_year,
-                    Timetable.semester == semester,
-                    Timetable.teacher_id == teacher.id,
-                    Timetable.class_name == course_item['班级'],
-                    Timetable.course_name == course_item['course'],
-                    Timetable.weekday == day_of_week_mapping[course_item['星期']],
-                    Timetable.period == course_item['节次'],
-                    Timetable.section_time == course_item['section_time'],
-                    Timetable.week_info == course_item['week_info'],
-                    Timetable.classroom == course_item['classroom']
-                )
-                result = await db.execute(stmt)
-                existing_timetable = result.scalar_one_or_none()
-                
-                if not existing_timetable:
-                    # 创建课表
-                    timetable = Timetable(
-                        college_id=college.id,
-                        teacher_id=teacher.id,
-                        class_id=clazz.id,
-                        class_name=course_item['班级'],
-                        course_code=course_item['class_code'],
-                        course_name=course_item['course'],
-                        academic_year=academic_year,
-                        semester=semester,
-                        weekday=day_of_week_mapping[course_item['星期']],
-                        weekday_text=course_item['星期'],
-                        period=course_item['节次'],
-                        section_time=course_item['section_time'],
-                        week_info=course_item['week_info'],
-                        classroom=course_item['classroom']
-                    )
-                    db.add(timetable)
-            
-            await db.commit()
-            print("课表数据导入完成")
+            report = await ingest_timetable_file(
+                db,
+                'data/2025-2026-1.json',
+                academic_year="2025-2026",
+                semester=2,
+                teacher_info_path='data/teacher_info.json',
+            )
+            for reason, n in report.skip_reasons.items():
+                print(f"警告: 跳过 {n} 条课表（{reason}）")
+            print(
+                f"课表数据导入完成: 新增 {report.inserted}，更新 {report.updated}，跳过 {report.skipped}，"
+                f"{report.rows_per_second:.0f} 行/秒"
+            )
         except Exception as e:
-            await db.rollback()
             print(f"导入课表数据时出错: {e}")
 
 async def main():
@@ -21,6 +21,7 @@ app = FastAPI(
 
 # 导入认证中间件
 from app.middleware.auth_middleware import AuthMiddleware
+from app.middleware.audit_middleware import AuditMiddleware
 
 # 配置 CORS
 app.add_middleware(
@@ -33,6 +34,8 @@ app.add_middleware(
 
 # 添加认证中间件
 app.add_middleware(AuthMiddleware)
+# 请求日志中间件：在认证外层，401 也会记录
+app.add_middleware(AuditMiddleware)
 
 app.add_exception_handler(HTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -91,6 +94,51 @@ async def _bootstrap_on_startup():
         return
 
 
+@app.on_event("startup")
+async def _start_coherence_bus():
+    # 多 worker 部署时，各 worker 之间广播缓存失效
+    from app.core.coherence import coherence_bus
+    try:
+        coherence_bus.start()
+    except OSError:
+        # 套接字目录不可写等：退化为仅靠 TTL
+        return
+
+
+@app.on_event("startup")
+async def _replay_audit_spill():
+    # 上次数据库不可用时落盘的日志，启动时回放入库
+    from app.crud.audit_sink import audit_sink
+    try:
+        await audit_sink.replay_spill()
+    except Exception:
+        return
+
+
+@app.on_event("shutdown")
+async def _shutdown_password_pool():
+    from app.core.password_pool import password_pool
+    password_pool.shutdown()
+
+
+@app.on_event("shutdown")
+async def _shutdown_export_jobs():
+    from app.core.jobs import export_jobs
+    await export_jobs.shutdown()
+
+
+@app.on_event("shutdown")
+async def _stop_coherence_bus():
+    from app.core.coherence import coherence_bus
+    coherence_bus.stop()
+
+
+@app.on_event("shutdown")
+async def _shutdown_audit_sink():
+    from app.crud.audit_sink import audit_sink
+    await audit_sink.shutdown()
+
+
 # 健康检查接口
 @app.get("/health")
 def health_check():
@@ -0,0 +1,61 @@
+# tests/conftest.py
+"""测试公共夹具：内存 SQLite（aiosqlite）上建评教相关表
+
+app.core.config 导入时读取 MySQL 连接参数并创建引擎（不会真正连库）、读取 JWT 密钥，这里先给出占位值。
+只用到可移植 SQL 的查询才在 SQLite 上测；依赖 MySQL 的用例见各文件里的 skip 条件。
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+
+for _key, _value in {
+    "MYSQL_USER": "test",
+    "MYSQL_PASSWORD": "test",
+    "MYSQL_HOST": "127.0.0.1",
+    "MYSQL_PORT": "3306",
+    "MYSQL_DB": "test",
+    "COHERENCE_ENABLED": "false",
+    "SECRET_KEY": "test-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+import pytest
+from sqlalchemy import BigInteger
+from sqlalchemy.dialects.mysql import TINYINT
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from app.models import Base, College, LoginLog, OperationLog, TeachingEvaluation, Timetable, User
+
+
+# SQLite 只有 INTEGER PRIMARY KEY 会自增；TINYINT 为 MySQL 专有类型
+@compiles(BigInteger, "sqlite")
+@compiles(TINYINT, "sqlite")
+def _integer_on_sqlite(element, compiler, **kw):
+    return "INTEGER"
+
+
+TABLES = [College.__table__, User.__table__, Timetable.__table__, TeachingEvaluation.__table__, OperationLog.__table__, LoginLog.__table__]
+
+
+@pytest.fixture
+def run_in_db():
+    """run_in_db(fn)：新建内存库并建表，在一个会话里执行 await fn(db) 并返回其结果"""
+
+    def run(fn):
+        async def main():
+            engine = create_async_engine("sqlite+aiosqlite://")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all, tables=TABLES)
+            try:
+                async with AsyncSession(engine, expire_on_commit=False) as db:
+                    return await fn(db)
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,57 @@
+# tests/test_aggregation.py
+"""聚合内核与逐条朴素计算结果一致（含分数段边界、非数值与非 dict 行）"""
+from __future__ import annotations
+
+import random
+
+from app.crud.aggregation import LEVEL5_BOUNDS, LEVEL5_LABELS, aggregate_dimensions, classify, summarize
+
+
+def naive_histogram(values, bounds, labels):
+    hist = {lb: 0 for lb in labels}
+    for v in values:
+        for b, lb in zip(sorted(bounds, reverse=True), labels):
+            if v >= b:
+                hist[lb] += 1
+                break
+        else:
+            hist[labels[-1]] += 1
+    return hist
+
+
+def test_summarize_matches_naive():
+    rnd = random.Random(3)
+    values = [rnd.choice([59, 60, 74, 75, 89, 90, 100, 0, 60.5]) for _ in range(500)] + [None, "90", True]
+    numeric = [v for v in values if type(v) in (int, float)]
+    s = summarize(values)
+    assert s.count == len(numeric)
+    assert s.sum == sum(numeric)
+    assert (s.min, s.max) == (min(numeric), max(numeric))
+    assert s.histogram == naive_histogram(numeric, (90, 75, 60), ("优秀", "良好", "合格", "不合格"))
+    assert sum(s.histogram.values()) == s.count
+    assert summarize(values, bounds=LEVEL5_BOUNDS, labels=LEVEL5_LABELS).histogram == \
+        naive_histogram(numeric, LEVEL5_BOUNDS, LEVEL5_LABELS)
+    assert classify([90, 89.9, 75, 60, 59]) == ["优秀", "良好", "良好", "合格", "不合格"]
+
+
+def test_summarize_empty():
+    s = summarize([None, "x"])
+    assert s.count == 0 and s.mean is None and s.min is None
+    assert s.histogram == {"优秀": 0, "良好": 0, "合格": 0, "不合格": 0}
+
+
+def test_aggregate_dimensions_matches_naive():
+    rows = [
+        {"a": 10, "b": 20.5},
+        {"a": 30, "b": "x", "c": True},
+        None,
+        [1, 2],
+        {"b": 9},
+        {"a": 95},
+    ]
+    cols = aggregate_dimensions(rows)
+    assert list(cols) == ["a", "b", "c"]
+    assert (cols["a"].count, cols["a"].sum, cols["a"].min, cols["a"].max) == (3, 135.0, 10.0, 95.0)
+    assert cols["a"].histogram == {"优秀": 1, "良好": 0, "合格": 0, "不合格": 2}
+    assert (cols["b"].count, cols["b"].sum) == (2, 29.5)
+    assert cols["c"].count == 0 and cols["c"].mean is None
@@ -0,0 +1,117 @@
+# tests/test_async_crawl.py
+"""并发抓取：本地桩服务器回放 kbtable 页面，检查并发上限、令牌桶限速与断点续抓"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("bs4")
+
+from app.crawl.async_crawl import AsyncJWXTCrawler, TokenBucket, build_tasks
+from benchmarks.kbtable_fixture import KbtableStub, make_kbtable_html
+
+PAGE = make_kbtable_html(20)
+TASKS = build_tasks(["2024-2025-1", "2024-2025-2"], [{"skzy": f"Z{j}"} for j in range(4)])
+
+
+async def fixed_captcha(_: bytes) -> str:
+    return "AB12"
+
+
+async def crawl(stub, out_dir, *, concurrency=4, rate=0.0, retries=3, tasks=TASKS):
+    async with AsyncJWXTCrawler(
+        username="stub",
+        password="stub",
+        out_dir=str(out_dir),
+        base_url=stub.base_url,
+        concurrency=concurrency,
+        rate=rate,
+        retries=retries,
+        captcha_solver=fixed_captcha,
+    ) as crawler:
+        return await crawler.crawl(tasks)
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_concurrency_limit(tmp_path, concurrency):
+    with KbtableStub(PAGE, latency=0.1) as stub:
+        report = asyncio.run(crawl(stub, tmp_path, concurrency=concurrency))
+    assert len(report["done"]) == len(TASKS) and not report["failed"]
+    assert stub.queries == len(TASKS)
+    # 同时在服务器上处理的查询不超过并发数，且确实并发到了上限
+    assert stub.max_inflight == concurrency
+
+
+def test_token_bucket_rate():
+    rate, burst, n = 20.0, 3, 12
+
+    async def main():
+        bucket = TokenBucket(rate, burst=burst)
+        loop = asyncio.get_running_loop()
+        times = []
+        for _ in range(n):
+            await bucket.acquire()
+            times.append(loop.time())
+        return times
+
+    times = asyncio.run(main())
+    # 突发的 burst 个立即放行，之后每个间隔约 1/rate
+    assert times[burst - 1] - times[0] < 0.05
+    assert times[-1] - times[0] >= (n - burst) / rate * 0.9
+
+
+def test_crawl_respects_rate(tmp_path):
+    rate, concurrency = 25.0, 4
+    with KbtableStub(PAGE) as stub:
+        report = asyncio.run(crawl(stub, tmp_path, concurrency=concurrency, rate=rate))
+    assert len(report["done"]) == len(TASKS)
+    arrivals = sorted(stub.arrivals)
+    assert len(arrivals) == report["requests"]
+    # 任意窗口内到达的请求数不超过 突发 + 窗口长度 * rate
+    for i, start in enumerate(arrivals):
+        for j in range(i, len(arrivals)):
+            window = arrivals[j] - start
+            assert j - i + 1 <= concurrency + window * rate + 1, (i, j, window)
+    assert arrivals[-1] - arrivals[0] >= (len(arrivals) - concurrency) / rate * 0.9
+
+
+def test_resume_after_failed_tasks(tmp_path):
+    with KbtableStub(PAGE, fail_queries=len(TASKS) // 2) as stub:
+        first = asyncio.run(crawl(stub, tmp_path, retries=1))
+        assert len(first["failed"]) == len(TASKS) // 2
+        assert len(first["done"]) == len(TASKS) - len(TASKS) // 2
+
+        queries = stub.queries
+        second = asyncio.run(crawl(stub, tmp_path))
+    # 第二轮只补失败的任务
+    assert second["skipped"] == len(first["done"])
+    assert set(second["done"]) == set(first["failed"])
+    assert stub.queries - queries == len(first["failed"])
+
+
+def test_resume_after_interrupted_crawl(tmp_path):
+    with KbtableStub(PAGE, latency=0.1) as stub:
+        async def interrupted():
+            try:
+                await asyncio.wait_for(crawl(stub, tmp_path, concurrency=1), 0.45)
+            except asyncio.TimeoutError:
+                pass
+
+        asyncio.run(interrupted())
+        with open(tmp_path / "checkpoint.json", encoding="utf-8") as f:
+            done = json.load(f)["done"]
+        assert 0 < len(done) < len(TASKS)
+
+        queries = stub.queries
+        report = asyncio.run(crawl(stub, tmp_path))
+
+    assert report["skipped"] == len(done)
+    assert len(report["done"]) == len(TASKS) - len(done) and not report["failed"]
+    assert stub.queries - queries == len(TASKS) - len(done)
+    for task in TASKS:
+        assert os.path.exists(tmp_path / f"{task.key}.json")
+        assert not os.path.exists(tmp_path / f"{task.key}.json.part")
@@ -0,0 +1,61 @@
+# tests/test_audit_sink.py
+"""溢出文件回放：多个 worker 同时启动回放时，每条溢出日志只入库一次"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.audit_sink import AuditSink
+from app.crud.logs import login_log_row
+from app.models import LoginLog
+
+
+def write_spill(path, n, prefix):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            row = login_log_row(user_id=i, user_name=f"{prefix}{i}", login_type="password", login_status=1)
+            f.write(json.dumps({"t": "login_log", "r": row}, ensure_ascii=False, default=str) + "\n")
+
+
+def make_sink(db, spill_path):
+    return AuditSink(
+        flush_interval_ms=10,
+        batch_size=7,
+        max_queue=100,
+        flush_timeout=5,
+        spill_path=str(spill_path),
+        session_factory=lambda: AsyncSession(db.bind),
+    )
+
+
+def test_concurrent_replay_inserts_each_log_once(run_in_db, tmp_path):
+    spill = tmp_path / "audit_spill.jsonl"
+    write_spill(spill, 5, "legacy")  # 按 pid 分文件之前的旧文件
+    write_spill(tmp_path / "audit_spill.101.jsonl", 20, "a")
+    write_spill(tmp_path / "audit_spill.102.jsonl", 13, "b")
+    write_spill(tmp_path / "audit_spill.jsonl.99.replay", 3, "crashed")  # 上次回放中途崩溃留下的
+
+    async def check(db):
+        workers = [make_sink(db, spill) for _ in range(3)]
+        done = await asyncio.gather(*(w.replay_spill() for w in workers))
+        total = (await db.execute(select(func.count()).select_from(LoginLog))).scalar_one()
+        return sorted(done), total
+
+    done, total = run_in_db(check)
+    assert done == [0, 0, 41]
+    assert total == 41
+    assert sorted(os.listdir(tmp_path)) == ["audit_spill.jsonl.lock"]
+
+
+def test_spill_goes_to_per_process_file(run_in_db, tmp_path):
+    async def check(db):
+        sink = make_sink(db, tmp_path / "audit_spill.jsonl")
+        sink._spill([("login_log", login_log_row(user_id=1, user_name="x", login_type="password", login_status=0))])
+        return sink.spilled
+
+    assert run_in_db(check) == 1
+    assert os.listdir(tmp_path) == [f"audit_spill.{os.getpid()}.jsonl"]
@@ -0,0 +1,106 @@
+# tests/test_college_listen_counts.py
+"""college_listen_counts（一条分组查询）与原来逐个教师 COUNT 的结果一致"""
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.crud.stats import college_listen_counts
+from app.models import TeachingEvaluation, Timetable, User
+
+COLLEGE_ID = 1
+
+
+async def legacy_counts(db, *, college_id, academic_year=None, semester=None):
+    """改动前 get_college_listen_statistics 里的写法：每位教师各查一次 COUNT"""
+    teachers = (await db.execute(
+        select(User.id, User.user_name).where(User.college_id == college_id, User.is_delete == False)  # noqa: E712
+    )).all()
+    result = []
+    for teacher_id, teacher_name in teachers:
+        eval_stmt = select(func.count(TeachingEvaluation.id)).where(
+            TeachingEvaluation.listen_teacher_id == teacher_id,
+            TeachingEvaluation.is_delete == False,  # noqa: E712
+            (TeachingEvaluation.eval_source != "supervisor") | (TeachingEvaluation.eval_source == None),  # noqa: E711
+        )
+        if academic_year:
+            eval_stmt = eval_stmt.join(Timetable, TeachingEvaluation.timetable_id == Timetable.id).where(
+                Timetable.academic_year == academic_year
+            )
+        if semester:
+            if academic_year:
+                eval_stmt = eval_stmt.where(Timetable.semester == semester)
+            else:
+                eval_stmt = eval_stmt.join(Timetable, TeachingEvaluation.timetable_id == Timetable.id).where(
+                    Timetable.semester == semester
+                )
+        result.append((teacher_id, teacher_name, (await db.execute(eval_stmt)).scalar_one()))
+    return result
+
+
+async def seed(db):
+    users = [
+        User(id=1, user_on="t1", user_name="甲", password="x", college_id=COLLEGE_ID),
+        User(id=2, user_on="t2", user_name="乙", password="x", college_id=COLLEGE_ID),
+        User(id=3, user_on="t3", user_name="丙", password="x", college_id=COLLEGE_ID),  # 没听过课
+        User(id=4, user_on="t4", user_name="丁", password="x", college_id=COLLEGE_ID, is_delete=True),
+        User(id=5, user_on="t5", user_name="戊", password="x", college_id=2),
+    ]
+    db.add_all(users)
+    terms = [("2024-2025", 1), ("2024-2025", 2), ("2025-2026", 1)]
+    timetables = [
+        Timetable(
+            id=i + 1, teacher_id=5, class_name="班", course_name=f"课{i}", academic_year=year, semester=sem,
+            weekday=1, period="第一大节", section_time="01-02", week_info="1", classroom="",
+        )
+        for i, (year, sem) in enumerate(terms)
+    ]
+    db.add_all(timetables)
+    await db.flush()
+
+    n = 0
+    # (听课人, 课表, 来源, 是否删除)
+    for listener, tt, source, deleted in [
+        (1, 1, None, False), (1, 1, "peer", False), (1, 2, None, False), (1, 3, "supervisor", False),
+        (1, 3, None, True),
+        (2, 2, "peer", False), (2, 3, None, False), (2, 3, None, False), (2, 1, "supervisor", False),
+        (4, 1, None, False),
+        (5, 2, None, False),
+    ]:
+        n += 1
+        db.add(TeachingEvaluation(
+            evaluation_no=f"EV-{n}", timetable_id=tt, teach_teacher_id=5, listen_teacher_id=listener,
+            eval_source=source, total_score=80, dimension_scores={}, listen_date=datetime(2025, 1, n),
+            submit_time=datetime(2025, 1, n), status=1, is_delete=deleted,
+        ))
+    await db.flush()
+
+
+@pytest.mark.parametrize("academic_year, semester", [
+    (None, None),
+    ("2024-2025", None),
+    (None, 1),
+    ("2024-2025", 2),
+    ("2025-2026", 1),
+    ("2030-2031", 1),
+])
+def test_matches_per_teacher_counts(run_in_db, academic_year, semester):
+    async def check(db):
+        await seed(db)
+        new = await college_listen_counts(db, college_id=COLLEGE_ID, academic_year=academic_year, semester=semester)
+        old = await legacy_counts(db, college_id=COLLEGE_ID, academic_year=academic_year, semester=semester)
+        return new, old
+
+    new, old = run_in_db(check)
+    assert new == sorted(old)
+    assert [r[0] for r in new] == [1, 2, 3]
+
+
+def test_teachers_without_evaluations_count_zero(run_in_db):
+    async def check(db):
+        await seed(db)
+        return await college_listen_counts(db, college_id=COLLEGE_ID)
+
+    assert run_in_db(check) == [(1, "甲", 3), (2, "乙", 3), (3, "丙", 0)]
@@ -0,0 +1,71 @@
+# tests/test_count_cache.py
+"""分页总数缓存：命中不查库；涉及的表提交写入（ORM 钩子或显式 bump）后失效，回滚、无关表写入不影响"""
+from __future__ import annotations
+
+from sqlalchemy import func, insert, select
+
+from app.crud.count_cache import CountCache, cached_count, count_cache, statement_tables
+from app.models import Timetable, User
+
+
+def user(n):
+    return User(id=n, user_on=f"t{n}", user_name="师", password="x", college_id=1)
+
+
+COUNT_USERS = select(func.count()).select_from(User).where(User.college_id == 1)
+
+
+def test_invalidated_on_version_bump(run_in_db):
+    count_cache.clear()
+
+    async def main(db):
+        db.add_all([user(1), user(2)])
+        await db.commit()
+        assert await cached_count(db, COUNT_USERS) == 2
+        hits = count_cache.hits
+
+        # Core 写入不经 ORM 钩子：没有 bump 之前命中缓存，仍是旧值
+        await db.execute(insert(User).values(id=3, user_on="t3", user_name="师", password="x", college_id=1))
+        await db.commit()
+        assert await cached_count(db, COUNT_USERS) == 2
+        assert count_cache.hits == hits + 1
+
+        count_cache.bump(["user"], broadcast=False)
+        assert await cached_count(db, COUNT_USERS) == 3
+
+        # ORM 写入提交后自动递增版本号
+        db.add(user(4))
+        await db.commit()
+        assert await cached_count(db, COUNT_USERS) == 4
+
+        # 回滚的写入不递增；无关表的写入也不影响
+        hits = count_cache.hits
+        db.add(user(5))
+        await db.flush()
+        await db.rollback()
+        count_cache.bump(["timetable"], broadcast=False)
+        assert await cached_count(db, COUNT_USERS) == 4
+        assert count_cache.hits == hits + 1
+
+    try:
+        run_in_db(main)
+    finally:
+        count_cache.clear()
+
+
+def test_write_during_count_is_not_cached():
+    cache = CountCache(maxsize=8, ttl_seconds=60)
+    versions = cache.snapshot(["user"])
+    cache.bump(["user"], broadcast=False)
+    cache.set("k", 10, versions=versions, cost=0.01)
+    assert cache.get("k") is None
+
+    cache.set("k", 11, versions=cache.snapshot(["user"]), cost=0.01)
+    assert cache.get("k") == 11
+    cache.bump(["user"], broadcast=False)
+    assert cache.get("k") is None and cache.stale == 1
+
+
+def test_statement_tables_include_joins():
+    stmt = select(func.count()).select_from(Timetable).join(User, User.id == Timetable.teacher_id)
+    assert statement_tables(stmt) == {"timetable", "user"}
@@ -0,0 +1,55 @@
+# tests/test_dimension_averages.py
+"""维度均分：Python 聚合与 SQL 聚合（读生成列）同一分母
+
+SQL 实现依赖 MySQL 的生成列与 date_format，这里在 SQLite 上跑 Python 实现，
+期望值按生成列的口径手算：只有 JSON 数值（非布尔）计入，分母为该维度取到数值的行数。
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+from app.crud.evaluation import _dimension_avg_scores, evaluation_crud
+from app.models import TeachingEvaluation, Timetable, User
+
+ROWS = [
+    {"teachingAttitude": 90, "content": 80, "method": "90", "extra": 100},
+    {"teachingAttitude": 70, "effect": True},
+    [90, 80],  # 不是对象
+    {},
+]
+
+
+async def seed(db):
+    db.add(User(id=1, user_on="t1", user_name="甲", password="x", college_id=1))
+    db.add(Timetable(
+        id=1, teacher_id=1, class_name="班", course_name="课", academic_year="2024-2025", semester=1,
+        weekday=1, period="第一大节", section_time="01-02", week_info="1", classroom="",
+    ))
+    await db.flush()
+    for n, scores in enumerate(ROWS, start=1):
+        db.add(TeachingEvaluation(
+            evaluation_no=f"EV-{n}", timetable_id=1, teach_teacher_id=1, listen_teacher_id=1,
+            total_score=80, dimension_scores=scores, listen_date=datetime(2025, 1, n),
+            submit_time=datetime(2025, 1, n), status=1,
+        ))
+    await db.flush()
+
+
+def test_python_aggregate_matches_sql_semantics(run_in_db):
+    async def body(db):
+        await seed(db)
+        return await evaluation_crud._aggregate(
+            db, where=[TeachingEvaluation.teach_teacher_id == 1], academic_year=None, semester=None, sql=False,
+        )
+
+    agg = run_in_db(body)
+    assert agg["valid"] == len(ROWS)
+    # SQL：COUNT(dim_*) > 0 的维度才返回，SUM(dim_*) / COUNT(dim_*)；Python 实现另带上数据里的其它维度
+    assert agg["dimension_avg_scores"] == {"teachingAttitude": 80.0, "content": 80.0, "extra": 100.0}
+
+
+def test_sql_row_shape():
+    # SQL 实现的输入：各维度 (COUNT(dim_*), SUM(dim_*))，SUM 在没有数值时为 NULL
+    dims = {"teachingAttitude": (2, 160), "content": (1, 80), "method": (0, None), "effect": (0, None)}
+    assert _dimension_avg_scores(dims) == {"teachingAttitude": 80.0, "content": 80.0}
+    assert _dimension_avg_scores({"content": (0, None)}) == {}
@@ -0,0 +1,90 @@
+# tests/test_evaluated_index.py
+"""已评课表索引：装载期间到达的 mark/unmark 在装载完成后重放，重复应用幂等"""
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime
+
+from app.crud.evaluated_index import EvaluatedIndex
+from app.models import TeachingEvaluation, Timetable, User
+
+TERM = ("2024-2025", 1)
+
+
+class SlowIndex(EvaluatedIndex):
+    """装载结果是查询开始时的快照，在 release 之前一直挂起"""
+
+    def __init__(self, snapshot):
+        super().__init__(maxsize=8, ttl_seconds=60)
+        self.snapshot = snapshot
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def _load(self, db, listen_teacher_id):
+        self.started.set()
+        await self.release.wait()
+        self.loads += 1
+        return {term: {tt: set(evs) for tt, evs in tts.items()} for term, tts in self.snapshot.items()}
+
+
+def test_changes_during_load_are_replayed():
+    async def main():
+        # 快照里已有评教 10、11；评教 11 的软删除与评教 12 的提交发生在查询之后、装载完成之前
+        index = SlowIndex({TERM: {1: {10}, 2: {11}}})
+        first = asyncio.create_task(index.evaluations(None, listen_teacher_id=7))
+        await index.started.wait()
+        second = asyncio.create_task(index.evaluations(None, listen_teacher_id=7, academic_year=TERM[0]))
+
+        index.mark(listen_teacher_id=7, academic_year=TERM[0], semester=TERM[1], timetable_id=3, evaluation_id=12)
+        index.unmark(listen_teacher_id=7, timetable_id=2, evaluation_id=11)
+        # 快照里已包含的提交再次到达（例如广播重复），重放不重复计入
+        index.mark(listen_teacher_id=7, academic_year=TERM[0], semester=TERM[1], timetable_id=1, evaluation_id=10)
+        # 其它听课人的变更不影响本次装载
+        index.mark(listen_teacher_id=8, academic_year=TERM[0], semester=TERM[1], timetable_id=4, evaluation_id=13)
+
+        index.release.set()
+        expected = {1: 10, 3: 12}
+        assert await first == expected
+        assert await second == expected
+        assert index.loads == 1
+
+        # 装载完成后的变更直接作用在缓存上
+        index.unmark(listen_teacher_id=7, timetable_id=1, evaluation_id=10)
+        index.mark(listen_teacher_id=7, academic_year="2024-2025", semester=2, timetable_id=5, evaluation_id=14)
+        assert await index.evaluations(None, listen_teacher_id=7) == {3: 12, 5: 14}
+        assert await index.timetable_ids(None, listen_teacher_id=7, academic_year=TERM[0], semester=TERM[1]) == {3}
+        assert index.loads == 1 and index._replay == {}
+
+    asyncio.run(main())
+
+
+def test_load_groups_by_term(run_in_db):
+    async def main(db):
+        db.add(User(id=1, user_on="t1", user_name="甲", password="x"))
+        db.add_all([
+            Timetable(
+                id=i, teacher_id=1, class_name="班", course_name=f"课{i}", academic_year=year, semester=sem,
+                weekday=1, period="第一大节", section_time="01-02", week_info="1", classroom="",
+            )
+            for i, (year, sem) in enumerate([TERM, TERM, ("2024-2025", 2)], start=1)
+        ])
+        await db.flush()
+        db.add_all([
+            TeachingEvaluation(
+                evaluation_no=f"EV-{n}", timetable_id=tt, teach_teacher_id=1, listen_teacher_id=1,
+                total_score=80, dimension_scores={}, listen_date=date(2025, 1, n),
+                submit_time=datetime(2025, 1, n), status=1, is_delete=deleted,
+            )
+            for n, tt, deleted in [(1, 1, False), (2, 1, False), (3, 2, True), (4, 3, False)]
+        ])
+        await db.commit()
+
+        index = EvaluatedIndex(maxsize=8, ttl_seconds=60)
+        by_term = await index.evaluations(db, listen_teacher_id=1, academic_year=TERM[0], semester=TERM[1])
+        everything = await index.evaluations(db, listen_teacher_id=1)
+        return by_term, everything, index.loads, index.hits
+
+    by_term, everything, loads, hits = run_in_db(main)
+    assert by_term == {1: 2}
+    assert everything == {1: 2, 3: 4}
+    assert (loads, hits) == (1, 1)
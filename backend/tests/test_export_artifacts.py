@@ -0,0 +1,104 @@
+# tests/test_export_artifacts.py
+"""后台导出产物：数据版本指纹不变时复用已落盘的文件，范围内新增评教后生成新版本并清理旧文件"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.jobs import DONE, JobQueue
+from app.crud.export import build_export_stmt, export_artifact_path, export_data_version, write_export_artifact
+from app.models import College, TeachingEvaluation, Timetable, User
+
+YEAR, SEMESTER = "2024-2025", 1
+
+
+def evaluation(n, timetable_id=1):
+    return TeachingEvaluation(
+        evaluation_no=f"EV-{n}", timetable_id=timetable_id, teach_teacher_id=1, listen_teacher_id=2,
+        total_score=80 + n, dimension_scores={"content": 90}, listen_date=datetime(2025, 1, n),
+        submit_time=datetime(2025, 1, n), status=1,
+    )
+
+
+async def seed(db):
+    db.add(College(id=1, college_code="C1", college_name="信息学院"))
+    db.add_all([
+        User(id=1, user_on="t1", user_name="甲", password="x", college_id=1),
+        User(id=2, user_on="t2", user_name="乙", password="x", college_id=1),
+    ])
+    db.add_all([
+        Timetable(
+            id=i, teacher_id=1, college_id=1, class_name="班", course_name=f"课{i}", academic_year=year,
+            semester=SEMESTER, weekday=1, period="第一大节", section_time="01-02", week_info="1", classroom="",
+        )
+        for i, year in ((1, YEAR), (2, "2023-2024"))
+    ])
+    await db.flush()
+    db.add(evaluation(1))
+    await db.commit()
+
+
+def test_artifact_reused_until_scope_changes(run_in_db, tmp_path, monkeypatch):
+    queue = JobQueue(workers=1, max_pending=4, retention_seconds=3600, state_dir=str(tmp_path / "jobs"))
+    runs = []
+
+    async def export(db):
+        """与导出接口相同的流程：指纹 -> 产物路径 -> 以 (范围, 学期, 格式, 指纹) 去重提交任务"""
+        version = await export_data_version(db, academic_year=YEAR, semester=SEMESTER)
+        path = export_artifact_path(str(tmp_path), "school", YEAR, SEMESTER, "csv", version)
+        stmt = build_export_stmt(academic_year=YEAR, semester=SEMESTER)
+
+        async def run(job):
+            runs.append(version)
+            job.meta["size"] = await write_export_artifact(stmt, path, "csv")
+            return str(path)
+
+        job, created = queue.submit(("school", YEAR, SEMESTER, "csv", version), run, owner=1)
+        await asyncio.sleep(0.05)
+        assert queue.get(job.id).status == DONE
+        return version, path, created
+
+    async def main(db):
+        # 导出游标自带会话，这里指向测试库
+        monkeypatch.setattr("app.database.AsyncSessionLocal", async_sessionmaker(db.bind))
+        await seed(db)
+
+        v1, path1, created = await export(db)
+        assert created and path1.exists()
+        rows = path1.read_text(encoding="utf-8-sig").splitlines()
+        assert len(rows) == 2 and rows[1].startswith("EV-1,")
+
+        # 数据没变：指纹相同，复用同一任务与文件，不再执行导出
+        again, path, created = await export(db)
+        assert (again, path, created) == (v1, path1, False)
+        assert runs == [v1]
+        # 产物已存在时直接返回大小，不重写
+        path1.write_bytes(b"cached")
+        stmt = build_export_stmt(academic_year=YEAR, semester=SEMESTER)
+        assert await write_export_artifact(stmt, path1, "csv") == len(b"cached")
+        assert path1.read_bytes() == b"cached"
+
+        # 范围外的评教不影响指纹
+        db.add(evaluation(2, timetable_id=2))
+        await db.commit()
+        assert await export_data_version(db, academic_year=YEAR, semester=SEMESTER) == v1
+
+        # 范围内新增评教：新指纹、新文件，旧版本被清理
+        db.add(evaluation(3))
+        await db.commit()
+        v2, path2, created = await export(db)
+        assert created and v2 != v1 and path2 != path1
+        assert path2.exists() and not path1.exists()
+        assert len(path2.read_text(encoding="utf-8-sig").splitlines()) == 3
+        assert runs == [v1, v2]
+
+        # 作废一条评教同样改变指纹
+        await db.execute(update(TeachingEvaluation).where(TeachingEvaluation.evaluation_no == "EV-3").values(status=0))
+        await db.commit()
+        assert await export_data_version(db, academic_year=YEAR, semester=SEMESTER) not in (v1, v2)
+        await queue.shutdown()
+
+    run_in_db(main)
@@ -0,0 +1,79 @@
+# tests/test_export_jobs.py
+"""后台导出任务：查询/下载/去重落在另一个 worker 上时通过状态文件找到任务"""
+from __future__ import annotations
+
+import asyncio
+import json
+import subprocess
+import sys
+
+from app.core.jobs import DONE, FAILED, JobQueue
+
+
+def make_queue(state_dir):
+    return JobQueue(workers=1, max_pending=4, retention_seconds=3600, state_dir=str(state_dir))
+
+
+def test_job_visible_and_deduplicated_across_workers(tmp_path):
+    key = ("school", "2024-2025", 1, "csv", "v1")
+    runs = []
+
+    async def run(job):
+        runs.append(job.id)
+        job.meta["size"] = 3
+        return str(tmp_path / "school.csv")
+
+    async def main():
+        a, b = make_queue(tmp_path), make_queue(tmp_path)
+        job, created = a.submit(key, run, owner=1, meta={"format": "csv", "filename": "全校.csv"})
+        assert created
+
+        # 另一个 worker 提交相同导出：复用，不重复执行
+        other, created = b.submit(key, run, owner=2)
+        assert not created and other.id == job.id
+
+        await asyncio.sleep(0.05)
+        seen = b.get(job.id)
+        assert seen is not None and seen.status == DONE
+        assert seen.result == str(tmp_path / "school.csv")
+        assert seen.meta == {"format": "csv", "filename": "全校.csv", "size": 3}
+        assert seen.owners == {1, 2}
+        # 执行进程也能看到另一个 worker 追加的提交人
+        assert a.get(job.id).owners == {1, 2}
+        assert b.get("0" * 16 + "-" + "0" * 12) is None
+        assert b.get("../../etc/passwd") is None
+        await a.shutdown()
+        await b.shutdown()
+
+    asyncio.run(main())
+    assert len(runs) == 1
+
+
+def test_job_of_exited_worker_is_failed_and_resubmittable(tmp_path):
+    key = ("school", None, None, "csv", "v1")
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+
+    async def run(job):
+        return "x"
+
+    async def main():
+        a, b = make_queue(tmp_path), make_queue(tmp_path)
+        job, _ = a.submit(key, run, owner=1)
+        await a.shutdown()
+        # 模拟执行进程在任务结束前退出
+        path = tmp_path / f"{job.id.split('-')[0]}.job.json"
+        state = json.loads(path.read_text(encoding="utf-8"))
+        path.write_text(json.dumps({**state, "status": "running", "pid": dead.pid}), encoding="utf-8")
+
+        seen = b.get(job.id)
+        assert seen.status == FAILED
+
+        again, created = b.submit(key, run, owner=1)
+        assert created and again.id != job.id
+        await asyncio.sleep(0.05)
+        assert b.get(again.id).status == DONE
+        assert b.get(job.id) is None
+        await b.shutdown()
+
+    asyncio.run(main())
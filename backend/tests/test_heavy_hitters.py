@@ -0,0 +1,88 @@
+# tests/test_heavy_hitters.py
+"""Space-Saving：计数上下界、撤销、合并与序列化"""
+from __future__ import annotations
+
+import random
+from collections import Counter
+
+from app.crud.heavy_hitters import SpaceSaving, normalize_text, top_texts
+
+
+def stream(seed, n=3000):
+    """少数高频文本 + 大量只出现一两次的长尾"""
+    rnd = random.Random(seed)
+    heavy = ["节奏偏快", "板书不清", "互动较少", "PPT 字太小"]
+    return [rnd.choice(heavy) if rnd.random() < 0.4 else f"长尾{rnd.randint(0, 5000)}" for _ in range(n)]
+
+
+def check_bounds(sketch, truth):
+    total = sum(truth.values())
+    for key, (count, error, _) in sketch._items.items():
+        true = truth[key]
+        assert count - error <= true <= count, key
+    # 真实频次超过 总条数 / capacity 的文本一定在表里
+    for key, true in truth.items():
+        if true > total / sketch.capacity:
+            assert key in sketch._items, key
+
+
+def test_normalize_text():
+    assert normalize_text("节奏偏快。") == normalize_text("节奏偏快！") == normalize_text(" 节奏 偏快 ") == "节奏偏快"
+    assert normalize_text("ＰＰＴ字太小") == normalize_text("ppt 字太小")
+    assert normalize_text(None) == normalize_text("。。") == ""
+
+
+def test_exact_under_capacity_and_bounds_when_full():
+    values = ["节奏偏快。", "板书不清", "节奏偏快！", "", None, "板书不清", "节奏 偏快"]
+    sketch = SpaceSaving(8).update(values)
+    assert sketch.total == 5
+    assert sketch.top() == ["节奏偏快。", "板书不清"]
+    assert top_texts([]) is None
+
+    values = stream(1)
+    sketch = SpaceSaving(20).update(values)
+    assert len(sketch) == 20 and sketch.total == len(values)
+    check_bounds(sketch, Counter(normalize_text(v) for v in values))
+
+
+def test_remove():
+    sketch = SpaceSaving(4).update(["节奏偏快", "节奏偏快", "板书不清"])
+    sketch.remove("节奏偏快！")
+    sketch.add("板书不清", -1)
+    sketch.remove("从未出现")  # 未被跟踪：只减总数
+    assert sketch.total == 0
+    assert sketch.top() == ["节奏偏快"]
+    assert sketch._items["节奏偏快"][:2] == [1, 0]
+    sketch.remove("节奏偏快")
+    assert sketch.top() is None and sketch.total == 0
+
+    # 撤销后误差上界不超过剩余计数
+    full = SpaceSaving(2).update(["a", "b", "c", "c"])
+    full.remove("c", 2)
+    count, error, _ = full._items["c"]
+    assert 0 <= error <= count
+
+
+def test_merge_exact_when_capacity_allows():
+    a = SpaceSaving(10).update(["节奏偏快", "板书不清", "节奏偏快"])
+    b = SpaceSaving(10).update(["节奏偏快。", "互动较少"])
+    a.merge(b)
+    assert a.total == 5
+    assert {k: v[:2] for k, v in a._items.items()} == {"节奏偏快": [3, 0], "板书不清": [1, 0], "互动较少": [1, 0]}
+    assert a.top(1) == ["节奏偏快"]
+
+
+def test_merge_keeps_bounds_and_heavy_hitters():
+    left, right = stream(2), stream(3)
+    merged = SpaceSaving(25).update(left).merge(SpaceSaving(25).update(right))
+    assert len(merged) == 25 and merged.total == len(left) + len(right)
+    check_bounds(merged, Counter(normalize_text(v) for v in left + right))
+    assert set(merged.top(4)) == {"节奏偏快", "板书不清", "互动较少", "PPT 字太小"}
+
+
+def test_json_roundtrip():
+    sketch = SpaceSaving(20).update(stream(4, 500))
+    restored = SpaceSaving.from_json(sketch.to_json(), capacity=20)
+    assert restored._items == sketch._items and restored.total == sketch.total
+    assert SpaceSaving.from_json(None).top() is None
+    assert SpaceSaving.from_json({"total": 0, "items": []}).to_json() == {"total": 0, "items": []}
@@ -0,0 +1,125 @@
+# tests/test_ingest.py
+"""课表批量入库的计数：新增/更新/跳过（含原因）与批次
+
+upsert 用的是 MySQL 的 INSERT ... ON DUPLICATE KEY UPDATE，SQLite 上执行不了；
+这里预置引用数据（学院/教师/专业/班级/已有槽位），用只记录语句的会话验证计数与每批写入的行数。
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy.dialects import mysql
+
+from app.crawl import ingest
+from app.crawl.ingest import ingest_timetable_rows, iter_json_rows
+
+YEAR, SEMESTER = "2024-2025", 1
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+
+        class Result:
+            @staticmethod
+            def all():
+                return []
+
+        return Result()
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    def upserts(self):
+        """每条课表 upsert 写入的行数"""
+        out = []
+        for stmt in self.statements:
+            if getattr(stmt, "table", None) is not None and stmt.table.name == "timetable":
+                params = stmt.compile(dialect=mysql.dialect()).params
+                out.append(sum(1 for k in params if k.startswith("teacher_id")))
+        return out
+
+
+def row(class_name="23计算机1班", course="数据结构", teacher="张三", weekday="星期一", **kw):
+    return {
+        "班级": class_name, "学院": "信息学院", "专业": "计算机科学与技术", "年级": "2023",
+        "course": course, "teacher": teacher, "星期": weekday, "节次": "第一大节",
+        "section_time": "01-02", "week_info": "1-16", "classroom": "A101", **kw,
+    }
+
+
+def existing_slot(r):
+    return (YEAR, SEMESTER, 1, r["班级"], r["course"], 1, r["节次"], r["section_time"], r["week_info"], r["classroom"])
+
+
+@pytest.fixture
+def refs(monkeypatch):
+    async def load(self, db, *, academic_year, semester):
+        self.colleges = {"信息学院": 1}
+        self.user_by_on = {"T001": 1}
+        self.users_by_name = {"张三": [1], "李四": [2], "王五": [3, 4]}
+        self.majors = {(1, "计算机科学与技术"): 10}
+        self.classes = {(10, "23计算机1班"): 100, (10, "23计算机2班"): 101}
+        self.slots = {existing_slot(row(course="操作系统"))}
+
+    monkeypatch.setattr(ingest._Refs, "load", load)
+
+
+def test_report_counts(refs):
+    rows = [
+        row(),                                  # 新增
+        row(course="操作系统"),                  # 命中已有槽位 -> 更新
+        row(class_name="23计算机2班", teacher="李四", weekday="周二"),  # 新增
+        row(),                                  # 文件内重复
+        "not a dict",
+        row(course=""),
+        row(weekday="某天"),
+        {**row(), "学院": "不存在学院"},
+        row(teacher="赵六"),
+        row(teacher="王五"),                     # 重名且无工号
+        row(teacher="王五", course="高等数学"),
+    ]
+    db = RecordingSession()
+    report = asyncio.run(ingest_timetable_rows(
+        db, iter(rows), academic_year=YEAR, semester=SEMESTER,
+        name_to_employee_no={}, batch_size=4,
+    ))
+    assert (report.read, report.inserted, report.updated, report.skipped) == (11, 2, 1, 8)
+    assert report.inserted + report.updated + report.skipped == report.read
+    assert dict(report.skip_reasons) == {
+        "duplicate_in_file": 1, "invalid": 1, "missing_field": 1, "invalid_weekday": 1,
+        "college_missing": 1, "teacher_missing": 1, "teacher_ambiguous": 2,
+    }
+    # 每批 4 行：只有第一批有可写入的行，后两批全部跳过、不写库；引用都已存在，不建专业/班级
+    assert db.upserts() == [3]
+    assert (report.batches, db.commits, db.rollbacks) == (1, 1, 0)
+    assert (report.majors_created, report.classes_created) == (0, 0)
+
+
+def test_employee_no_resolves_duplicate_names(refs):
+    db = RecordingSession()
+    report = asyncio.run(ingest_timetable_rows(
+        db, iter([row(teacher="王五")]), academic_year=YEAR, semester=SEMESTER,
+        name_to_employee_no={"王五": "T001"},
+    ))
+    assert (report.inserted, report.skipped) == (1, 0)
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps([row(), row(weekday="星期三")], ensure_ascii=False),
+    "\n".join(json.dumps(r, ensure_ascii=False) for r in [row(), row(weekday="星期三")]),
+])
+def test_iter_json_rows(tmp_path, text):
+    path = tmp_path / "rows.json"
+    path.write_text(text, encoding="utf-8")
+    assert list(iter_json_rows(str(path), chunk_size=7)) == [row(), row(weekday="星期三")]
@@ -0,0 +1,72 @@
+# tests/test_pagination.py
+"""游标分页：游标编解码、升降序混合的 keyset_after 逐页翻完与一次排序的结果一致"""
+from __future__ import annotations
+
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.crud.pagination import apply_keyset, decode_cursor, encode_cursor, keyset_page, want_total
+from app.models import TeachingEvaluation, Timetable, User
+
+
+def test_cursor_roundtrip():
+    values = [datetime(2025, 3, 1, 8, 30, 15, 120000), date(2025, 3, 1), 88.5, "张三", 42]
+    token = encode_cursor(values)
+    assert "=" not in token and "+" not in token and "/" not in token
+    assert decode_cursor(token, len(values)) == values
+
+
+@pytest.mark.parametrize("token", ["!!!", encode_cursor([1]), encode_cursor([{"x": 1}, 2]), "e30"])
+def test_invalid_cursor(token):
+    with pytest.raises(ValueError, match="无效的分页游标"):
+        decode_cursor(token, 2)
+
+
+def test_want_total():
+    assert want_total(None, None) is True
+    assert want_total(None, "") is False
+    assert want_total(True, "abc") is True
+
+
+def test_keyset_pages_mixed_directions(run_in_db):
+    te = TeachingEvaluation
+    # 提交时间降序、总分升序、id 升序决胜；时间与总分都有大量重复
+    keyset = [(te.submit_time, True), (te.total_score, False), (te.id, False)]
+    rnd = random.Random(5)
+
+    async def main(db):
+        db.add(User(id=1, user_on="t1", user_name="甲", password="x"))
+        db.add(Timetable(
+            id=1, teacher_id=1, class_name="班", course_name="课", academic_year="2024-2025", semester=1,
+            weekday=1, period="第一大节", section_time="01-02", week_info="1", classroom="",
+        ))
+        await db.flush()
+        db.add_all([
+            te(
+                evaluation_no=f"EV-{n}", timetable_id=1, teach_teacher_id=1, listen_teacher_id=1,
+                total_score=rnd.choice([60, 75, 90]), dimension_scores={},
+                listen_date=date(2025, 1, 1) + timedelta(days=n),
+                submit_time=datetime(2025, 1, rnd.randint(1, 3), 8, 0, rnd.choice([0, 30])), status=1,
+            )
+            for n in range(1, 58)
+        ])
+        await db.commit()
+
+        expected = (await db.execute(
+            select(te).order_by(te.submit_time.desc(), te.total_score.asc(), te.id.asc())
+        )).scalars().all()
+
+        seen, cursor, pages = [], "", 0
+        while cursor is not None:
+            rows = (await db.execute(apply_keyset(select(te), keyset, cursor, 10))).scalars().all()
+            items, cursor = keyset_page(rows, keyset, 10)
+            seen.extend(items)
+            pages += 1
+        return [e.id for e in expected], [e.id for e in seen], pages
+
+    expected, seen, pages = run_in_db(main)
+    assert seen == expected
+    assert pages == 6
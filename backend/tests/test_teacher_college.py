@@ -0,0 +1,39 @@
+# tests/test_teacher_college.py
+"""教师所属学院：单个重建与全量对账取同一个学院（本学期课表中的最小非空学院 id）"""
+from __future__ import annotations
+
+from app.crud.stats import _teacher_colleges
+from app.models import Timetable, User
+
+YEAR, SEMESTER = "2024-2025", 1
+
+
+def timetable(i, teacher_id, college_id, *, year=YEAR, semester=SEMESTER, is_delete=False):
+    return Timetable(
+        id=i, teacher_id=teacher_id, college_id=college_id, class_name="班", course_name=f"课{i}",
+        academic_year=year, semester=semester, weekday=1, period="第一大节", section_time="01-02",
+        week_info="1", classroom="", is_delete=is_delete,
+    )
+
+
+def test_single_teacher_matches_reconcile(run_in_db):
+    async def main(db):
+        db.add_all([User(id=t, user_on=f"t{t}", user_name="师", password="x") for t in (1, 2, 3)])
+        db.add_all([
+            # 跨学院授课：插入顺序在前的是较大的学院 id
+            timetable(1, 1, 7), timetable(2, 1, None), timetable(3, 1, 3),
+            timetable(4, 1, 1, is_delete=True), timetable(5, 1, 2, semester=2),
+            timetable(6, 2, None),
+            timetable(7, 3, 5),
+        ])
+        await db.commit()
+        every = await _teacher_colleges(db, stat_year=YEAR, stat_semester=SEMESTER)
+        single = {
+            t: (await _teacher_colleges(db, stat_year=YEAR, stat_semester=SEMESTER, teacher_id=t)).get(t)
+            for t in (1, 2, 3)
+        }
+        return every, single
+
+    every, single = run_in_db(main)
+    assert every == {1: 3, 2: None, 3: 5}
+    assert single == every
@@ -0,0 +1,50 @@
+# tests/test_timetable_parser.py
+"""课表解析：流式解析器（lxml / 标准库两种后端）与改动前 BeautifulSoup + identify_* 的输出逐条一致"""
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("bs4")
+
+from app.crawl.crawl import JWXTSpider
+from app.crawl.parser import TimetableParser, available_backend
+from benchmarks.bench_timetable_parser import legacy_parse
+from benchmarks.kbtable_fixture import make_kbtable_html
+
+BACKENDS = ["stdlib", pytest.param("lxml", marks=pytest.mark.skipif(
+    available_backend() != "lxml", reason="未安装 lxml"))]
+
+
+@pytest.fixture(scope="module")
+def page(tmp_path_factory):
+    path = tmp_path_factory.mktemp("kbtable") / "kbtable.html"
+    path.write_text(make_kbtable_html(120), encoding="utf-8")
+    spider = JWXTSpider()
+    return spider, str(path), list(legacy_parse(spider, str(path)))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("chunk_size", [97, 1 << 16])
+def test_matches_legacy_parser(page, backend, chunk_size):
+    spider, path, expected = page
+    assert expected
+    parser = TimetableParser.from_spider(spider, backend=backend)
+    # 小块读取让标签、中文字符跨块边界
+    assert list(parser.iter_file(path, chunk_size=chunk_size)) == expected
+    assert parser.found_table
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_class_info_matches_identify(page, backend):
+    spider, _, expected = page
+    parser = TimetableParser.from_spider(spider, backend=backend)
+    for name in {r["班级"] for r in expected} | {"", "无匹配班级", "23大数据技术1班", "工商计算机"}:
+        assert parser.identify_college(name) == spider.identify_college(name), name
+        assert parser.identify_major(name) == spider.identify_major(name), name
+        assert parser.identify_grade(name) == spider.identify_grade(name), name
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_page_without_table(backend):
+    parser = TimetableParser.from_spider(JWXTSpider(), backend=backend)
+    assert parser.parse_text("<html><body><p>登录已过期</p></body></html>") is None
@@ -0,0 +1,91 @@
+# tests/test_token_cache.py
+"""token 撤销：毫秒精度的撤销时刻、worker 重启后按库里的 password_changed_at 拒绝旧 token、缓存条目 TTL"""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, Request
+from sqlalchemy import update
+
+from app.core.auth import create_access_token, verify_token
+from app.core.token_cache import TokenCache, token_cache
+from app.models import User
+from app.schemas import TokenData
+
+USER = TokenData(id=1, user_on="t001", college_id=None, status=1, is_delete=False)
+
+
+def new_cache(**kw) -> TokenCache:
+    return TokenCache(**{"maxsize": 16, "max_token_lifetime": 1800, "ttl_seconds": 60, **kw})
+
+
+def bearer(token: str) -> Request:
+    return Request({"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]})
+
+
+def test_same_second_revocation():
+    cache = new_cache()
+    now = time.time()
+    cache.revoke_user(1, not_before=now, broadcast=False)
+    # 同一秒内、撤销前签发的 token 也失效；撤销之后签发的不受影响
+    assert cache.is_revoked(1, now - 0.3)
+    assert not cache.is_revoked(1, now + 0.2)
+    assert not cache.is_revoked(2, now - 0.3)
+
+
+def test_persisted_not_before_survives_restart():
+    # 新进程内存里没有撤销记录，只凭库里的时刻判断
+    cache = new_cache()
+    assert not cache.is_revoked(1, 100.2)
+    assert cache.is_revoked(1, 100.2, not_before=100.5)
+    assert not cache.is_revoked(1, 100.7, not_before=100.5)
+    # 内存与库里的取较晚者
+    cache.revoke_user(1, not_before=time.time(), broadcast=False)
+    assert cache.is_revoked(1, time.time() - 1, not_before=100.5)
+
+
+def test_cached_entry_expires_after_ttl(monkeypatch):
+    cache = new_cache(ttl_seconds=5)
+    now = time.time()
+    cache.put("tok", USER, now + 3600)
+    assert cache.get("tok") == USER
+    monkeypatch.setattr(time, "time", lambda: now + 6)
+    assert cache.get("tok") is None
+    # 关闭 TTL 即不缓存
+    off = new_cache(ttl_seconds=0)
+    off.put("tok", USER, now + 3600)
+    assert off.get("tok") is None
+
+
+def test_verify_token_checks_password_changed_at(run_in_db):
+    token_cache.clear()
+
+    async def main(db):
+        db.add(User(id=USER.id, user_on=USER.user_on, user_name="张三", password="x"))
+        await db.commit()
+
+        old = create_access_token(USER).token
+        assert (await verify_token(bearer(old), db)).id == USER.id
+
+        # 另一个 worker 改了密码：本进程没收到广播，缓存也已过期
+        await db.execute(
+            update(User).where(User.id == USER.id)
+            .values(password_changed_at=datetime.now() + timedelta(milliseconds=5))
+        )
+        await db.commit()
+        token_cache.clear()
+        time.sleep(0.01)
+
+        with pytest.raises(HTTPException) as exc:
+            await verify_token(bearer(old), db)
+        assert exc.value.status_code == 401
+
+        new = create_access_token(USER).token
+        assert (await verify_token(bearer(new), db)).id == USER.id
+
+    try:
+        run_in_db(main)
+    finally:
+        token_cache.clear()